@@ -3,63 +3,30 @@ import os
 import shutil
 from time import sleep
 
-import boto3
-from botocore.exceptions import ClientError
-
 from artemislib.datetime import get_utc_datetime
 from artemislib.logging import Logger
 from env import (
     ENGINE_ID,
     INSTANCE_ID,
     PRIORITY_TASK_QUEUE,
-    REGION,
     S3_KEY,
     SERVICES_S3_KEY,
-    SQS_ENDPOINT,
     TASK_QUEUE,
     WORKING_DIR,
     reset_log_state,
 )
 from oci.builder import ScanImages
 from processor.processor import EngineProcessor
+from utils.consumer import DEFAULT_POLL_WAIT, PRIORITY_POLL_WAIT, TaskConsumer
 from utils.engine import _build_docker_images, check_disk_space, cleanup_images
+from utils.events import event_publisher
+from utils.git_mirror import git_mirror_cache
+from utils.plugin import plugin_registry
 from utils.services import get_services_dict
+from utils.trivy_cache import trivy_db_cache
 
 log = Logger(__name__)
 
-DEFAULT_POLL_WAIT = 20  # Seconds
-PRIORITY_POLL_WAIT = 5  # Seconds
-
-
-def poll(queue, wait_time=DEFAULT_POLL_WAIT):
-    try:
-        sqs = boto3.client("sqs", endpoint_url=SQS_ENDPOINT, region_name=REGION)
-
-        resp = sqs.receive_message(
-            QueueUrl=queue,
-            AttributeNames=["SentTimestamp"],
-            MaxNumberOfMessages=1,
-            MessageAttributeNames=["All"],
-            WaitTimeSeconds=wait_time,
-        )
-
-        messages = resp.get("Messages", [])
-        msg = messages[0] if messages else None
-
-        if msg:
-            log.info("Got message %s", msg["MessageId"])
-            receipt_handle = msg["ReceiptHandle"]
-            sqs.delete_message(QueueUrl=queue, ReceiptHandle=receipt_handle)
-        else:
-            log.debug("SQS poll timeout (%s)", queue.split("/")[-1])
-        return msg
-
-    except ClientError as err:
-        if err.response["Error"]["Code"] == "AWS.SimpleQueueService.NonExistentQueue":
-            log.warning("Queue not found: %s", queue)
-        else:
-            raise err
-
 
 def process(msg, manager=None):  # pylint: disable=too-many-statements
     services = get_services_dict(SERVICES_S3_KEY, S3_KEY).get("services")
@@ -79,6 +46,8 @@ def process(msg, manager=None):  # pylint: disable=too-many-statements
     debug = []
 
     if action.lower() == "scan":
+        # Make room for the repo, and for the mirror to grow by as much, by evicting old mirrors if needed
+        git_mirror_cache.evict(details.get("repo_size", 0) * 2)
         if not check_disk_space(details.get("repo_size", 0)):
             log.error("Scan failed because not enough disk space (repo size: %d KB)", details["repo_size"])
             engine_processor.update_scan_status(
@@ -121,7 +90,8 @@ def process(msg, manager=None):  # pylint: disable=too-many-statements
                 log.error("Repo %s/%s could not be pulled. Plugins will not be processed.", service, repo)
                 errors.append("Repository was unable to be scanned. Please contact support with the scan id.")
         finally:
-            # Make sure we always clean up
+            # Make sure we always send any buffered events and clean up
+            event_publisher.flush()
             cleanup(WORKING_DIR, str(engine_processor.get_scan_id()))
             cleanup_images(images.results)
 
@@ -131,6 +101,23 @@ def process(msg, manager=None):  # pylint: disable=too-many-statements
     reset_log_state()
 
 
+def fail_task(msg, manager=None):
+    """
+    Marks the scan of a task that is being dropped from the queue as failed so that it isn't left queued or processing
+    """
+    services = get_services_dict(SERVICES_S3_KEY, S3_KEY).get("services")
+    action = msg["MessageAttributes"]["action"]["StringValue"]
+    engine_processor = EngineProcessor(services, action, json.loads(msg["Body"]), manager=manager)
+
+    log.error("Scan %s failed repeatedly and is being dropped", engine_processor.action_details.scan_id)
+    engine_processor.update_scan_status(
+        "error",
+        end_time=get_utc_datetime(),
+        errors=["Scan did not complete after repeated attempts. Please contact support with the scan id."],
+    )
+    engine_processor.queue_callback("error")
+
+
 def cleanup(working_dir, scan_id):
     try:
         log.info(f"cleaning up cloned repo at {working_dir, scan_id}")
@@ -155,6 +142,8 @@ def main():
         manager.terminate_instance()
         return
 
+    consumer = TaskConsumer(PRIORITY_TASK_QUEUE, TASK_QUEUE, on_drop=lambda msg: fail_task(msg, manager))
+
     while True:
         try:
             if manager.maintenance_mode():
@@ -171,21 +160,22 @@ def main():
                 # Shutting down so break out of the polling loop
                 break
 
-            # Poll the priority queue for a task
-            msg = poll(PRIORITY_TASK_QUEUE, wait_time=PRIORITY_POLL_WAIT)
-            if msg:
-                # The priority queue had a task so process it and then continue
-                # so that the priority queue gets polled again.
-                Logger.add_fields(priority_task_queue=True)
-                process(msg, manager)
-                continue
+            # Bring the plugin images up to date in the background, if it's time, while waiting for a task
+            plugin_registry.start_image_refresh()
+
+            # Likewise, download the shared Trivy DBs if they are out of date
+            trivy_db_cache.start_refresh(plugin_registry.trivy_image())
 
-            # Polling the priority queue timed out with no message so poll the
-            # regular task queue for a task.
-            msg = poll(TASK_QUEUE)
+            # Get the next task, from the priority queue first
+            msg = consumer.receive()
             if msg:
-                Logger.add_fields(priority_task_queue=False)
-                process(msg, manager)
+                Logger.add_fields(priority_task_queue=consumer.is_priority(msg))
+                try:
+                    process(msg, manager)
+                finally:
+                    # The task stays on the queue until the scan is done so that it is picked up again if the engine
+                    # dies part way through
+                    consumer.ack(msg)
 
         except Exception as e:  # pylint: disable=broad-except
             # Catch everything so that an error doesn't kill the engine
@@ -193,6 +183,7 @@ def main():
             # investigated.
             log.exception("Error: %s", e)
 
+    consumer.close()
     manager.set_instance_health()
     manager.terminate_instance()
 
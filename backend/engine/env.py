@@ -23,10 +23,40 @@ INSTANCE_ID = os.environ.get("INSTANCE_ID", None)
 S3_BUCKET = os.environ.get("S3_BUCKET", None)
 S3_KEY = not LOCAL_SERVICES_OVERRIDE
 SERVICES_S3_KEY = "services.json"
+# How often, in seconds, the engine checks whether services.json has changed
+SERVICES_REFRESH_INTERVAL = int(os.environ.get("ARTEMIS_SERVICES_REFRESH_INTERVAL") or 300)
 DEFAULT_DEPTH = os.environ.get("DEFAULT_DEPTH", None)
 DEFAULT_INCLUDE_DEV = os.environ.get("DEFAULT_INCLUDE_DEV", False)
 TASK_QUEUE = os.environ.get("TASK_QUEUE")
 PRIORITY_TASK_QUEUE = os.environ.get("PRIORITY_TASK_QUEUE")
+EVENT_QUEUE = os.environ.get("EVENT_QUEUE")
+
+# Task queue consumer configuration
+#
+# ARTEMIS_TASK_VISIBILITY_TIMEOUT -- Visibility timeout of received task messages, extended until the scan finishes
+# ARTEMIS_TASK_MAX_RECEIVE_COUNT -- Task messages received more times than this are dropped
+# ARTEMIS_PRIORITY_TASK_WEIGHT -- Priority tasks in a row before the regular queue is given a turn
+TASK_VISIBILITY_TIMEOUT = int(os.environ.get("ARTEMIS_TASK_VISIBILITY_TIMEOUT") or 300)  # seconds
+TASK_MAX_RECEIVE_COUNT = int(os.environ.get("ARTEMIS_TASK_MAX_RECEIVE_COUNT") or 5)
+PRIORITY_TASK_WEIGHT = max(int(os.environ.get("ARTEMIS_PRIORITY_TASK_WEIGHT") or 5), 1)
+
+# Opt-in cache of bare repository mirrors on the engine host used to speed up pulling repos
+#
+# ARTEMIS_GIT_MIRROR_DIR -- Directory, on the same filesystem as the working directory, to keep the mirrors in
+# ARTEMIS_GIT_MIRROR_MIN_FREE -- Disk space, in KB, to keep free in addition to the space a scan needs
+GIT_MIRROR_DIR = os.environ.get("ARTEMIS_GIT_MIRROR_DIR")
+GIT_MIRROR_MIN_FREE = int(os.environ.get("ARTEMIS_GIT_MIRROR_MIN_FREE") or 0)
+
+# Opt-in copy of the Trivy DBs for the plugins that run Trivy. The engine downloads the DBs on a schedule and the
+# plugins scan against them instead of each downloading the DBs every time they run.
+#
+# ARTEMIS_TRIVY_CACHE_DIR -- Directory, shared by the engines on the host, to keep the DBs in
+# ARTEMIS_TRIVY_DB_REFRESH_INTERVAL -- How often, in seconds, the DBs are downloaded again
+# ARTEMIS_TRIVY_SERVER -- URL of a long-running 'trivy server' for the plugins to scan through, so that the DB is
+#   already loaded instead of being loaded by every scan. The server is not managed by the engine.
+TRIVY_CACHE_DIR = os.environ.get("ARTEMIS_TRIVY_CACHE_DIR")
+TRIVY_DB_REFRESH_INTERVAL = int(os.environ.get("ARTEMIS_TRIVY_DB_REFRESH_INTERVAL") or 21600)
+TRIVY_SERVER = os.environ.get("ARTEMIS_TRIVY_SERVER")
 
 # Reverse proxy configuration for when Artemis is using an authenticated reverse proxy to access
 # private VCS instances.
@@ -57,6 +87,17 @@ if re.match(r"^\d{1,4}[mg]$", PLUGIN_JAVA_HEAP_SIZE) is None:
     )
     PLUGIN_JAVA_HEAP_SIZE = DEFAULT_PLUGIN_JAVA_HEAP_SIZE
 
+# Read-only plugins can be run concurrently. PLUGIN_MAX_WORKERS is the number of plugins that may run at the same time
+# (1 disables concurrency). PLUGIN_MEMORY_BUDGET is the total amount of memory, in MB, that concurrently running
+# plugins may reserve based on the "memory" value in their settings (0 disables the memory budget).
+PLUGIN_MAX_WORKERS = max(int(os.environ.get("ARTEMIS_PLUGIN_MAX_WORKERS") or 1), 1)
+PLUGIN_MEMORY_BUDGET = max(int(os.environ.get("ARTEMIS_PLUGIN_MEMORY_BUDGET") or 0), 0)
+DEFAULT_PLUGIN_MEMORY = 1024  # MB
+
+# How often, in seconds, plugin images are checked for updates when ECR is in use. Images are refreshed in the
+# background between scans and are only pulled when a plugin is run if they have not been checked within this time.
+PLUGIN_IMAGE_REFRESH_INTERVAL = int(os.environ.get("ARTEMIS_PLUGIN_IMAGE_REFRESH_INTERVAL") or 900)
+
 STATUS_LAMBDA = os.environ.get("ARTEMIS_STATUS_LAMBDA")
 
 MANDATORY_INCLUDE_PATHS = json.loads(os.environ.get("ARTEMIS_MANDATORY_INCLUDE_PATHS") or "[]")
@@ -72,6 +113,9 @@ CONFIGURATION_EVENTS_ENABLED = os.environ.get("ARTEMIS_CONFIGURATION_EVENTS_ENAB
 VULNERABILITY_EVENTS_ENABLED = os.environ.get("ARTEMIS_VULNERABILITY_EVENTS_ENABLED", "false").lower() == "true"
 METADATA_EVENTS_ENABLED = os.environ.get("ARTEMIS_METADATA_EVENTS_ENABLED", "false").lower() == "true"
 
+# How long, in seconds, secret values retrieved from Secrets Manager are cached by the engine
+SECRETS_CACHE_TTL = int(os.environ.get("ARTEMIS_SECRETS_CACHE_TTL") or 300)
+
 DB_RETRY_WAIT = int(os.environ.get("ARTEMIS_DB_RETRY_WAIT", 5))  # seconds
 DB_RETRY_LIMIT = int(os.environ.get("ARTEMIS_DB_RETRY_LIMIT", 60))  # 60 retries @ 5 seconds each is 5 minutes
 
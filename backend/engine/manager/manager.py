@@ -11,7 +11,7 @@ from artemislib.aws import AWSConnect, LambdaError
 from artemislib.datetime import format_timestamp, get_utc_datetime
 from artemislib.logging import Logger
 from env import STATUS_LAMBDA, DB_RETRY_LIMIT, DB_RETRY_WAIT, REGION
-from utils.plugin import get_plugin_list, get_plugin_settings
+from utils.plugin import get_plugin_list, plugin_registry
 
 log = Logger(__name__)
 
@@ -130,8 +130,9 @@ class EngineManager:
         return self._maintenance_mode
 
     def _register_plugins(self):
+        plugin_registry.load()
         for plugin_name in get_plugin_list():
-            settings = get_plugin_settings(plugin_name)
+            settings = plugin_registry.get_settings(plugin_name)
             plugin, _ = Plugin.objects.get_or_create(
                 name=plugin_name, defaults={"friendly_name": settings.name, "type": settings.plugin_type}
             )
@@ -3,17 +3,20 @@ import re
 import subprocess
 import uuid
 from collections import namedtuple
-from datetime import datetime, timezone
+from typing import Iterable, Iterator
 
-from engine.plugins.gitsecrets.secrets_processor import SecretProcessor
+from engine.plugins.gitsecrets.secrets_processor import FileIndex, SecretProcessor
 from engine.plugins.lib import utils
 from engine.plugins.lib.common.system.allowlist import SystemAllowList
+from engine.plugins.lib.secrets_common.blame import GitBlame
 from engine.plugins.lib.secrets_common.enums import SecretValidity
 
 log = utils.setup_logging("gitsecrets")
 
 GIT_SECRETS_RESULT = namedtuple("git_secrets_result", ["scan_results", "event_info"])
-GIT_BLAME_RESULT = namedtuple("git_blame_result", ["name", "commit", "timestamp"])
+
+# The lines of the git-secrets output that are findings: <filename>:<line number>:<line>
+FINDING_REGEX = re.compile(r".+:\d+:.+")
 
 
 def main():
@@ -36,26 +39,34 @@ def main():
 
 def run_git_secrets(scan_path: str) -> GIT_SECRETS_RESULT:
     log.info("Running git-secrets")
-    r = execute_git_secrets(scan_path)
+    proc = execute_git_secrets(scan_path)
 
     if not scan_path.endswith("/"):
         scan_path += "/"
 
+    # Parse the findings as git-secrets writes them instead of waiting for all of the output
+    with proc:
+        findings = list(parse_git_secrets(proc.stderr, scan_path))
+
     results = []
     event_info = {}
-    if r.returncode != 1:
+    if proc.returncode != 1:
         return GIT_SECRETS_RESULT(results, event_info)
 
     allowlist = SystemAllowList(al_type="secret")
 
-    for line in re.findall(".+:\\d+:.+", decode_response(r.stderr)):
-        processor = SecretProcessor(base_path=scan_path)
-        if not processor.process_response(line):
-            continue
+    processors = []
+    for processor in findings:
         if allowlist.ignore_secret(processor.filename, processor.secret):
             log.info("Skipping secret that matched system allowlist in file '%s'", processor.filename)
             continue
-        blame_result = blame(scan_path, processor.filename, processor.line_number)
+        processors.append(processor)
+
+    # Blame all of the matched lines together so that each file is only blamed once
+    blame_results = GitBlame(scan_path).blame((processor.filename, processor.line_number) for processor in processors)
+
+    for processor in processors:
+        blame_result = blame_results[(processor.filename, processor.line_number)]
         item_id = str(uuid.uuid4())
         item = {
             "id": item_id,
@@ -73,50 +84,33 @@ def run_git_secrets(scan_path: str) -> GIT_SECRETS_RESULT:
     return GIT_SECRETS_RESULT(results, event_info)
 
 
-def execute_git_secrets(scan_path):
-    return subprocess.run(["git-secrets", "--scan", "--recursive", scan_path], capture_output=True, check=False)
+def parse_git_secrets(stream: Iterable[bytes], scan_path: str) -> Iterator[SecretProcessor]:
+    """
+    Parses the git-secrets output a line at a time
+    :return: The processed findings, skipping lines that aren't findings or can't be processed
+    """
+    files = None
+    for raw in stream:
+        line = decode_response(raw).rstrip("\n")
+        if not FINDING_REGEX.match(line):
+            continue
+        if files is None:
+            # The files are only listed once there is a finding to resolve the filename of
+            files = FileIndex(scan_path)
+        processor = SecretProcessor(base_path=scan_path, files=files)
+        if processor.process_response(line):
+            yield processor
+
+
+def execute_git_secrets(scan_path: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        ["git-secrets", "--scan", "--recursive", scan_path], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
 
 
 def decode_response(response_bytes):
     return response_bytes.decode("utf-8", "ignore")
 
 
-def blame(scan_path: str, file: str, line_num: int) -> GIT_BLAME_RESULT:
-    name = "Unknown Author"
-    email = "<>"
-    commit = "HEAD"
-    timestamp = ""
-
-    # Run 'git blame' to get the name of who committed the flagged line
-    r = execute_git_blame(line_num, file, scan_path)
-    if r.returncode != 0:
-        return GIT_BLAME_RESULT(name, commit, timestamp)
-    lines = decode_response(r.stdout).split("\n")
-    commit = lines[0].split()[0]
-    for line in lines:
-        if line.startswith("author "):
-            split = line.split(maxsplit=1)
-            if len(split) > 1:
-                name = split[1]
-        elif line.startswith("author-mail "):
-            split = line.split(maxsplit=1)
-            if len(split) > 1:
-                email = split[1]
-        elif line.startswith("author-time "):
-            split = line.split(maxsplit=1)
-            if len(split) > 1:
-                timestamp = datetime.fromtimestamp(int(split[1]), timezone.utc).isoformat(timespec="microseconds")
-    return GIT_BLAME_RESULT(f"{name} {email}", commit, timestamp)
-
-
-def execute_git_blame(line_num, file, scan_path):
-    return subprocess.run(
-        ["git", "blame", "-p", "-L", "%d,%d" % (line_num, line_num), "--", file],
-        capture_output=True,
-        cwd=scan_path,
-        check=False,
-    )
-
-
 if __name__ == "__main__":
     main()
@@ -1,6 +1,7 @@
 # pylint: disable=too-many-instance-attributes
 import os
 import re
+from functools import lru_cache
 from string import Template
 from typing import Optional
 
@@ -12,6 +13,8 @@ log = setup_logging("gitsecrets")
 DEFAULT_SEPARATOR = ":"
 DEFAULT_SETTER_ERROR_MESSAGE = "property $property is read only"
 
+CLASSIFIER_CACHE_SIZE = 10000
+
 URL_REGEX = r"://[^/\s:@]{3,64}:[^/\s:@]{3,64}@[a-zA-Z0-9\.-]+(:[0-9]{1,5}){0,1})"
 
 # !!! IMPORTANT
@@ -149,12 +152,72 @@ REGEXES = [
 ]
 
 
+class SecretClassifier:
+    """
+    Finds the secret in a line using the secret regexes in priority order.
+
+    The regexes are searched for one at a time instead of as a single combined alternation. Most of the regexes start
+    with a literal that the re module scans for directly, while a combined alternation has to try every regex at every
+    position in the line, which is several times slower. Instead, the result for each distinct line is cached because
+    the lines that git-secrets matches in noisy repos are mostly the same lines repeated across many files.
+    """
+
+    def __init__(self, regexes: list[SecretRegex], cache_size: int = CLASSIFIER_CACHE_SIZE):
+        self._searches = [(secret_regex.regex.search, secret_regex.finding_type) for secret_regex in regexes]
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _classify(self, secret: str) -> tuple[str, str]:
+        for search, finding_type in self._searches:
+            match = search(secret)
+            if match:
+                return (match.group(0), finding_type)
+        return (secret, "other")
+
+
+CLASSIFIER = SecretClassifier(REGEXES)
+
+
+class FileIndex:
+    """
+    The set of files under a directory, listed once so that resolving the filenames in the git-secrets output doesn't
+    need a filesystem check for every candidate filename of every line.
+    """
+
+    def __init__(self, path: str):
+        self._cwd = os.getcwd()
+        self._files = set()
+        self._scan(self._normalize(path))
+
+    def __contains__(self, filename: str) -> bool:
+        # The filenames are usually already normalized, since git-secrets builds them from the path it was given
+        return filename in self._files or self._normalize(filename) in self._files
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def _normalize(self, filename: str) -> str:
+        # Relative paths are resolved the same way os.path.isfile() would, against the working directory
+        return os.path.normpath(os.path.join(self._cwd, filename))
+
+    def _scan(self, path: str) -> None:
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name != ".git":
+                            self._scan(entry.path)
+                    elif entry.is_file():
+                        self._files.add(entry.path)
+        except OSError as e:
+            log.warning("Unable to list files in %s: %s", path, e)
+
+
 class SecretProcessor:
     """
     Takes in a line of git secrets output and gets the file path, offending line number, secret, and secret type
     """
 
-    def __init__(self, separator=DEFAULT_SEPARATOR, base_path=None):
+    def __init__(self, separator=DEFAULT_SEPARATOR, base_path=None, files: Optional[FileIndex] = None):
         self.separator = separator
         self.split = None
         self._filename = None
@@ -162,6 +225,7 @@ class SecretProcessor:
         self._secret = None
         self._secret_type = None
         self._base_path = base_path
+        self._files = files
 
     def process_response(self, line: str) -> bool:
         """
@@ -187,13 +251,18 @@ class SecretProcessor:
         # We are limiting the range to len()-1 because there are two items reserved for the line_number and secret.
         # we only need len()-1 because range ends before the last value
         for split_num in range(1, len(self.split) - 1):
-            if os.path.isfile(filename):
+            if self._is_file(filename):
                 self.filename = filename
                 self.split = self.split[split_num:]
                 return True
             filename = f"{filename}{self.separator}{self.split[split_num]}"
         return False
 
+    def _is_file(self, filename: str) -> bool:
+        if self._files is not None:
+            return filename in self._files
+        return os.path.isfile(filename)
+
     def _process_line_number(self) -> bool:
         """
         Get the int line number number from the first item in the split list.
@@ -215,15 +284,7 @@ class SecretProcessor:
         """
         # git-secrets returns the entire line that was matched. We only want to
         # return the specific match.
-        for secret_regex in REGEXES:
-            finding_type = secret_regex.finding_type
-            regex = secret_regex.regex
-
-            match = regex.search(secret)
-            if match:
-                return (match.group(0), finding_type)
-
-        return (secret, "other")
+        return CLASSIFIER.classify(secret)
 
     def _process_secret(self) -> bool:
         """
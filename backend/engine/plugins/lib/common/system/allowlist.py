@@ -1,7 +1,13 @@
-from fnmatch import fnmatch
+import re
+from collections import defaultdict
+from fnmatch import translate
+from typing import Any, Iterable, Iterator
 
+from artemislib.allowlist import SubstringMatcher
 from artemislib.singleton import Singleton
 
+WILDCARDS = "*?["
+
 
 class SystemAllowList(metaclass=Singleton):
     def __init__(self, model=None, al_type: str = None) -> None:
@@ -14,20 +20,105 @@ class SystemAllowList(metaclass=Singleton):
         # Load the System Allowlist from the DB
         self._items = self._load_al(al_type)
 
+    @property
+    def _items(self) -> list:
+        return self._loaded_items
+
+    @_items.setter
+    def _items(self, items: list) -> None:
+        # Compile the items whenever they are (re)loaded so that checking a secret doesn't go through every item. The
+        # items are split by which fields they have, since that determines how they're matched.
+        self._loaded_items = items
+
+        filenames = []
+        values = []
+        pairs = defaultdict(list)
+        for item in items:
+            if "filename" in item and "value" not in item:
+                filenames.append((item["filename"], None))
+            elif "value" in item and "filename" not in item:
+                values.append((item["value"], None))
+            elif "value" in item and "filename" in item:
+                pairs[item["value"]].append((item["filename"], None))
+
+        self._filenames = GlobIndex(filenames)
+        self._values = GlobIndex(values)
+        # The items with both fields are looked up by value first, and then the filename patterns of the values that
+        # matched are checked
+        self._pairs = GlobIndex((value, GlobIndex(filenames)) for value, filenames in pairs.items())
+
     def _load_al(self, al_type: str) -> list:
         return [item["value"] for item in self.model.objects.filter(item_type=al_type).values("value")]
 
     def ignore_secret(self, filename: str, value: str) -> bool:
-        for item in self._items:
-            if (
-                ("filename" in item and "value" not in item and fnmatch(filename, item["filename"]))
-                or ("value" in item and "filename" not in item and fnmatch(value, item["value"]))
-                or (
-                    "value" in item
-                    and "filename" in item
-                    and fnmatch(filename, item["filename"])
-                    and fnmatch(value, item["value"])
-                )
-            ):
-                return True
-        return False
+        return (
+            self._filenames.match(filename)
+            or self._values.match(value)
+            or any(filenames.match(filename) for filenames in self._pairs.matches(value))
+        )
+
+
+class GlobIndex:
+    """
+    Index of fnmatch patterns, each with an associated item.
+
+    Rather than calling fnmatch() with every pattern, the patterns are sorted by their shape when the index is built:
+    exact strings and literal prefixes and suffixes are looked up in dicts, '*literal*' patterns are searched for
+    together in a single pass, and only the remaining patterns are matched as regexes, translated once.
+    """
+
+    def __init__(self, patterns: Iterable[tuple[str, Any]]):
+        self._exact = defaultdict(list)
+        self._prefixes = defaultdict(lambda: defaultdict(list))
+        self._suffixes = defaultdict(lambda: defaultdict(list))
+        self._substrings = defaultdict(list)
+        self._regexes = defaultdict(list)
+
+        for pattern, item in patterns:
+            literal = pattern.strip("*")
+            if any(char in literal for char in WILDCARDS):
+                self._regexes[pattern].append(item)
+            elif pattern == literal:
+                self._exact[pattern].append(item)
+            elif pattern == f"{literal}*":
+                self._prefixes[len(literal)][literal].append(item)
+            elif pattern == f"*{literal}":
+                self._suffixes[len(literal)][literal].append(item)
+            elif pattern == f"*{literal}*":
+                self._substrings[literal].append(item)
+            else:
+                # Repeated wildcards, like '**literal'
+                self._regexes[pattern].append(item)
+
+        self._substring_matcher = SubstringMatcher(self._substrings)
+        self._compiled = [(re.compile(translate(pattern)), items) for pattern, items in self._regexes.items()]
+        self._combined = re.compile("|".join(f"(?:{translate(pattern)})" for pattern in self._regexes))
+
+    def match(self, name: str) -> bool:
+        """
+        Whether any of the patterns match the name
+        """
+        return (
+            name in self._exact
+            or any(name[:length] in prefixes for length, prefixes in self._prefixes.items())
+            or any(name[-length:] in suffixes for length, suffixes in self._suffixes.items() if length <= len(name))
+            or (len(self._substring_matcher) > 0 and self._substring_matcher.search(name))
+            or (len(self._regexes) > 0 and self._combined.match(name) is not None)
+        )
+
+    def matches(self, name: str) -> Iterator[Any]:
+        """
+        The items of all of the patterns that match the name
+        """
+        yield from self._exact.get(name, [])
+        for length, prefixes in self._prefixes.items():
+            yield from prefixes.get(name[:length], [])
+        for length, suffixes in self._suffixes.items():
+            if length <= len(name):
+                yield from suffixes.get(name[-length:], [])
+        for literal, items in self._substrings.items():
+            if literal in name:
+                yield from items
+        for regex, items in self._compiled:
+            if regex.match(name):
+                yield from items
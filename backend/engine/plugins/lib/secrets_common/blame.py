@@ -0,0 +1,131 @@
+import os
+import re
+import subprocess
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterable
+
+from engine.plugins.lib import utils
+
+log = utils.setup_logging("blame")
+
+BLAME_RESULT = namedtuple("blame_result", ["name", "commit", "timestamp"])
+UNKNOWN_BLAME = BLAME_RESULT("Unknown Author <>", "HEAD", "")
+
+BLAME_WORKERS = os.cpu_count() or 1
+
+# The first line of each blamed line in the porcelain output: <commit> <original line> <final line> [<group size>]
+HEADER_REGEX = re.compile(r"^([0-9a-f]{40}) \d+ (\d+)(?: \d+)?$")
+
+
+class GitBlame:
+    """
+    Attributes lines of the files in a git repo to the commit and author that last changed them.
+
+    The lines are grouped by file so that each file is blamed by a single 'git blame' covering all of the lines that
+    were asked for in that file, instead of a 'git blame' per line, and the files are blamed concurrently. The author
+    of each commit is cached so that it's only parsed once no matter how many lines or files the commit touched.
+    """
+
+    def __init__(self, repo_path: str, max_workers: int = BLAME_WORKERS):
+        self.repo_path = repo_path
+        self.max_workers = max_workers
+        self._authors = {}
+
+    def blame(self, locations: Iterable[tuple[str, int]]) -> dict[tuple[str, int], BLAME_RESULT]:
+        """
+        Blames a set of lines.
+        :param locations: (filename, line number) pairs, with the filenames relative to the repo path
+        :return: The blame result for each (filename, line number) pair. Lines that can't be blamed, like lines in
+        files that aren't committed, are attributed to an unknown author at HEAD.
+        """
+        files = defaultdict(set)
+        for filename, line in locations:
+            files[filename].add(line)
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for filename, blamed in zip(files, executor.map(self.blame_file, files, files.values())):
+                for line in files[filename]:
+                    results[(filename, line)] = blamed.get(line, UNKNOWN_BLAME)
+        return results
+
+    def blame_file(self, filename: str, lines: Iterable[int]) -> dict[int, BLAME_RESULT]:
+        """
+        Blames a set of lines in a single file with one 'git blame'
+        :return: The blame result for each of the lines that could be blamed, by line number
+        """
+        lines = sorted(set(lines))
+        r = execute_git_blame(filename, _ranges(lines), self.repo_path)
+        if r.returncode == 0:
+            return self._parse(decode_response(r.stdout))
+
+        if len(lines) > 1:
+            # The whole 'git blame' fails if any of the ranges are past the end of the file as it was committed, so
+            # fall back to blaming each line on its own so the rest of the lines can still be attributed
+            log.debug("Unable to blame %s lines of %s together, blaming them individually", len(lines), filename)
+            results = {}
+            for line in lines:
+                results.update(self.blame_file(filename, [line]))
+            return results
+
+        return {}
+
+    def _parse(self, output: str) -> dict[int, BLAME_RESULT]:
+        results = {}
+        commit = None
+        line = None
+        author = {}
+        for row in output.split("\n"):
+            if commit is None:
+                match = HEADER_REGEX.match(row)
+                if match:
+                    commit, line = match.group(1), int(match.group(2))
+                    author = {}
+            elif row.startswith("\t"):
+                # The line content ends the entry for the line. The author details are only included the first time a
+                # commit appears in the output so later lines from the same commit are resolved from the cache.
+                if author:
+                    self._authors.setdefault(commit, _author(author))
+                results[line] = self._authors.get(commit, UNKNOWN_BLAME)._replace(commit=commit)
+                commit = None
+            else:
+                key, _, value = row.partition(" ")
+                if key in ("author", "author-mail", "author-time"):
+                    author[key] = value
+        return results
+
+
+def _author(fields: dict) -> BLAME_RESULT:
+    name = fields.get("author") or "Unknown Author"
+    email = fields.get("author-mail") or "<>"
+    timestamp = ""
+    if fields.get("author-time"):
+        timestamp = datetime.fromtimestamp(int(fields["author-time"]), timezone.utc).isoformat(timespec="microseconds")
+    return BLAME_RESULT(f"{name} {email}", None, timestamp)
+
+
+def _ranges(lines: list[int]) -> list[tuple[int, int]]:
+    """
+    Collapses a sorted list of line numbers into ranges of consecutive lines
+    """
+    ranges = []
+    for line in lines:
+        if ranges and ranges[-1][1] == line - 1:
+            ranges[-1] = (ranges[-1][0], line)
+        else:
+            ranges.append((line, line))
+    return ranges
+
+
+def execute_git_blame(filename: str, ranges: list[tuple[int, int]], repo_path: str) -> subprocess.CompletedProcess:
+    cmd = ["git", "blame", "--porcelain"]
+    for start, end in ranges:
+        cmd.extend(["-L", f"{start},{end}"])
+    cmd.extend(["--", filename])
+    return subprocess.run(cmd, capture_output=True, cwd=repo_path, check=False)
+
+
+def decode_response(response_bytes: bytes) -> str:
+    return response_bytes.decode("utf-8", "ignore")
@@ -0,0 +1,22 @@
+import os
+
+
+def trivy_command(subcommand: str, target: str, *args: str) -> list[str]:
+    """
+    Builds a Trivy command that uses the DBs and server provided by the engine, if any. Without them Trivy downloads
+    the DBs itself.
+    """
+    cmd = ["trivy", subcommand, target, *args]
+
+    cache_dir = os.environ.get("ARTEMIS_TRIVY_CACHE_DIR")
+    if cache_dir:
+        # The engine keeps the DBs up to date, so don't check for updates. The DBs are shared with other plugins so
+        # keep the scan cache in memory instead of writing it alongside them.
+        cmd.extend(["--cache-dir", cache_dir, "--skip-db-update", "--skip-java-db-update", "--cache-backend", "memory"])
+
+    server = os.environ.get("ARTEMIS_TRIVY_SERVER")
+    if server:
+        # The server already has the vulnerability DB loaded so it doesn't need to be loaded for each scan
+        cmd.extend(["--server", server])
+
+    return cmd
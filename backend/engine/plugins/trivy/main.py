@@ -5,6 +5,7 @@ trivy image scanning plugin
 import json
 import subprocess
 from engine.plugins.lib.utils import convert_string_to_json
+from engine.plugins.lib.trivy_common.cli import trivy_command
 from engine.plugins.lib.trivy_common.parsing_util import parse_output
 from engine.plugins.lib.utils import setup_logging
 from engine.plugins.lib.utils import parse_args
@@ -13,7 +14,7 @@ logger = setup_logging("trivy")
 
 
 def execute_trivy_image_scan(image: str):
-    proc = subprocess.run(["trivy", "image", image, "--format", "json"], capture_output=True, check=False)
+    proc = subprocess.run(trivy_command("image", image, "--format", "json"), capture_output=True, check=False)
     if proc.returncode != 0:
         logger.warning(proc.stderr.decode("utf-8"))
         return None
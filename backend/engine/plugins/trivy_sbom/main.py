@@ -5,6 +5,7 @@ trivy SBOM plugin
 import json
 import subprocess
 from typing import Optional
+from engine.plugins.lib.trivy_common.cli import trivy_command
 from engine.plugins.lib.trivy_common.generate_locks import check_package_files
 from engine.plugins.lib.sbom_common.go_installer import go_mod_download
 from engine.plugins.trivy_sbom.parser import clean_output_application_sbom
@@ -21,7 +22,7 @@ NO_RESULTS_TEXT = "no supported file was detected"
 # Scan the repo at an application level
 def execute_trivy_application_sbom(path: str, include_dev: bool) -> Optional[str]:
     logger.info(f"Creating SBOM at an application level. Dev-dependencies: {include_dev}")
-    args = ["trivy", "fs", path, "--format", "cyclonedx"]
+    args = trivy_command("fs", path, "--format", "cyclonedx")
     if include_dev:
         args.append("--include-dev-deps")
     proc = subprocess.run(args, capture_output=True, check=False)
@@ -39,7 +40,7 @@ def execute_trivy_application_sbom(path: str, include_dev: bool) -> Optional[str
 
 # Scan the images
 def execute_trivy_image_sbom(image: str) -> Optional[str]:
-    proc = subprocess.run(["trivy", "image", image, "--format", "cyclonedx"], capture_output=True, check=False)
+    proc = subprocess.run(trivy_command("image", image, "--format", "cyclonedx"), capture_output=True, check=False)
     if proc.returncode != 0:
         logger.warning(proc.stderr.decode("utf-8"))
         return None
@@ -4,6 +4,7 @@ trivy SCA plugin
 
 import json
 import subprocess
+from engine.plugins.lib.trivy_common.cli import trivy_command
 from engine.plugins.lib.trivy_common.generate_locks import check_package_files
 from engine.plugins.lib.utils import convert_string_to_json
 from engine.plugins.lib.trivy_common.parsing_util import parse_output
@@ -17,7 +18,7 @@ NO_RESULTS_TEXT = "no supported file was detected"
 
 def execute_trivy_lock_scan(path: str, include_dev: bool):
     logger.info(f"Scanning lock-files. Dev-dependencies: {include_dev}")
-    args = ["trivy", "fs", path, "--format", "json"]
+    args = trivy_command("fs", path, "--format", "json")
     if include_dev:
         args.append("--include-dev-deps")
     proc = subprocess.run(args, capture_output=True, check=False)
@@ -1,6 +1,10 @@
 import json
+import queue
 import subprocess
+import tempfile
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator
 
 from engine.plugins.trufflehog.detectors import verified_detectors_allowlist, inactiveable_detectors
 from engine.plugins.trufflehog.type_normalization import normalize_type
@@ -25,9 +29,8 @@ def main(in_args=None):
     error_dict = {"errors": [], "alerts": [], "debug": []}
     depth = args.engine_vars.get("depth")
 
-    verified_results = run_security_checker(args.path, error_dict, verified=True, depth=depth)
-    unverified_results = run_security_checker(args.path, error_dict, verified=False, depth=depth)
-    scan_results = verified_results + unverified_results
+    # The findings are scrubbed as they come in from both passes, instead of once both passes have finished
+    scan_results = run_security_checkers(args.path, error_dict, depth=depth)
 
     cleaned_results = scrub_results(scan_results, error_dict)
 
@@ -81,7 +84,7 @@ def get_validity(finding):
             return SecretValidity.UNKNOWN
 
 
-def scrub_results(scan_results: list, error_dict: dict) -> dict:
+def scrub_results(scan_results: Iterable[dict], error_dict: dict) -> dict:
     cleaned_records = []
     event_info = {}
     allowlist = SystemAllowList(al_type="secret")
@@ -141,7 +144,37 @@ def scrub_results(scan_results: list, error_dict: dict) -> dict:
     return {"results": cleaned_records, "event_info": event_info}
 
 
-def run_security_checker(scan_path: str, error_dict: dict, verified: bool, depth=None) -> list:
+def run_security_checkers(scan_path: str, error_dict: dict, depth=None) -> Iterator[dict]:
+    """
+    Runs the verified and unverified trufflehog passes at the same time
+    :return: The findings of both passes, as they are found
+    """
+    findings = queue.Queue()
+
+    def produce(verified: bool) -> None:
+        try:
+            for finding in run_security_checker(scan_path, error_dict, verified=verified, depth=depth):
+                findings.put(finding)
+        finally:
+            findings.put(None)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(produce, verified) for verified in (True, False)]
+
+        running = len(futures)
+        while running:
+            finding = findings.get()
+            if finding is None:
+                running -= 1
+            else:
+                yield finding
+
+        for future in futures:
+            # Raise any error from either pass
+            future.result()
+
+
+def run_security_checker(scan_path: str, error_dict: dict, verified: bool, depth=None) -> Iterator[dict]:
     log.info("Running trufflehog (depth limit: %s)", depth)
 
     cmd = [
@@ -168,17 +201,22 @@ def run_security_checker(scan_path: str, error_dict: dict, verified: bool, depth
 
     cmd.append("file://.")
 
-    proc_results = subprocess.run(cmd, cwd=scan_path, capture_output=True, check=False)
-
-    if proc_results.stderr:
-        log.error(proc_results.stderr.decode("utf-8"))
-
-    lines = proc_results.stdout.decode("utf-8").split("\n")
-
-    del lines[-1]
-    results = [json.loads(line) for line in lines]
-
-    return results
+    # The findings are decoded a line at a time as trufflehog outputs them rather than buffering all of the output.
+    # stderr goes to a file so that it can't fill up the pipe and block trufflehog while stdout is being read.
+    with (
+        tempfile.TemporaryFile() as stderr,
+        subprocess.Popen(cmd, cwd=scan_path, stdout=subprocess.PIPE, stderr=stderr) as proc,
+    ):
+        for line in proc.stdout:
+            if line.strip():
+                yield json.loads(line)
+
+        proc.wait()
+        stderr.seek(0)
+        errors = stderr.read()
+
+    if errors:
+        log.error(errors.decode("utf-8"))
 
 
 if __name__ == "__main__":
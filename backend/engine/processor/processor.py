@@ -1,12 +1,15 @@
 import json
 import os
 from base64 import b64decode
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 from string import Template
 from typing import Optional, Union
 
 import boto3
 from botocore.exceptions import ClientError
+from django.db import connections
 from django.db.models import Q
 
 from artemisdb.artemisdb.consts import AllowListType, PluginType
@@ -15,18 +18,26 @@ from artemislib.datetime import get_utc_datetime
 from artemislib.db_cache import DBLookupCache
 from artemislib.github.app import GithubApp
 from artemislib.logging import Logger
-from env import APPLICATION, REGION, SQS_ENDPOINT, VULNERABILITY_EVENTS_ENABLED, METADATA_EVENTS_ENABLED
+from env import (
+    APPLICATION,
+    METADATA_EVENTS_ENABLED,
+    PLUGIN_MAX_WORKERS,
+    PLUGIN_MEMORY_BUDGET,
+    REGION,
+    SQS_ENDPOINT,
+    VULNERABILITY_EVENTS_ENABLED,
+)
 from metadata.metadata import get_all_metadata
 from oci.builder import ScanImages
 from processor.details import Details
 from processor.sbom import process_sbom
 from processor.sbom_cdx import process_sbom as process_sbom_cdx
 from processor.scan_details import ScanDetails
-from processor.vulns import process_vulns, resolve_vulns
+from processor.vulns import VulnAllowList, process_vulns, resolve_vulns
 from utils.deploy_key import create_ssh_url, git_clone
 from utils.engine import get_key
 from utils.git import git_clean, git_pull, git_reset
-from utils.plugin import Result, get_plugin_settings, run_plugin, process_event_info, queue_event
+from utils.plugin import Result, plugin_registry, run_plugin, process_event_info, queue_event
 
 logger = Logger(__name__)
 
@@ -52,6 +63,8 @@ class EngineProcessor:
         self.scan = self._get_repo_scan_object(scan_object=scan_object, manager=manager)
         self.lookup_cache = DBLookupCache(cache_item_model=cache_item_model)
         self.severity_dict = SEVERITY_DICT
+        self._num_plugins = 0
+        self._current_plugin = 0
 
     def _get_repo_scan_object(self, scan_object=None, manager=None):
         """
@@ -110,76 +123,30 @@ class EngineProcessor:
     def process_plugins(self, images: ScanImages, services: dict) -> None:
         """
         Executes plugins to scan the repository, updating the DB of the progress.
+
+        Plugins that do not modify the working directory are run concurrently, bounded by PLUGIN_MAX_WORKERS and
+        PLUGIN_MEMORY_BUDGET. Writable plugins are run one at a time afterwards so that the working directory can be
+        cleaned and reset after each one. All DB updates are made from the calling thread.
         :param images: dict of image build results and how many dockerfiles were found and built
         :return: None
         """
         logger.info("Running the following plugins: %s", self.action_details.plugins)
-        num_plugins = len(self.action_details.plugins)
-        # Run analysis tasks here
-        current_plugin = 0
+        self._num_plugins = len(self.action_details.plugins)
+        self._current_plugin = 0
 
         error_plugins = []
 
-        for plugin in self.action_details.plugins:
-            Logger.add_fields(plugin=plugin)
+        concurrent_plugins, serial_plugins = self._partition_plugins()
 
-            current_plugin += 1
-            logger.info("Running plugin %s against %s:%s", plugin, self.details.repo, self.action_details.branch)
+        if concurrent_plugins:
+            error_plugins.extend(self._process_plugins_concurrently(concurrent_plugins, images, services))
+
+        for plugin in serial_plugins:
+            Logger.add_fields(plugin=plugin)
             try:
-                start_time = get_utc_datetime()
-                progress = {
-                    "plugin_name": plugin,
-                    "plugin_start_time": start_time.isoformat(timespec="microseconds"),
-                    "current_plugin": current_plugin,
-                    "total_plugins": num_plugins,
-                }
-
-                self.scan.update_status(f"running plugin {plugin}", progress=progress)
-                results = run_plugin(
-                    plugin,
-                    self.scan.get_scan_object(),
-                    images,
-                    depth=self.action_details.depth,
-                    include_dev=self.action_details.include_dev,
-                    features=self.details.features,
-                    services=services,
-                )
-
-                if results.disabled:
-                    logger.info("Plugin %s is disabled", plugin)
-                else:
-                    logger.info("Plugin %s completed, updating results", plugin)
-
-                    if results.type == PluginType.SBOM.value and plugin == "veracode_sbom":
-                        process_sbom(results, self.scan.get_scan_object())
-
-                        # SBOM results should not be returned directly in the scan, so clear details
-                        results.details = []
-
-                        # Use the CycloneDX format by default when not using veracode_sbom tool
-                    elif results.type == PluginType.SBOM.value and not results.success and plugin != "veracode_sbom":
-                        process_sbom_cdx(results, self.scan.get_scan_object())
-
-                        # SBOM results should not be returned directly in the scan, so clear details
-                        results.details = []
-
-                    elif results.type == PluginType.VULN.value:
-                        process_vulns(results, self.scan.get_scan_object(), plugin)
-
-                    self.scan.create_plugin_result_set(start_time, results)
-                    self._cache_results(results)
-
-                    logger.info("Plugin %s results updated", plugin)
-
-                if results.dirty:
-                    # Clean and reset the repo in case the plugin wrote any files to disk. This way files created or
-                    # modified by one plugin won't pollute the repo for subsequent plugins.
-                    git_clean(os.path.join(self.action_details.scan_working_dir, "base"))
-                    git_reset(
-                        os.path.join(self.action_details.scan_working_dir, "base"),
-                        self.scan.get_scan_object().include_paths,
-                        self.scan.get_scan_object().exclude_paths,
-                    )
+                start_time = self._plugin_started(plugin)
+                results = self._run_plugin(plugin, images, services)
+                self._plugin_finished(plugin, start_time, results)
             except Exception as e:  # pylint: disable=broad-except
                 # Catch everything so that an error doesn't kill the engine
                 # but log the exception with stack trace so it can be
@@ -197,6 +164,153 @@ class EngineProcessor:
         if VULNERABILITY_EVENTS_ENABLED:
             self._process_vuln_events()
 
+    def _partition_plugins(self) -> tuple[list[tuple[str, int]], list[str]]:
+        """
+        Splits the plugins into those that can be run concurrently, along with their memory estimate, and those that
+        must be run serially. Concurrency is disabled when PLUGIN_MAX_WORKERS is 1.
+        """
+        if PLUGIN_MAX_WORKERS <= 1:
+            return [], list(self.action_details.plugins)
+
+        concurrent_plugins = []
+        serial_plugins = []
+        for plugin in self.action_details.plugins:
+            try:
+                settings = plugin_registry.get_settings(plugin)
+            except Exception:  # pylint: disable=broad-except
+                # Let the serial run report the error for this plugin
+                serial_plugins.append(plugin)
+                continue
+            if settings.writable:
+                serial_plugins.append(plugin)
+            else:
+                concurrent_plugins.append((plugin, settings.memory))
+        return concurrent_plugins, serial_plugins
+
+    def _process_plugins_concurrently(
+        self, plugins: list[tuple[str, int]], images: ScanImages, services: dict
+    ) -> list[str]:
+        """
+        Runs the read-only plugins in a thread pool. Plugins are started in order as long as there is a free worker and
+        their memory estimate fits within the remaining budget. A plugin is always started if nothing else is running
+        so that a plugin larger than the budget does not block the scan.
+        :return: list of plugins that failed to execute
+        """
+        error_plugins = []
+        pending = deque(plugins)
+        running: dict[Future, tuple[str, int, datetime]] = {}
+        reserved = 0
+
+        with ThreadPoolExecutor(max_workers=PLUGIN_MAX_WORKERS, thread_name_prefix="plugin") as executor:
+            while pending or running:
+                while pending and len(running) < PLUGIN_MAX_WORKERS:
+                    plugin, memory = pending[0]
+                    if running and PLUGIN_MEMORY_BUDGET and reserved + memory > PLUGIN_MEMORY_BUDGET:
+                        break
+                    pending.popleft()
+                    try:
+                        start_time = self._plugin_started(plugin)
+                    except Exception as e:  # pylint: disable=broad-except
+                        logger.exception("Error running plugin %s: %s", plugin, e)
+                        error_plugins.append(plugin)
+                        continue
+                    future = executor.submit(self._run_plugin_in_thread, plugin, images, services)
+                    running[future] = (plugin, memory, start_time)
+                    reserved += memory
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    plugin, memory, start_time = running.pop(future)
+                    reserved -= memory
+                    try:
+                        self._plugin_finished(plugin, start_time, future.result())
+                    except Exception as e:  # pylint: disable=broad-except
+                        logger.exception("Error running plugin %s: %s", plugin, e)
+                        error_plugins.append(plugin)
+
+        return error_plugins
+
+    def _plugin_started(self, plugin: str) -> datetime:
+        """
+        Updates the scan progress for a plugin that is about to run.
+        :return: plugin start time
+        """
+        self._current_plugin += 1
+        logger.info("Running plugin %s against %s:%s", plugin, self.details.repo, self.action_details.branch)
+        start_time = get_utc_datetime()
+        progress = {
+            "plugin_name": plugin,
+            "plugin_start_time": start_time.isoformat(timespec="microseconds"),
+            "current_plugin": self._current_plugin,
+            "total_plugins": self._num_plugins,
+        }
+        self.scan.update_status(f"running plugin {plugin}", progress=progress)
+        return start_time
+
+    def _run_plugin(self, plugin: str, images: ScanImages, services: dict) -> Result:
+        return run_plugin(
+            plugin,
+            self.scan.get_scan_object(),
+            images,
+            depth=self.action_details.depth,
+            include_dev=self.action_details.include_dev,
+            features=self.details.features,
+            services=services,
+        )
+
+    def _run_plugin_in_thread(self, plugin: str, images: ScanImages, services: dict) -> Result:
+        # The shared log fields are seen by every worker so the plugin is only added to this thread's logs
+        Logger.add_thread_fields(plugin=plugin)
+        try:
+            return self._run_plugin(plugin, images, services)
+        finally:
+            Logger.remove_thread_fields("plugin")
+            # Django opens a DB connection per thread so close any opened by this worker
+            connections.close_all()
+
+    def _plugin_finished(self, plugin: str, start_time: datetime, results: Result) -> None:
+        """
+        Stores the results of a plugin run and, if needed, cleans up the working directory.
+        """
+        if results.disabled:
+            logger.info("Plugin %s is disabled", plugin)
+        else:
+            logger.info("Plugin %s completed, updating results", plugin)
+
+            if results.type == PluginType.SBOM.value and plugin == "veracode_sbom":
+                process_sbom(results, self.scan.get_scan_object())
+
+                # SBOM results should not be returned directly in the scan, so clear details
+                results.details = []
+
+                # Use the CycloneDX format by default when not using veracode_sbom tool
+            elif results.type == PluginType.SBOM.value and not results.success and plugin != "veracode_sbom":
+                process_sbom_cdx(results, self.scan.get_scan_object())
+
+                # SBOM results should not be returned directly in the scan, so clear details
+                results.details = []
+
+            elif results.type == PluginType.VULN.value:
+                process_vulns(results, self.scan.get_scan_object(), plugin)
+
+            self.scan.create_plugin_result_set(start_time, results)
+            self._cache_results(results)
+
+            logger.info("Plugin %s results updated", plugin)
+
+        if results.dirty:
+            # Clean and reset the repo in case the plugin wrote any files to disk. This way files created or
+            # modified by one plugin won't pollute the repo for subsequent plugins.
+            git_clean(os.path.join(self.action_details.scan_working_dir, "base"))
+            git_reset(
+                os.path.join(self.action_details.scan_working_dir, "base"),
+                self.scan.get_scan_object().include_paths,
+                self.scan.get_scan_object().exclude_paths,
+            )
+
     def pull_repo(self):
         logger.info("Pulling repo %s/%s:%s", self.details.service, self.details.repo, self.action_details.branch)
         url = use_hostname_or_url(self.details.service, self.action_details.url, self.service_dict)
@@ -225,6 +339,7 @@ class EngineProcessor:
             self.service_dict.get("append_dot_git_suffix", True),
             self.scan.get_scan_object().include_paths,
             self.scan.get_scan_object().exclude_paths,
+            mirror_key=f"{self.details.service}/{self.details.repo}",
         )
         if self.action_details.diff_base:
             # This has to happen AFTER the call to git_pull() above
@@ -245,7 +360,7 @@ class EngineProcessor:
         :return: True/False
         """
         for plugin in self.action_details.plugins:
-            settings = get_plugin_settings(plugin)
+            settings = plugin_registry.get_settings(plugin)
             if settings.build_images and not settings.disabled:
                 return True
         return False
@@ -341,36 +456,38 @@ class EngineProcessor:
     def _process_vuln_events(self) -> None:
         logger.info("Processing vulnerability events")
 
-        # Get all of the vulnerability instances that were either created by this scan or resolved by this scan
-        qs = self.scan.get_scan_object().repovulnerabilityscan_set.all() | RepoVulnerabilityScan.objects.filter(
-            resolved=True, resolved_by=self.scan.get_scan_object()
+        # Get all of the vulnerability instances that were either created by this scan or resolved by this scan,
+        # along with everything needed to evaluate the allowlist and build the events
+        qs = (
+            (
+                self.scan.get_scan_object().repovulnerabilityscan_set.all()
+                | RepoVulnerabilityScan.objects.filter(resolved=True, resolved_by=self.scan.get_scan_object())
+            )
+            .select_related("vulnerability")
+            .prefetch_related(
+                "vulnerability__components",
+                "vulnerability__plugins",
+                "vulnerabilityscanplugin_set__components",
+            )
         )
 
-        # Pull the non-expired vulns AllowList
-        allow_list = list(
+        # Pull the non-expired vulns and vulns_raw AllowLists and compile them for matching
+        allow_list = VulnAllowList(
             self.scan.get_scan_object().repo.allowlistitem_set.filter(
                 Q(item_type=AllowListType.VULN.value),
-                Q(expires=None) | Q(expires__gt=datetime.now(timezone.utc).replace(tzinfo=timezone.utc)),
-            )
-        )
-
-        # Pull the non-expired vulns_raw AllowList
-        raw_allow_object_list = self.scan.get_scan_object().repo.allowlistitem_set.filter(
-            Q(item_type=AllowListType.VULN_RAW.value),
-            Q(expires=None) | Q(expires__gt=datetime.now(timezone.utc)),
+                Q(expires=None) | Q(expires__gt=datetime.now(timezone.utc)),
+            ),
+            self.scan.get_scan_object().repo.allowlistitem_set.filter(
+                Q(item_type=AllowListType.VULN_RAW.value),
+                Q(expires=None) | Q(expires__gt=datetime.now(timezone.utc)),
+            ),
         )
 
-        # Place all the raw CVEs values into a set for faster searching.
-        if raw_allow_object_list:
-            raw_allow_list = set(x.value["id"] for x in raw_allow_object_list)
-        else:
-            raw_allow_list = set()
-
         # Build out a plugin result structure with event info that contains these
         # vulns so that they can be processed as if they came from a plugin
         results = {"details": [], "event_info": {}}
         for vuln in qs:
-            if not vuln.resolved and allowlist_vuln(vuln, allow_list, raw_allow_list):
+            if not vuln.resolved and allow_list.match(vuln):
                 # Vuln is unresolved but allowlisted so skip it
                 logger.debug("Vuln %s matches allowlist, excluding", vuln)
                 continue
@@ -479,33 +596,3 @@ def handle_key(key: Union[str, bytes], service_type: str, service_key: Optional[
         # base64 decoded first.
         return b64decode(key).decode("utf-8")
     return None
-
-
-def allowlist_vuln(vuln: RepoVulnerabilityScan, allow_list: list, raw_allow_list: set) -> bool:
-    """
-    Determine whether RepoVulnerabilityScan object should be filtered out by the allowlist
-    """
-    for adv_id in vuln.vulnerability.advisory_ids:
-        if adv_id in raw_allow_list:
-            # Advisory ID is in the list of raw IDs to filter out
-            logger.debug("Vuln matches %s in the raw allow list", adv_id)
-            return True
-    for vsp in vuln.vulnerabilityscanplugin_set.all():
-        components = []
-        for component in vsp.components.all():
-            components.append(f"{component.name}-{component.version}")
-        for item in allow_list:
-            if (
-                item.value["id"] in vuln.vulnerability.advisory_ids
-                and item.value["component"] in components
-                and item.value["source"] in vsp.source
-            ):
-                # This AL item matches a component and source of this vuln instance
-                logger.debug(
-                    "Vuln matches <%s, %s, %s> in the allow list",
-                    item.value["id"],
-                    item.value["component"],
-                    item.value["source"],
-                )
-                return True
-    return False
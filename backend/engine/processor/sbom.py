@@ -1,6 +1,8 @@
 import uuid
+from typing import Iterable, Optional
 
 import simplejson as json
+from django.db import transaction
 
 from artemisdb.artemisdb.consts import ComponentType
 from artemisdb.artemisdb.models import Component, License, RepoComponentScan, Scan
@@ -12,74 +14,197 @@ from utils.plugin import Result
 
 logger = Logger(__name__)
 
+# Maximum number of rows per bulk query
+BATCH_SIZE = 1000
+
 
 def process_sbom(result: Result, scan: Scan):
     # The graphs are all moved into one list instead of lists of lists so that all of the tree roots are in this list.
     # The "source" field identifies the different graphs from each other.
     flattened = []
 
+    # Every component in the graphs, deduplicated by name and version
+    dependencies = {}
+
     # Go through the graphs
     for graph in result.details:
-        # Process all the direct dependencies of this graph
+        # Collect all the direct dependencies of this graph and their children
         for direct in graph:
-            process_dependency(direct, scan)
+            flatten_dependency(direct, dependencies)
             flattened.append(direct)  # Add the direct to the flattened list
 
+    process_dependencies(list(dependencies.values()), scan)
+
     # Write the dependency information to S3
     write_sbom_json(scan.scan_id, flattened)
 
 
-def process_dependency(dep: dict, scan: Scan):
-    component = get_component(dep["name"], dep["version"], scan, dep.get("type"))
-
-    # Keep a copy of the license objects so they only have to be retrieved from the DB once
-    license_obj_cache = {}
-
-    licenses = []
-    for license in dep["licenses"]:
-        license_id = license.get("id").lower()
-        if license_id not in license_obj_cache:
-            # If we don't have a local copy of the license object get it from the DB
-            license_obj_cache[license_id], _ = License.objects.get_or_create(
-                license_id=license_id, defaults={"name": license["name"]}
-            )
-
-        # Add the license object to the list for this component
-        licenses.append(license_obj_cache[license_id])
-
-    # Update the component's set of licenses
-    if licenses:
-        component.licenses.set(licenses)
-
-    for child in dep["deps"]:
-        process_dependency(dep=child, scan=scan)
+def flatten_dependency(dep: dict, dependencies: dict) -> None:
+    """
+    Collect a dependency and all of its children into the dependencies dict, keyed by name and version. If a component
+    appears more than once in the tree the last occurrence is kept.
+    """
+    stack = [dep]
+    while stack:
+        current = stack.pop()
+        dependencies[(current["name"], current["version"])] = current
+        # Reversed so that the children are visited in order
+        stack.extend(reversed(current["deps"]))
+
+
+def process_dependencies(deps: list[dict], scan: Scan) -> None:
+    """
+    Store the components and their licenses for a flattened list of dependencies.
+    """
+    with transaction.atomic():
+        components = get_components([(dep["name"], dep["version"], dep.get("type")) for dep in deps], scan)
+        licenses = get_licenses([(license["id"], license["name"]) for dep in deps for license in dep["licenses"]])
+
+        # Update the components' sets of licenses
+        set_component_licenses(
+            {
+                components[(dep["name"], dep["version"])]: [
+                    licenses[license["id"].lower()] for license in dep["licenses"]
+                ]
+                for dep in deps
+                if dep["licenses"]
+            }
+        )
 
 
-def get_component(name: str, version: str, scan: Scan, component_type: str = None) -> Component:
-    label = str(uuid.uuid4()).replace("-", "")  # Dash is not in the allowed character set for ltree labels
-    component, created = Component.objects.get_or_create(
-        name=name, version=version, defaults={"label": label, "component_type": component_type}
+def get_licenses(licenses: Iterable[tuple[str, str]]) -> dict[str, License]:
+    """
+    Resolves (license_id, name) tuples to License objects, creating any that do not exist.
+    :return: dict of lowercase license ID to License
+    """
+    wanted = {}
+    for license_id, name in licenses:
+        wanted.setdefault(license_id.lower(), name)
+    if not wanted:
+        return {}
+
+    found = _fetch_licenses(list(wanted))
+
+    missing = [
+        License(license_id=license_id, name=name) for license_id, name in wanted.items() if license_id not in found
+    ]
+    if missing:
+        # Conflicts are ignored in case another engine has created the same license in the meantime
+        License.objects.bulk_create(missing, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        found.update(_fetch_licenses([license.license_id for license in missing]))
+
+    return found
+
+
+def _fetch_licenses(license_ids: list[str]) -> dict[str, License]:
+    found = {}
+    for i in range(0, len(license_ids), BATCH_SIZE):
+        for license in License.objects.filter(license_id__in=license_ids[i : i + BATCH_SIZE]):
+            found[license.license_id] = license
+    return found
+
+
+def set_component_licenses(component_licenses: dict[Component, list[License]]) -> None:
+    """
+    Batch version of component.licenses.set(). Replaces the licenses of each component with the given list.
+    """
+    if not component_licenses:
+        return
+
+    through = Component.licenses.through
+    wanted = {(component.pk, license.pk) for component, licenses in component_licenses.items() for license in licenses}
+
+    component_pks = [component.pk for component in component_licenses]
+    stale = []
+    existing = set()
+    for i in range(0, len(component_pks), BATCH_SIZE):
+        for link in through.objects.filter(component_id__in=component_pks[i : i + BATCH_SIZE]):
+            if (link.component_id, link.license_id) in wanted:
+                existing.add((link.component_id, link.license_id))
+            else:
+                stale.append(link.pk)
+
+    for i in range(0, len(stale), BATCH_SIZE):
+        through.objects.filter(pk__in=stale[i : i + BATCH_SIZE]).delete()
+
+    through.objects.bulk_create(
+        [through(component_id=component_id, license_id=license_id) for component_id, license_id in wanted - existing],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
     )
 
-    if not created and component.component_type in [None, ComponentType.UNKNOWN.value] and component_type is not None:
-        # Update the component type if not already set
-        component.component_type = component_type.lower()
-        component.save()
 
-    # Get the component/repo mapping, creating it if necessary. This mapping is maintained so that the SBOM
+def get_components(components: Iterable[tuple[str, str, Optional[str]]], scan: Scan) -> dict[tuple, Component]:
+    """
+    Resolves (name, version, component_type) tuples to Component objects, creating any that do not exist, and maps all
+    of them to the scan's repo.
+    :return: dict of (name, version) to Component
+    """
+    wanted = {}
+    for name, version, component_type in components:
+        if wanted.get((name, version)) is None:
+            wanted[(name, version)] = component_type
+    if not wanted:
+        return {}
+
+    found = _fetch_components(wanted)
+
+    missing = [
+        Component(
+            name=name,
+            version=version,
+            label=str(uuid.uuid4()).replace("-", ""),  # Dash is not in the allowed character set for ltree labels
+            component_type=component_type,
+        )
+        for (name, version), component_type in wanted.items()
+        if (name, version) not in found
+    ]
+    if missing:
+        # Conflicts are ignored in case another engine has created the same component in the meantime
+        Component.objects.bulk_create(missing, batch_size=BATCH_SIZE, ignore_conflicts=True)
+        found.update(_fetch_components({(c.name, c.version): None for c in missing}))
+
+    # Update the component type if not already set
+    updated = []
+    for key, component in found.items():
+        component_type = wanted[key]
+        if component.component_type in [None, ComponentType.UNKNOWN.value] and component_type is not None:
+            component.component_type = component_type.lower()
+            updated.append(component)
+    if updated:
+        Component.objects.bulk_update(updated, ["component_type"], batch_size=BATCH_SIZE)
+
+    # Get the component/repo mappings, creating them if necessary. This mapping is maintained so that the SBOM
     # components API can do efficient filtering based on user scope or last scan time. Previously we used
     # the path through the dependency and scan tables for this but it was unusable in practice due to the
-    # size of those tables.
-    component_repo, created = RepoComponentScan.objects.get_or_create(
-        repo=scan.repo, component=component, defaults={"scan": scan}
+    # size of those tables. We're only tracking the latest scan right now for filtering on when a component was
+    # last seen so existing mappings are updated to point to this scan.
+    RepoComponentScan.objects.bulk_create(
+        [RepoComponentScan(repo=scan.repo, component=component, scan=scan) for component in found.values()],
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["repo", "component"],
+        update_fields=["scan"],
     )
-    if not created:
-        # Update the scan to point to this latest scan. We're only tracking the latest scan right now
-        # for filtering on when a component was last seen.
-        component_repo.scan = scan
-        component_repo.save()
 
-    return component
+    return found
+
+
+def _fetch_components(keys: dict[tuple, Optional[str]]) -> dict[tuple, Component]:
+    """
+    Retrieves the Components matching the (name, version) keys, BATCH_SIZE keys per query.
+    """
+    found = {}
+    keys = list(keys)
+    for i in range(0, len(keys), BATCH_SIZE):
+        chunk = set(keys[i : i + BATCH_SIZE])
+        for component in Component.objects.filter(
+            name__in={name for name, _ in chunk}, version__in={version for _, version in chunk}
+        ):
+            # The name and version filters are independent so they can match more than the requested pairs
+            if (component.name, component.version) in chunk:
+                found[(component.name, component.version)] = component
+    return found
 
 
 def convert_string_to_json(output_str: str, log):
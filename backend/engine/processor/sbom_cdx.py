@@ -1,13 +1,13 @@
 import simplejson as json
+from django.db import transaction
 
-from artemisdb.artemisdb.models import License, Scan
+from artemisdb.artemisdb.models import Scan
 from artemislib.aws import AWSConnect
 from artemislib.consts import SBOM_JSON_S3_KEY
 from artemislib.env import SCAN_DATA_S3_BUCKET, SCAN_DATA_S3_ENDPOINT
 from artemislib.logging import Logger
 from utils.plugin import Result
-from processor.sbom import get_component
-from processor.sbom import convert_string_to_json
+from processor.sbom import convert_string_to_json, get_components, get_licenses, set_component_licenses
 
 logger = Logger(__name__)
 
@@ -21,9 +21,12 @@ def process_sbom(result: Result, scan: Scan) -> None:
     if result.details:
         results = result.details[0]
         parsed = result.details[1]
-        # Go through the results
+
+        # Deduplicate the results by name and version, keeping the last occurrence
+        dependencies = {}
         for obj in parsed:
-            process_dependency(obj, scan)
+            dependencies[(obj["name"], obj["version"])] = obj
+        process_dependencies(list(dependencies.values()), scan)
 
         # Write the dependency information to S3
         write_sbom_json(scan.scan_id, results)
@@ -31,37 +34,38 @@ def process_sbom(result: Result, scan: Scan) -> None:
         logger.warning("No results returned from Trivy SBOM Plugin")
 
 
-def process_dependency(dep: dict, scan: Scan) -> None:
-    component = get_component(dep["name"], dep["version"], scan, dep["type"])
-
-    # Keep a copy of the license objects so they only have to be retrieved from the DB once
-    license_obj_cache = {}
-
-    licenses = []
-    for license in dep["licenses"]:
-        license_id = license.get("id").lower()
-        # Check if the licence exceeds the maximum allowed length
-        if len(license.get("name")) > MAX_LICENCE_LENGTH:
-            logger.error(f"{component}'s license exceeds character limit. License is: {license['name']}")
-            continue
-        # If we don't have a local copy of the license object get it from the DB
-        if license_id not in license_obj_cache:
-            try:
-                license_obj_cache[license_id], _ = License.objects.get_or_create(
-                    license_id=license_id, defaults={"name": license["name"]}
-                )
-            except Exception as e:
-                logger.error(f"Error inserting data for license_id {license_id}: {e}")
-
-        # Add the license object to the list for this component
-        licenses.append(license_obj_cache[license_id])
-
-    # Check if the component's license count exceeds the threshold of what is deemed suspicious
-    if len(licenses) > MAX_LICENCE_COUNT:
-        logger.warning(f"{component} potentially contains incorrect license information")
-    # Update the component's set of licenses
-    if licenses:
-        component.licenses.set(licenses)
+def process_dependencies(deps: list[dict], scan: Scan) -> None:
+    with transaction.atomic():
+        components = get_components([(dep["name"], dep["version"], dep["type"]) for dep in deps], scan)
+
+        component_licenses = {}
+        for dep in deps:
+            component = components[(dep["name"], dep["version"])]
+            licenses = []
+            for license in dep["licenses"]:
+                # Check if the licence exceeds the maximum allowed length
+                if len(license.get("name")) > MAX_LICENCE_LENGTH:
+                    logger.error(f"{component}'s license exceeds character limit. License is: {license['name']}")
+                    continue
+                licenses.append(license)
+
+            # Check if the component's license count exceeds the threshold of what is deemed suspicious
+            if len(licenses) > MAX_LICENCE_COUNT:
+                logger.warning(f"{component} potentially contains incorrect license information")
+            if licenses:
+                component_licenses[component] = licenses
+
+        license_objs = get_licenses(
+            [(license["id"], license["name"]) for licenses in component_licenses.values() for license in licenses]
+        )
+
+        # Update the components' sets of licenses
+        set_component_licenses(
+            {
+                component: [license_objs[license["id"].lower()] for license in licenses]
+                for component, licenses in component_licenses.items()
+            }
+        )
 
 
 def write_sbom_json(scan_id: str, sbom: str) -> None:
@@ -1,8 +1,7 @@
 import uuid
-from typing import Optional
+from typing import Iterable
 
 from django.db import transaction
-from django.db.models import Q, QuerySet
 
 from artemisdb.artemisdb.consts import Severity
 from artemisdb.artemisdb.models import (
@@ -13,8 +12,9 @@ from artemisdb.artemisdb.models import (
     Vulnerability,
     VulnerabilityScanPlugin,
 )
+from artemislib.datetime import get_utc_datetime
 from artemislib.logging import Logger
-from processor.sbom import get_component
+from processor.sbom import BATCH_SIZE, get_components
 from utils.plugin import Result
 
 LOG = Logger(__name__)
@@ -43,157 +43,331 @@ ADVISORY_ID_PREFIX_LIST = [
 ] + ADVISORY_ID_PREFIX_STRIP_LIST
 
 
+class _VulnEntry:
+    """
+    In-memory state of a Vulnerability while a plugin's results are being ingested
+    """
+
+    def __init__(self, vuln: Vulnerability, seq: int):
+        self.vuln = vuln
+        self.seq = seq  # Merge order: existing vulns by age and then new vulns in the order they were created
+        self.modified = False
+        self.components = set()  # (name, version) keys of the components to map to the vuln
+        self.absorbed = []  # PKs of existing vulns that have been merged into this one
+        self.sources = []  # Sources of the vuln instance in this scan
+        self.instance_components = set()  # (name, version) keys of the components to map to the vuln instance
+
+    @property
+    def created(self) -> bool:
+        return self.vuln.pk is None
+
+
 def process_vulns(result: Result, scan: Scan, plugin_name: str) -> None:
     """
     Process all of the vulns in the plugin results into the vulnerability inventory.
+
+    The results are ingested as a batch: all of the existing vulns that share advisory IDs with the results are
+    retrieved in a single query, matched and merged in memory, and then written back using bulk operations within a
+    single transaction. The number of queries depends on the number of tables written, not the number of findings.
     """
     plugin = Plugin.objects.get(name=plugin_name)
+
+    findings = []
     for v in result.details:
         advisory_ids = _filter_advisory_ids(v.get("inventory", {}).get("advisory_ids", [v["id"]]))
 
         # Make sure the severity value is valid
         v["severity"] = _filter_invalid_severity(v["severity"])
 
-        # Build a Q filter for any of the advisory IDs
-        adv_ids_filter = None
-        for adv_id in advisory_ids:
-            if adv_ids_filter is None:
-                adv_ids_filter = Q(advisory_ids__contains=adv_id)
-            else:
-                adv_ids_filter |= Q(advisory_ids__contains=adv_id)
-
-        vulns = Vulnerability.objects.filter(adv_ids_filter).order_by("added")
-
-        created = False
-        if vulns.count() == 0:
-            LOG.debug("Creating vuln for %s", advisory_ids)
-            # No vulns reference any of the advisory IDs so create a new one
-            vuln = Vulnerability.objects.create(
-                vuln_id=uuid.uuid4(),
-                description=v["description"].strip(),
-                remediation=v["remediation"].strip(),
-                severity=v["severity"],
-                advisory_ids=advisory_ids,
+        if "component" in v.get("inventory", {}):
+            component = (
+                v["inventory"]["component"]["name"],
+                v["inventory"]["component"]["version"],
+                v["inventory"]["component"].get("type"),
             )
-            created = True
-        elif vulns.count() > 1:
-            LOG.debug("Merging vulns %s", vulns)
-            # More than one vuln reference the advisory IDs so merge them into a single vuln
-            vuln = _merge_vulns(vulns)
         else:
-            # Only one vuln references any of the advisory IDs so use it
-            vuln = vulns.first()
+            component = None
 
-        # This should never happen but just in case.
-        if vuln is None:
-            LOG.error("could not find valid vuln")
-            continue
+        source = v.get("source") if isinstance(v.get("source"), list) else [v.get("source", "")]
+        findings.append(
+            (v, advisory_ids, component, {"source": source, "filename": v.get("filename"), "line": v.get("line")})
+        )
 
-        LOG.debug("Found existing vuln %s", vuln.vuln_id)
+        if "inventory" in v:
+            # Delete the inventory part of the plugin result because we don't need to store it in the DB
+            del v["inventory"]
 
-        # Update plugin mapping for this vuln, if needed
-        if not vuln.plugins.filter(pk=plugin.pk).exists():
-            vuln.plugins.add(plugin)
+    if not findings:
+        return
+
+    # Index the existing vulns that reference any of the advisory IDs
+    index: dict[str, set[_VulnEntry]] = {}
+    entries: list[_VulnEntry] = []
+    all_advisory_ids = list({adv_id for _, advisory_ids, _, _ in findings for adv_id in advisory_ids})
+    for vuln in Vulnerability.objects.filter(advisory_ids__has_any_keys=all_advisory_ids).order_by("added"):
+        entry = _VulnEntry(vuln, len(entries))
+        entries.append(entry)
+        for adv_id in vuln.advisory_ids:
+            index.setdefault(adv_id, set()).add(entry)
+
+    for v, advisory_ids, component, source in findings:
+        matches = set()
+        for adv_id in advisory_ids:
+            matches |= index.get(adv_id, set())
 
-        # Update component mapping for this vuln, if needed
-        if "component" in v.get("inventory", {}):
-            component = get_component(
-                name=v["inventory"]["component"]["name"],
-                version=v["inventory"]["component"]["version"],
-                scan=scan,
-                component_type=v["inventory"]["component"].get("type"),
+        if not matches:
+            LOG.debug("Creating vuln for %s", advisory_ids)
+            # No vulns reference any of the advisory IDs so create a new one
+            entry = _VulnEntry(
+                Vulnerability(
+                    vuln_id=uuid.uuid4(),
+                    description=v["description"].strip(),
+                    remediation=v["remediation"].strip(),
+                    severity=v["severity"],
+                    advisory_ids=advisory_ids,
+                ),
+                len(entries),
             )
-            if not vuln.components.filter(pk=component.pk).exists():
-                vuln.components.add(component)
+            entries.append(entry)
+            LOG.debug("Added %s to vuln inventory (%s)", v["id"], entry.vuln.vuln_id)
         else:
-            component = None
+            if len(matches) > 1:
+                LOG.debug("Merging vulns %s", [e.vuln for e in matches])
+                # More than one vuln reference the advisory IDs so merge them into a single vuln
+                entry = _merge_vulns(sorted(matches, key=lambda e: e.seq), index)
+            else:
+                # Only one vuln references any of the advisory IDs so use it
+                (entry,) = matches
+            LOG.debug("Found existing vuln %s", entry.vuln.vuln_id)
+            if _update_vuln(entry.vuln, v, advisory_ids):
+                LOG.debug("Updated %s in vuln inventory (%s)", v["id"], entry.vuln.vuln_id)
+                entry.modified = True
 
-        if created:
-            LOG.debug("Added %s to vuln inventory (%s)", v["id"], vuln.vuln_id)
-        else:
-            modified = False
-
-            # Add any advisory IDs that are not present
-            for adv_id in advisory_ids:
-                if adv_id not in vuln.advisory_ids:
-                    vuln.advisory_ids.append(adv_id)
-                    modified = True
-
-            # Use the longer description on the assumption that longer is going to be better.
-            # Don't update the description if it has been customized.
-            if len(vuln.description) < len(v["description"].strip()) and not vuln.description_customized:
-                vuln.description = v["description"].strip()
-                modified = True
-
-            # Use the longer remediation on the assumption that longer is going to be better.
-            # Don't update the remediation if it has been customized.
-            if len(vuln.remediation) < len(v["remediation"].strip()) and not vuln.remediation_customized:
-                vuln.remediation = v["remediation"].strip()
-                modified = True
-
-            # Store the most severe of the severities if they are different
-            if vuln.severity != v["severity"]:
-                most_severe = Vulnerability.most_severe(vuln.severity, v["severity"])
-                if vuln.severity != most_severe:
-                    vuln.severity = most_severe
-                    modified = True
-
-            if modified:
-                LOG.debug("Updated %s in vuln inventory (%s)", v["id"], vuln.vuln_id)
-                vuln.save()
+        for adv_id in entry.vuln.advisory_ids:
+            index.setdefault(adv_id, set()).add(entry)
 
-        source = v.get("source") if isinstance(v.get("source"), list) else [v.get("source", "")]
-        _process_vuln_instance(vuln, scan, plugin, component, source, v.get("filename"), v.get("line"))
+        if component:
+            entry.components.add(component)
+            entry.instance_components.add(component[:2])
+        entry.sources.append(source)
 
-        if "inventory" in v:
-            # Delete the inventory part of the plugin result because we don't need to store it in the DB
-            del v["inventory"]
+    # Only the vulns that were matched and survived merging are written
+    entries = [e for e in entries if e.seq is not None and e.sources]
 
+    with transaction.atomic():
+        components = get_components([c for e in entries for c in e.components], scan)
+        _write_vulns(entries, plugin, components)
+        _write_vuln_instances(entries, scan, plugin, components)
 
-def _merge_vulns(vulns: QuerySet) -> Optional[Vulnerability]:
+
+def _update_vuln(vuln: Vulnerability, v: dict, advisory_ids: list) -> bool:
     """
-    Merge the vulns matching the provided QuerySet into a single vuln, deleting the others.
+    Update an existing vuln from a plugin result.
+    :return: whether the vuln was modified
     """
-    vuln = None
-    with transaction.atomic():
-        for v in vulns:
-            if vuln is None:
-                vuln = v
-            else:
-                # Use the longer description on the assumption that longer is going to be better.
-                # Don't update the description if it has been customized.
-                if len(vuln.description) < len(v.description) and not vuln.description_customized:
-                    vuln.description = v.description
+    modified = False
 
-                # Use the longer remediation on the assumption that longer is going to be better.
-                # Don't update the remediation if it has been customized.
-                if len(vuln.remediation) < len(v.remediation) and not vuln.remediation_customized:
-                    vuln.remediation = v.remediation
+    # Add any advisory IDs that are not present
+    for adv_id in advisory_ids:
+        if adv_id not in vuln.advisory_ids:
+            vuln.advisory_ids.append(adv_id)
+            modified = True
 
-                # Store the most severe of the severities if they are different
-                if vuln.severity != v.severity:
-                    vuln.severity = Vulnerability.most_severe(vuln.severity, v.severity)
+    # Use the longer description on the assumption that longer is going to be better.
+    # Don't update the description if it has been customized.
+    if len(vuln.description) < len(v["description"].strip()) and not vuln.description_customized:
+        vuln.description = v["description"].strip()
+        modified = True
 
-                # Make sure the surviving vuln has all of the plugins mapped
-                for plugin in v.plugins.all():
-                    if not vuln.plugins.filter(pk=plugin.pk).exists():
-                        vuln.plugins.add(plugin)
+    # Use the longer remediation on the assumption that longer is going to be better.
+    # Don't update the remediation if it has been customized.
+    if len(vuln.remediation) < len(v["remediation"].strip()) and not vuln.remediation_customized:
+        vuln.remediation = v["remediation"].strip()
+        modified = True
 
-                # Make sure the surviving vuln has all of the components mapped
-                for component in v.components.all():
-                    if not vuln.components.filter(pk=component.pk).exists():
-                        vuln.components.add(component)
+    # Store the most severe of the severities if they are different
+    if vuln.severity != v["severity"]:
+        most_severe = Vulnerability.most_severe(vuln.severity, v["severity"])
+        if vuln.severity != most_severe:
+            vuln.severity = most_severe
+            modified = True
 
-                # Make sure all the advisory IDs are included
-                for adv_id in v.advisory_ids:
-                    if adv_id not in vuln.advisory_ids:
-                        vuln.advisory_ids.append(adv_id)
+    return modified
 
-                # Save the surving vuln, delete the other one
-                vuln.save()
-                v.delete()
 
-    return vuln
+def _merge_vulns(matches: list[_VulnEntry], index: dict[str, set[_VulnEntry]]) -> _VulnEntry:
+    """
+    Merge the matching vulns into the oldest one. Existing vulns that are merged are deleted when the results are
+    written and vulns that were created from these results are never written.
+    """
+    entry = matches[0]
+    vuln = entry.vuln
+    for other in matches[1:]:
+        v = other.vuln
+
+        # Use the longer description on the assumption that longer is going to be better.
+        # Don't update the description if it has been customized.
+        if len(vuln.description) < len(v.description) and not vuln.description_customized:
+            vuln.description = v.description
+
+        # Use the longer remediation on the assumption that longer is going to be better.
+        # Don't update the remediation if it has been customized.
+        if len(vuln.remediation) < len(v.remediation) and not vuln.remediation_customized:
+            vuln.remediation = v.remediation
+
+        # Store the most severe of the severities if they are different
+        if vuln.severity != v.severity:
+            vuln.severity = Vulnerability.most_severe(vuln.severity, v.severity)
+
+        # Make sure all the advisory IDs are included
+        for adv_id in v.advisory_ids:
+            if adv_id not in vuln.advisory_ids:
+                vuln.advisory_ids.append(adv_id)
+
+        # Make sure the surviving vuln has all of the plugins, components, and sources mapped
+        entry.components |= other.components
+        entry.instance_components |= other.instance_components
+        entry.sources += other.sources
+        entry.absorbed += other.absorbed
+        if not other.created:
+            entry.absorbed.append(v.pk)
+
+        for adv_id in v.advisory_ids:
+            index[adv_id].discard(other)
+            index[adv_id].add(entry)
+        other.seq = None  # Mark as merged
+
+    entry.modified = True
+    return entry
+
+
+def _write_vulns(entries: list[_VulnEntry], plugin: Plugin, components: dict[tuple, Component]) -> None:
+    """
+    Write the vulns and their plugin and component mappings
+    """
+    modified = [e.vuln for e in entries if e.modified and not e.created]
+    Vulnerability.objects.bulk_create([e.vuln for e in entries if e.created], batch_size=BATCH_SIZE)
+
+    now = get_utc_datetime()
+    for vuln in modified:
+        vuln.updated = now
+    Vulnerability.objects.bulk_update(
+        modified, ["advisory_ids", "description", "remediation", "severity", "updated"], batch_size=BATCH_SIZE
+    )
+
+    plugin_links = [Vulnerability.plugins.through(vulnerability_id=e.vuln.pk, plugin_id=plugin.pk) for e in entries]
+    component_links = [
+        Vulnerability.components.through(vulnerability_id=e.vuln.pk, component_id=components[c[:2]].pk)
+        for e in entries
+        for c in e.components
+    ]
+
+    # Make sure the surviving vulns have all of the plugins and components of the merged vulns mapped
+    absorbed = {pk: e.vuln.pk for e in entries for pk in e.absorbed}
+    if absorbed:
+        for link in Vulnerability.plugins.through.objects.filter(vulnerability_id__in=absorbed):
+            plugin_links.append(
+                Vulnerability.plugins.through(
+                    vulnerability_id=absorbed[link.vulnerability_id], plugin_id=link.plugin_id
+                )
+            )
+        for link in Vulnerability.components.through.objects.filter(vulnerability_id__in=absorbed):
+            component_links.append(
+                Vulnerability.components.through(
+                    vulnerability_id=absorbed[link.vulnerability_id], component_id=link.component_id
+                )
+            )
+
+    Vulnerability.plugins.through.objects.bulk_create(plugin_links, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    Vulnerability.components.through.objects.bulk_create(component_links, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+    if absorbed:
+        Vulnerability.objects.filter(pk__in=absorbed).delete()
+
+
+def _get_vuln_instances(scan: Scan, vuln_pks: list[int]) -> dict[int, RepoVulnerabilityScan]:
+    """
+    Get the existing vuln instances for this repo+branch, by vuln
+    """
+    ref = {"ref__isnull": True} if scan.ref is None else {"ref": scan.ref}
+    instances = {}
+    for i in range(0, len(vuln_pks), BATCH_SIZE):
+        for vuln_instance in RepoVulnerabilityScan.objects.filter(
+            repo=scan.repo, vulnerability_id__in=vuln_pks[i : i + BATCH_SIZE], **ref
+        ).order_by("pk"):
+            # Keep the oldest instance if there are duplicates from before the instances were looked up first
+            instances.setdefault(vuln_instance.vulnerability_id, vuln_instance)
+    return instances
+
+
+def _write_vuln_instances(
+    entries: list[_VulnEntry], scan: Scan, plugin: Plugin, components: dict[tuple, Component]
+) -> None:
+    """
+    Record the vuln instances for this scan
+    """
+    vuln_pks = [e.vuln.pk for e in entries]
+
+    # Get or create the vuln instances for this repo+branch. The instances are looked up before creating the missing
+    # ones because the unique constraint doesn't stop duplicates on the default branch, where the ref is NULL.
+    instances = _get_vuln_instances(scan, vuln_pks)
+    RepoVulnerabilityScan.objects.bulk_create(
+        [
+            RepoVulnerabilityScan(
+                repo=scan.repo, ref=scan.ref, vulnerability_id=pk, vuln_instance_id=uuid.uuid4(), resolved=False
+            )
+            for pk in vuln_pks
+            if pk not in instances
+        ],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    instances.update(_get_vuln_instances(scan, [pk for pk in vuln_pks if pk not in instances]))
+
+    # Map the vuln instances to this scan as coming from this plugin and component
+    vuln_scans = {}
+    instance_pks = [instance.pk for instance in instances.values()]
+    for i in range(0, len(instance_pks), BATCH_SIZE):
+        for vuln_scan in VulnerabilityScanPlugin.objects.filter(
+            scan=scan, vuln_instance_id__in=instance_pks[i : i + BATCH_SIZE]
+        ):
+            vuln_scans[vuln_scan.vuln_instance_id] = vuln_scan
+
+    created = []
+    existing = list(vuln_scans.values())
+    for e in entries:
+        vuln_instance = instances[e.vuln.pk]
+        vuln_scan = vuln_scans.get(vuln_instance.pk)
+        if vuln_scan is None:
+            vuln_scan = VulnerabilityScanPlugin(vuln_instance=vuln_instance, scan=scan, source=[])
+            vuln_scans[vuln_instance.pk] = vuln_scan
+            created.append(vuln_scan)
+
+        # Record the source locations for this specific vuln instance
+        vuln_scan.source += e.sources
+
+    VulnerabilityScanPlugin.objects.bulk_create(created, batch_size=BATCH_SIZE)
+    VulnerabilityScanPlugin.objects.bulk_update(existing, ["source"], batch_size=BATCH_SIZE)
+
+    VulnerabilityScanPlugin.plugins.through.objects.bulk_create(
+        [
+            VulnerabilityScanPlugin.plugins.through(vulnerabilityscanplugin_id=vuln_scan.pk, plugin_id=plugin.pk)
+            for vuln_scan in vuln_scans.values()
+        ],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    VulnerabilityScanPlugin.components.through.objects.bulk_create(
+        [
+            VulnerabilityScanPlugin.components.through(
+                vulnerabilityscanplugin_id=vuln_scans[instances[e.vuln.pk].pk].pk, component_id=components[c].pk
+            )
+            for e in entries
+            for c in e.instance_components
+        ],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
 
 
 def _filter_advisory_ids(full_advisory_ids: list) -> list[str]:
@@ -217,52 +391,81 @@ def _filter_advisory_ids(full_advisory_ids: list) -> list[str]:
     return list(advisory_ids)
 
 
-def _process_vuln_instance(
-    vuln: Vulnerability,
-    scan: Scan,
-    plugin: Plugin,
-    component: Optional[Component],
-    source: list,
-    filename: str,
-    line: int,
-) -> None:
-    """
-    Record the vuln instance for this scan
-    """
-    # Get or create the vuln instance for this repo+branch
-    vuln_instance, _ = RepoVulnerabilityScan.objects.get_or_create(
-        repo=scan.repo, ref=scan.ref, vulnerability=vuln, defaults={"vuln_instance_id": uuid.uuid4(), "resolved": False}
-    )
-    # Map the vuln instance to this scan as coming from this plugin and component
-    vuln_scan, _ = VulnerabilityScanPlugin.objects.get_or_create(vuln_instance=vuln_instance, scan=scan)
-    if not vuln_scan.plugins.filter(pk=plugin.pk).exists():
-        vuln_scan.plugins.add(plugin)
-    if component and not vuln_scan.components.filter(pk=component.pk).exists():
-        vuln_scan.components.add(component)
-
-    # Record the source location for this specific vuln instance
-    vuln_scan.source.append({"source": source, "filename": filename, "line": line})
-    vuln_scan.save()
-
-
 def resolve_vulns(scan: Scan, error_plugins: list) -> None:
     # Get the plugins run by this scan, excluding any that failed to execute successfully
-    plugins = Q()
-    for plugin in Plugin.objects.filter(name__in=[p for p in scan.plugins if not p.startswith("-")]).exclude(
+    plugins = Plugin.objects.filter(name__in=[p for p in scan.plugins if not p.startswith("-")]).exclude(
         name__in=error_plugins
-    ):
-        plugins |= Q(vulnerability__plugins=plugin)
+    )
 
     # Get the unresolved vuln instances for this repo+ref that have been found by these plugins previously
     # but that were not found by this scan
     vuln_instances = RepoVulnerabilityScan.objects.filter(
-        Q(repo=scan.repo, ref=scan.ref, resolved=False) & plugins
+        repo=scan.repo, ref=scan.ref, resolved=False, vulnerability__plugins__in=plugins
     ).exclude(scan=scan)
 
-    # Update the vuln instances to mark them resolved
+    # Update the vuln instances to mark them resolved. This is a single UPDATE statement with the instances and
+    # plugins selected by subqueries.
     vuln_instances.update(resolved=True, resolved_by=scan)
 
 
+class VulnAllowList:
+    """
+    Compiled form of a repo's vuln and vuln_raw allowlist items.
+
+    The vuln items are indexed by advisory ID so that each vuln instance only has to be compared against the items
+    for its own advisory IDs instead of the whole allowlist.
+    """
+
+    def __init__(self, allow_list: Iterable, raw_allow_list: Iterable):
+        # Advisory IDs that are allowlisted regardless of component or source
+        self.raw = {item.value["id"] for item in raw_allow_list}
+
+        # Advisory ID -> set of allowlisted (component, source) pairs
+        self.items = {}
+        for item in allow_list:
+            self.items.setdefault(item.value["id"], set()).add((item.value["component"], item.value["source"]))
+
+    def match(self, vuln: RepoVulnerabilityScan) -> bool:
+        """
+        Determine whether RepoVulnerabilityScan object should be filtered out by the allowlist. The vuln instance's
+        scan plugin records and their components should be prefetched.
+        """
+        advisory_ids = vuln.vulnerability.advisory_ids
+        for adv_id in advisory_ids:
+            if adv_id in self.raw:
+                # Advisory ID is in the list of raw IDs to filter out
+                LOG.debug("Vuln matches %s in the raw allow list", adv_id)
+                return True
+
+        candidates = set()
+        for adv_id in advisory_ids:
+            for component, source in self.items.get(adv_id, ()):
+                candidates.add((adv_id, component, source))
+        if not candidates:
+            return False
+
+        for vsp in vuln.vulnerabilityscanplugin_set.all():
+            components = {f"{component.name}-{component.version}" for component in vsp.components.all()}
+            sources = _vuln_scan_sources(vsp.source)
+            for adv_id, component, source in candidates:
+                if component in components and source in sources:
+                    # This AL item matches a component and source of this vuln instance
+                    LOG.debug("Vuln matches <%s, %s, %s> in the allow list", adv_id, component, source)
+                    return True
+        return False
+
+
+def _vuln_scan_sources(source: list) -> set:
+    # Each source location is recorded as a dict containing the list of sources along with the filename and line
+    sources = set()
+    for location in source:
+        if isinstance(location, dict):
+            sources.update(location.get("source") or [])
+        else:
+            sources.add(location)
+    return sources
+
+
 def _filter_invalid_severity(severity: str) -> str:
     # Any severities that are not known are changed to NONE. This can happen when a vuln is new
     # and doesn't have a CVSS score yet. Different tools handle this differently and this should
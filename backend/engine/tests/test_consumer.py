@@ -0,0 +1,123 @@
+import time
+import unittest
+from unittest.mock import patch
+
+import boto3
+from moto import mock_aws
+
+from utils.consumer import TaskConsumer
+
+REGION = "us-east-1"
+
+
+@mock_aws
+@patch("utils.consumer.PRIORITY_POLL_WAIT", 0)
+@patch("utils.consumer.DEFAULT_POLL_WAIT", 0)
+class TestTaskConsumer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sqs = boto3.client("sqs", region_name=REGION)
+        self.priority_url = self.sqs.create_queue(QueueName="test-priority-task-queue")["QueueUrl"]
+        self.url = self.sqs.create_queue(QueueName="test-task-queue")["QueueUrl"]
+        self.consumer = None
+
+    def tearDown(self) -> None:
+        if self.consumer:
+            self.consumer.close()
+
+    def _consumer(self, on_drop=None) -> TaskConsumer:
+        self.consumer = TaskConsumer(self.priority_url, self.url, client=self.sqs, on_drop=on_drop)
+        return self.consumer
+
+    def _send(self, queue_url: str, body: str) -> None:
+        self.sqs.send_message(QueueUrl=queue_url, MessageBody=body)
+
+    def _count(self, queue_url: str, attribute: str = "ApproximateNumberOfMessages") -> int:
+        resp = self.sqs.get_queue_attributes(QueueUrl=queue_url, AttributeNames=[attribute])
+        return int(resp["Attributes"][attribute])
+
+    def test_receive_priority_first(self):
+        self._send(self.url, "regular")
+        self._send(self.priority_url, "priority")
+        consumer = self._consumer()
+
+        msg = consumer.receive()
+        self.assertEqual(msg["Body"], "priority")
+        self.assertTrue(consumer.is_priority(msg))
+
+        msg = consumer.receive()
+        self.assertEqual(msg["Body"], "regular")
+        self.assertFalse(consumer.is_priority(msg))
+
+        self.assertIsNone(consumer.receive())
+
+    @patch("utils.consumer.PRIORITY_TASK_WEIGHT", 2)
+    def test_receive_fair(self):
+        for i in range(4):
+            self._send(self.priority_url, f"priority-{i}")
+        self._send(self.url, "regular")
+        consumer = self._consumer()
+
+        bodies = []
+        for _ in range(5):
+            msg = consumer.receive()
+            bodies.append(msg["Body"])
+            consumer.ack(msg)
+
+        # The regular queue gets a turn after two priority tasks in a row
+        self.assertEqual(bodies, ["priority-0", "priority-1", "regular", "priority-2", "priority-3"])
+
+    def test_ack(self):
+        self._send(self.url, "regular")
+        consumer = self._consumer()
+
+        msg = consumer.receive()
+        # The message stays on the queue while the task is being processed
+        self.assertEqual(self._count(self.url, "ApproximateNumberOfMessagesNotVisible"), 1)
+
+        consumer.ack(msg)
+        self.assertEqual(self._count(self.url, "ApproximateNumberOfMessagesNotVisible"), 0)
+        self.assertEqual(self._count(self.url), 0)
+
+    def test_receive_one_at_a_time(self):
+        for i in range(3):
+            self._send(self.url, f"regular-{i}")
+        consumer = self._consumer()
+
+        msg = consumer.receive()
+        # Only the task being processed is kept from other engines
+        self.assertEqual(self._count(self.url, "ApproximateNumberOfMessagesNotVisible"), 1)
+        self.assertEqual(self._count(self.url), 2)
+        consumer.ack(msg)
+
+    @patch("utils.consumer.TASK_MAX_RECEIVE_COUNT", 1)
+    def test_drop_poison_message(self):
+        self._send(self.url, "regular")
+        # Simulate an earlier receive by an engine that never finished the task
+        resp = self.sqs.receive_message(QueueUrl=self.url)
+        self.sqs.change_message_visibility(
+            QueueUrl=self.url, ReceiptHandle=resp["Messages"][0]["ReceiptHandle"], VisibilityTimeout=0
+        )
+        dropped = []
+        consumer = self._consumer(on_drop=dropped.append)
+
+        self.assertIsNone(consumer.receive())
+        # The task is failed before its message is dropped
+        self.assertEqual([msg["Body"] for msg in dropped], ["regular"])
+        self.assertEqual(self._count(self.url), 0)
+        self.assertEqual(self._count(self.url, "ApproximateNumberOfMessagesNotVisible"), 0)
+
+    @patch("utils.consumer.TASK_VISIBILITY_TIMEOUT", 3)
+    def test_heartbeat(self):
+        self._send(self.url, "regular")
+        with patch.object(
+            self.sqs, "change_message_visibility_batch", wraps=self.sqs.change_message_visibility_batch
+        ) as change_visibility:
+            consumer = self._consumer()
+            msg = consumer.receive()
+            time.sleep(1.5)
+
+            self.assertGreater(change_visibility.call_count, 0)
+            entries = change_visibility.call_args.kwargs["Entries"]
+            self.assertEqual([entry["ReceiptHandle"] for entry in entries], [msg["ReceiptHandle"]])
+
+            consumer.ack(msg)
@@ -1,5 +1,8 @@
+import logging
 import os
 import random
+import threading
+import time
 import unittest
 from base64 import b64encode
 from copy import deepcopy
@@ -14,6 +17,7 @@ from processor import processor as engine_processor
 from processor.details import Details
 from processor.scan_details import ScanDetails
 from utils.git import get_last_commit_timestamp
+from utils.plugin import PluginSettings, Result
 from utils.services import _get_services_from_file
 
 TEST_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -39,6 +43,69 @@ def _load_services() -> Any:
     return svcs.get("services")
 
 
+class DummyDBScanObject:
+    def __init__(self):
+        self.statuses = []
+        self.plugin_results = []
+
+    def get_scan_object(self):
+        return Scan()
+
+    def update_status(self, status, *args, **kwargs):
+        self.statuses.append(status)
+
+    def create_plugin_result_set(self, start_time, results):
+        self.plugin_results.append(results.name)
+
+
+class PluginRunTracker:
+    """
+    Stand-in for run_plugin that records how many plugins were running at the same time
+    """
+
+    def __init__(self, writable: set, fail: set = None, duration: float = 0.05, barrier: threading.Barrier = None):
+        self.writable = writable
+        self.fail = fail or set()
+        self.duration = duration
+        # If set, the concurrent plugins wait for each other to be running before finishing
+        self.barrier = barrier
+        self.running = 0
+        self.max_running = 0
+        self.order = []
+        self.log_fields = {}
+        self._lock = threading.Lock()
+
+    def settings(self, plugin: str) -> PluginSettings:
+        return PluginSettings(name=plugin, writable=plugin in self.writable, memory=512)
+
+    def run(self, plugin: str, *args, **kwargs) -> Result:
+        with self._lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            self.order.append(plugin)
+            record = logging.getLogRecordFactory()(plugin, logging.INFO, "", 0, "", (), None)
+            self.log_fields[plugin] = getattr(record, "plugin", None)
+        if self.barrier and plugin not in self.writable:
+            self.barrier.wait(timeout=10)
+        else:
+            time.sleep(self.duration)
+        with self._lock:
+            self.running -= 1
+        if plugin in self.fail:
+            raise Exception("Plugin failure")
+        return Result(
+            name=plugin,
+            type="misc",
+            success=True,
+            truncated=False,
+            details=[],
+            errors=[],
+            alerts=[],
+            debug=[],
+            dirty=plugin in self.writable,
+        )
+
+
 class TestEngineProcessor(unittest.TestCase):
     def test_engine_processor_create(self):
         processor = engine_processor.EngineProcessor(TEST_SERVICES, "scan", TEST_DETAILS, {}, object)
@@ -159,6 +226,61 @@ class TestEngineProcessor(unittest.TestCase):
         self.assertTrue(get_api_key.called)
         self.assertEqual(expected_result, result)
 
+    def _process_plugins(self, plugins, tracker, max_workers, memory_budget=0):
+        scan = DummyDBScanObject()
+        processor = engine_processor.EngineProcessor(TEST_SERVICES, "scan", TEST_DETAILS, scan, object)
+        processor.action_details.plugins = plugins
+        with (
+            patch.object(engine_processor, "PLUGIN_MAX_WORKERS", max_workers),
+            patch.object(engine_processor, "PLUGIN_MEMORY_BUDGET", memory_budget),
+            patch.object(engine_processor.plugin_registry, "get_settings", tracker.settings),
+            patch.object(engine_processor, "run_plugin", tracker.run),
+            patch.object(engine_processor, "resolve_vulns") as resolve_vulns,
+            patch.object(engine_processor, "git_clean") as git_clean,
+            patch.object(engine_processor, "git_reset"),
+        ):
+            processor.process_plugins(None, {})
+        return scan, resolve_vulns, git_clean
+
+    def test_process_plugins_serial(self):
+        tracker = PluginRunTracker(writable=set())
+        scan, _, _ = self._process_plugins(["a", "b", "c"], tracker, max_workers=1)
+        self.assertEqual(tracker.max_running, 1)
+        self.assertEqual(tracker.order, ["a", "b", "c"])
+        self.assertEqual(scan.plugin_results, ["a", "b", "c"])
+
+    def test_process_plugins_concurrent(self):
+        tracker = PluginRunTracker(writable={"w1", "w2"}, barrier=threading.Barrier(4))
+        scan, _, git_clean = self._process_plugins(["a", "w1", "b", "c", "w2", "d"], tracker, max_workers=4)
+        self.assertEqual(tracker.max_running, 4)
+        # Each plugin's logs are tagged with that plugin, even while the others are running
+        self.assertEqual(tracker.log_fields, {plugin: plugin for plugin in ["a", "b", "c", "d", "w1", "w2"]})
+        # Writable plugins run one at a time after the concurrent plugins
+        self.assertEqual(tracker.order[-2:], ["w1", "w2"])
+        self.assertEqual(git_clean.call_count, 2)
+        self.assertEqual(sorted(scan.plugin_results), ["a", "b", "c", "d", "w1", "w2"])
+        self.assertEqual(len(scan.statuses), 6)
+
+    def test_process_plugins_memory_budget(self):
+        tracker = PluginRunTracker(writable=set())
+        scan, _, _ = self._process_plugins(["a", "b", "c", "d"], tracker, max_workers=4, memory_budget=1024)
+        # Each plugin reserves 512 MB so only two fit within the budget
+        self.assertEqual(tracker.max_running, 2)
+        self.assertEqual(len(scan.plugin_results), 4)
+
+    def test_process_plugins_memory_budget_exceeded(self):
+        tracker = PluginRunTracker(writable=set())
+        scan, _, _ = self._process_plugins(["a", "b"], tracker, max_workers=4, memory_budget=256)
+        # A plugin larger than the whole budget still runs, just by itself
+        self.assertEqual(tracker.max_running, 1)
+        self.assertEqual(len(scan.plugin_results), 2)
+
+    def test_process_plugins_concurrent_errors(self):
+        tracker = PluginRunTracker(writable={"w"}, fail={"b", "w"})
+        scan, resolve_vulns, _ = self._process_plugins(["a", "b", "w"], tracker, max_workers=2)
+        self.assertEqual(scan.plugin_results, ["a"])
+        self.assertEqual(sorted(resolve_vulns.call_args.args[1]), ["b", "w"])
+
     @pytest.mark.integtest
     def test_git_log(self):
         test_url = "https://github.com/turnerlabs/samlkeygen.git"
@@ -1,5 +1,6 @@
 import docker
 import os
+from datetime import datetime, timedelta, timezone
 from typing import Any
 import unittest
 from unittest.mock import patch, Mock
@@ -7,6 +8,7 @@ import docker.errors
 from pydantic import ValidationError
 
 from engine.utils.plugin import (
+    PluginRegistry,
     PluginSettings,
     Runner,
     get_plugin_settings,
@@ -14,7 +16,10 @@ from engine.utils.plugin import (
     process_event_info,
     temporary_volume,
     get_truncated_hash,
+    get_truncated_hashes,
+    _get_secret_raw,
 )
+from utils.secrets import SecretCache
 from utils.services import _get_services_from_file
 
 TEST_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -162,6 +167,73 @@ class TestEngineUtils(unittest.TestCase):
             get_plugin_settings("invalid")
         self.assertEqual(ex.exception.error_count(), 4)
 
+    @patch("engine.utils.plugin.ENGINE_DIR", PLUGIN_TEST_BASE_DIR)
+    def test_plugin_registry_settings(self):
+        """
+        Tests that the plugin registry loads the settings once and still raises errors for invalid plugins.
+        """
+        registry = PluginRegistry()
+        with patch("engine.utils.plugin.get_plugin_settings", wraps=get_plugin_settings) as mock_get_plugin_settings:
+            registry.load()
+            load_count = mock_get_plugin_settings.call_count
+
+            self.assertEqual(registry.get_settings("normal").name, "Test Plugin")
+            self.assertEqual(registry.get_settings("minimal").name, "Test Minimal Plugin")
+            self.assertEqual(mock_get_plugin_settings.call_count, load_count)
+
+            with self.assertRaises(ValidationError):
+                registry.get_settings("invalid")
+            with self.assertRaises(FileNotFoundError):
+                registry.get_settings("nonexistent")
+
+    @patch("engine.utils.plugin.ECR", "123456789012.dkr.ecr.us-east-2.amazonaws.com")
+    @patch("engine.utils.plugin.subprocess.run")
+    @patch("engine.utils.plugin.boto3.client")
+    def test_plugin_registry_ecr_login(self, mock_client, mock_run):
+        """
+        Tests that the ECR login is reused until it is about to expire.
+        """
+        mock_client.return_value.get_authorization_token.return_value = {
+            "authorizationData": [
+                {
+                    "authorizationToken": "QVdTOnBhc3N3b3Jk",  # AWS:password
+                    "expiresAt": datetime.now(timezone.utc) + timedelta(hours=12),
+                    "proxyEndpoint": "https://123456789012.dkr.ecr.us-east-2.amazonaws.com",
+                }
+            ]
+        }
+        mock_run.return_value.returncode = 0
+
+        registry = PluginRegistry()
+        self.assertIsNone(registry.ecr_login())
+        self.assertIsNone(registry.ecr_login())
+        self.assertEqual(mock_client.return_value.get_authorization_token.call_count, 1)
+        self.assertEqual(mock_run.call_args.kwargs["input"], b"password")
+
+        # Forcing a login ignores the expiration
+        self.assertIsNone(registry.ecr_login(force=True))
+        self.assertEqual(mock_client.return_value.get_authorization_token.call_count, 2)
+
+    @patch("engine.utils.plugin.execute_docker_pull")
+    def test_plugin_registry_pull_image(self, mock_pull):
+        """
+        Tests that an image is only pulled if it is out of date and has not been checked recently.
+        """
+        mock_pull.return_value = True
+        registry = PluginRegistry()
+        with (
+            patch.object(registry, "ecr_login", return_value=None),
+            patch.object(registry, "_is_latest", side_effect=[False, True]),
+        ):
+            self.assertIsNone(registry.pull_image("test/image:latest"))
+            self.assertIsNone(registry.pull_image("test/image:latest"))
+            self.assertEqual(mock_pull.call_count, 1)
+
+            # Once the image is due to be checked again it is not pulled because it is already the latest
+            with patch("engine.utils.plugin.PLUGIN_IMAGE_REFRESH_INTERVAL", 0):
+                self.assertIsNone(registry.pull_image("test/image:latest"))
+            self.assertEqual(mock_pull.call_count, 1)
+
     def test_temporary_volume_normal(self):
         """
         Tests a temporary volume is created and automatically cleaned up.
@@ -188,13 +260,13 @@ class TestEngineUtils(unittest.TestCase):
     @patch("engine.utils.plugin.queue_event")
     @patch("engine.utils.plugin.SECRETS_EVENTS_ENABLED", True)
     @patch("engine.utils.plugin.PROCESS_SECRETS_WITH_PATH_EXCLUSIONS", True)
-    @patch("engine.utils.plugin.get_truncated_hash")
+    @patch("engine.utils.plugin.get_truncated_hashes")
     def test_process_event_info_secret_hash(self, mock_hash, mock_queue_event):
         """
         Test that process_event_info generates a secret_hash when secret details exist,
         and does not include secret_hash when no secret details are available.
         """
-        mock_hash.return_value = "abcd1234567890abcd1234"
+        mock_hash.return_value = ["abcd1234567890abcd1234"]
 
         mock_scan = Mock()
         mock_scan.repo.repo = "test-org/test-repo"
@@ -221,7 +293,7 @@ class TestEngineUtils(unittest.TestCase):
         }
 
         process_event_info(mock_scan, results, "secrets", "test-plugin", False)
-        mock_hash.assert_called_once_with("sk-1234567890abcdef")
+        mock_hash.assert_called_once_with(["sk-1234567890abcdef"])
 
         # Verify that queue_event was called
         self.assertTrue(mock_queue_event.called)
@@ -240,7 +312,7 @@ class TestEngineUtils(unittest.TestCase):
         results["event_info"]["secret-1"]["match"] = [""]
 
         process_event_info(mock_scan, results, "secrets", "test-plugin", False)
-        mock_hash.assert_called_once_with("")
+        mock_hash.assert_called_once_with([""])
 
         # Verify that the payload does NOT include secret_hash
         call_args = mock_queue_event.call_args[0]
@@ -257,6 +329,9 @@ class TestEngineUtils(unittest.TestCase):
             "11f450d9c976c012eeaac9eb8047ef5ad1963c12f8b928c6392d1306b9cf5796"
         )
         mock_aws_connect.return_value = mock_aws_instance
+        patcher = patch("engine.utils.plugin.secrets_cache", SecretCache(_get_secret_raw))
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
         test_value = "test-secret-value"
         result = get_truncated_hash(test_value)
@@ -264,3 +339,31 @@ class TestEngineUtils(unittest.TestCase):
         # Verify the same input produces the same output
         result2 = get_truncated_hash(test_value)
         self.assertEqual(result, result2)
+
+        # Verify that the pepper is only retrieved once
+        mock_aws_instance.get_secret_raw.assert_called_once_with("artemis/pepper")
+
+        # Verify that hashing a batch is equivalent to hashing each value
+        self.assertEqual(
+            get_truncated_hashes(["a", test_value, ""]), [get_truncated_hash(v) for v in ["a", test_value, ""]]
+        )
+
+    @patch("utils.secrets.monotonic")
+    def test_secret_cache(self, mock_monotonic):
+        loader = Mock(side_effect=lambda name: None if name == "missing" else f"{name}-value")
+        cache = SecretCache(loader, ttl=60)
+
+        mock_monotonic.return_value = 100
+        self.assertEqual(cache.get("pepper"), "pepper-value")
+        self.assertEqual(cache.get("pepper"), "pepper-value")
+        self.assertEqual(loader.call_count, 1)
+
+        # Values that could not be retrieved are not cached
+        self.assertIsNone(cache.get("missing"))
+        self.assertIsNone(cache.get("missing"))
+        self.assertEqual(loader.call_count, 3)
+
+        # Expired values are retrieved again
+        mock_monotonic.return_value = 161
+        cache.get("pepper")
+        self.assertEqual(loader.call_count, 4)
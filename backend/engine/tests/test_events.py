@@ -0,0 +1,83 @@
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+import boto3
+from moto import mock_aws
+
+from utils.events import MAX_BATCH_BYTES, EventPublisher
+
+REGION = "us-east-1"
+TEST_REPO = "testorg/testrepo"
+
+
+@mock_aws
+class TestEventPublisher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sqs = boto3.client("sqs", region_name=REGION)
+        self.queue_url = self.sqs.create_queue(QueueName="test-event-queue")["QueueUrl"]
+        self.publisher = EventPublisher(queue_url=self.queue_url, client=self.sqs)
+
+    def _receive_all(self) -> list:
+        messages = []
+        while True:
+            resp = self.sqs.receive_message(QueueUrl=self.queue_url, MaxNumberOfMessages=10)
+            if not resp.get("Messages"):
+                return messages
+            for msg in resp["Messages"]:
+                messages.append(json.loads(msg["Body"]))
+                self.sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=msg["ReceiptHandle"])
+
+    def test_publish_batches(self):
+        with patch.object(self.sqs, "send_message_batch", wraps=self.sqs.send_message_batch) as send_message_batch:
+            for i in range(25):
+                self.publisher.publish(TEST_REPO, "vulnerability", {"id": i})
+
+            # Only the full batches have been sent so far
+            self.assertEqual(send_message_batch.call_count, 2)
+
+            self.publisher.flush()
+            self.assertEqual(send_message_batch.call_count, 3)
+
+        self.assertEqual(sorted(msg["id"] for msg in self._receive_all()), list(range(25)))
+
+    def test_publish_size_aware(self):
+        # Each payload is a bit over a third of the batch limit so at most two fit in a batch
+        padding = "x" * (MAX_BATCH_BYTES // 3)
+        with patch.object(self.sqs, "send_message_batch", wraps=self.sqs.send_message_batch) as send_message_batch:
+            for i in range(5):
+                self.publisher.publish(TEST_REPO, "secret", {"id": i, "padding": padding})
+            self.publisher.flush()
+
+            self.assertEqual([len(c.kwargs["Entries"]) for c in send_message_batch.call_args_list], [2, 2, 1])
+
+        self.assertEqual(len(self._receive_all()), 5)
+
+    def test_publish_too_large(self):
+        self.publisher.publish(TEST_REPO, "secret", {"padding": "x" * MAX_BATCH_BYTES})
+        self.publisher.flush()
+
+        self.assertEqual(self._receive_all(), [])
+
+    @patch("utils.events.sleep")
+    def test_retry_partial_failure(self, _):
+        client = MagicMock()
+        client.send_message_batch.side_effect = [
+            {
+                "Successful": [{"Id": "0"}],
+                "Failed": [
+                    {"Id": "1", "SenderFault": False, "Code": "InternalError"},
+                    {"Id": "2", "SenderFault": True, "Code": "InvalidMessageContents"},
+                ],
+            },
+            {"Successful": [{"Id": "1"}], "Failed": []},
+        ]
+        publisher = EventPublisher(queue_url=self.queue_url, client=client)
+        for i in range(3):
+            publisher.publish(TEST_REPO, "configuration", {"id": i})
+        publisher.flush()
+
+        # Only the entry that failed due to a service error is retried
+        self.assertEqual(client.send_message_batch.call_count, 2)
+        retried = client.send_message_batch.call_args_list[1].kwargs["Entries"]
+        self.assertEqual([json.loads(entry["MessageBody"]) for entry in retried], [{"id": 1}])
@@ -0,0 +1,96 @@
+import os
+import subprocess
+import time
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from utils import git
+from utils.git_mirror import SEED_REF_PREFIX, GitMirrorCache
+
+TEST_KEY = "github/testorg/testrepo"
+
+
+def _git(args: list, cwd: str) -> str:
+    return subprocess.run(["git"] + args, cwd=cwd, stdout=subprocess.PIPE, check=True).stdout.decode("utf-8").strip()
+
+
+class TestGitMirrorCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = TemporaryDirectory()
+        self.origin = os.path.join(self.tmp.name, "origin")
+        os.makedirs(self.origin)
+        _git(["init", "--quiet", "--initial-branch=main"], self.origin)
+        _git(["config", "user.email", "test@example.com"], self.origin)
+        _git(["config", "user.name", "test"], self.origin)
+        self._commit("README.md", "first")
+
+        self.cache = GitMirrorCache(os.path.join(self.tmp.name, "mirrors"))
+        patcher = patch.object(git, "git_mirror_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _commit(self, filename: str, content: str) -> str:
+        with open(os.path.join(self.origin, filename), "w") as f:
+            f.write(content)
+        _git(["add", filename], self.origin)
+        _git(["commit", "--quiet", "-m", content], self.origin)
+        return _git(["rev-parse", "HEAD"], self.origin)
+
+    def _pull(self, name: str, branch: str = "main") -> str:
+        working_dir = os.path.join(self.tmp.name, name)
+        self.assertTrue(
+            git.git_pull(
+                "", f"file://{self.origin}", working_dir, branch=branch, include=[], exclude=[], mirror_key=TEST_KEY
+            )
+        )
+        return os.path.join(working_dir, "base")
+
+    def test_pull(self):
+        base = self._pull("scan1")
+        mirror = os.path.join(self.cache.cache_dir, f"{TEST_KEY}.git")
+        self.assertTrue(os.path.isdir(mirror))
+        self.assertEqual(_git(["rev-parse", "HEAD"], base), _git(["rev-parse", "HEAD"], self.origin))
+
+        head = self._commit("new.txt", "second")
+        base = self._pull("scan2")
+
+        # The existing objects were linked in from the mirror instead of being pulled again
+        objects = [
+            os.path.join(root, name)
+            for root, _, files in os.walk(os.path.join(base, ".git", "objects"))
+            for name in files
+        ]
+        self.assertTrue(any(os.stat(path).st_nlink > 1 for path in objects))
+        self.assertEqual(_git(["rev-parse", "HEAD"], base), head)
+        self.assertTrue(os.path.isfile(os.path.join(base, "new.txt")))
+        # The mirror was updated with the new commit
+        self.assertIn(head, _git(["for-each-ref", "--format=%(objectname)"], mirror))
+        # The refs used to seed the repo are removed once it has been pulled
+        self.assertEqual(_git(["for-each-ref", SEED_REF_PREFIX], base), "")
+        # The repo does not depend on the mirror
+        self.assertFalse(os.path.exists(os.path.join(base, ".git", "objects", "info", "alternates")))
+        self.assertEqual(_git(["fsck", "--connectivity-only"], base), "")
+
+    def test_pull_no_mirror(self):
+        self.cache.cache_dir = None
+        self._pull("scan1")
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "mirrors")))
+
+    def test_evict(self):
+        self._pull("scan1")
+        for n, key in enumerate(["github/testorg/old", "github/testorg/new"]):
+            mirror = self.cache._mirror_path(key)
+            self.assertTrue(self.cache.update(key, os.path.join(self.tmp.name, "scan1", "base"), None))
+            os.utime(mirror, (time.time() + n, time.time() + n))
+
+        # Each mirror that is removed frees up enough space
+        space = iter([0, 0, 100])
+        with patch("utils.git_mirror.get_available_space", side_effect=lambda: next(space)):
+            self.cache.evict(50)
+
+        remaining = sorted(str(path.relative_to(self.cache.cache_dir)) for path in self.cache._mirrors())
+        self.assertEqual(remaining, ["github/testorg/new.git"])
@@ -0,0 +1,93 @@
+import os
+import subprocess
+import unittest
+from collections import namedtuple
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from engine.plugins.lib.secrets_common import blame
+from engine.plugins.lib.secrets_common.blame import BLAME_RESULT, UNKNOWN_BLAME, GitBlame
+
+TEST_GIT_BLAME_BYTES = (
+    b"35702d1527511111a920def45bfbf3f694b7210d 1185 1185 1\nauthor Walter Scott\nauthor-mail "
+    b"<wascott@example.com>\nauthor-time 1499200109\nauthor-tz -0400\ncommitter Walter "
+    b"Scott\ncommitter-mail <wascott@example.com>\ncommitter-time 1499200109\ncommitter-tz "
+    b"-0400\nsummary initial addition of docker container for phpcalendar\nboundary\nfilename "
+    b"app/test/docs/docs.htm\n\tstyle='mso-bookmark:pdo'><span "
+    b"style='mso-tab-count:1'>\xa0\xa0\xa0\xa0\xa0\xa0\xa0\xa0 </span>$dsn = "
+    b"'postgres://localhost/mydb?persist';<span style='mso-spacerun:yes'>\xa0 </span># "
+    b"persist is optional</span></pre><pre\n"
+    b"35702d1527511111a920def45bfbf3f694b7210d 1190 1190 1\n\tauthor Not The Author\n"
+)
+
+SUBPROCESS_RESPONSE = namedtuple("subprocess_response", ["returncode", "stdout", "stderr"])
+
+
+def _git(args: list, cwd: str) -> str:
+    return subprocess.run(["git"] + args, cwd=cwd, stdout=subprocess.PIPE, check=True).stdout.decode("utf-8").strip()
+
+
+class TestGitBlame(unittest.TestCase):
+    @patch.object(blame, "execute_git_blame")
+    def test_blame_file(self, mock_blame):
+        mock_blame.return_value = SUBPROCESS_RESPONSE(0, TEST_GIT_BLAME_BYTES, None)
+
+        result = GitBlame("does it matter?").blame_file("app/test/docs/docs.htm", [1190, 1185])
+
+        mock_blame.assert_called_once_with("app/test/docs/docs.htm", [(1185, 1185), (1190, 1190)], "does it matter?")
+        expected = BLAME_RESULT(
+            "Walter Scott <wascott@example.com>",
+            "35702d1527511111a920def45bfbf3f694b7210d",
+            "2017-07-04T20:28:29.000000+00:00",
+        )
+        # The second line is from the same commit, so its author comes from the first, not from the line content
+        self.assertEqual(result, {1185: expected, 1190: expected})
+
+    @patch.object(blame, "execute_git_blame")
+    def test_blame_file_failure(self, mock_blame):
+        mock_blame.return_value = SUBPROCESS_RESPONSE(128, b"", b"fatal: file has only 10 lines")
+
+        result = GitBlame("path").blame([("file", 11), ("file", 12), ("file", 20)])
+
+        # The lines are blamed individually after blaming them together fails
+        self.assertEqual(mock_blame.call_count, 4)
+        self.assertEqual(
+            result, {("file", 11): UNKNOWN_BLAME, ("file", 12): UNKNOWN_BLAME, ("file", 20): UNKNOWN_BLAME}
+        )
+
+    def test_ranges(self):
+        self.assertEqual(blame._ranges([1, 2, 3, 5, 7, 8]), [(1, 3), (5, 5), (7, 8)])
+        self.assertEqual(blame._ranges([]), [])
+
+    def test_blame_repo(self):
+        with TemporaryDirectory() as repo:
+            _git(["init", "--quiet"], repo)
+            _git(["config", "user.email", "test@example.com"], repo)
+            _git(["config", "user.name", "test"], repo)
+            for i, content in enumerate(["a\nb\nc\n", "a\nB\nc\nd\n"]):
+                with open(os.path.join(repo, "file.txt"), "w") as f:
+                    f.write(content)
+                with open(os.path.join(repo, f"other{i}.txt"), "w") as f:
+                    f.write("x\n")
+                _git(["add", "."], repo)
+                _git(["commit", "--quiet", "-m", content], repo)
+            first, second = _git(["rev-list", "--reverse", "HEAD"], repo).split()
+
+            with patch.object(blame, "execute_git_blame", wraps=blame.execute_git_blame) as mock_blame:
+                result = GitBlame(repo).blame(
+                    [("file.txt", 1), ("file.txt", 2), ("file.txt", 4), ("other0.txt", 1), ("missing.txt", 1)]
+                )
+
+            # One 'git blame' per file
+            self.assertEqual(mock_blame.call_count, 3)
+            self.assertEqual(
+                {location: result.commit for location, result in result.items()},
+                {
+                    ("file.txt", 1): first,
+                    ("file.txt", 2): second,
+                    ("file.txt", 4): second,
+                    ("other0.txt", 1): first,
+                    ("missing.txt", 1): "HEAD",
+                },
+            )
+            self.assertEqual(result[("file.txt", 1)].name, "test <test@example.com>")
@@ -2,11 +2,13 @@ import json
 import os.path
 import secrets
 import unittest
+from unittest.mock import patch
 
 import pytest
 
 from oci import builder, remover
 from engine.plugins.trivy import main as Trivy
+from engine.plugins.lib.trivy_common.cli import trivy_command
 from engine.plugins.lib.utils import convert_string_to_json
 from engine.plugins.lib.utils import setup_logging
 
@@ -107,6 +109,31 @@ class TestPluginTrivy(unittest.TestCase):
         result = Trivy.parse_output([TEST_IMAGE_VULN_DICT])
         self.assertEqual(TEST_IMAGE_VULN_RESULT, result)
 
+    def test_trivy_command(self):
+        with patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(trivy_command("image", "test:latest"), ["trivy", "image", "test:latest"])
+
+        env = {"ARTEMIS_TRIVY_CACHE_DIR": "/trivy/db-1", "ARTEMIS_TRIVY_SERVER": "http://localhost:4954"}
+        with patch.dict(os.environ, env, clear=True):
+            self.assertEqual(
+                trivy_command("fs", "/work/base", "--format", "json"),
+                [
+                    "trivy",
+                    "fs",
+                    "/work/base",
+                    "--format",
+                    "json",
+                    "--cache-dir",
+                    "/trivy/db-1",
+                    "--skip-db-update",
+                    "--skip-java-db-update",
+                    "--cache-backend",
+                    "memory",
+                    "--server",
+                    "http://localhost:4954",
+                ],
+            )
+
 
 @pytest.mark.integtest
 class TestPluginTrivyIntegration(unittest.TestCase):
@@ -192,6 +192,13 @@ EXAMPLE_VENDOR_FINDING = {
 }
 
 
+def _mock_proc(stdout: bytes) -> MagicMock:
+    proc = MagicMock()
+    proc.__enter__.return_value = proc
+    proc.stdout = io.BytesIO(stdout)
+    return proc
+
+
 class TestPluginTrufflehog(unittest.TestCase):
     @patch("engine.plugins.trufflehog.main.run_security_checker")
     @patch("engine.plugins.trufflehog.main.scrub_results")
@@ -215,11 +222,9 @@ class TestPluginTrufflehog(unittest.TestCase):
             "debug": [],
         }
 
-        mock_output = MagicMock()
-        mock_output.stdout = test
-        subproc.run.return_value = mock_output
+        subproc.Popen.return_value = _mock_proc(test)
 
-        actual = trufflehog.run_security_checker(utils.CODE_DIRECTORY, errors_dict, verified=True)
+        actual = list(trufflehog.run_security_checker(utils.CODE_DIRECTORY, errors_dict, verified=True))
         expected = [EXAMPLE_UNKNOWN_FINDING]
 
         self.assertEqual(actual, expected)
@@ -233,16 +238,14 @@ class TestPluginTrufflehog(unittest.TestCase):
             "debug": [],
         }
 
-        mock_output = MagicMock()
-        mock_output.stdout = dummy_output
-        subproc.run.return_value = mock_output
+        subproc.Popen.return_value = _mock_proc(dummy_output)
 
         expected_param = "--include-detectors"
         expected_detectors = ",".join(verified_detectors_allowlist)
 
-        trufflehog.run_security_checker(utils.CODE_DIRECTORY, errors_dict, verified=True)
+        list(trufflehog.run_security_checker(utils.CODE_DIRECTORY, errors_dict, verified=True))
 
-        subproc_args = subproc.run.call_args.args
+        subproc_args = subproc.Popen.call_args.args
         cmd = subproc_args[0]
 
         self.assertIn(expected_param, cmd)
@@ -257,23 +260,53 @@ class TestPluginTrufflehog(unittest.TestCase):
             "debug": [],
         }
 
-        mock_output = MagicMock()
-        mock_output.stdout = dummy_output
-        subproc.run.return_value = mock_output
+        subproc.Popen.return_value = _mock_proc(dummy_output)
 
         expected_param_1 = "--no-verification"
         expected_param_2 = "--exclude-detectors"
         expected_detectors = ",".join(verified_detectors_allowlist)
 
-        trufflehog.run_security_checker(utils.CODE_DIRECTORY, errors_dict, verified=False)
+        list(trufflehog.run_security_checker(utils.CODE_DIRECTORY, errors_dict, verified=False))
 
-        subproc_args = subproc.run.call_args.args
+        subproc_args = subproc.Popen.call_args.args
         cmd = subproc_args[0]
 
         self.assertIn(expected_param_1, cmd)
         self.assertIn(expected_param_2, cmd)
         self.assertIn(expected_detectors, cmd)
 
+    @patch("engine.plugins.trufflehog.main.run_security_checker")
+    def test_run_security_checkers(self, mock_security_checker):
+        errors_dict = {
+            "errors": [],
+            "alerts": [],
+            "debug": [],
+        }
+        mock_security_checker.side_effect = lambda *args, verified, **kwargs: iter(
+            [EXAMPLE_ACTIVE_FINDING] if verified else [EXAMPLE_UNKNOWN_FINDING, EXAMPLE_INACTIVE_FINDING]
+        )
+
+        actual = list(trufflehog.run_security_checkers(utils.CODE_DIRECTORY, errors_dict, depth=10))
+
+        # Both passes are run and all of their findings are returned, in whatever order they are found
+        self.assertCountEqual(actual, [EXAMPLE_ACTIVE_FINDING, EXAMPLE_UNKNOWN_FINDING, EXAMPLE_INACTIVE_FINDING])
+        self.assertCountEqual(
+            [call.kwargs for call in mock_security_checker.call_args_list],
+            [{"verified": True, "depth": 10}, {"verified": False, "depth": 10}],
+        )
+
+    @patch("engine.plugins.trufflehog.main.run_security_checker")
+    def test_run_security_checkers_error(self, mock_security_checker):
+        def security_checker(*args, verified, **kwargs):
+            yield EXAMPLE_ACTIVE_FINDING
+            if not verified:
+                raise json.JSONDecodeError("Expecting value", "", 0)
+
+        mock_security_checker.side_effect = security_checker
+
+        with self.assertRaises(json.JSONDecodeError):
+            list(trufflehog.run_security_checkers(utils.CODE_DIRECTORY, {}))
+
     @patch("engine.plugins.trufflehog.main.SystemAllowList._load_al")
     def test_run_scrub_results(self, mock_load_al):
         mock_load_al.return_value = []
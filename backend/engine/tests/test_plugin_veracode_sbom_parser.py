@@ -29,7 +29,7 @@ VERACODE_SBOM_RESULT = Result(
 
 
 @patch("engine.processor.sbom.write_sbom_json", autospec=True)
-@patch("engine.processor.sbom.process_dependency")
+@patch("engine.processor.sbom.process_dependencies")
 class TestPluginVeracodeSbomParser(unittest.TestCase):
     def test_sbom_parse(self, _, mock_write_sbom_json):
         with open(TEST_VERACODE_OUTPUT_PATH) as f:
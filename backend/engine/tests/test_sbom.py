@@ -0,0 +1,117 @@
+import time
+import unittest
+import uuid
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from artemisdb.artemisdb.models import Component, License, Repo, RepoComponentScan, Scan
+from processor.sbom import process_sbom
+from utils.plugin import Result
+
+BENCHMARK_NODES = 50000
+
+
+def _dep(name: str, version: str = "1.0.0", licenses: list = None, deps: list = None) -> dict:
+    return {
+        "name": name,
+        "version": version,
+        "licenses": [{"id": license_id, "name": license_id.upper()} for license_id in (licenses or [])],
+        "source": "package-lock.json",
+        "deps": deps or [],
+        "type": "npm",
+    }
+
+
+def _result(details: list) -> Result:
+    return Result(
+        name="test_sbom_plugin",
+        type="sbom",
+        success=True,
+        truncated=False,
+        details=details,
+        errors=[],
+        alerts=[],
+        debug=[],
+    )
+
+
+@pytest.mark.integtest
+@patch("processor.sbom.write_sbom_json")
+class TestProcessSbom(unittest.TestCase):
+    """
+    Test Class relies on the artemisdb docker container being up.
+    """
+
+    def setUp(self) -> None:
+        self.prefix = f"test-{uuid.uuid4().hex[:8]}"
+        self.repo = Repo.objects.create(service="testservice", repo=f"testorg/{self.prefix}")
+        self.scan = Scan.objects.create(repo=self.repo, scan_id=uuid.uuid4(), ref="main")
+
+    def tearDown(self) -> None:
+        self.repo.delete()
+        Component.objects.filter(name__startswith=self.prefix).delete()
+        License.objects.filter(license_id__startswith=self.prefix).delete()
+
+    def _name(self, name) -> str:
+        return f"{self.prefix}-{name}"
+
+    def _graph(self, count: int, children: int) -> list:
+        # Builds a graph of direct dependencies that each have their own children
+        return [
+            [
+                _dep(
+                    self._name(f"direct-{n}"),
+                    licenses=[self._name("mit"), self._name(f"lic-{n % 10}")],
+                    deps=[_dep(self._name(f"child-{n}-{c}"), licenses=[self._name("mit")]) for c in range(children)],
+                )
+                for n in range(count)
+            ]
+        ]
+
+    def test_process_sbom(self, mock_write_sbom_json):
+        mit, apache = self._name("mit"), self._name("apache")
+        existing = Component.objects.create(name=self._name("a"), version="1.0.0")
+        existing.licenses.add(License.objects.create(license_id=apache, name="Apache"))
+
+        graph = [
+            _dep(self._name("a"), licenses=[mit], deps=[_dep(self._name("b"), licenses=[mit, apache])]),
+            _dep(self._name("b"), licenses=[apache]),  # Duplicate component, last occurrence wins
+        ]
+        process_sbom(_result([graph]), self.scan)
+
+        mock_write_sbom_json.assert_called_once_with(self.scan.scan_id, graph)
+
+        a = Component.objects.get(name=self._name("a"), version="1.0.0")
+        self.assertEqual(a.pk, existing.pk)
+        self.assertEqual([license.license_id for license in a.licenses.all()], [mit])
+
+        b = Component.objects.get(name=self._name("b"), version="1.0.0")
+        self.assertEqual(b.component_type, "npm")
+        self.assertEqual([license.license_id for license in b.licenses.all()], [apache])
+
+        self.assertEqual(RepoComponentScan.objects.filter(repo=self.repo, scan=self.scan).count(), 2)
+
+    def test_process_sbom_query_count(self, _):
+        def run(count: int) -> int:
+            with CaptureQueriesContext(connection) as ctx:
+                process_sbom(_result(self._graph(count, 2)), self.scan)
+            return len(ctx.captured_queries)
+
+        # The number of queries does not depend on the number of components
+        self.assertEqual(run(2), run(20))
+
+    @pytest.mark.benchmark
+    def test_process_sbom_benchmark(self, _):
+        # Each direct dependency has three children so the graph has 50k nodes
+        graph = self._graph(BENCHMARK_NODES // 4, 3)
+
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.monotonic()
+            process_sbom(_result(graph), self.scan)
+            elapsed = time.monotonic() - start
+
+        print(f"Processed {BENCHMARK_NODES} SBOM nodes in {elapsed:.2f}s with {len(ctx.captured_queries)} queries")
+        self.assertEqual(RepoComponentScan.objects.filter(repo=self.repo, scan=self.scan).count(), BENCHMARK_NODES)
@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import boto3
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from utils.services import ServicesCache
+
+TEST_BUCKET = "test-services-bucket"
+TEST_KEY = "services.json"
+
+
+def _services(name: str) -> dict:
+    return {"services": {name: {"type": "github"}}}
+
+
+@patch("utils.services.REGION", "us-east-1")
+@patch("utils.services.S3_BUCKET", TEST_BUCKET)
+@mock_aws
+class TestServicesCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.s3 = boto3.client("s3", region_name="us-east-1")
+        self.s3.create_bucket(Bucket=TEST_BUCKET)
+        self.cache = ServicesCache(refresh_interval=60)
+
+    def _put(self, services: dict) -> None:
+        self.s3.put_object(Bucket=TEST_BUCKET, Key=TEST_KEY, Body=json.dumps(services))
+
+    @patch("utils.services.monotonic")
+    def test_s3(self, mock_monotonic):
+        mock_monotonic.return_value = 1000
+        self._put(_services("github"))
+        self.assertEqual(self.cache.get(TEST_KEY, True), _services("github"))
+
+        with patch.object(self.cache._s3, "get_object", wraps=self.cache._s3.get_object) as get_object:
+            # Within the refresh interval the cached copy is used without checking S3
+            self.assertEqual(self.cache.get(TEST_KEY, True), _services("github"))
+            get_object.assert_not_called()
+
+            # After the refresh interval the object is revalidated
+            mock_monotonic.return_value = 1061
+            self.assertEqual(self.cache.get(TEST_KEY, True), _services("github"))
+            self.assertIn("IfNoneMatch", get_object.call_args.kwargs)
+
+            # Changes are picked up at the next revalidation
+            self._put(_services("gitlab"))
+            self.assertEqual(self.cache.get(TEST_KEY, True), _services("github"))
+            mock_monotonic.return_value = 1122
+            self.assertEqual(self.cache.get(TEST_KEY, True), _services("gitlab"))
+
+    @patch("utils.services.monotonic")
+    def test_s3_fallback(self, mock_monotonic):
+        mock_monotonic.return_value = 1000
+        self._put(_services("github"))
+        self.cache.get(TEST_KEY, True)
+
+        mock_monotonic.return_value = 1061
+        error = ClientError({"Error": {"Code": "ServiceUnavailable"}}, "GetObject")
+        with patch.object(self.cache._s3, "get_object", side_effect=error):
+            # The last good copy is used if S3 is unavailable
+            self.assertEqual(self.cache.get(TEST_KEY, True), _services("github"))
+
+            # Errors are raised if there is no last good copy
+            cache = ServicesCache(refresh_interval=60)
+            cache._s3 = self.cache._s3
+            with self.assertRaises(ClientError):
+                cache.get(TEST_KEY, True)
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            services_file = os.path.join(tmpdir, "services.json")
+            with open(services_file, "w") as f:
+                json.dump(_services("github"), f)
+
+            cache = ServicesCache(refresh_interval=0)
+            self.assertEqual(cache.get(services_file, False), _services("github"))
+
+            # The returned copy can be modified without affecting the cache
+            cache.get(services_file, False)["services"].clear()
+            self.assertEqual(cache.get(services_file, False), _services("github"))
+
+            # The file is reloaded when its modification time changes
+            with open(services_file, "w") as f:
+                json.dump(_services("gitlab"), f)
+            os.utime(services_file, ns=(0, 0))
+            self.assertEqual(cache.get(services_file, False), _services("gitlab"))
+
+            # The last good copy is used if the file is removed
+            os.remove(services_file)
+            self.assertEqual(cache.get(services_file, False), _services("gitlab"))
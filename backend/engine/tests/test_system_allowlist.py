@@ -1,8 +1,32 @@
+import time
 import unittest
+from fnmatch import fnmatch
 from unittest.mock import patch
 
+import pytest
+
+from artemislib.logging import Logger
 from engine.plugins.lib.common.system.allowlist import SystemAllowList
 
+LOG = Logger(__name__)
+
+
+def _fnmatch_ignore_secret(items: list, filename: str, value: str) -> bool:
+    # Checks each item with fnmatch directly, which the compiled allowlist has to agree with
+    for item in items:
+        if (
+            ("filename" in item and "value" not in item and fnmatch(filename, item["filename"]))
+            or ("value" in item and "filename" not in item and fnmatch(value, item["value"]))
+            or (
+                "value" in item
+                and "filename" in item
+                and fnmatch(filename, item["filename"])
+                and fnmatch(value, item["value"])
+            )
+        ):
+            return True
+    return False
+
 
 class TestSystemAllowList(unittest.TestCase):
     @patch("engine.plugins.lib.common.system.allowlist.SystemAllowList._load_al")
@@ -34,3 +58,80 @@ class TestSystemAllowList(unittest.TestCase):
             with self.subTest(test_case=test_case):
                 actual = al.ignore_secret(test_case[0], test_case[1])
                 self.assertEqual(actual, test_case[2])
+
+    @patch("engine.plugins.lib.common.system.allowlist.SystemAllowList._load_al")
+    def test_ignore_secret_pairs(self, mock_al):
+        mock_al.return_value = [
+            {"filename": "*/fixtures/*", "value": "AKIA*"},
+            {"filename": "config.py", "value": "sk_live_*"},
+            {"filename": "*.md", "value": "password"},
+            {"filename": "docs/*", "value": "password"},
+        ]
+        al = SystemAllowList()
+        al._items = al._load_al("secret")
+
+        test_cases = [
+            ("src/fixtures/keys.json", "AKIA0000000000000000", True),
+            ("src/fixtures/keys.json", "ASIA0000000000000000", False),
+            ("src/keys.json", "AKIA0000000000000000", False),
+            ("config.py", "sk_live_0000", True),
+            ("app/config.py", "sk_live_0000", False),
+            ("README.md", "password", True),
+            ("docs/setup.txt", "password", True),
+            ("src/setup.txt", "password", False),
+            ("README.md", "password1", False),
+            # Edge cases with \0 in the filename or value, which must match the same way fnmatch does
+            ("src/fixtures/keys\0.json", "AKIA\0", True),
+            ("src/\0/keys.json", "AKIA\0", False),
+        ]
+        for test_case in test_cases:
+            with self.subTest(test_case=test_case):
+                actual = al.ignore_secret(test_case[0], test_case[1])
+                self.assertEqual(actual, _fnmatch_ignore_secret(mock_al.return_value, test_case[0], test_case[1]))
+                self.assertEqual(actual, test_case[2])
+
+    @pytest.mark.benchmark
+    @patch("engine.plugins.lib.common.system.allowlist.SystemAllowList._load_al")
+    def test_benchmark(self, mock_al):
+        rules = 1000
+        findings = 50000
+        # Coprime with the number of kinds of rules so that the sample includes all of them
+        step = 101
+
+        # A mix of filename, value, and filename and value rules, both exact and wildcard
+        items = []
+        for n in range(rules):
+            if n % 4 == 0:
+                items.append({"filename": f"*/vendor{n}/*"})
+            elif n % 4 == 1:
+                items.append({"value": f"AKIA{n:016d}"})
+            elif n % 4 == 2:
+                items.append({"value": f"*EXAMPLE{n}*"})
+            else:
+                items.append({"filename": f"*/test{n}.py", "value": f"sk_live_{n}*"})
+        mock_al.return_value = items
+        al = SystemAllowList()
+        al._items = al._load_al("secret")
+
+        # At least half of the findings match a rule, spread across the different kinds of rules
+        secrets = []
+        for n in range(findings):
+            k = n % (rules * 2)
+            secrets.append(
+                [
+                    (f"src/vendor{k}/lib.py", "password"),
+                    ("src/app.py", f"AKIA{k:016d}"),
+                    ("src/app.py", f"key = 'EXAMPLE{k}'"),
+                    (f"src/test{k}.py", f"sk_live_{k}"),
+                ][n % 4]
+            )
+
+        start = time.monotonic()
+        actual = [al.ignore_secret(filename, value) for filename, value in secrets]
+        elapsed = time.monotonic() - start
+        LOG.info("Checked %d findings against %d rules in %.3fs", findings, rules, elapsed)
+
+        # Checking every finding with fnmatch takes too long so only a sample is compared
+        expected = [_fnmatch_ignore_secret(items, filename, value) for filename, value in secrets[::step]]
+        self.assertEqual(actual[::step], expected)
+        self.assertGreaterEqual(sum(actual), findings // 2)
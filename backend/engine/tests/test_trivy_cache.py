@@ -0,0 +1,90 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from utils import trivy_cache
+from utils.trivy_cache import TrivyDBCache
+
+TEST_IMAGE = "artemis/dind:latest"
+
+
+def _download(image: str, cache_dir: str, args: list[str]) -> bool:
+    with open(os.path.join(cache_dir, args[0].strip("-")), "w") as f:
+        f.write(image)
+    return True
+
+
+class TestTrivyDBCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache_dir = os.path.join(self.tmp.name, "trivy")
+
+    def _versions(self) -> list[str]:
+        return sorted(name for name in os.listdir(self.cache_dir) if name.startswith(trivy_cache.VERSION_PREFIX))
+
+    @patch.object(trivy_cache, "execute_trivy_download", side_effect=_download)
+    def test_refresh(self, mock_download):
+        cache = TrivyDBCache(self.cache_dir, 3600)
+        self.assertIsNone(cache.current())
+        self.assertEqual(cache.plugin_args(), [])
+
+        self.assertTrue(cache.refresh(TEST_IMAGE))
+        self.assertEqual(mock_download.call_count, 2)
+        current = cache.current()
+        self.assertEqual(
+            sorted(os.listdir(current)), ["download-db-only", "download-java-db-only"], "Both DBs are downloaded"
+        )
+        self.assertEqual(cache.plugin_args(), ["-e", f"ARTEMIS_TRIVY_CACHE_DIR={current}"])
+
+        # Downloaded within the refresh interval, possibly by another engine
+        self.assertFalse(cache.refresh(TEST_IMAGE))
+        self.assertEqual(mock_download.call_count, 2)
+
+    @patch.object(trivy_cache, "execute_trivy_download", side_effect=_download)
+    def test_refresh_prune(self, _):
+        cache = TrivyDBCache(self.cache_dir, 0)
+        for _ in range(3):
+            self.assertTrue(cache.refresh(TEST_IMAGE))
+            previous = cache.current()
+
+        # Only the current version and the one before it, which running plugins may still be using, are kept
+        self.assertTrue(cache.refresh(TEST_IMAGE))
+        self.assertEqual(self._versions(), sorted([os.path.basename(previous), os.path.basename(cache.current())]))
+
+    @patch.object(trivy_cache, "execute_trivy_download", return_value=False)
+    def test_refresh_failure(self, _):
+        cache = TrivyDBCache(self.cache_dir, 3600)
+        self.assertFalse(cache.refresh(TEST_IMAGE))
+        self.assertIsNone(cache.current())
+        self.assertEqual(self._versions(), [])
+
+    @patch.object(trivy_cache, "execute_trivy_download", side_effect=_download)
+    def test_refresh_locked(self, mock_download):
+        cache = TrivyDBCache(self.cache_dir, 3600)
+        with cache._lock():
+            # Another engine is already downloading the DBs
+            self.assertFalse(TrivyDBCache(self.cache_dir, 3600).refresh(TEST_IMAGE))
+        mock_download.assert_not_called()
+
+    @patch.object(trivy_cache, "REFRESH_RETRY_INTERVAL", 0)
+    @patch.object(trivy_cache, "execute_trivy_download", side_effect=_download)
+    def test_start_refresh(self, mock_download):
+        TrivyDBCache(None, 3600).start_refresh(TEST_IMAGE)
+        mock_download.assert_not_called()
+
+        cache = TrivyDBCache(self.cache_dir, 3600)
+        cache.start_refresh(TEST_IMAGE)
+        cache._refresh_thread.join()
+        self.assertIsNotNone(cache.current())
+
+        # Not started again until the DBs are out of date
+        thread = cache._refresh_thread
+        cache.start_refresh(TEST_IMAGE)
+        self.assertIs(cache._refresh_thread, thread)
+        self.assertEqual(mock_download.call_count, 2)
+
+    def test_plugin_args_server(self):
+        cache = TrivyDBCache(None, 3600, "http://localhost:4954")
+        self.assertEqual(cache.plugin_args(), ["-e", "ARTEMIS_TRIVY_SERVER=http://localhost:4954"])
@@ -0,0 +1,228 @@
+import time
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from artemisdb.artemisdb.consts import AllowListType
+from artemisdb.artemisdb.models import AllowListItem, Plugin, Repo, RepoVulnerabilityScan, Scan, Vulnerability
+from processor.processor import EngineProcessor
+from processor.vulns import VulnAllowList, process_vulns, resolve_vulns
+from utils.plugin import Result
+
+TEST_PLUGIN = "test_vulns_plugin"
+
+
+def _finding(advisory_ids: list, description="", severity="medium", component=None) -> dict:
+    finding = {
+        "id": advisory_ids[0],
+        "description": description,
+        "remediation": "",
+        "severity": severity,
+        "source": "package-lock.json",
+        "inventory": {"advisory_ids": advisory_ids},
+    }
+    if component:
+        finding["inventory"]["component"] = {"name": component[0], "version": component[1], "type": "npm"}
+    return finding
+
+
+def _al_item(advisory_id: str, component: str = None, source: str = None) -> SimpleNamespace:
+    value = {"id": advisory_id}
+    if component is not None:
+        value.update({"component": component, "source": source})
+    return SimpleNamespace(value=value)
+
+
+class _Related(list):
+    def all(self):
+        return self
+
+
+def _vuln_instance(advisory_ids: list, component: tuple, sources: list) -> SimpleNamespace:
+    # Stand-in for a RepoVulnerabilityScan with its scan plugin records and components prefetched
+    vsp = SimpleNamespace(
+        components=_Related([SimpleNamespace(name=component[0], version=component[1])]),
+        source=[{"source": sources, "filename": None, "line": None}],
+    )
+    return SimpleNamespace(
+        vulnerability=SimpleNamespace(advisory_ids=advisory_ids), vulnerabilityscanplugin_set=_Related([vsp])
+    )
+
+
+def _result(details: list) -> Result:
+    return Result(
+        name=TEST_PLUGIN,
+        type="vulnerability",
+        success=False,
+        truncated=False,
+        details=details,
+        errors=[],
+        alerts=[],
+        debug=[],
+    )
+
+
+@pytest.mark.integtest
+class TestProcessVulns(unittest.TestCase):
+    """
+    Test Class relies on the artemisdb docker container being up.
+    """
+
+    def setUp(self) -> None:
+        self.prefix = f"TEST-{uuid.uuid4().hex[:8]}"
+        self.repo = Repo.objects.create(service="testservice", repo=f"testorg/{self.prefix}")
+        self.scan = Scan.objects.create(repo=self.repo, scan_id=uuid.uuid4(), ref="main")
+        self.plugin, _ = Plugin.objects.get_or_create(name=TEST_PLUGIN)
+
+    def tearDown(self) -> None:
+        Vulnerability.objects.filter(advisory_ids__has_any_keys=self._ids(range(25))).delete()
+        self.repo.delete()
+
+    def _ids(self, nums) -> list:
+        return [f"CVE-{self.prefix}-{n}" for n in nums]
+
+    def test_process_vulns_merges(self):
+        a, b, c = self._ids(range(3))
+        existing = Vulnerability.objects.create(vuln_id=uuid.uuid4(), advisory_ids=[a], severity="low")
+
+        process_vulns(
+            _result(
+                [
+                    _finding([a], "longer description", "low", ("lodash", "1.0.0")),
+                    _finding([b], severity="high"),
+                    _finding([b, a], severity="medium"),  # Bridges the existing vuln with the new one
+                    _finding([c], component=("react", "2.0.0")),
+                ]
+            ),
+            self.scan,
+            TEST_PLUGIN,
+        )
+
+        existing.refresh_from_db()
+        self.assertEqual(sorted(existing.advisory_ids), [a, b])
+        self.assertEqual(existing.description, "longer description")
+        self.assertEqual(existing.severity, "high")
+        self.assertEqual([p.name for p in existing.plugins.all()], [TEST_PLUGIN])
+        self.assertEqual([str(c) for c in existing.components.all()], ["lodash@1.0.0"])
+        self.assertEqual(Vulnerability.objects.filter(advisory_ids__has_any_keys=[a, b]).count(), 1)
+
+        instances = RepoVulnerabilityScan.objects.filter(repo=self.repo, ref="main")
+        self.assertEqual(instances.count(), 2)
+        vuln_scan = instances.get(vulnerability=existing).vulnerabilityscanplugin_set.get(scan=self.scan)
+        self.assertEqual(len(vuln_scan.source), 3)
+        self.assertEqual([p.name for p in vuln_scan.plugins.all()], [TEST_PLUGIN])
+
+    def test_process_vulns_default_branch(self):
+        # Default branch scans have no ref, which the unique constraint on the vuln instances doesn't cover
+        details = [_finding([cve]) for cve in self._ids(range(3))]
+        for _ in range(2):
+            scan = Scan.objects.create(repo=self.repo, scan_id=uuid.uuid4(), ref=None)
+            process_vulns(_result(details), scan, TEST_PLUGIN)
+
+        instances = RepoVulnerabilityScan.objects.filter(repo=self.repo, ref__isnull=True)
+        self.assertEqual(instances.count(), 3)
+        for instance in instances:
+            self.assertEqual(instance.vulnerabilityscanplugin_set.count(), 2)
+
+    def test_process_vulns_query_count(self):
+        def run(start: int, count: int) -> int:
+            details = [_finding([cve], component=(cve, "1.0.0")) for cve in self._ids(range(start, start + count))]
+            with CaptureQueriesContext(connection) as ctx:
+                process_vulns(_result(details), self.scan, TEST_PLUGIN)
+            return len(ctx.captured_queries)
+
+        # The number of queries does not depend on the number of findings
+        self.assertEqual(run(0, 2), run(2, 20))
+
+    def test_resolve_vulns(self):
+        a, b = self._ids(range(2))
+        process_vulns(_result([_finding([a]), _finding([b])]), self.scan, TEST_PLUGIN)
+
+        # Rescan that only finds one of the vulns
+        scan = Scan.objects.create(repo=self.repo, scan_id=uuid.uuid4(), ref="main", plugins=[TEST_PLUGIN])
+        process_vulns(_result([_finding([a])]), scan, TEST_PLUGIN)
+        resolve_vulns(scan, [])
+
+        instances = RepoVulnerabilityScan.objects.filter(repo=self.repo, ref="main")
+        self.assertFalse(instances.get(vulnerability__advisory_ids__contains=[a]).resolved)
+        self.assertEqual(instances.get(vulnerability__advisory_ids__contains=[b]).resolved_by, scan)
+
+    def test_process_vuln_events_query_count(self):
+        processor = SimpleNamespace(
+            scan=SimpleNamespace(get_scan_object=lambda: self.scan), details=SimpleNamespace(isArchived=False)
+        )
+
+        def run(start: int, count: int) -> tuple:
+            ids = self._ids(range(start, start + count))
+            process_vulns(_result([_finding([cve], component=(cve, "1.0.0")) for cve in ids]), self.scan, TEST_PLUGIN)
+            # Allowlist the first vuln of each batch
+            AllowListItem.objects.create(
+                item_id=uuid.uuid4(),
+                repo=self.repo,
+                item_type=AllowListType.VULN.value,
+                value={"id": ids[0], "component": f"{ids[0]}-1.0.0", "source": "package-lock.json"},
+                reason="test",
+            )
+            with patch("processor.processor.process_event_info") as process_event_info:
+                with CaptureQueriesContext(connection) as ctx:
+                    EngineProcessor._process_vuln_events(processor)
+            return len(ctx.captured_queries), process_event_info.call_args.args[1]
+
+        small, _ = run(0, 2)
+        large, results = run(2, 20)
+
+        # The number of queries does not depend on the number of vulns
+        self.assertEqual(small, large)
+
+        # Only the two allowlisted vulns are excluded
+        self.assertEqual(len(results["details"]), 20)
+        self.assertEqual(
+            results["event_info"][results["details"][0]["id"]]["vulnerability"]["sources"], ["package-lock.json"]
+        )
+
+
+class TestVulnAllowList(unittest.TestCase):
+    def test_match(self):
+        allow_list = VulnAllowList(
+            [_al_item("CVE-1", "lodash-1.0.0", "package-lock.json"), _al_item("CVE-2", "react-2.0.0", "yarn.lock")],
+            [_al_item("CVE-3")],
+        )
+
+        self.assertTrue(allow_list.match(_vuln_instance(["CVE-1"], ("lodash", "1.0.0"), ["package-lock.json"])))
+        self.assertTrue(allow_list.match(_vuln_instance(["GHSA-1", "CVE-3"], ("lodash", "1.0.0"), [])))
+
+        # Advisory ID matches but the component or source does not
+        self.assertFalse(allow_list.match(_vuln_instance(["CVE-1"], ("lodash", "1.0.1"), ["package-lock.json"])))
+        self.assertFalse(allow_list.match(_vuln_instance(["CVE-2"], ("react", "2.0.0"), ["package-lock.json"])))
+        self.assertFalse(allow_list.match(_vuln_instance(["CVE-4"], ("lodash", "1.0.0"), ["package-lock.json"])))
+
+    @pytest.mark.benchmark
+    def test_match_benchmark(self):
+        def run(vulns: int, items: int) -> float:
+            allow_list = VulnAllowList(
+                [_al_item(f"CVE-{n}", f"component-{n}-1.0.0", "package-lock.json") for n in range(0, items * 2, 2)],
+                [_al_item(f"CVE-RAW-{n}") for n in range(items)],
+            )
+            instances = [
+                _vuln_instance([f"CVE-{n}", f"GHSA-{n}"], (f"component-{n}", "1.0.0"), ["package-lock.json"])
+                for n in range(vulns)
+            ]
+            # Best of three to smooth out noise
+            timings = []
+            for _ in range(3):
+                start = time.monotonic()
+                matched = sum(allow_list.match(instance) for instance in instances)
+                timings.append(time.monotonic() - start)
+            elapsed = min(timings)
+            print(f"Matched {matched} of {vulns} vulns against {items * 2} allowlist items in {elapsed:.3f}s")
+            return elapsed
+
+        # Quadrupling both the vulns and allowlist items should take roughly four times as long, not sixteen
+        small = run(20000, 1000)
+        large = run(80000, 4000)
+        self.assertLess(large, small * 8)
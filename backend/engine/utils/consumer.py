@@ -0,0 +1,186 @@
+import threading
+from typing import Callable, Optional
+
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
+
+from artemislib.logging import Logger
+from env import (
+    PRIORITY_TASK_WEIGHT,
+    REGION,
+    SQS_ENDPOINT,
+    TASK_MAX_RECEIVE_COUNT,
+    TASK_VISIBILITY_TIMEOUT,
+)
+
+log = Logger(__name__)
+
+DEFAULT_POLL_WAIT = 20  # Seconds
+PRIORITY_POLL_WAIT = 5  # Seconds
+
+# SQS limit on the number of entries in a batch request
+MAX_BATCH_ENTRIES = 10
+
+
+class _TaskQueue:
+    def __init__(self, url: str, wait_time: int):
+        self.url = url
+        self.wait_time = wait_time
+
+    @property
+    def name(self) -> str:
+        return self.url.split("/")[-1]
+
+
+class TaskConsumer:
+    """
+    Receives scan tasks from the priority and regular task queues.
+
+    Tasks are taken from the priority queue first. To keep the regular queue from being starved while the priority
+    queue is busy, after PRIORITY_TASK_WEIGHT priority tasks in a row the regular queue is given the next turn. Both
+    queues are checked without waiting before falling back to long polling, so there is no delay between tasks while
+    there is work queued.
+
+    A message is only deleted from its queue once the task has been acknowledged, which the engine does when the scan
+    finishes. Until then a heartbeat thread keeps extending the visibility timeout of the message so that the task is
+    not handed to another engine, and if this engine dies the task becomes visible again. Messages are received one at
+    a time so that no tasks are kept from other engines while this engine is busy.
+
+    Messages that have been received more than TASK_MAX_RECEIVE_COUNT times are dropped. on_drop is called with each
+    dropped message before it is deleted so that its task can be failed.
+    """
+
+    def __init__(self, priority_queue: str, queue: str, client=None, on_drop: Callable[[dict], None] = None):
+        self._queues = [_TaskQueue(priority_queue, PRIORITY_POLL_WAIT), _TaskQueue(queue, DEFAULT_POLL_WAIT)]
+        self._client = client or boto3.client("sqs", endpoint_url=SQS_ENDPOINT, region_name=REGION)
+        self._on_drop = on_drop
+        self._priority_streak = 0
+
+        # Message ID -> (queue, receipt handle) of every message held by this consumer
+        self._lock = threading.Lock()
+        self._held: dict[str, tuple[_TaskQueue, str]] = {}
+
+        self._stop = threading.Event()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="task-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def receive(self) -> Optional[dict]:
+        """
+        Gets the next task message, waiting for one to arrive if both queues are empty
+        :return: the SQS message, or None if no message arrived
+        """
+        if self._priority_streak >= PRIORITY_TASK_WEIGHT:
+            # The priority queue has had its share so give the regular queue the first chance
+            order = list(reversed(self._queues))
+        else:
+            order = self._queues
+
+        for queue in order:
+            msg = self._take(queue, wait_time=0)
+            if msg:
+                return msg
+
+        for queue in self._queues:
+            msg = self._take(queue, wait_time=queue.wait_time)
+            if msg:
+                return msg
+            log.debug("SQS poll timeout (%s)", queue.name)
+        return None
+
+    def is_priority(self, msg: dict) -> bool:
+        with self._lock:
+            held = self._held.get(msg["MessageId"])
+        return held is not None and held[0] is self._queues[0]
+
+    def ack(self, msg: dict) -> None:
+        """
+        Deletes a finished task's message from its queue
+        """
+        with self._lock:
+            queue, receipt_handle = self._held.pop(msg["MessageId"], (None, None))
+        if queue is None:
+            return
+        try:
+            self._client.delete_message(QueueUrl=queue.url, ReceiptHandle=receipt_handle)
+        except ClientError as e:
+            log.error("Unable to delete message %s: %s", msg["MessageId"], e)
+
+    def close(self) -> None:
+        self._stop.set()
+
+    def _take(self, queue: _TaskQueue, wait_time: int) -> Optional[dict]:
+        msg = self._receive(queue, wait_time)
+        if msg is None:
+            return None
+
+        if queue is self._queues[0]:
+            self._priority_streak += 1
+        else:
+            self._priority_streak = 0
+        log.info("Got message %s", msg["MessageId"])
+        return msg
+
+    def _receive(self, queue: _TaskQueue, wait_time: int) -> Optional[dict]:
+        try:
+            resp = self._client.receive_message(
+                QueueUrl=queue.url,
+                AttributeNames=["SentTimestamp", "ApproximateReceiveCount"],
+                MaxNumberOfMessages=1,
+                MessageAttributeNames=["All"],
+                VisibilityTimeout=TASK_VISIBILITY_TIMEOUT,
+                WaitTimeSeconds=wait_time,
+            )
+        except ClientError as err:
+            if err.response["Error"]["Code"] == "AWS.SimpleQueueService.NonExistentQueue":
+                log.warning("Queue not found: %s", queue.url)
+                return None
+            raise err
+
+        for msg in resp.get("Messages", []):
+            receive_count = int(msg.get("Attributes", {}).get("ApproximateReceiveCount", 1))
+            if receive_count > TASK_MAX_RECEIVE_COUNT:
+                # The task has been started repeatedly without finishing, so it is likely what is taking the engines
+                # down. Drop it instead of passing it on again.
+                log.error("Dropping message %s after %d receives", msg["MessageId"], receive_count)
+                self._drop(queue, msg)
+                continue
+            with self._lock:
+                self._held[msg["MessageId"]] = (queue, msg["ReceiptHandle"])
+            return msg
+        return None
+
+    def _drop(self, queue: _TaskQueue, msg: dict) -> None:
+        if self._on_drop is not None:
+            try:
+                self._on_drop(msg)
+            except Exception as e:  # pylint: disable=broad-except
+                # The message is still dropped so that it can't take down any more engines
+                log.error("Unable to fail the task of message %s: %s", msg["MessageId"], e)
+        self._client.delete_message(QueueUrl=queue.url, ReceiptHandle=msg["ReceiptHandle"])
+
+    def _heartbeat_loop(self) -> None:
+        # Extend the visibility well before it runs out
+        while not self._stop.wait(TASK_VISIBILITY_TIMEOUT / 3):
+            with self._lock:
+                entries = [
+                    (queue, receipt_handle, TASK_VISIBILITY_TIMEOUT) for queue, receipt_handle in self._held.values()
+                ]
+            self._change_visibility(entries)
+
+    def _change_visibility(self, entries: list[tuple[_TaskQueue, str, int]]) -> None:
+        for queue in self._queues:
+            queue_entries = [(receipt_handle, timeout) for q, receipt_handle, timeout in entries if q is queue]
+            for i in range(0, len(queue_entries), MAX_BATCH_ENTRIES):
+                try:
+                    resp = self._client.change_message_visibility_batch(
+                        QueueUrl=queue.url,
+                        Entries=[
+                            {"Id": str(n), "ReceiptHandle": receipt_handle, "VisibilityTimeout": timeout}
+                            for n, (receipt_handle, timeout) in enumerate(queue_entries[i : i + MAX_BATCH_ENTRIES])
+                        ],
+                    )
+                except (BotoCoreError, ClientError) as e:
+                    log.error("Unable to change message visibility: %s", e)
+                    continue
+                for failure in resp.get("Failed", []):
+                    log.error("Unable to change message visibility: %s", failure.get("Message"))
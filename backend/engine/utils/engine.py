@@ -20,8 +20,7 @@ def check_disk_space(repo_size: int, available_space=None) -> bool:
     :return: True if the available space is greater than the repo size, otherwise False
     """
     if available_space is None:
-        s = os.statvfs("/work")
-        available_space = (s.f_frsize * s.f_bavail) / 1024
+        available_space = get_available_space()
 
     log.info(
         f"Available Disk Space: {available_space}, Repository Size: {repo_size}",
@@ -33,6 +32,14 @@ def check_disk_space(repo_size: int, available_space=None) -> bool:
     return True
 
 
+def get_available_space() -> float:
+    """
+    :return: the available space on the working directory's disk in KB
+    """
+    s = os.statvfs("/work")
+    return (s.f_frsize * s.f_bavail) / 1024
+
+
 def get_ttl_expiration():
     return int((datetime.now(timezone.utc) + timedelta(days=DYNAMODB_TTL_DAYS)).timestamp())
 
@@ -0,0 +1,127 @@
+import json
+import threading
+from time import sleep
+from typing import Optional
+
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
+
+from artemislib.logging import Logger
+from env import EVENT_QUEUE, REGION, SQS_ENDPOINT
+
+log = Logger(__name__)
+
+# SQS limits on the number of messages in a batch and the total size of the batch
+MAX_BATCH_MESSAGES = 10
+MAX_BATCH_BYTES = 256 * 1024
+
+MAX_SEND_ATTEMPTS = 3
+RETRY_DELAY = 1  # Seconds, doubled after each attempt
+
+
+class _Event:
+    def __init__(self, repo: str, plugin_type: str, body: str):
+        self.repo = repo
+        self.plugin_type = plugin_type
+        self.body = body
+        self.size = len(body.encode("utf-8"))
+
+
+class EventPublisher:
+    """
+    Buffers events and sends them to the event queue in batches using a single SQS client.
+
+    Events are sent when a full batch has been buffered. Any remaining events must be sent by calling flush(), which
+    the engine does at the end of each scan.
+    """
+
+    def __init__(self, queue_url: Optional[str] = None, client=None):
+        self._queue_url = queue_url
+        self._client = client
+        self._lock = threading.Lock()
+        self._buffer: list[_Event] = []
+        self._buffer_size = 0
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = boto3.client("sqs", endpoint_url=SQS_ENDPOINT, region_name=REGION)
+            return self._client
+
+    def publish(self, repo: str, plugin_type: str, payload: dict) -> None:
+        log.info("Queuing %s event for %s", plugin_type, repo)
+        event = _Event(repo, plugin_type, json.dumps(payload))
+        if event.size > MAX_BATCH_BYTES:
+            log.error("Unable to queue %s event for %s: event is too large (%d bytes)", plugin_type, repo, event.size)
+            return
+
+        batch = None
+        with self._lock:
+            if len(self._buffer) >= MAX_BATCH_MESSAGES or self._buffer_size + event.size > MAX_BATCH_BYTES:
+                # This event doesn't fit in the current batch so send that batch first
+                batch = self._take_batch()
+            self._buffer.append(event)
+            self._buffer_size += event.size
+
+        if batch:
+            self._send(batch)
+
+    def flush(self) -> None:
+        """
+        Sends all of the buffered events
+        """
+        while True:
+            with self._lock:
+                batch = self._take_batch()
+            if not batch:
+                return
+            self._send(batch)
+
+    def _take_batch(self) -> list[_Event]:
+        # Must be called while holding the lock. The buffer never holds more than one batch.
+        batch = self._buffer
+        self._buffer = []
+        self._buffer_size = 0
+        return batch
+
+    def _send(self, batch: list[_Event]) -> None:
+        queue_url = self._queue_url or EVENT_QUEUE
+        if not queue_url:
+            for event in batch:
+                log.error("Unable to queue %s event for %s: no event queue", event.plugin_type, event.repo)
+            return
+
+        pending = {str(i): event for i, event in enumerate(batch)}
+        for attempt in range(MAX_SEND_ATTEMPTS):
+            if attempt:
+                sleep(RETRY_DELAY * 2 ** (attempt - 1))
+
+            try:
+                resp = self.client.send_message_batch(
+                    QueueUrl=queue_url,
+                    Entries=[{"Id": entry_id, "MessageBody": event.body} for entry_id, event in pending.items()],
+                )
+            except (BotoCoreError, ClientError) as e:
+                log.warning("Unable to send batch of %d events (attempt %d): %s", len(pending), attempt + 1, e)
+                continue
+
+            failed = {}
+            for failure in resp.get("Failed", []):
+                event = pending[failure["Id"]]
+                if failure.get("SenderFault"):
+                    # The message itself was rejected so retrying won't help
+                    log.error(
+                        "Unable to queue %s event for %s: %s", event.plugin_type, event.repo, failure.get("Message")
+                    )
+                else:
+                    failed[failure["Id"]] = event
+            pending = failed
+            if not pending:
+                return
+
+        for event in pending.values():
+            log.error("Unable to queue %s event for %s", event.plugin_type, event.repo)
+
+
+event_publisher = EventPublisher()
@@ -19,6 +19,7 @@ from env import (
     REV_PROXY_SECRET_REGION,
 )
 from utils.engine import get_key
+from utils.git_mirror import git_mirror_cache
 
 log = Logger(__name__)
 
@@ -36,6 +37,7 @@ def git_pull(
     append_dot_git_suffix: bool = True,
     include: list = None,
     exclude: list = None,
+    mirror_key: str = None,
 ) -> bool:
     """
     Downloads repository using 'git init' and 'git pull', using the https url of the repository
@@ -46,6 +48,7 @@ def git_pull(
     :param public: whether this repository is public or not. If it is public, we do not need an api key
     :param branch: branch of the repository. If user did not specify one, this will be None.
     :param diff_base:
+    :param mirror_key: service/org/repo of the repository, used to speed up the pull if the mirror cache is enabled
     :return: True/False regarding whether the repository could be pulled.
     """
     url = repo
@@ -69,6 +72,11 @@ def git_pull(
     if http_basic_auth:
         _set_http_basic_auth(repo, api_key, base)
 
+    # Start from the mirror's objects, if there is one, so that only what has changed needs to be pulled
+    use_mirror = bool(mirror_key) and git_mirror_cache.enabled
+    if use_mirror:
+        git_mirror_cache.seed(mirror_key, base)
+
     # Pull the repo
     args = ["git", "pull", url]
     if branch:
@@ -87,6 +95,10 @@ def git_pull(
             log.error(r.stderr.decode("utf-8").replace(api_key, "xxxxxxxx"))
             return False
 
+    if use_mirror:
+        git_mirror_cache.unseed(base)
+        git_mirror_cache.update(mirror_key, base, branch)
+
     # Update the working tree to apply the path inclusions and exclusions
     _apply_path_exclusions(base, include, exclude)
 
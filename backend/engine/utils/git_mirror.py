@@ -0,0 +1,165 @@
+"""
+Local cache of bare repository mirrors used to speed up pulling repositories that are scanned repeatedly
+"""
+
+import fcntl
+import hashlib
+import os
+import shutil
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from artemislib.logging import Logger
+from env import GIT_MIRROR_DIR, GIT_MIRROR_MIN_FREE
+from utils.engine import get_available_space
+
+log = Logger(__name__)
+
+# Refs the mirror's branches are fetched into in the scan repo so they can be used as the starting point when pulling
+SEED_REF_PREFIX = "refs/mirror/"
+
+
+class GitMirrorCache:
+    """
+    Bare repository mirrors, keyed by service/org/repo, that are shared between scans on the engine host.
+
+    The mirrors are never fetched from the version control service directly so that the API keys are never written
+    to disk. Instead, before a repo is pulled the mirror's objects are hard-linked into the new repo and its refs
+    fetched so that the pull only has to download what has changed. Once the repo has been pulled the mirror fetches
+    the new commits back from it. The scan repo is self-contained because plugin containers only mount the scan
+    working directory.
+
+    Mirrors are evicted, least recently used first, when the disk does not have room for the next scan.
+    """
+
+    def __init__(self, cache_dir: Optional[str], min_free: int = 0):
+        self.cache_dir = cache_dir
+        self.min_free = min_free  # KB
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.cache_dir)
+
+    def seed(self, key: str, git_dir: str) -> bool:
+        """
+        Copies the mirror's objects and refs into a newly initialized repo
+        :param key: service/org/repo of the repository
+        :param git_dir: working tree of the repo
+        :return: True if the repo was seeded from the mirror
+        """
+        mirror = self._mirror_path(key)
+        with self._lock(mirror):
+            if not os.path.isdir(mirror):
+                return False
+            log.info("Seeding repo from mirror %s", key)
+            _link_tree(os.path.join(mirror, "objects"), os.path.join(git_dir, ".git", "objects"))
+            # The objects are already in place so fetching the refs does not transfer anything
+            ok = _git(["fetch", "--no-tags", "--quiet", mirror, f"+refs/heads/*:{SEED_REF_PREFIX}*"], git_dir)
+            os.utime(mirror)  # Mark the mirror as recently used
+        return ok
+
+    def unseed(self, git_dir: str) -> None:
+        """
+        Removes the refs added by seed() so that they are not visible to the plugins
+        """
+        r = subprocess.run(
+            ["git", "for-each-ref", "--format=delete %(refname)", SEED_REF_PREFIX],
+            cwd=git_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+        if r.returncode != 0 or not r.stdout:
+            return
+        _git(["update-ref", "--stdin"], git_dir, stdin=r.stdout)
+
+    def update(self, key: str, git_dir: str, branch: Optional[str]) -> bool:
+        """
+        Fetches the commit that was pulled into the repo into the mirror, creating the mirror if necessary
+        :param key: service/org/repo of the repository
+        :param git_dir: working tree of the repo
+        :param branch: branch that was pulled, or None for the default branch
+        :return: True if the mirror was updated
+        """
+        mirror = self._mirror_path(key)
+        with self._lock(mirror):
+            if not os.path.isdir(mirror):
+                os.makedirs(mirror)
+                if not _git(["init", "--bare", "--quiet"], mirror):
+                    shutil.rmtree(mirror, ignore_errors=True)
+                    return False
+            log.info("Updating mirror %s", key)
+            # The branch may be a commit or contain characters that aren't valid in a ref name so name the mirror's
+            # branch after its hash instead
+            name = hashlib.sha256((branch or "").encode("utf-8")).hexdigest()[:16]
+            ok = _git(["fetch", "--no-tags", "--quiet", git_dir, f"+HEAD:refs/heads/{name}"], mirror)
+            os.utime(mirror)
+        return ok
+
+    def evict(self, required: int) -> None:
+        """
+        Removes the least recently used mirrors until there is enough free disk space
+        :param required: space needed, in KB, in addition to the minimum free space
+        """
+        if not self.enabled:
+            return
+        required += self.min_free
+        for mirror in sorted(self._mirrors(), key=lambda path: path.stat().st_mtime):
+            if get_available_space() >= required:
+                return
+            with self._lock(str(mirror), blocking=False) as locked:
+                if locked:
+                    log.info("Evicting mirror %s", mirror.relative_to(self.cache_dir))
+                    shutil.rmtree(mirror, ignore_errors=True)
+
+    def _mirror_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.git")
+
+    def _mirrors(self) -> list[Path]:
+        return [path for path in Path(self.cache_dir).glob("**/*.git") if (path / "objects").is_dir()]
+
+    @contextmanager
+    def _lock(self, mirror: str, blocking: bool = True):
+        # Engines on the same host share the cache so access to each mirror is serialized with a lock file
+        os.makedirs(os.path.dirname(mirror), exist_ok=True)
+        with open(f"{mirror}.lock", "w") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _link_tree(src: str, dst: str) -> None:
+    # Git never modifies object files in place so they can be hard-linked instead of copied
+    for root, _, files in os.walk(src):
+        target = os.path.join(dst, os.path.relpath(root, src))
+        os.makedirs(target, exist_ok=True)
+        for name in files:
+            dst_file = os.path.join(target, name)
+            if os.path.exists(dst_file):
+                continue
+            try:
+                os.link(os.path.join(root, name), dst_file)
+            except OSError:
+                # Not on the same filesystem
+                shutil.copy2(os.path.join(root, name), dst_file)
+
+
+def _git(args: list, cwd: str, stdin: bytes = None) -> bool:
+    r = subprocess.run(
+        ["git"] + args, cwd=cwd, input=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False
+    )
+    if r.returncode != 0:
+        log.error(r.stderr.decode("utf-8"))
+        return False
+    return True
+
+
+git_mirror_cache = GitMirrorCache(GIT_MIRROR_DIR, GIT_MIRROR_MIN_FREE)
@@ -1,18 +1,21 @@
 import json
+from base64 import b64decode
 from enum import Enum
 import os
 import subprocess
+import threading
 from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from fnmatch import fnmatch
-from typing import Optional, Union
+from time import monotonic, time
+from typing import Iterable, Optional, Union
 from urllib.parse import quote_plus
 import uuid
 
 import boto3
 import hashlib
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
 from django.db.models import Q
 from django.db import transaction
 import docker
@@ -20,20 +23,21 @@ import docker.errors
 from pydantic import BaseModel, Field, field_validator
 
 from artemisdb.artemisdb.models import PluginConfig, SecretType, PluginType, Scan
+from artemislib.allowlist import AllowList, SubstringMatcher
 from artemislib.aws import AWSConnect
 from artemislib.github.app import GITHUB_APP_ID
 from artemislib.logging import Logger, LOG_LEVEL, inject_plugin_logs
-from artemislib.util import dict_eq
 from env import (
+    DEFAULT_PLUGIN_MEMORY,
     ECR,
     ENGINE_DIR,
     ENGINE_ID,
     HOST_WORKING_DIR,
     WORKING_DIR,
+    PLUGIN_IMAGE_REFRESH_INTERVAL,
     PLUGIN_JAVA_HEAP_SIZE,
     PROCESS_SECRETS_WITH_PATH_EXCLUSIONS,
     REGION,
-    SQS_ENDPOINT,
     APPLICATION,
     REV_PROXY_DOMAIN_SUBSTRING,
     REV_PROXY_SECRET,
@@ -45,11 +49,19 @@ from env import (
     VULNERABILITY_EVENTS_ENABLED,
 )
 from oci.builder import ScanImages
+from utils.events import event_publisher
+from utils.secrets import SecretCache
+from utils.trivy_cache import trivy_db_cache
 
 log = Logger(__name__)
 
 UI_SECRETS_TAB_INDEX = 3
 
+PEPPER_SECRET_NAME = f"{APPLICATION}/pepper"
+
+# Log in to ECR again when the login is within this many seconds of expiring
+ECR_LOGIN_EXPIRY_MARGIN = 300
+
 TEMP_VOLUME_NAME_PREFIX = "artemis-plugin-temp-"
 TEMP_VOLUME_LABEL = "artemis.temp"
 TEMP_VOLUME_MOUNT = "/tmp/work"
@@ -103,6 +115,8 @@ class PluginSettings(BaseModel):
     writable: bool = False
     docker: bool = False
     runner: Runner = Runner.CORE
+    memory: int = DEFAULT_PLUGIN_MEMORY
+    trivy: bool = False
 
     @field_validator("image", mode="after")
     @classmethod
@@ -188,58 +202,6 @@ def get_engine_vars(
     )
 
 
-def get_ecr_login_cmd() -> Optional[list[str]]:
-    log.info("Logging into ECR")
-    login_command_response = subprocess.run(
-        [
-            "aws",
-            "ecr",
-            "get-login",
-            "--no-include-email",
-            "--region=%s" % REGION,
-            "--registry-ids=%s" % ECR.split(".")[0],
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        check=False,
-    )
-
-    if login_command_response.returncode != 0:
-        return None
-    return login_command_response.stdout.decode("utf-8").strip().split(" ")
-
-
-def pull_image(image: str):
-    # Try to pull the latest image
-    if execute_docker_pull(image, not ECR):
-        # Success, return no error
-        return None
-
-    if not ECR:
-        return f"Unable to pull image: {image}"
-
-    # Pull failed, probably because ECR auth expired.
-    # Get the docker login command from awscli.
-    login_command = get_ecr_login_cmd()
-    if login_command is None:
-        # Getting the ECR login command failed
-        return "Unable to get ECR login"
-
-    # Got the ECR login command, now run it
-    r = subprocess.run(login_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
-
-    if r.returncode != 0:
-        return "Unable to log in to ECR: %s" % r.stderr
-    log.info("ECR login successful")
-
-    # Login was succesfully, try pulling the image again
-    if not execute_docker_pull(image, True):
-        return "Unable to pull image %s" % image
-
-    # Success, return no error
-    return None
-
-
 def execute_docker_pull(image: str, log_error: bool) -> bool:
     """
     Executes docker pull [image]
@@ -267,6 +229,161 @@ def get_plugin_settings(plugin: str) -> PluginSettings:
         return PluginSettings.model_validate_json(f.read())
 
 
+class PluginRegistry:
+    """
+    Settings of all of the plugins, loaded and validated once, along with the state of the plugin images.
+
+    When ECR is in use the registry also keeps the ECR login until it expires and tracks when each plugin image was
+    last brought up to date so that plugins don't wait on a pull every time they are run. The images can be refreshed
+    in a background thread between scans.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._login_lock = threading.Lock()
+        self._settings: Optional[dict[str, PluginSettings]] = None
+        self._auth_config: Optional[dict] = None
+        self._login_expires = 0.0
+        self._image_checked: dict[str, float] = {}  # Image -> when it was last brought up to date
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._last_refresh: Optional[float] = None
+
+    def load(self) -> None:
+        """
+        Loads and validates the settings of all of the plugins
+        """
+        settings = {}
+        for plugin in get_plugin_list():
+            try:
+                settings[plugin] = get_plugin_settings(plugin)
+            except (OSError, ValueError) as e:
+                # Errors are raised again if the plugin is run
+                log.error("Unable to load settings for plugin %s: %s", plugin, e)
+        with self._lock:
+            self._settings = settings
+
+    def get_settings(self, plugin: str) -> PluginSettings:
+        if self._settings is None:
+            self.load()
+        if plugin in self._settings:
+            return self._settings[plugin]
+        # Not loaded, so read the settings directly so that any error is raised
+        return get_plugin_settings(plugin)
+
+    def trivy_image(self) -> Optional[str]:
+        """
+        Image of an enabled plugin that runs Trivy, used to download the shared Trivy DBs
+        """
+        if self._settings is None:
+            self.load()
+        for _, settings in sorted(self._settings.items()):
+            if settings.trivy and settings.image and not settings.disabled:
+                return settings.image
+        return None
+
+    def ecr_login(self, force: bool = False) -> Optional[str]:
+        """
+        Logs in to ECR, unless the current login has not expired
+        :return: error message if the login failed, otherwise None
+        """
+        with self._login_lock:
+            if not force and time() < self._login_expires - ECR_LOGIN_EXPIRY_MARGIN:
+                return None
+
+            log.info("Logging into ECR")
+            try:
+                ecr = boto3.client("ecr", region_name=REGION)
+                auth = ecr.get_authorization_token(registryIds=[ECR.split(".")[0]])["authorizationData"][0]
+            except (BotoCoreError, ClientError) as e:
+                log.error("Unable to get ECR authorization token: %s", e)
+                return "Unable to get ECR login"
+
+            username, password = b64decode(auth["authorizationToken"]).decode("utf-8").split(":", 1)
+            r = subprocess.run(
+                ["docker", "login", "--username", username, "--password-stdin", auth["proxyEndpoint"]],
+                input=password.encode("utf-8"),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                check=False,
+            )
+            if r.returncode != 0:
+                return "Unable to log in to ECR: %s" % r.stderr
+
+            self._auth_config = {"username": username, "password": password}
+            self._login_expires = auth["expiresAt"].timestamp()
+            log.info("ECR login successful")
+            return None
+
+    def pull_image(self, image: str) -> Optional[str]:
+        """
+        Makes sure the latest version of the image is available, unless that was already done within
+        PLUGIN_IMAGE_REFRESH_INTERVAL
+        :return: error message if the image could not be pulled, otherwise None
+        """
+        with self._lock:
+            checked = self._image_checked.get(image)
+        if checked is not None and monotonic() - checked < PLUGIN_IMAGE_REFRESH_INTERVAL:
+            return None
+        return self._refresh_image(image)
+
+    def refresh_images(self) -> None:
+        """
+        Brings the images of all of the enabled plugins up to date
+        """
+        if self._settings is None:
+            self.load()
+        for image in sorted({s.image for s in self._settings.values() if s.image and not s.disabled}):
+            err = self._refresh_image(image)
+            if err:
+                log.warning("Unable to refresh plugin image: %s", err)
+        self._last_refresh = monotonic()
+
+    def start_image_refresh(self) -> None:
+        """
+        Refreshes the plugin images in a background thread if ECR is in use, PLUGIN_IMAGE_REFRESH_INTERVAL has passed
+        since the last refresh, and a refresh is not already running
+        """
+        if not ECR:
+            return
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        if self._last_refresh is not None and monotonic() - self._last_refresh < PLUGIN_IMAGE_REFRESH_INTERVAL:
+            return
+        self._refresh_thread = threading.Thread(target=self.refresh_images, name="plugin-image-refresh", daemon=True)
+        self._refresh_thread.start()
+
+    def _refresh_image(self, image: str) -> Optional[str]:
+        err = self.ecr_login()
+        if err:
+            return err
+
+        if not self._is_latest(image) and not execute_docker_pull(image, False):
+            # The pull may have failed because the login was revoked, so log in again and retry
+            err = self.ecr_login(force=True)
+            if err:
+                return err
+            if not execute_docker_pull(image, True):
+                return "Unable to pull image %s" % image
+
+        with self._lock:
+            self._image_checked[image] = monotonic()
+        return None
+
+    def _is_latest(self, image: str) -> bool:
+        """
+        Compares the digest of the image in the registry with the digests of the local image
+        """
+        try:
+            digest = docker_client.images.get_registry_data(image, auth_config=self._auth_config).id
+            local = docker_client.images.get(image).attrs.get("RepoDigests") or []
+        except docker.errors.DockerException:
+            return False
+        return any(d.endswith(f"@{digest}") for d in local)
+
+
+plugin_registry = PluginRegistry()
+
+
 def _get_plugin_config(plugin: str, full_repo: str) -> dict:
     """
     Get plugin config from DB if one exists
@@ -328,7 +445,7 @@ def run_plugin(
     if features is None:
         features = {}
 
-    settings = get_plugin_settings(plugin)
+    settings = plugin_registry.get_settings(plugin)
 
     if not settings.image:
         return Result(
@@ -357,8 +474,8 @@ def run_plugin(
         )
 
     if ECR:
-        # Pull the plugin's settings.image
-        err = pull_image(settings.image)
+        # Pull the plugin's settings.image, if it hasn't been refreshed recently
+        err = plugin_registry.pull_image(settings.image)
         if err:
             return Result(
                 name=settings.name,
@@ -389,7 +506,7 @@ def run_plugin(
     # The temporary named volume is automatically deleted after the plugin
     # container exits.
     with temporary_volume(f"{TEMP_VOLUME_NAME_PREFIX}-{plugin}") as volname:
-        container_name = get_container_name()
+        container_name = get_container_name(plugin)
         plugin_command = get_plugin_command(
             scan, plugin, container_name, settings, depth, include_dev, volname, scan_images, plugin_config, services
         )
@@ -494,20 +611,26 @@ def process_event_info(scan: Scan, results, plugin_type: str, plugin_name: str,
         if not PROCESS_SECRETS_WITH_PATH_EXCLUSIONS and (scan.include_paths or scan.exclude_paths):
             log.info("Skipping secrets event processing of scan with path inclusions/exclusions")
             return
-        for item in results.get("details", []):
-            if "/" in scan.repo.repo:
-                org, repository = scan.repo.repo.split("/", 1)
-            else:
-                org = scan.repo.repo
-                repository = scan.repo.repo
+        if "/" in scan.repo.repo:
+            org, repository = scan.repo.repo.split("/", 1)
+        else:
+            org = scan.repo.repo
+            repository = scan.repo.repo
+
+        details = results.get("details", [])
 
+        # Hash all of the secrets at once
+        all_secret_details = []
+        for item in details:
             secret_details = results["event_info"][item["id"]]["match"]
             if isinstance(secret_details, list) and secret_details:
                 secret_details = str(secret_details[0])
             else:
                 secret_details = ""
-            secret_hash = get_truncated_hash(secret_details)
+            all_secret_details.append(secret_details)
+        secret_hashes = get_truncated_hashes(all_secret_details) if details else []
 
+        for item, secret_details, secret_hash in zip(details, all_secret_details, secret_hashes):
             payload = {
                 "timestamp": timestamp,
                 "type": plugin_type,
@@ -591,24 +714,36 @@ def process_event_info(scan: Scan, results, plugin_type: str, plugin_name: str,
 
 
 def queue_event(repo: str, plugin_type: str, payload: dict):
-    log.info("Queuing %s event for %s", plugin_type, repo)
-    try:
-        sqs = boto3.client("sqs", endpoint_url=SQS_ENDPOINT, region_name=REGION)
-        # If EVENT_QUEUE is missing, this will throw an error, and it will be caught. Ignoring typehint.
-        sqs.send_message(QueueUrl=os.environ.get("EVENT_QUEUE"), MessageBody=json.dumps(payload))  # type:ignore
-    except ClientError:
-        log.error("Unable to queue %s event for %s", plugin_type, repo)
+    # Events are batched so they may not be sent until the buffer is flushed at the end of the scan
+    event_publisher.publish(repo, plugin_type, payload)
+
+
+def _get_secret_raw(secret_name: str) -> Optional[str]:
+    return AWSConnect().get_secret_raw(secret_name)
+
+
+secrets_cache = SecretCache(_get_secret_raw)
 
 
 def get_truncated_hash(value: str, chars=24) -> str:
-    aws = AWSConnect()
-    pepper = aws.get_secret_raw(f"{APPLICATION}/pepper")
-    pepper = bytes.fromhex(pepper)
-    hash = hashlib.new("sha3_256")
-    hash.update(pepper)
-    hash.update(value.encode())
+    return get_truncated_hashes([value], chars)[0]
 
-    return hash.hexdigest()[:chars]
+
+def get_truncated_hashes(values: Iterable[str], chars=24) -> list[str]:
+    """
+    Hashes a batch of values with the pepper. The pepper is only retrieved and hashed once, and then a copy of that
+    hash state is used for each value.
+    """
+    pepper = bytes.fromhex(secrets_cache.get(PEPPER_SECRET_NAME))
+    keyed = hashlib.new("sha3_256")
+    keyed.update(pepper)
+
+    hashes = []
+    for value in values:
+        hash = keyed.copy()
+        hash.update(value.encode())
+        hashes.append(hash.hexdigest()[:chars])
+    return hashes
 
 
 def get_secret_raw_wl(scan):
@@ -633,15 +768,18 @@ def get_secret_raw_wl(scan):
 def get_secret_al(scan):
     # Note: scan type is unspecified until we enable typechecking Django models.
     """
-    Get the non-expired secret whitelist for the repo and convert it into a list.
+    Get the non-expired secret whitelist for the repo and compile it into an AllowList.
     """
     from artemisdb.artemisdb.consts import (
         AllowListType,  # pylint: disable=import-outside-toplevel
     )
 
-    return scan.repo.allowlistitem_set.filter(
-        Q(item_type=AllowListType.SECRET.value),
-        Q(expires=None) | Q(expires__gt=datetime.now(timezone.utc).replace(tzinfo=timezone.utc)),
+    return AllowList.for_type(
+        scan.repo.allowlistitem_set.filter(
+            Q(item_type=AllowListType.SECRET.value),
+            Q(expires=None) | Q(expires__gt=datetime.now(timezone.utc).replace(tzinfo=timezone.utc)),
+        ),
+        AllowListType.SECRET.value,
     )
 
 
@@ -649,7 +787,8 @@ def filter_raw_secrets(scan: Scan, plugin_output: dict) -> dict:
     """
     Get the raw secrets whitelists for this repo as a list of strings.
     """
-    secret_al = get_secret_raw_wl(scan)
+    # Compile the whitelisted strings once so each match is searched for all of them in a single pass
+    secret_al = SubstringMatcher(get_secret_raw_wl(scan))
 
     details = plugin_output.get("details", [])
     event_info = plugin_output.get("event_info", {})
@@ -707,37 +846,28 @@ def filter_secrets(scan: Scan, plugin_output: dict):
     return {"details": filtered_details, "event_info": event_info}
 
 
-def match_nonallowlisted_raw_secrets(allowlist: list, matches: Union[str, list]) -> list:
+def match_nonallowlisted_raw_secrets(allowlist: Union[list, SubstringMatcher], matches: Union[str, list]) -> list:
     if not isinstance(matches, list):
         matches = [matches]
+    if not isinstance(allowlist, SubstringMatcher):
+        allowlist = SubstringMatcher(allowlist)
 
-    valid = []
-    for match in matches:
-        for al_item in allowlist:
-            if al_item in match:
-                break
-        else:
-            # No AL items were a substring of the match
-            valid.append(match)
+    # Keep the matches that no AL items are a substring of
+    return [match for match in matches if not allowlist.search(match)]
 
-    return valid
 
-
-def match_nonallowlisted_secrets(allow_list, item):
-    for al in allow_list:
-        if dict_eq(al.value, item, ["filename", "line", "commit"]):
-            # Item matches AL so return False so it gets filtered out
-            return False
-    # Item does not match AL so return True so it gets included
-    return True
+def match_nonallowlisted_secrets(allow_list: AllowList, item) -> bool:
+    # Return False if the item matches the AL so it gets filtered out, True so it gets included
+    return not allow_list.match(item)
 
 
 def get_iso_timestamp() -> str:
     return datetime.now(timezone.utc).isoformat(timespec="microseconds")
 
 
-def get_container_name() -> str:
-    return f"plugin-{ENGINE_ID}"
+def get_container_name(plugin: str) -> str:
+    # The plugin name is included so that multiple plugins can run concurrently within the same engine.
+    return f"plugin-{ENGINE_ID}-{plugin}"
 
 
 def get_plugin_command(
@@ -826,6 +956,10 @@ def get_plugin_command(
             ]
         )
 
+    if settings.trivy:
+        # Point the plugin at the Trivy DBs kept up to date by the engine
+        cmd.extend(trivy_db_cache.plugin_args())
+
     cmd.extend(
         [
             "-e",
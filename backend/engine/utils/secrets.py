@@ -0,0 +1,34 @@
+import threading
+from time import monotonic
+from typing import Callable, Optional
+
+from env import SECRETS_CACHE_TTL
+
+
+class SecretCache:
+    """
+    Caches secret values for a limited time so that they are not retrieved from Secrets Manager every time they are
+    used. Values that could not be retrieved are not cached.
+    """
+
+    def __init__(self, loader: Callable[[str], Optional[str]], ttl: int = SECRETS_CACHE_TTL):
+        """
+        :param loader: function that retrieves the value of a secret by name
+        :param ttl: number of seconds a value is cached
+        """
+        self._loader = loader
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._values: dict[str, tuple[str, float]] = {}
+
+    def get(self, secret_name: str) -> Optional[str]:
+        with self._lock:
+            cached = self._values.get(secret_name)
+        if cached is not None and cached[1] > monotonic():
+            return cached[0]
+
+        value = self._loader(secret_name)
+        if value is not None:
+            with self._lock:
+                self._values[secret_name] = (value, monotonic() + self._ttl)
+        return value
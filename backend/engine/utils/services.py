@@ -1,12 +1,15 @@
+from copy import deepcopy
+from time import monotonic
 from typing import Any, Optional
 import json
 import os
 
 import boto3
+from botocore.exceptions import BotoCoreError, ClientError
 
 from artemislib.logging import Logger
 
-from env import REGION, S3_BUCKET
+from env import REGION, S3_BUCKET, SERVICES_REFRESH_INTERVAL
 
 log = Logger(__name__)
 
@@ -22,14 +25,87 @@ def _get_services_from_file(service_file: str) -> Optional[Any]:
     return None
 
 
-def _get_services_s3_object(s3_key: str):
-    s3 = boto3.resource("s3", region_name=REGION)
-    s3_object = s3.Object(S3_BUCKET, s3_key)
-    s3_object = s3_object.get()
-    return json.loads(s3_object["Body"].read().decode("utf-8"))
+class ServicesCache:
+    """
+    Caches the services definition between scans.
+
+    The cached copy is used without any checks until the refresh interval has passed. After that the S3 object is
+    revalidated using its ETag, or the local file using its modification time, and only reloaded if it has changed.
+    If the services cannot be reloaded the last good copy continues to be used.
+    """
+
+    def __init__(self, refresh_interval: int = SERVICES_REFRESH_INTERVAL):
+        self._refresh_interval = refresh_interval
+        self._source = None  # (services_loc, s3) of the cached copy
+        self._services = None
+        self._version = None  # ETag of the S3 object or modification time of the file
+        self._checked = 0.0
+        self._s3 = None
+
+    def get(self, services_loc: str, s3: bool) -> Optional[Any]:
+        if self._source != (services_loc, s3):
+            self.invalidate()
+        elif monotonic() - self._checked < self._refresh_interval:
+            return deepcopy(self._services)
+
+        try:
+            if s3:
+                self._refresh_s3(services_loc)
+            else:
+                self._refresh_file(services_loc)
+        except (BotoCoreError, ClientError, OSError, ValueError) as e:
+            if self._services is None:
+                raise
+            log.warning("Unable to refresh services from %s, using last good copy: %s", services_loc, e)
+        else:
+            self._source = (services_loc, s3)
+        self._checked = monotonic()
+
+        return deepcopy(self._services)
+
+    def invalidate(self) -> None:
+        self._source = None
+        self._services = None
+        self._version = None
+        self._checked = 0.0
+
+    def _refresh_s3(self, s3_key: str) -> None:
+        if self._s3 is None:
+            self._s3 = boto3.client("s3", region_name=REGION)
+
+        kwargs = {"Bucket": S3_BUCKET, "Key": s3_key}
+        if self._version is not None:
+            kwargs["IfNoneMatch"] = self._version
+        try:
+            resp = self._s3.get_object(**kwargs)
+        except ClientError as e:
+            if e.response.get("ResponseMetadata", {}).get("HTTPStatusCode") == 304:
+                log.debug("Services in S3 have not changed")
+                return
+            raise
+
+        services = json.loads(resp["Body"].read().decode("utf-8"))
+        self._services = services
+        self._version = resp.get("ETag")
+        log.info("Loaded services from S3 (ETag: %s)", self._version)
+
+    def _refresh_file(self, service_file: str) -> None:
+        try:
+            mtime = os.stat(service_file).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime is not None and mtime == self._version:
+            return
+
+        services = _get_services_from_file(service_file)
+        if services is None:
+            raise FileNotFoundError(service_file)
+        self._services = services
+        self._version = mtime
+
+
+_services_cache = ServicesCache()
 
 
 def get_services_dict(services_loc: str, s3: bool):
-    if s3:
-        return _get_services_s3_object(services_loc)
-    return _get_services_from_file(services_loc)
+    return _services_cache.get(services_loc, s3)
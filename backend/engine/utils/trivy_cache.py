@@ -0,0 +1,175 @@
+"""
+Copy of the Trivy DBs that is shared by the plugins that run Trivy
+"""
+
+import fcntl
+import os
+import shutil
+import subprocess
+import threading
+from contextlib import contextmanager
+from time import monotonic, time, time_ns
+from typing import Optional
+
+from artemislib.logging import Logger
+from env import ENGINE_ID, TRIVY_CACHE_DIR, TRIVY_DB_REFRESH_INTERVAL, TRIVY_SERVER
+
+log = Logger(__name__)
+
+# Link to the version of the DBs that plugins are given
+CURRENT_LINK = "current"
+VERSION_PREFIX = "db-"
+
+# The vulnerability DB and the Java DB, which Trivy uses to identify JARs
+DOWNLOAD_ARGS = [["--download-db-only"], ["--download-java-db-only"]]
+
+# How long to wait, in seconds, before trying again after a refresh fails
+REFRESH_RETRY_INTERVAL = 300
+
+
+class TrivyDBCache:
+    """
+    Trivy DBs, shared by the engines on the host, that the plugins scan against with the DB updates turned off instead
+    of each plugin downloading the DBs every time it runs. The cache directory is mounted into the engine container so
+    the plugin containers see it at the same path.
+
+    Each refresh downloads the DBs into a new version directory and then switches the current link to it, so plugins
+    that are already running keep the version they started with. Only the current and previous versions are kept.
+    The engines on the host take turns refreshing the DBs so they are only downloaded once per refresh interval.
+
+    Plugins can also be pointed at a long-running Trivy server so that the DB is already loaded when they scan.
+    """
+
+    def __init__(self, cache_dir: Optional[str], refresh_interval: int, server: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self.refresh_interval = refresh_interval
+        self.server = server
+        self._refresh_thread: Optional[threading.Thread] = None
+        self._last_attempt: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.cache_dir)
+
+    def current(self) -> Optional[str]:
+        """
+        :return: Directory of the current version of the DBs, or None if they have not been downloaded yet
+        """
+        if not self.enabled:
+            return None
+        path = os.path.realpath(os.path.join(self.cache_dir, CURRENT_LINK))
+        return path if os.path.isdir(path) else None
+
+    def plugin_args(self) -> list[str]:
+        """
+        Arguments for 'docker run' that point a plugin at the current DBs and the Trivy server. Until the DBs have
+        been downloaded the plugin downloads them itself.
+        """
+        args = []
+        current = self.current()
+        if current:
+            args.extend(["-e", f"ARTEMIS_TRIVY_CACHE_DIR={current}"])
+        if self.server:
+            args.extend(["-e", f"ARTEMIS_TRIVY_SERVER={self.server}"])
+        return args
+
+    def refresh(self, image: str) -> bool:
+        """
+        Downloads the DBs, unless another engine is already doing so or they were downloaded within the refresh
+        interval
+        :param image: image that has Trivy installed
+        :return: True if the DBs were downloaded
+        """
+        with self._lock() as locked:
+            if not locked or self._age() < self.refresh_interval:
+                return False
+
+            log.info("Downloading Trivy DBs")
+            previous = self.current()
+            version = os.path.join(self.cache_dir, f"{VERSION_PREFIX}{time_ns()}")
+            os.makedirs(version)
+            if not all(execute_trivy_download(image, version, args) for args in DOWNLOAD_ARGS):
+                shutil.rmtree(version, ignore_errors=True)
+                return False
+
+            self._switch(version)
+            self._prune({os.path.basename(version), os.path.basename(previous or "")})
+            log.info("Trivy DBs downloaded to %s", version)
+        return True
+
+    def start_refresh(self, image: Optional[str]) -> None:
+        """
+        Refreshes the DBs in a background thread if the cache is enabled, the DBs are older than the refresh interval,
+        and a refresh is not already running
+        """
+        if not self.enabled or not image:
+            return
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        if self._last_attempt is not None and monotonic() - self._last_attempt < REFRESH_RETRY_INTERVAL:
+            return
+        if self._age() < self.refresh_interval:
+            return
+        self._last_attempt = monotonic()
+        self._refresh_thread = threading.Thread(
+            target=self.refresh, args=(image,), name="trivy-db-refresh", daemon=True
+        )
+        self._refresh_thread.start()
+
+    def _age(self) -> float:
+        # The link is replaced on every refresh so its own modification time is when the DBs were last downloaded
+        try:
+            return time() - os.lstat(os.path.join(self.cache_dir, CURRENT_LINK)).st_mtime
+        except FileNotFoundError:
+            return float("inf")
+
+    def _switch(self, version: str) -> None:
+        # Replacing the link with a new one is atomic so plugins never see it missing
+        tmp = os.path.join(self.cache_dir, f"{CURRENT_LINK}.tmp")
+        if os.path.lexists(tmp):
+            os.remove(tmp)
+        os.symlink(os.path.basename(version), tmp)
+        os.replace(tmp, os.path.join(self.cache_dir, CURRENT_LINK))
+
+    def _prune(self, keep: set) -> None:
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.startswith(VERSION_PREFIX) and entry.name not in keep:
+                log.info("Removing old Trivy DBs %s", entry.name)
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    @contextmanager
+    def _lock(self):
+        # Engines on the same host share the cache so refreshes are serialized with a lock file
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, "refresh.lock"), "w") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def execute_trivy_download(image: str, cache_dir: str, args: list[str]) -> bool:
+    """
+    Downloads a Trivy DB into the cache directory using a container, since Trivy is installed in the plugin images
+    rather than the engine
+    """
+    r = subprocess.run(
+        ["docker", "run", "--rm", "--volumes-from", ENGINE_ID, image]
+        + ["trivy", "image", "--cache-dir", cache_dir, "--no-progress"]
+        + args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=False,
+    )
+    if r.returncode != 0:
+        log.error("Unable to download Trivy DB: %s", r.stderr.decode("utf-8"))
+        return False
+    return True
+
+
+trivy_db_cache = TrivyDBCache(TRIVY_CACHE_DIR, TRIVY_DB_REFRESH_INTERVAL, TRIVY_SERVER)
@@ -1,14 +1,16 @@
+import uuid
 from http import HTTPStatus
 
 from django.core.exceptions import ValidationError as DjangoValidationError
 
 from artemisapi.response import response
-from artemisdb.artemisdb.models import AllowListItem, Repo, Scan
+from artemisdb.artemisdb.consts import ReportStatus, ReportType
+from artemisdb.artemisdb.models import AllowListItem, Repo, Report, Scan, User
 from artemisdb.artemisdb.paging import page
-from repo.report.report import get_repo_report
+from repo.report.report import get_repo_report, report_with_download
 from repo.util.aws import AWSConnect, LambdaError
 from repo.util.const import DEFAULT_PAGE_SIZE, FORMAT_SBOM, WL_TYPES
-from repo.util.env import JSON_REPORT_LAMBDA, SBOM_REPORT_LAMBDA
+from repo.util.env import JSON_REPORT_LAMBDA, JSON_REPORT_QUEUE, SBOM_REPORT_LAMBDA
 from repo.util.parse_event import EventParser
 
 
@@ -35,9 +37,12 @@ def get(event_parser: EventParser):
                 parsed_event["service_id"],
                 scan_id=parsed_event["scan_id"],
                 params=parsed_event["query_params"],
+                user=event_parser.identity.principal_id,
             )
             if report:
-                r = response(report)
+                # Streamed reports are generated in the background and the client polls the report for its location
+                code = HTTPStatus.ACCEPTED if parsed_event["query_params"].get("stream") else HTTPStatus.OK
+                r = response(report, code=code)
         except LambdaError:
             r = response("An error occurred generating the report", code=HTTPStatus.INTERNAL_SERVER_ERROR)
     return r
@@ -65,7 +70,7 @@ def get_repo_whitelist(event):
     return response([item.to_dict() for item in wl])
 
 
-def get_report(repo_id, service, scan_id=None, params=None):
+def get_report(repo_id, service, scan_id=None, params=None, user=None):
     try:
         if scan_id:
             # Get the scan with the specific ID
@@ -93,6 +98,9 @@ def get_report(repo_id, service, scan_id=None, params=None):
 
             return handler({"scan_id": scan.scan_id})
     else:
+        if params.get("stream"):
+            return queue_json_report(scan, params, user)
+
         if JSON_REPORT_LAMBDA is not None:
             # Running in Lambda environment so invoke the JSON report Lambda
             aws = AWSConnect()
@@ -104,6 +112,35 @@ def get_report(repo_id, service, scan_id=None, params=None):
             return handler({"scan_id": scan.scan_id, "filters": params})
 
 
+def queue_json_report(scan: Scan, params: dict, user=None) -> dict:
+    """
+    Queues the full report to be streamed to S3 by the JSON report Lambda, like PDF reports, so that generating a large
+    report isn't limited by the API timeout
+    :return: The report, which is polled until it has been completed and has a download location
+    """
+    report = Report.objects.create(
+        report_id=uuid.uuid4(),
+        report_type=ReportType.JSON.value,
+        created_by=User.objects.filter(email=user).first(),
+        status=ReportStatus.QUEUED.value,
+        scan_id=scan.scan_id,
+        filters=params,
+    )
+
+    if JSON_REPORT_LAMBDA is not None:
+        # Running in Lambda environment so queue the report for the JSON report Lambda
+        if not AWSConnect().queue_report(str(report.report_id), JSON_REPORT_QUEUE):
+            raise LambdaError
+    else:
+        # Running locally (via api_runner, for example) so run the handler directly
+        from json_report.handlers import handler  # pylint: disable=import-outside-toplevel
+
+        handler({"scan_id": scan.scan_id, "filters": params, "report_id": str(report.report_id)})
+        report.refresh_from_db()
+
+    return report_with_download(report)
+
+
 def get_repo_history(event, user=None):
     repo_id = event["repo_id"]
     service_id = event["service_id"]
@@ -11,6 +11,7 @@ from repo.github_util.github_utils import process_github
 from repo.gitlab_util.process_gitlab import process_gitlab
 from repo.report.report import post_report
 from repo.services.ado import process_ado
+from repo.util.aws import AWSConnect
 from repo.util.const import PROCESS_RESPONSE_TUPLE
 from repo.util.parse_event import EventParser
 
@@ -93,47 +94,52 @@ def post_repo(event_parser: EventParser, identity=None):
 
     service_dict = event_parser.services.get(event["service_id"], {})
     service_type = service_dict.get("type")
-    if service_type == "github":
-        s_response = process_github(
-            req_list,
-            event["service_id"],
-            service_dict.get("url"),
-            service_dict.get("secret_loc"),
-            service_dict.get("nat_connect"),
-            identity=identity,
-            diff_url=service_dict.get("diff_url"),
-        )
-    elif service_type == "gitlab":
-        s_response = process_gitlab(
-            req_list,
-            event["service_id"],
-            service_dict.get("url"),
-            service_dict.get("secret_loc"),
-            service_dict.get("batch_queries"),
-            service_dict.get("nat_connect"),
-            identity=identity,
-            diff_url=service_dict.get("diff_url"),
-        )
-    elif service_type == "bitbucket":
-        s_response = process_bitbucket(
-            req_list,
-            event["service_id"],
-            service_dict.get("url"),
-            service_dict.get("secret_loc"),
-            service_dict.get("nat_connect"),
-            identity=identity,
-        )
-    elif service_type == "ado":
-        s_response = process_ado(
-            req_list,
-            event["service_id"],
-            service_dict.get("url"),
-            service_dict.get("secret_loc"),
-            service_dict.get("nat_connect"),
-            identity=identity,
-        )
-    else:
-        s_response = PROCESS_RESPONSE_TUPLE([], [], [])
+    # The scans are created and queued in bulk once all of the repos have been processed
+    with AWSConnect().batch_queue() as batch:
+        if service_type == "github":
+            s_response = process_github(
+                req_list,
+                event["service_id"],
+                service_dict.get("url"),
+                service_dict.get("secret_loc"),
+                service_dict.get("nat_connect"),
+                identity=identity,
+                diff_url=service_dict.get("diff_url"),
+            )
+        elif service_type == "gitlab":
+            s_response = process_gitlab(
+                req_list,
+                event["service_id"],
+                service_dict.get("url"),
+                service_dict.get("secret_loc"),
+                service_dict.get("batch_queries"),
+                service_dict.get("nat_connect"),
+                identity=identity,
+                diff_url=service_dict.get("diff_url"),
+            )
+        elif service_type == "bitbucket":
+            s_response = process_bitbucket(
+                req_list,
+                event["service_id"],
+                service_dict.get("url"),
+                service_dict.get("secret_loc"),
+                service_dict.get("nat_connect"),
+                identity=identity,
+            )
+        elif service_type == "ado":
+            s_response = process_ado(
+                req_list,
+                event["service_id"],
+                service_dict.get("url"),
+                service_dict.get("secret_loc"),
+                service_dict.get("nat_connect"),
+                identity=identity,
+            )
+        else:
+            s_response = PROCESS_RESPONSE_TUPLE([], [], [])
+
+    if batch.failed:
+        s_response = _remove_failed_scans(s_response, batch.failed)
 
     if s_response.queued and not (s_response.failed or s_response.unauthorized):
         code = HTTPStatus.OK
@@ -147,3 +153,18 @@ def post_repo(event_parser: EventParser, identity=None):
         code = HTTPStatus.NOT_IMPLEMENTED  # service not recognized/implemented
 
     return response({"queued": s_response.queued, "failed": s_response.failed + s_response.unauthorized}, code=code)
+
+
+def _remove_failed_scans(s_response: PROCESS_RESPONSE_TUPLE, failed_scans: dict) -> PROCESS_RESPONSE_TUPLE:
+    """
+    Moves the scans that could not be queued from the queued list to the failed list
+    """
+    queued = []
+    failed = list(s_response.failed)
+    for item in s_response.queued:
+        repo, scan_id = item.rsplit("/", 1)
+        if scan_id in failed_scans:
+            failed.append({"repo": repo, "error": failed_scans[scan_id]})
+        else:
+            queued.append(item)
+    return PROCESS_RESPONSE_TUPLE(queued, failed, s_response.unauthorized)
@@ -33,6 +33,10 @@ def get_repo_report(event, user=None):
         if report is None:
             return response(code=HTTPStatus.NOT_FOUND)
 
+    return response(report_with_download(report))
+
+
+def report_with_download(report: Report) -> dict:
     resp = report.to_dict()
     resp["download"] = None
 
@@ -45,7 +49,7 @@ def get_repo_report(event, user=None):
             if arg.startswith("Expires="):
                 resp["download"]["expires"] = format_unix_time(int(arg.replace("Expires=", "")))
 
-    return response(resp)
+    return resp
 
 
 def post_report(event_parser: EventParser, user=None):
@@ -1,15 +1,17 @@
 import json
 import uuid
+from collections import defaultdict
+from contextlib import contextmanager
 
 import boto3
 from botocore.exceptions import ClientError
 from django.db import transaction
 
 from artemisdb.artemisdb.consts import ReportStatus, ScanStatus
-from artemisdb.artemisdb.models import Group, Repo, Report, ScanBatch, ScanScheduleRun, User
+from artemisdb.artemisdb.models import Group, Repo, Report, Scan, ScanBatch, ScanScheduleRun, User
 from artemislib.aws import AWS_DEFAULT_REGION
 from artemislib.logging import Logger
-from repo.util.const import DEFAULT_S3_DL_EXPIRATION_SECONDS
+from repo.util.const import DEFAULT_S3_DL_EXPIRATION_SECONDS, SQS_MAX_BATCH_SIZE
 from repo.util.env import (
     DEFAULT_BATCH_PRIORITY,
     PRIORITY_TASK_QUEUE,
@@ -25,12 +27,54 @@ from repo.util.utils import get_iso_timestamp, get_ttl_expiration, is_qualified,
 logger = Logger(__name__)
 
 
+def _get_owner(identity) -> tuple:
+    """
+    Returns the user or group that owns the scans requested by the identity
+    """
+    if identity.principal_type in ["user", "user_api_key"]:
+        return User.objects.filter(email=identity.principal_id).first(), None
+    if identity.principal_type == "group_api_key":
+        return None, Group.objects.filter(group_id=identity.principal_id).first()
+    return None, None
+
+
+def _task_message(scan_request: dict) -> dict:
+    return {
+        "repo": scan_request["repo"],
+        "service": scan_request["service"],
+        "scan_id": str(scan_request["scan_id"]),
+        "url": scan_request["repo_url"],
+        "public": scan_request["public"],
+        "archived": scan_request["archived"],
+        "plugins": scan_request["plugins"],
+        "repo_size": scan_request["repo_size"],
+        "depth": scan_request["depth"],
+        "branch": scan_request["branch"],
+        "include_dev": scan_request["include_dev"],
+        "callback": scan_request["callback"],
+        "features": scan_request["identity"].features,
+        "diff_base": scan_request["diff_base"],
+        "batch_id": scan_request["batch_id"],
+    }
+
+
 class LambdaError(Exception):
     pass
 
 
+class ScanQueueBatch:
+    """
+    Scans requested within AWSConnect.batch_queue()
+    """
+
+    def __init__(self):
+        self.scan_requests = []
+        self.failed = {}
+
+
 class AWSConnect:
     _instances = {}
+    _batch = None
     _SQS = None
     _S3 = None
     _S3_CLIENT = None
@@ -86,120 +130,174 @@ class AWSConnect:
         if not queue_url:
             raise KeyError("queue_url is None. Check Lambda environment variables.")
 
-        scan = self.create_scan(
-            name,
-            branch,
-            service,
-            identity=identity,
-            categories=categories,
-            plugins=plugins,
-            depth=depth,
-            include_dev=include_dev,
-            callback={"url": callback_url, "client_id": client_id},
-            batch_priority=batch_priority,
-            schedule_run=schedule_run,
-            batch_id=batch_id,
-            include_paths=include_paths,
-            exclude_paths=exclude_paths,
-        )
+        scan_request = {
+            "scan_id": uuid.uuid4(),
+            "queue_url": queue_url,
+            "repo": name,
+            "repo_url": repo_url,
+            "repo_size": repo_size,
+            "service": service,
+            "public": public,
+            "archived": archived,
+            "plugins": plugins,
+            "depth": depth,
+            "branch": branch,
+            "include_dev": include_dev,
+            "callback": {"url": callback_url, "client_id": client_id},
+            "batch_priority": batch_priority,
+            "identity": identity,
+            "categories": categories,
+            "diff_base": diff_base,
+            "schedule_run": schedule_run,
+            "batch_id": batch_id,
+            "include_paths": include_paths,
+            "exclude_paths": exclude_paths,
+        }
+        if self._batch is not None:
+            # Creating and queuing the scan is deferred until the end of the batch
+            self._batch.scan_requests.append(scan_request)
+        else:
+            self.queue_scans([scan_request])
+        return str(scan_request["scan_id"])
+
+    @contextmanager
+    def batch_queue(self):
+        """
+        Defers creating and queuing the scans requested by queue_repo_for_scan() within the block so that they
+        are created and queued in bulk when the block exits. The scan IDs are still returned immediately. The
+        scans that could not be queued are available in the "failed" attribute of the yielded batch afterwards.
+        """
+        batch = ScanQueueBatch()
+        self._batch = batch
         try:
-            self._SQS.send_message(
-                QueueUrl=queue_url,
-                MessageAttributes={
-                    "action": {"DataType": "String", "StringValue": "scan"},
-                    "timestamp": {"DataType": "String", "StringValue": get_iso_timestamp()},
-                },
-                MessageBody=json.dumps(
-                    {
-                        "repo": name,
-                        "service": service,
-                        "scan_id": str(scan.scan_id),
-                        "url": repo_url,
-                        "public": public,
-                        "archived": archived,
-                        "plugins": plugins,
-                        "repo_size": repo_size,
-                        "depth": depth,
-                        "branch": branch,
-                        "include_dev": include_dev,
-                        "callback": {"url": callback_url, "client_id": client_id},
-                        "features": identity.features,
-                        "diff_base": diff_base,
-                        "batch_id": batch_id,
-                    }
-                ),
+            yield batch
+        finally:
+            self._batch = None
+        if batch.scan_requests:
+            batch.failed = self.queue_scans(batch.scan_requests)
+
+    def queue_scans(self, scan_requests: list[dict]) -> dict[str, str]:
+        """
+        Creates the scan records and queues the scan tasks
+        :return: Error for each scan ID that could not be queued
+        """
+        self.create_scans(scan_requests)
+
+        failed = {}
+        by_queue = defaultdict(list)
+        for scan_request in scan_requests:
+            by_queue[scan_request["queue_url"]].append(scan_request)
+        for queue_url, queue_requests in by_queue.items():
+            for i in range(0, len(queue_requests), SQS_MAX_BATCH_SIZE):
+                chunk = queue_requests[i : i + SQS_MAX_BATCH_SIZE]
+                try:
+                    resp = self._SQS.send_message_batch(
+                        QueueUrl=queue_url,
+                        Entries=[
+                            {
+                                "Id": str(n),
+                                "MessageAttributes": {
+                                    "action": {"DataType": "String", "StringValue": "scan"},
+                                    "timestamp": {"DataType": "String", "StringValue": get_iso_timestamp()},
+                                },
+                                "MessageBody": json.dumps(_task_message(scan_request)),
+                            }
+                            for n, scan_request in enumerate(chunk)
+                        ],
+                    )
+                    errors = [chunk[int(entry["Id"])] for entry in resp.get("Failed", [])]
+                except ClientError:
+                    errors = chunk
+                for scan_request in errors:
+                    failed[str(scan_request["scan_id"])] = "Unable to queue task"
+
+        if failed:
+            logger.error("Unable to queue %d of %d scan tasks", len(failed), len(scan_requests))
+            Scan.objects.filter(scan_id__in=list(failed)).update(
+                status=ScanStatus.ERROR.value, errors=["Unable to queue task"]
             )
-        except ClientError:
-            self.update_status(scan, ScanStatus.ERROR.value, errors=["Unable to queue task"])
-        return str(scan.scan_id)
+        return failed
 
-    def create_scan(
-        self,
-        repo,
-        ref,
-        service,
-        identity=None,
-        categories=None,
-        plugins=None,
-        depth=None,
-        include_dev=False,
-        callback=None,
-        batch_priority=DEFAULT_BATCH_PRIORITY,
-        schedule_run=None,
-        batch_id=None,
-        include_paths: list = None,
-        exclude_paths: list = None,
-    ):
+    def create_scans(self, scan_requests: list[dict]) -> list[Scan]:
         """
-        Creates the scan record in the database
+        Creates the scan records in the database
+
+        The owners, schedule runs, and batches are looked up once for each distinct value and the repos and scans
+        are created in bulk.
         """
-        run = None
-        owner = None
-        owner_group = None
-        batch = None
-        if schedule_run is not None:
-            run = ScanScheduleRun.objects.get(run_id=schedule_run)
-            owner = run.schedule.owner
-        elif identity.principal_type in ["user", "user_api_key"]:
-            owner = User.objects.filter(email=identity.principal_id).first()
-        elif identity.principal_type == "group_api_key":
-            owner_group = Group.objects.filter(group_id=identity.principal_id).first()
-        if batch_id is not None:
-            try:
-                batch = ScanBatch.objects.get(batch_id=batch_id)
-            except ScanBatch.DoesNotExist:
+        owners = {}
+        runs = {}
+        batches = {}
+        for scan_request in scan_requests:
+            schedule_run = scan_request["schedule_run"]
+            identity = scan_request["identity"]
+            if schedule_run is not None:
+                if schedule_run not in runs:
+                    runs[schedule_run] = ScanScheduleRun.objects.select_related("schedule__owner").get(
+                        run_id=schedule_run
+                    )
+            elif identity is not None:
+                key = (identity.principal_type, identity.principal_id)
+                if key not in owners:
+                    owners[key] = _get_owner(identity)
+            batch_id = scan_request["batch_id"]
+            if batch_id is not None and batch_id not in batches:
                 # The batch ID was previously validated to exist but there's a race condition when
                 # we implement batch deletion/cleanup so handle when the batch does not exist.
-                # The 'batch' variable is already initialized to None so we can just pass here.
-                pass
+                batches[batch_id] = ScanBatch.objects.filter(batch_id=batch_id).first()
+
         with transaction.atomic():
             # The DB cleanup process will delete repo objects that don't have any associated scans
             # so that when all of the scans from a deleted repo age out we also clean up the repo
             # records. We need to do repo and scan creation in a transaction so that we don't have
             # a race condition where a repo would get deleted immediately after creation should the
             # DB cleanup happen to run between repo creation and scan creation.
-            repo, _created = Repo.objects.get_or_create(repo=repo, service=service)
-            scan = repo.scan_set.create(
-                scan_id=uuid.uuid4(),
-                ref=ref,
-                status=ScanStatus.QUEUED.value,
-                expires=get_ttl_expiration(),
-                owner=owner,
-                owner_group=owner_group,
-                categories=categories,
-                plugins=plugins,
-                depth=depth,
-                include_dev=include_dev,
-                callback=callback,
-                batch_priority=batch_priority,
-                sbom=is_sbom(plugins),
-                qualified=is_qualified(plugins),
-                schedule_run=run,
-                batch=batch,
-                include_paths=include_paths or [],
-                exclude_paths=exclude_paths or [],
+            keys = {(scan_request["repo"], scan_request["service"]) for scan_request in scan_requests}
+            Repo.objects.bulk_create(
+                [Repo(repo=repo, service=service) for repo, service in keys], ignore_conflicts=True
             )
-        return scan
+            repos = {
+                (repo.repo, repo.service): repo
+                for repo in Repo.objects.filter(
+                    repo__in={repo for repo, _ in keys}, service__in={service for _, service in keys}
+                )
+            }
+
+            scans = []
+            for scan_request in scan_requests:
+                run = runs.get(scan_request["schedule_run"])
+                identity = scan_request["identity"]
+                if run is not None:
+                    owner, owner_group = run.schedule.owner, None
+                elif identity is not None:
+                    owner, owner_group = owners[(identity.principal_type, identity.principal_id)]
+                else:
+                    owner, owner_group = None, None
+                plugins = scan_request["plugins"]
+                scans.append(
+                    Scan(
+                        repo=repos[(scan_request["repo"], scan_request["service"])],
+                        scan_id=scan_request["scan_id"],
+                        ref=scan_request["branch"],
+                        status=ScanStatus.QUEUED.value,
+                        expires=get_ttl_expiration(),
+                        owner=owner,
+                        owner_group=owner_group,
+                        categories=scan_request["categories"],
+                        plugins=plugins,
+                        depth=scan_request["depth"],
+                        include_dev=scan_request["include_dev"],
+                        callback=scan_request["callback"],
+                        batch_priority=scan_request["batch_priority"],
+                        sbom=is_sbom(plugins),
+                        qualified=is_qualified(plugins),
+                        schedule_run=run,
+                        batch=batches.get(scan_request["batch_id"]),
+                        include_paths=scan_request["include_paths"] or [],
+                        exclude_paths=scan_request["exclude_paths"] or [],
+                    )
+                )
+            return Scan.objects.bulk_create(scans)
 
     def update_status(self, scan, status, errors=None):
         """
@@ -257,11 +355,12 @@ class AWSConnect:
         else:
             raise LambdaError
 
-    def queue_report(self, report_id: str) -> bool:
+    def queue_report(self, report_id: str, queue: str = REPORT_QUEUE) -> bool:
         try:
-            self._SQS.send_message(QueueUrl=REPORT_QUEUE, MessageBody=json.dumps({"report_id": report_id}))
+            self._SQS.send_message(QueueUrl=queue, MessageBody=json.dumps({"report_id": report_id}))
             return True
         except ClientError:
             report = Report.objects.get(report_id=report_id)
             report.status = ReportStatus.FAILED.value
+            report.save()
             return False
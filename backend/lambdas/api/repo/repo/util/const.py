@@ -146,7 +146,7 @@ FORMAT_SUMMARY = "summary"
 FORMAT_SBOM = "sbom"
 
 HISTORY_QUERY_PARAMS = ["limit", "offset", "initiated_by", "include_batch", "include_diff", "qualified"]
-QUERY_PARAMS = ["results", "severity", "secret", "type", "format", "filter_diff"]
+QUERY_PARAMS = ["results", "severity", "secret", "type", "format", "filter_diff", "stream"]
 RESULTS = ["vulnerabilities", "secrets", "static_analysis", "inventory", "configuration"]
 SEVERITY = ["critical", "high", "medium", "low", "negligible", ""]
 FORMAT = [FORMAT_FULL, FORMAT_SUMMARY, FORMAT_SBOM]
@@ -208,6 +208,9 @@ DEFAULT_SCAN_QUERY_PARAMS = {"format": FORMAT_FULL, "filter_diff": True}
 DEFAULT_S3_DL_EXPIRATION_SECONDS = 3600  # 1 hour
 REPORT_S3_DL_EXPIRATION_SECONDS = 300  # 5 Minutes
 
+# Maximum number of messages in an SQS SendMessageBatch request
+SQS_MAX_BATCH_SIZE = 10
+
 SCOPE_CACHE_EXPIRATION_MINUTES = 60
 
 MAX_PATH_LENGTH = 4096
@@ -201,6 +201,11 @@ class Validator:
         else:
             event["query_params"]["filter_diff"] = True
 
+        # Streaming the report to S3 is only needed for the full report, which can be too large to return directly
+        self._validate_bool(params, "stream")
+        if params.get("stream") and params["format"] != FORMAT_FULL:
+            raise ValidationError("stream is only supported for the full report format")
+
     def _validate_params(self, items, validation_list, error_message):
         validation_set = set(validation_list)
         for item in items:
@@ -106,3 +106,22 @@ class TestPost(unittest.TestCase):
         result = post.post_repo(event_parser)
 
         self.assertEqual(expected_result, result)
+
+    def test_remove_failed_scans(self):
+        s_response = PROCESS_RESPONSE_TUPLE(
+            ["testorg/repo1/scan1", "testorg/repo2/scan2"], [{"repo": "testorg/repo3", "error": "Not found"}], []
+        )
+
+        result = post._remove_failed_scans(s_response, {"scan2": "Unable to queue task"})
+
+        self.assertEqual(
+            result,
+            PROCESS_RESPONSE_TUPLE(
+                ["testorg/repo1/scan1"],
+                [
+                    {"repo": "testorg/repo3", "error": "Not found"},
+                    {"repo": "testorg/repo2", "error": "Unable to queue task"},
+                ],
+                [],
+            ),
+        )
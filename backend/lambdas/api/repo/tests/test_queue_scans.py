@@ -0,0 +1,145 @@
+import json
+import unittest
+import uuid
+from unittest.mock import patch
+
+import boto3
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from moto import mock_aws
+
+from artemisdb.artemisdb.consts import ScanStatus
+from artemisdb.artemisdb.models import Repo, Scan, ScanBatch
+from repo.util import aws
+from repo.util.aws import AWSConnect
+from repo.util.identity import Identity
+
+TEST_REGION = "us-east-1"
+TEST_IDENTITY = Identity(principal_id="nobody@example.com", scope=[[["*"]]], features={}, principal_type="user")
+
+
+def _queue(aws_connect: AWSConnect, name: str, batch_priority: bool = True, nat_queue: bool = False) -> str:
+    return aws_connect.queue_repo_for_scan(
+        name,
+        f"https://example.com/{name}",
+        100,
+        "github",
+        plugins=["gitsecrets"],
+        batch_priority=batch_priority,
+        identity=TEST_IDENTITY,
+        nat_queue=nat_queue,
+    )
+
+
+@mock_aws
+class TestQueueScans(unittest.TestCase):
+    def setUp(self) -> None:
+        sqs = boto3.client("sqs", region_name=TEST_REGION)
+        self.task_queue = sqs.create_queue(QueueName="task-queue")["QueueUrl"]
+        self.priority_queue = sqs.create_queue(QueueName="priority-task-queue")["QueueUrl"]
+        self.aws_connect = AWSConnect()
+
+        for patcher in [
+            patch.object(self.aws_connect, "_SQS", sqs),
+            patch.object(aws, "TASK_QUEUE", self.task_queue),
+            patch.object(aws, "PRIORITY_TASK_QUEUE", self.priority_queue),
+            patch.object(aws, "TASK_QUEUE_NAT", f"{self.task_queue}-missing"),
+            patch.object(AWSConnect, "create_scans"),
+            patch.object(aws, "Scan"),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.sqs = sqs
+
+    def _receive(self, queue_url: str) -> list:
+        messages = []
+        while True:
+            resp = self.sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10)
+            if not resp.get("Messages"):
+                return messages
+            messages.extend(json.loads(msg["Body"]) for msg in resp["Messages"])
+
+    def test_batch_queue(self):
+        with self.aws_connect.batch_queue() as batch:
+            batch_scan_ids = [_queue(self.aws_connect, f"testorg/repo{i}") for i in range(12)]
+            priority_scan_id = _queue(self.aws_connect, "testorg/priority", batch_priority=False)
+
+            # Nothing is created or queued until the end of the batch
+            AWSConnect.create_scans.assert_not_called()
+            self.assertEqual(self._receive(self.task_queue), [])
+
+        AWSConnect.create_scans.assert_called_once()
+        self.assertEqual(len(AWSConnect.create_scans.call_args.args[0]), 13)
+        self.assertEqual(batch.failed, {})
+        self.assertCountEqual([msg["scan_id"] for msg in self._receive(self.task_queue)], batch_scan_ids)
+        self.assertEqual([msg["scan_id"] for msg in self._receive(self.priority_queue)], [priority_scan_id])
+
+    def test_batch_queue_failed(self):
+        with self.aws_connect.batch_queue() as batch:
+            scan_id = _queue(self.aws_connect, "testorg/repo")
+            nat_scan_id = _queue(self.aws_connect, "testorg/nat", nat_queue=True)
+
+        self.assertEqual(batch.failed, {nat_scan_id: "Unable to queue task"})
+        self.assertEqual([msg["scan_id"] for msg in self._receive(self.task_queue)], [scan_id])
+        # The scans that could not be queued are marked as failed
+        aws.Scan.objects.filter.assert_called_once_with(scan_id__in=[nat_scan_id])
+        aws.Scan.objects.filter.return_value.update.assert_called_once_with(
+            status=ScanStatus.ERROR.value, errors=["Unable to queue task"]
+        )
+
+    def test_queue_repo_for_scan(self):
+        scan_id = _queue(self.aws_connect, "testorg/repo")
+
+        AWSConnect.create_scans.assert_called_once()
+        self.assertEqual([msg["scan_id"] for msg in self._receive(self.task_queue)], [scan_id])
+
+
+@pytest.mark.integtest
+class TestCreateScans(unittest.TestCase):
+    """
+    Test Class relies on the artemisdb docker container being up.
+    """
+
+    def setUp(self) -> None:
+        self.org = f"testorg-{uuid.uuid4().hex[:8]}"
+        self.batch = ScanBatch.objects.create(batch_id=uuid.uuid4(), description="test")
+        # One of the repos already exists
+        Repo.objects.create(service="github", repo=f"{self.org}/repo0")
+
+    def tearDown(self) -> None:
+        Repo.objects.filter(repo__startswith=f"{self.org}/").delete()
+        self.batch.delete()
+
+    def _scan_request(self, name: str) -> dict:
+        return {
+            "scan_id": uuid.uuid4(),
+            "repo": name,
+            "service": "github",
+            "plugins": ["gitsecrets"],
+            "depth": None,
+            "branch": "main",
+            "include_dev": False,
+            "callback": {"url": None, "client_id": None},
+            "batch_priority": True,
+            "identity": TEST_IDENTITY,
+            "categories": [],
+            "schedule_run": None,
+            "batch_id": str(self.batch.batch_id),
+            "include_paths": None,
+            "exclude_paths": None,
+        }
+
+    def test_create_scans(self):
+        scan_requests = [self._scan_request(f"{self.org}/repo{i % 10}") for i in range(20)]
+
+        with CaptureQueriesContext(connection) as ctx:
+            AWSConnect().create_scans(scan_requests)
+
+        # The owner and batch are looked up once and the repos and scans are created in bulk
+        self.assertLessEqual(len(ctx.captured_queries), 7)
+        self.assertEqual(Repo.objects.filter(repo__startswith=f"{self.org}/").count(), 10)
+        scans = Scan.objects.filter(scan_id__in=[scan_request["scan_id"] for scan_request in scan_requests])
+        self.assertEqual(scans.count(), 20)
+        self.assertTrue(all(scan.batch_id == self.batch.pk for scan in scans))
+        self.assertTrue(all(scan.status == ScanStatus.QUEUED.value for scan in scans))
@@ -9,6 +9,7 @@ from django.core.exceptions import ValidationError
 
 from artemisdb.artemisdb.models import Repo, Scan
 from repo import get
+from repo.util.aws import LambdaError
 
 TEST_EVENT = {
     "service_id": "github",
@@ -322,3 +323,37 @@ class TestGet(unittest.TestCase):
         result = get.get_whitelist(TEST_EVENT["repo_id"], TEST_EVENT["service_id"], item_type=test_item_type)
 
         self.assertEqual([], result)
+
+    @patch.object(get, "report_with_download")
+    @patch.object(get, "AWSConnect")
+    @patch.object(get, "JSON_REPORT_QUEUE", "json-report-queue")
+    @patch.object(get, "JSON_REPORT_LAMBDA", "json-report")
+    @patch.object(get, "User")
+    @patch.object(get, "Report")
+    @patch.object(get, "Repo")
+    def test_get_report_stream(self, mock_repo, mock_report, _mock_user, mock_aws, mock_report_with_download):
+        scan = TEST_SCANS[0]
+        mock_repo.objects.get.return_value.scan_set.get.return_value = scan
+        mock_report_with_download.return_value = {"status": "queued", "download": None}
+        params = {"format": "full", "filter_diff": True, "stream": True}
+
+        result = get.get_report(
+            TEST_EVENT["repo_id"], TEST_EVENT["service_id"], scan_id=str(scan.scan_id), params=params, user="user"
+        )
+
+        # The report is queued to be streamed to S3 by the JSON report Lambda instead of waiting for it
+        report = mock_report.objects.create.return_value
+        self.assertEqual(mock_report.objects.create.call_args.kwargs["report_type"], "json")
+        self.assertEqual(mock_report.objects.create.call_args.kwargs["status"], "queued")
+        self.assertEqual(mock_report.objects.create.call_args.kwargs["filters"], params)
+        mock_aws.return_value.queue_report.assert_called_once_with(str(report.report_id), "json-report-queue")
+        mock_aws.return_value.invoke_lambda.assert_not_called()
+        mock_report_with_download.assert_called_once_with(report)
+        self.assertEqual(result, mock_report_with_download.return_value)
+
+        # The report isn't returned if it couldn't be queued
+        mock_aws.return_value.queue_report.return_value = False
+        with self.assertRaises(LambdaError):
+            get.get_report(
+                TEST_EVENT["repo_id"], TEST_EVENT["service_id"], scan_id=str(scan.scan_id), params=params, user="user"
+            )
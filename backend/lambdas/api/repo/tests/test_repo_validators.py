@@ -490,6 +490,31 @@ class TestValidators(unittest.TestCase):
                 with self.assertRaises(ValidationError):
                     self.validator.validate_request_query(test_case)
 
+    def test_validate_stream(self):
+        base_event = {
+            "service_id": "service",
+            "repo_id": "org/repo",
+            "resource_id": "877d2023-4a44-4d01-84ec-e80bedaf7f3d",
+            "query_params": {},
+            "body": None,
+        }
+        for query_params, expected in [
+            ({"stream": [""]}, True),
+            ({"stream": ["true"], "format": ["full"]}, True),
+            ({"stream": ["false"], "format": ["summary"]}, False),
+            ({"format": ["full"]}, None),
+        ]:
+            with self.subTest(query_params=query_params):
+                event = {**copy.deepcopy(base_event), "query_params": query_params}
+                self.validator.validate_request_query(event)
+                self.assertEqual(event["query_params"].get("stream"), expected)
+
+        # The report can only be streamed in the full format
+        for query_params in [{"stream": ["true"], "format": ["summary"]}, {"stream": ["foo"]}]:
+            with self.subTest(query_params=query_params):
+                with self.assertRaises(ValidationError):
+                    self.validator.validate_request_query({**copy.deepcopy(base_event), "query_params": query_params})
+
     def test_path_validators(self):
         test_cases = ["./foo", "/foo", "../foo", "foo/../../../bar", "A" * 4097, "foo\0bar", "$FOOBAR"]
         for test_case in test_cases:
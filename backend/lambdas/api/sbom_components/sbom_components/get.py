@@ -85,7 +85,7 @@ def _component_list(name: str, paging, scope: list[list[list[str]]]):
     if name:
         api_resource = f"{api_resource}/{name}"
 
-    return page(components, paging.offset, paging.limit, api_resource, query_str=paging.query_str)
+    return page(components, paging.offset, paging.limit, api_resource, query_str=paging.query_str, paging=paging)
 
 
 def _repo_list(name: str, version: str, paging, scope: list[list[list[str]]]):
@@ -114,5 +114,10 @@ def _repo_list(name: str, version: str, paging, scope: list[list[list[str]]]):
         repos = repos.order_by("service", "repo")
 
     return page(
-        repos, paging.offset, paging.limit, f"sbom/components/{name}/{version}/repos", query_str=paging.query_str
+        repos,
+        paging.offset,
+        paging.limit,
+        f"sbom/components/{name}/{version}/repos",
+        query_str=paging.query_str,
+        paging=paging,
     )
@@ -33,6 +33,7 @@ class ParsedEvent:
                 substring_filters=["service", "repo"],
                 timestamp_filters=["last_scan"],
                 ordering_fields=["service", "repo"],
+                cursor_paging=True,
             )
             return
 
@@ -50,6 +51,7 @@ class ParsedEvent:
                 timestamp_filters=["last_scan"],
                 nullable_filters=["license"],
                 ordering_fields=["version", "service", "repo"],
+                cursor_paging=True,
             )
             return
 
@@ -60,4 +62,5 @@ class ParsedEvent:
             timestamp_filters=["last_scan"],
             nullable_filters=["license"],
             ordering_fields=["name", "version", "service", "repo"],
+            cursor_paging=True,
         )
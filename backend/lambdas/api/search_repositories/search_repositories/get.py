@@ -74,6 +74,7 @@ def _get_repos(paging: PageInfo, query: dict[str, str], scope: list[list[list[st
         "search/repositories",
         query_str=paging.query_str,
         to_dict_kwargs={"include_scan": True, "include_qualified_scan": True, "include_app_metadata": True},
+        paging=paging,
     )
 
 
@@ -16,6 +16,7 @@ class ParsedEvent:
             mv_filters=["risk"],
             mv_validators={"risk": validate_risk_value},
             api_id=SearchRepositoriesAPIIdentifier.GET.value,
+            cursor_paging=True,
         )
 
 
@@ -1,3 +1,5 @@
+from django.db.models import QuerySet
+
 from artemisapi.response import response
 from artemisapi.validators import ValidationError
 from artemisdb.artemisdb.models import Repo, Scan
@@ -16,6 +18,24 @@ def get(event, admin: bool = False, authz: dict = None, **kwargs):
 
 
 def _get_scan_list(paging: PageInfo, admin: bool = False, scope: dict = False):
+    qs = get_scans(paging, admin=admin, scope=scope)
+
+    # Mimic DRF limit-offset paging
+    return page(
+        qs,
+        paging.offset,
+        paging.limit,
+        "search/scans",
+        query_str=paging.query_str,
+        to_dict_kwargs={"history_format": True},
+        paging=paging,
+    )
+
+
+def get_scans(paging: PageInfo, admin: bool = False, scope: dict = False) -> QuerySet:
+    """
+    Returns the scans matching the filters that are visible to the caller
+    """
     map = FilterMap()
     map.add_string("plugins", "plugin")
     map.add_string("batch__batch_id", "batch_id")
@@ -31,14 +51,4 @@ def _get_scan_list(paging: PageInfo, admin: bool = False, scope: dict = False):
     else:
         # Non-admin can get all scans within their scope
         qs = Scan.objects.filter(repo__in=Repo.in_scope(scope))
-    qs = apply_filters(qs, filter_map=map, page_info=paging, default_order=["-created"], distinct=False)
-
-    # Mimic DRF limit-offset paging
-    return page(
-        qs,
-        paging.offset,
-        paging.limit,
-        "search/scans",
-        query_str=paging.query_str,
-        to_dict_kwargs={"history_format": True},
-    )
+    return apply_filters(qs, filter_map=map, page_info=paging, default_order=["-created"], distinct=False)
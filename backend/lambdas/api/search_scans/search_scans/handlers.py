@@ -3,6 +3,7 @@ from http import HTTPStatus
 from artemisapi.authorizer import get_authorizer_info
 from artemisapi.response import response
 from search_scans.get import get
+from search_scans.post import post
 
 
 def handler(event, _):
@@ -14,5 +15,7 @@ def handler(event, _):
 
     if event.get("httpMethod") == "GET":
         return get(event, **auth)
+    elif event.get("httpMethod") == "POST":
+        return post(event, **auth)
     else:
         return response(code=HTTPStatus.METHOD_NOT_ALLOWED)
@@ -0,0 +1,49 @@
+from datetime import timezone
+
+from django.db.models import Max
+
+from artemisapi.response import response
+from artemisapi.validators import ValidationError
+from search_scans.get import get_scans
+from search_scans.util.events import ParsedEvent
+
+
+def post(event, admin: bool = False, authz: dict = None, **kwargs):
+    """
+    Checks, for each of a list of service/repo/branch combinations, whether a scan matching the query has been created
+    since the provided timestamp. This answers the same question as a GET for each combination but with one query.
+    """
+    try:
+        parsed_event = ParsedEvent(event, parse_body=True)
+    except ValidationError as e:
+        return response({"message": e.message}, e.code)
+
+    return response({"results": _scans_exist(parsed_event, admin=admin, scope=authz)})
+
+
+def _scans_exist(parsed_event: ParsedEvent, admin: bool = False, scope: dict = None) -> list[bool]:
+    scans = parsed_event.scans
+
+    qs = get_scans(parsed_event.paging, admin=admin, scope=scope).filter(
+        repo__service__in={scan["service"] for scan in scans},
+        repo__repo__in={scan["repo"] for scan in scans},
+    )
+    timestamps = [scan["created__gt"] for scan in scans if scan.get("created__gt") is not None]
+    if len(timestamps) == len(scans):
+        # Nothing older than the earliest timestamp can match
+        qs = qs.filter(created__gt=min(timestamps))
+
+    # Find the most recent matching scan of each repo+branch. Timestamps are stored in UTC but may be returned without a
+    # timezone so make sure they can be compared to the timestamps in the request.
+    latest = {
+        (item["repo__service"], item["repo__repo"], item["ref"]): (
+            item["latest"] if item["latest"].tzinfo else item["latest"].replace(tzinfo=timezone.utc)
+        )
+        for item in qs.order_by().values("repo__service", "repo__repo", "ref").annotate(latest=Max("created"))
+    }
+
+    results = []
+    for scan in scans:
+        created = latest.get((scan["service"], scan["repo"], scan.get("branch")))
+        results.append(created is not None and (scan.get("created__gt") is None or created > scan["created__gt"]))
+    return results
@@ -1,13 +1,26 @@
+import json
 from uuid import UUID
 
 from artemisapi.validators import ValidationError
 from artemisdb.artemisdb.paging import parse_paging_event
+from search_scans.util.validators import validate_post_body
 
 
 class ParsedEvent:
-    def __init__(self, event):
+    def __init__(self, event, parse_body: bool = False):
         self.batch_id = None
         self.description = None
+        self.scans = None
+
+        if parse_body:
+            try:
+                body = validate_post_body(json.loads(event.get("body") or ""))
+            except json.JSONDecodeError:
+                raise ValidationError("Invalid JSON in body")
+            self.scans = body["scans"]
+
+            # Filter the scans using the query in the body as if it were the query string
+            event = {"queryStringParameters": dict(body.get("query") or {})}
 
         self.query = event.get("queryStringParameters") or {}
 
@@ -25,4 +38,5 @@ class ParsedEvent:
             boolean_filters=["sbom"],
             ordering_fields=["created"],
             substring_filters=["plugin"],
+            cursor_paging=True,
         )
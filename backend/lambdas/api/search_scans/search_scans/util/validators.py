@@ -0,0 +1,45 @@
+from artemisapi.validators import ValidationError, validate_dict_keys, validate_dict_value_type
+from artemislib.datetime import from_iso_timestamp
+
+REQUIRED_POST_KEYS = ["scans"]
+OPTIONAL_POST_KEYS = ["query"]
+
+REQUIRED_SCAN_KEYS = ["service", "repo"]
+OPTIONAL_SCAN_KEYS = ["branch", "created__gt"]
+
+# Maximum number of scans that can be checked in a single request
+MAX_SCANS = 1000
+
+
+def validate_post_body(body: dict) -> dict:
+    if not isinstance(body, dict):
+        raise ValidationError("Body must be a dict")
+
+    validate_dict_keys(body, REQUIRED_POST_KEYS, OPTIONAL_POST_KEYS)
+
+    # The query uses the same filters as the query string of a GET request
+    validate_dict_value_type(body, "query", dict, str)
+
+    validate_dict_value_type(body, "scans", list, dict)
+    if not body["scans"]:
+        raise ValidationError("scans must not be empty")
+    if len(body["scans"]) > MAX_SCANS:
+        raise ValidationError(f"scans must not contain more than {MAX_SCANS} items")
+
+    for scan in body["scans"]:
+        validate_dict_keys(scan, REQUIRED_SCAN_KEYS, OPTIONAL_SCAN_KEYS)
+        validate_dict_value_type(scan, "service", str)
+        validate_dict_value_type(scan, "repo", str)
+
+        # A null branch is the default branch
+        if scan.get("branch") is not None:
+            validate_dict_value_type(scan, "branch", str)
+
+        if scan.get("created__gt") is not None:
+            validate_dict_value_type(scan, "created__gt", str)
+            try:
+                scan["created__gt"] = from_iso_timestamp(scan["created__gt"])
+            except ValueError:
+                raise ValidationError("Invalid timestamp")
+
+    return body
@@ -0,0 +1,100 @@
+import json
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from artemisapi.validators import ValidationError
+from artemisdb.artemisdb.models import Repo, Scan
+from search_scans.post import post
+from search_scans.util.validators import MAX_SCANS, validate_post_body
+
+NOW = datetime.now(timezone.utc)
+
+
+def _event(body) -> dict:
+    return {"httpMethod": "POST", "body": json.dumps(body)}
+
+
+class TestValidatePostBody(unittest.TestCase):
+    def test_valid(self):
+        body = validate_post_body(
+            {
+                "query": {"plugin__icontains": "trufflehog"},
+                "scans": [
+                    {"service": "github", "repo": "testorg/testrepo", "branch": None, "created__gt": NOW.isoformat()},
+                    {"service": "github", "repo": "testorg/testrepo", "branch": "dev"},
+                ],
+            }
+        )
+        self.assertEqual(body["scans"][0]["created__gt"], NOW)
+
+    def test_invalid(self):
+        scan = {"service": "github", "repo": "testorg/testrepo"}
+        for body in [
+            [],
+            {"scans": []},
+            {"scans": [scan] * (MAX_SCANS + 1)},
+            {"scans": [{"service": "github"}]},
+            {"scans": [{**scan, "branch": 1}]},
+            {"scans": [{**scan, "created__gt": "yesterday"}]},
+            {"scans": [{**scan, "ref": "dev"}]},
+        ]:
+            with self.subTest(body=body):
+                with self.assertRaises(ValidationError):
+                    validate_post_body(body)
+
+    def test_post_invalid_query(self):
+        resp = post(_event({"scans": [{"service": "github", "repo": "testorg/testrepo"}], "query": {"foo": "bar"}}))
+        self.assertEqual(resp["statusCode"], HTTPStatus.BAD_REQUEST)
+
+
+@pytest.mark.integtest
+class TestSearchScansPost(unittest.TestCase):
+    """
+    Test Class relies on the artemisdb docker container being up.
+    """
+
+    def setUp(self) -> None:
+        self.repos = [
+            Repo.objects.create(service="github", repo=f"testorg/test-{uuid.uuid4().hex[:8]}") for _ in range(2)
+        ]
+
+    def tearDown(self) -> None:
+        for repo in self.repos:
+            repo.delete()
+
+    def _scan(self, repo: Repo, ref: str, plugins: list, created: datetime) -> None:
+        scan = Scan.objects.create(repo=repo, scan_id=uuid.uuid4(), ref=ref, plugins=plugins)
+        Scan.objects.filter(pk=scan.pk).update(created=created)
+
+    def _check(self, repo: Repo, branch: str, since: datetime) -> dict:
+        return {"service": repo.service, "repo": repo.repo, "branch": branch, "created__gt": since.isoformat()}
+
+    def test_post(self):
+        a, b = self.repos
+        self._scan(a, None, ["trufflehog"], NOW - timedelta(hours=1))
+        self._scan(a, "dev", ["trufflehog"], NOW - timedelta(days=2))
+        self._scan(b, "dev", ["eslint"], NOW - timedelta(hours=1))
+
+        body = {
+            "query": {"plugin__icontains": "trufflehog"},
+            "scans": [
+                self._check(a, None, NOW - timedelta(days=1)),  # Recent scan of the default branch
+                self._check(a, "dev", NOW - timedelta(days=1)),  # Scan is too old
+                self._check(a, "dev", NOW - timedelta(days=3)),
+                self._check(b, "dev", NOW - timedelta(days=1)),  # Scan does not match the query
+                self._check(b, "main", NOW - timedelta(days=1)),  # No scans of the branch
+                {"service": a.service, "repo": a.repo},  # Any matching scan of the default branch
+            ],
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            resp = post(_event(body), admin=True)
+
+        self.assertEqual(resp["statusCode"], HTTPStatus.OK)
+        self.assertEqual(json.loads(resp["body"])["results"], [True, False, True, False, False, True])
+        self.assertEqual(len(ctx.captured_queries), 1)
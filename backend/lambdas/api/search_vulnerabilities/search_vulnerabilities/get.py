@@ -112,6 +112,7 @@ def _get_vuln_repos(vuln_id: str, paging: PageInfo, admin: bool = False, scope:
         f"search/vulnerabilities/{vuln_id}/repositories",
         query_str=paging.query_str,
         to_dict_kwargs={"include_qualified_scan": True, "include_app_metadata": True},
+        paging=paging,
     )
 
 
@@ -137,7 +138,7 @@ def _get_vuln_list(paging: PageInfo, admin: bool = False, scope: dict = False):
     )
 
     # Mimic DRF limit-offset paging
-    return page(qs, paging.offset, paging.limit, "search/vulnerabilities", query_str=paging.query_str)
+    return page(qs, paging.offset, paging.limit, "search/vulnerabilities", query_str=paging.query_str, paging=paging)
 
 
 ###############################################################################
@@ -47,6 +47,7 @@ class ParsedEvent:
                 mv_filters=["plugin", "severity"],
                 mv_validators={"severity": validate_severity_value, "plugin": validate_plugin_value},
                 api_id=SearchVulnerabilitiesAPIIdentifier.GET_VULNS.value,
+                cursor_paging=True,
             )
         elif self.resource.lower() in (RESOURCE_REPOS_LONG, RESOURCE_REPOS_SHORT):
             self.paging = parse_paging_event(
@@ -59,6 +60,7 @@ class ParsedEvent:
                 mv_filters=["risk"],
                 mv_validators={"risk": validate_risk_value},
                 api_id=SearchVulnerabilitiesAPIIdentifier.GET_REPOS.value,
+                cursor_paging=True,
             )
         else:
             raise ValidationError(f"Invalid resource: {self.resource}")
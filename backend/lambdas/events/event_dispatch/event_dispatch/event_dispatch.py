@@ -1,6 +1,8 @@
+import fnmatch
 import json
 import os
-from fnmatch import fnmatch
+import re
+from typing import Optional
 
 import boto3
 from botocore.exceptions import ClientError
@@ -57,12 +59,87 @@ if "secrets" in ADDITIONAL_ROUTING and type(ADDITIONAL_ROUTING["secrets"]) is li
         SECRETS_MANAGEMENT[route["id"]] = route["queue"]
 
 
-def handler(event, _):
-    for item in event["Records"]:
-        process(json.loads(item["body"]))
+# SQS accepts up to 10 messages and 256 KiB per SendMessageBatch request
+MAX_BATCH_MESSAGES = 10
+MAX_BATCH_BYTES = 256 * 1024
+
+# Max number of repos the secrets management processes are cached for while the Lambda instance is reused
+MAX_ROUTER_CACHE = 10000
+
+
+class SecretsManagementRouter:
+    """
+    Compiled form of the secrets management include/exclude globs in services.json.
+
+    Each process's globs are translated into a single regex so that routing an event is one match per process instead
+    of an fnmatch() per glob. The processes are also cached per repo since a scan emits many events for the same repo.
+    """
+
+    def __init__(self, services: dict) -> None:
+        self.services = {}
+        for service, config in services["services"].items():
+            sm = config.get("secrets_management", {})
+            self.services[service] = [
+                (
+                    process,
+                    _compile_globs(sm[process].get("include", [])),
+                    _compile_globs(sm[process].get("exclude", [])),
+                )
+                for process in sm
+            ]
+        self._cache = {}
+
+    def processes(self, service: str, repo: str) -> list:
+        key = (service, repo)
+        if key not in self._cache:
+            if len(self._cache) >= MAX_ROUTER_CACHE:
+                self._cache.clear()
+            self._cache[key] = [
+                process
+                for process, include, exclude in self.services.get(service, [])
+                # Matching on an exclusion overrides inclusion
+                if include is not None and include.match(repo) and (exclude is None or not exclude.match(repo))
+            ]
+        return self._cache[key]
+
+
+def _compile_globs(globs: list) -> Optional[re.Pattern]:
+    if not globs:
+        return None
+    return re.compile("|".join(f"(?:{fnmatch.translate(glob)})" for glob in globs))
+
+
+ROUTER = None
+if S3_BUCKET:
+    ROUTER = SecretsManagementRouter(SERVICES)
 
 
-def process(event):
+def handler(event, _):
+    messages = {}  # Queue URL -> list of (record message ID, message body)
+    failures = set()
+
+    for item in event["Records"]:
+        try:
+            for queue, body in process(json.loads(item["body"])):
+                messages.setdefault(queue, []).append((item["messageId"], body))
+        except (ValueError, KeyError, TypeError) as e:
+            # The event is malformed so retrying it won't help
+            print(f"Unable to process record {item['messageId']}: {e}")
+
+    # Forward the events to each queue in batches instead of one message at a time
+    for queue, queue_messages in messages.items():
+        failures.update(send_messages(queue, queue_messages))
+
+    # Records that failed are retried by SQS. Successfully processed records are removed from the queue.
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in sorted(failures)]}
+
+
+def process(event) -> list:
+    """
+    Determines where the event is forwarded to
+    :return: List of (queue URL, message body) tuples
+    """
+    messages = []
     if event["type"] == "secrets":
         # Get all of the secrets management processes that are applicable for this event
         processes = determine_secrets_management_processes(event)
@@ -78,59 +155,65 @@ def process(event):
             if not SECRETS_ENABLED and SECRETS_MANAGEMENT[process] == SECRETS_QUEUE:
                 continue
 
-            try:
-                # Forward the event along by putting it in the queue consumed by this secrets management process
-                SQS.send_message(QueueUrl=SECRETS_MANAGEMENT[process], MessageBody=json.dumps(event))
-            except ClientError as e:
-                print(f"Unable to queue secrets event to {SECRETS_MANAGEMENT[process]}: {e}")
+            # Forward the event along by putting it in the queue consumed by this secrets management process
+            messages.append((SECRETS_MANAGEMENT[process], json.dumps(event)))
     elif event["type"] == "audit":
-        try:
-            SQS.send_message(QueueUrl=AUDIT_QUEUE, MessageBody=json.dumps(event["event"]))
-        except ClientError as e:
-            print(f"Unable to queue audit event to {AUDIT_QUEUE}: {e}")
+        messages.append((AUDIT_QUEUE, json.dumps(event["event"])))
     elif event["type"] in ADDITIONAL_ROUTING:
-        try:
-            SQS.send_message(QueueUrl=ADDITIONAL_ROUTING[event["type"]], MessageBody=json.dumps(event))
-        except ClientError as e:
-            print(f"Unable to queue {event['type']} event to {ADDITIONAL_ROUTING[event['type']]}: {e}")
+        messages.append((ADDITIONAL_ROUTING[event["type"]], json.dumps(event)))
     else:
         print(f"Unknown event type: {str(event.get('type'))}")
+    return messages
+
+
+def send_messages(queue: str, messages: list) -> set:
+    """
+    Sends the messages to the queue with SendMessageBatch
+    :param messages: List of (record message ID, message body) tuples
+    :return: Message IDs of the records that could not be sent
+    """
+    failures = set()
+    for batch in _batches(messages):
+        # The entry IDs only need to be unique within the request
+        entries = {str(i): message for i, message in enumerate(batch)}
+        try:
+            resp = SQS.send_message_batch(
+                QueueUrl=queue, Entries=[{"Id": i, "MessageBody": body} for i, (_, body) in entries.items()]
+            )
+        except ClientError as e:
+            print(f"Unable to queue {len(batch)} events to {queue}: {e}")
+            failures.update(message_id for message_id, _ in batch)
+            continue
 
+        for failed in resp.get("Failed", []):
+            print(f"Unable to queue event to {queue}: {failed.get('Code')} {failed.get('Message')}")
+            if not failed.get("SenderFault"):
+                # Only retry the failures that weren't caused by the message itself, like throttling
+                failures.add(entries[failed["Id"]][0])
+    return failures
+
+
+def _batches(messages: list):
+    # Split the messages into batches that are within both of the SendMessageBatch limits
+    batch = []
+    size = 0
+    for message in messages:
+        message_size = len(message[1].encode("utf-8"))
+        if batch and (len(batch) == MAX_BATCH_MESSAGES or size + message_size > MAX_BATCH_BYTES):
+            yield batch
+            batch = []
+            size = 0
+        batch.append(message)
+        size += message_size
+    if batch:
+        yield batch
 
-def determine_secrets_management_processes(event: dict, services: dict = None) -> list:
-    processes = []
 
+def determine_secrets_management_processes(event: dict, services: dict = None) -> list:
     if services is None:
-        services = SERVICES
-
-    # Get the secrets_management config from the services dict
-    sm = services["services"].get(event["service"], {}).get("secrets_management", {})
-
-    # Loop through each named process
-    for process in sm:
-        include_process = False
-
-        # Check all the inclusion globs to see if the repo matches
-        for include in sm[process].get("include", []):
-            if fnmatch(event["repo"], include):
-                # Repo matches so this process will be included
-                include_process = True
-                break
-
-        if not include_process:
-            # Repo didn't match an inclusion glob so no need to check the exclusions
-            continue
-
-        # Check all of the exclude globs to see if the repo matches
-        for exclude in sm[process].get("exclude", []):
-            if fnmatch(event["repo"], exclude):
-                # Matching on an exclusion overrides inclusion
-                include_process = False
-                break
-
-        # Repo is still marked as included in this process so add it to the list
-        if include_process:
-            processes.append(process)
+        router = ROUTER
+    else:
+        router = SecretsManagementRouter(services)
 
     # Return the list of all included secrets management processes
-    return processes
+    return list(router.processes(event["service"], event["repo"]))
@@ -0,0 +1,69 @@
+import json
+import unittest
+from unittest.mock import patch
+
+import botocore.exceptions
+
+try:
+    from event_dispatch import event_dispatch
+except (botocore.exceptions.ClientError, botocore.exceptions.NoCredentialsError, botocore.exceptions.ProfileNotFound):
+    raise unittest.SkipTest("Unit Test requires AWS Credentials to run. Skipping.")
+
+AUDIT_QUEUE = "https://sqs.us-east-1.amazonaws.com/123456789012/audit"
+METADATA_QUEUE = "https://sqs.us-east-1.amazonaws.com/123456789012/metadata"
+
+
+def _record(message_id: str, event: dict) -> dict:
+    return {"messageId": message_id, "body": json.dumps(event)}
+
+
+class TestDispatch(unittest.TestCase):
+    def setUp(self) -> None:
+        for patcher in [
+            patch.object(event_dispatch, "SQS", create=True),
+            patch.object(event_dispatch, "AUDIT_QUEUE", AUDIT_QUEUE),
+            patch.object(event_dispatch, "ADDITIONAL_ROUTING", {"metadata": METADATA_QUEUE}),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        event_dispatch.SQS.send_message_batch.return_value = {"Successful": [], "Failed": []}
+
+    def test_handler_batches(self):
+        records = [_record(f"audit-{i}", {"type": "audit", "event": {"i": i}}) for i in range(25)]
+        records.append(_record("metadata", {"type": "metadata", "repo": "org/repo"}))
+
+        actual = event_dispatch.handler({"Records": records}, None)
+
+        self.assertEqual(actual, {"batchItemFailures": []})
+        calls = event_dispatch.SQS.send_message_batch.call_args_list
+        # The messages are grouped by queue and sent up to 10 at a time
+        self.assertEqual(
+            [(call.kwargs["QueueUrl"], len(call.kwargs["Entries"])) for call in calls],
+            [(AUDIT_QUEUE, 10), (AUDIT_QUEUE, 10), (AUDIT_QUEUE, 5), (METADATA_QUEUE, 1)],
+        )
+        self.assertEqual(json.loads(calls[1].kwargs["Entries"][0]["MessageBody"]), {"i": 10})
+
+    def test_handler_failures(self):
+        def send_message_batch(QueueUrl, Entries):
+            if QueueUrl == METADATA_QUEUE:
+                raise botocore.exceptions.ClientError({"Error": {"Code": "ThrottlingException"}}, "SendMessageBatch")
+            return {
+                "Failed": [
+                    {"Id": Entries[1]["Id"], "Code": "InternalError", "SenderFault": False},
+                    {"Id": Entries[2]["Id"], "Code": "InvalidMessageContents", "SenderFault": True},
+                ]
+            }
+
+        event_dispatch.SQS.send_message_batch.side_effect = send_message_batch
+        records = [_record(f"audit-{i}", {"type": "audit", "event": {"i": i}}) for i in range(3)]
+        records.append(_record("metadata", {"type": "metadata", "repo": "org/repo"}))
+        records.append({"messageId": "malformed", "body": "{"})
+
+        actual = event_dispatch.handler({"Records": records}, None)
+
+        # Only the records that could be sent if they are retried are reported as failures
+        self.assertEqual(actual, {"batchItemFailures": [{"itemIdentifier": "audit-1"}, {"itemIdentifier": "metadata"}]})
+
+    def test_batches_size(self):
+        messages = [(str(i), "x" * 100 * 1024) for i in range(5)]
+        self.assertEqual([len(batch) for batch in event_dispatch._batches(messages)], [2, 2, 1])
@@ -3,7 +3,7 @@ import unittest
 import botocore.exceptions
 
 try:
-    from event_dispatch.event_dispatch import determine_secrets_management_processes
+    from event_dispatch.event_dispatch import SecretsManagementRouter, determine_secrets_management_processes
 except (botocore.exceptions.ClientError, botocore.exceptions.NoCredentialsError, botocore.exceptions.ProfileNotFound):
     raise unittest.SkipTest("Unit Test requires AWS Credentials to run. Skipping.")
 
@@ -51,3 +51,10 @@ class TestValidators(unittest.TestCase):
             with self.subTest(test_case=test_case):
                 actual = determine_secrets_management_processes(test_case["event"], SERVICES)
                 self.assertEqual(test_case["expected"], actual)
+
+    def test_router_cache(self):
+        router = SecretsManagementRouter(SERVICES)
+        self.assertEqual(router.processes("service4", "org/foobar"), ["process1", "process2"])
+        self.assertEqual(router.processes("service4", "org/foobar"), ["process1", "process2"])
+        self.assertEqual(router.processes("unknown", "org/foobar"), [])
+        self.assertEqual(len(router._cache), 2)
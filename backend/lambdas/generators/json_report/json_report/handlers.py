@@ -1,8 +1,20 @@
-from json_report.report import get_report
+import json
+
+from json_report.report import get_report, stream_queued_report, stream_report
 
 
 def handler(event, _=None):
+    if "Records" in event:
+        # Full reports queued by the API are streamed to S3
+        for record in event["Records"]:
+            stream_queued_report(json.loads(record["body"])["report_id"])
+        return None
+
     scan_id = event["scan_id"]
     params = event["filters"]
 
+    if event.get("report_id"):
+        # Stream the report to S3 and return a pointer to it instead of returning the report itself
+        return stream_report(scan_id, params, event["report_id"])
+
     return get_report(scan_id, params)
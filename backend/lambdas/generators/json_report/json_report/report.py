@@ -1,4 +1,15 @@
-from artemisdb.artemisdb.models import Scan
+import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional
+
+from django.db import connection
+
+from artemisdb.artemisdb.consts import PluginType, ReportStatus
+from artemisdb.artemisdb.models import PluginResult, Report, Scan
+from artemislib.aws import AWSConnect, S3MultipartWriter
+from artemislib.logging import Logger
 from json_report.results.configuration import get_configuration
 from json_report.results.inventory import get_inventory
 from json_report.results.results import PLUGIN_RESULTS, PluginErrors
@@ -6,89 +17,215 @@ from json_report.results.sbom import get_sbom
 from json_report.results.secret import get_secrets
 from json_report.results.static_analysis import get_static_analysis
 from json_report.results.vuln import get_vulns
-from json_report.util.const import FORMAT_FULL
+from json_report.util.const import FORMAT_FULL, JSON_REPORT_S3_KEY
+from json_report.util.env import REPORT_WORKERS
+
+LOG = Logger(__name__)
+
+# The report categories, in report order, with the plugin type and the method that unifies the plugin results
+CATEGORIES = {
+    "vulnerabilities": (PluginType.VULN, get_vulns),
+    "secrets": (PluginType.SECRETS, get_secrets),
+    "sbom": (PluginType.SBOM, lambda scan, _params, plugin_results: get_sbom(scan, plugin_results)),
+    "static_analysis": (PluginType.STATIC_ANALYSIS, get_static_analysis),
+    "inventory": (PluginType.INVENTORY, lambda scan, _params, plugin_results: get_inventory(scan, plugin_results)),
+    "configuration": (PluginType.CONFIGURATION, get_configuration),
+}
+
+# The categories that are included in the results and results summary of the report
+RESULTS = ["vulnerabilities", "secrets", "static_analysis", "inventory", "configuration"]
+
+# The PluginResult fields that are used to generate the report
+PLUGIN_RESULT_FIELDS = ["plugin_name", "plugin_type", "details", "errors", "alerts", "debug"]
 
 
 def get_report(scan_id, params=None):
+    scan = _get_scan(scan_id)
+    if scan is None:
+        return None
+
+    report, results = _build_report(scan, params)
+
+    if params["format"] == FORMAT_FULL:
+        report["results"] = {category: results[category].findings for category in RESULTS}
+    else:
+        report["results"] = {}
+
+    return report
+
+
+def stream_report(scan_id, params: dict, report_id: str) -> Optional[dict]:
+    """
+    Generates the full report and streams it to S3 instead of returning it so that the size of the report is not
+    limited by the Lambda's memory or response size. The report record is updated with the location of the report.
+    :return: Pointer to the report in S3, or None if the scan does not exist
+    """
+    scan = _get_scan(scan_id)
+    if scan is None:
+        Report.objects.filter(report_id=report_id).update(status=ReportStatus.FAILED.value)
+        return None
+
+    s3_key = JSON_REPORT_S3_KEY % report_id
+    try:
+        LOG.info("Streaming report for scan %s to %s", scan.scan_id, s3_key)
+        with AWSConnect().open_s3_multipart_writer(s3_key) as writer:
+            _write_report(writer, scan, params)
+    except Exception:
+        Report.objects.filter(report_id=report_id).update(status=ReportStatus.FAILED.value)
+        raise
+
+    Report.objects.filter(report_id=report_id).update(
+        status=ReportStatus.COMPLETED.value, s3_key=s3_key, completed=datetime.now(timezone.utc)
+    )
+    LOG.info("Streamed %d bytes", writer.size)
+
+    return {"report_id": str(report_id), "s3_key": s3_key, "size": writer.size}
+
+
+def stream_queued_report(report_id: str) -> Optional[dict]:
+    """
+    Streams a report that was queued by the API to S3, using the filters that were saved with the report
+    :return: Pointer to the report in S3, or None if the report could not be generated
+    """
     try:
-        scan = Scan.objects.get(scan_id=scan_id)
+        report = Report.objects.get(report_id=report_id)
+    except Report.DoesNotExist:
+        LOG.error("Unable to locate report %s, aborting", report_id)
+        return None
+
+    Report.objects.filter(report_id=report_id).update(status=ReportStatus.PROCESSING.value)
+    try:
+        return stream_report(report.scan_id, report.filters, report_id)
+    except Exception as e:  # pylint: disable=broad-except
+        # The report has been marked as failed so don't raise, which would have the queue deliver it again
+        LOG.exception("Unable to generate report %s: %s", report_id, e)
+        return None
+
+
+def _get_scan(scan_id) -> Optional[Scan]:
+    try:
+        return Scan.objects.select_related("repo").get(scan_id=scan_id)
     except Scan.DoesNotExist:
         return None
 
-    vuln_results = PLUGIN_RESULTS({}, PluginErrors(), True, None)
-    secret_results = PLUGIN_RESULTS({}, PluginErrors(), True, None)
-    sbom_results = PLUGIN_RESULTS({}, PluginErrors(), True, None)
-    sa_results = PLUGIN_RESULTS({}, PluginErrors(), True, None)
-    inv_results = PLUGIN_RESULTS({}, PluginErrors(), True, None)
-    config_results = PLUGIN_RESULTS({}, PluginErrors(), True, None)
 
-    # Initialize the errors
-    errors = PluginErrors()
-    errors.update(scan, name_override="Setup")
+def _build_report(scan: Scan, params: dict) -> tuple[dict, dict[str, PLUGIN_RESULTS]]:
+    """
+    Generates the requested report categories and builds the report, except for the results
+    :return: Tuple of the report and the results of each category
+    """
+    results = _empty_results()
+    results.update(_get_results(scan, params, _get_categories(params)))
+    return _report_header(scan, results), results
 
+
+def _get_categories(params: dict) -> list[str]:
     #    There are two use cases
     # 1. the user did not specify any "results" thus there is no 'results' key,
     #    so we want to generate reports for all three plugin categories.
     # 2. the user specified "results", giving params a "results" key with a list of values.
     #    We now want to see if each plugin category is one of the values.
-    if "results" not in params or "vulnerabilities" in params["results"]:
-        vuln_results = get_vulns(scan, params)
-
-    if "results" not in params or "secrets" in params["results"]:
-        secret_results = get_secrets(scan, params)
-
-    if "results" not in params or "sbom" in params["results"]:
-        sbom_results = get_sbom(scan)
-
-    if "results" not in params or "static_analysis" in params["results"]:
-        sa_results = get_static_analysis(scan, params)
-
-    if "results" not in params or "inventory" in params["results"]:
-        inv_results = get_inventory(scan)
-
-    if "results" not in params or "configuration" in params["results"]:
-        config_results = get_configuration(scan, params)
-
-    errors.update(vuln_results.errors)
-    errors.update(secret_results.errors)
-    errors.update(sbom_results.errors)
-    errors.update(sa_results.errors)
-    errors.update(inv_results.errors)
-    errors.update(config_results.errors)
-
-    success = (
-        vuln_results.success
-        and secret_results.success
-        and sbom_results.success
-        and sa_results.success
-        and inv_results.success
-        and config_results.success
-    )
+    return [category for category in CATEGORIES if "results" not in params or category in params["results"]]
+
+
+def _empty_results() -> dict[str, PLUGIN_RESULTS]:
+    return {category: PLUGIN_RESULTS({}, PluginErrors(), True, None) for category in CATEGORIES}
+
+
+def _report_header(scan: Scan, results: dict[str, PLUGIN_RESULTS]) -> dict:
+    """
+    Builds the report, except for the results, from the errors and summaries of the results of each category
+    """
+    # Initialize the errors
+    errors = PluginErrors()
+    errors.update(scan, name_override="Setup")
+    for category in CATEGORIES:
+        errors.update(results[category].errors)
 
     report = scan.to_dict()
     report["application_metadata"] = scan.formatted_application_metadata()
-    report["success"] = success
+    report["success"] = all(results[category].success for category in CATEGORIES)
     report["truncated"] = False  # Legacy field, static value
     report["errors"] = errors.errors
     report["alerts"] = errors.alerts
     report["debug"] = errors.debug
-    report["results_summary"] = {
-        "vulnerabilities": vuln_results.summary,
-        "secrets": secret_results.summary,
-        "static_analysis": sa_results.summary,
-        "inventory": inv_results.summary,
-        "configuration": config_results.summary,
-    }
+    report["results_summary"] = {category: results[category].summary for category in RESULTS}
+    return report
 
-    if params["format"] == FORMAT_FULL:
-        report["results"] = {
-            "vulnerabilities": vuln_results.findings,
-            "secrets": secret_results.findings,
-            "static_analysis": sa_results.findings,
-            "inventory": inv_results.findings,
-            "configuration": config_results.findings,
+
+def _get_results(scan: Scan, params: dict, categories: list[str]) -> dict[str, PLUGIN_RESULTS]:
+    """
+    Loads the plugin results of the categories in a single pass and then unifies each category concurrently
+    """
+    if not categories:
+        return {}
+
+    plugin_types = {CATEGORIES[category][0].value: category for category in categories}
+    plugin_results = defaultdict(list)
+    for plugin_result in _plugin_results(scan, list(plugin_types)):
+        plugin_results[plugin_types[plugin_result.plugin_type]].append(plugin_result)
+
+    with ThreadPoolExecutor(max_workers=max(REPORT_WORKERS, 1)) as executor:
+        futures = {
+            category: executor.submit(_get_category, category, scan, params, plugin_results[category])
+            for category in categories
         }
-    else:
-        report["results"] = {}
+        return {category: future.result() for category, future in futures.items()}
 
-    return report
+
+def _plugin_results(scan: Scan, plugin_types: list[str]) -> Iterator[PluginResult]:
+    return scan.pluginresult_set.filter(plugin_type__in=plugin_types).only(*PLUGIN_RESULT_FIELDS).iterator()
+
+
+def _get_category(category: str, scan: Scan, params: dict, plugin_results: Iterable) -> PLUGIN_RESULTS:
+    try:
+        return CATEGORIES[category][1](scan, params, plugin_results)
+    finally:
+        # Django opens a database connection per thread so close it when the worker is done with it
+        connection.close()
+
+
+def _write_report(writer: S3MultipartWriter, scan: Scan, params: dict) -> None:
+    """
+    Generates the report one category at a time, writing the findings of each category before generating the next,
+    so that only one category's findings are held in memory at once. The rest of the report depends on the results of
+    all of the categories so it is written after the results.
+    """
+    categories = _get_categories(params)
+    results = _empty_results()
+
+    writer.write('{"results": {')
+    for category in CATEGORIES:
+        if category in categories:
+            # The plugin results are unified as they are loaded rather than being loaded first
+            plugin_results = _plugin_results(scan, [CATEGORIES[category][0].value])
+            results[category] = CATEGORIES[category][1](scan, params, plugin_results)
+
+        if category in RESULTS:
+            if category != RESULTS[0]:
+                writer.write(", ")
+            writer.write(f"{json.dumps(category)}: ")
+            _write_findings(writer, results[category].findings)
+
+        # Only the errors and summary are needed from here on
+        results[category] = results[category]._replace(findings=None)
+    writer.write("}")
+
+    header = json.dumps(_report_header(scan, results))
+    if header != "{}":
+        writer.write(", ")
+        writer.write(header[1:-1])
+    writer.write("}")
+
+
+def _write_findings(writer: S3MultipartWriter, findings) -> None:
+    if not isinstance(findings, dict):
+        writer.write(json.dumps(findings))
+        return
+
+    writer.write("{")
+    for i, (key, value) in enumerate(findings.items()):
+        if i:
+            writer.write(", ")
+        writer.write(f"{json.dumps(key)}: {json.dumps(value)}")
+    writer.write("}")
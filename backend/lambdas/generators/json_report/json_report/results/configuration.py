@@ -1,14 +1,15 @@
 from datetime import datetime, timezone
+from typing import Iterable
 
 from artemisdb.artemisdb.consts import PluginType
-from artemisdb.artemisdb.models import AllowListType, Scan
+from artemisdb.artemisdb.models import AllowListType, PluginResult, Scan
+from artemislib.allowlist import AllowList
 from django.db.models import Q
 from json_report.results.results import PLUGIN_RESULTS, PluginErrors
-from json_report.util.const import SEVERITY, WL_CONFIGURATION_KEYS
-from json_report.util.util import dict_eq
+from json_report.util.const import SEVERITY
 
 
-def get_configuration(scan: Scan, params: dict) -> PLUGIN_RESULTS:
+def get_configuration(scan: Scan, params: dict, plugin_results: Iterable[PluginResult] = None) -> PLUGIN_RESULTS:
     """
     Unify the output of configuration plugins
     NOTE: unit tests are located at backend/lambdas/generators/json_report/tests/test_generate_report.py
@@ -28,15 +29,19 @@ def get_configuration(scan: Scan, params: dict) -> PLUGIN_RESULTS:
     filtered_severities = params.get("severity", SEVERITY)
 
     # Pull the non-expired static analysis items AllowList once
-    allow_list = list(
+    allow_list = AllowList.for_type(
         scan.repo.allowlistitem_set.filter(
             Q(item_type=AllowListType.CONFIGURATION.value),
             Q(expires=None) | Q(expires__gt=datetime.now(timezone.utc)),
-        )
+        ),
+        AllowListType.CONFIGURATION.value,
     )
 
+    if plugin_results is None:
+        plugin_results = scan.pluginresult_set.filter(plugin_type=PluginType.CONFIGURATION.value)
+
     plugin = _empty = object()
-    for plugin in scan.pluginresult_set.filter(plugin_type=PluginType.CONFIGURATION.value):
+    for plugin in plugin_results:
         errors.update(plugin)
 
         if plugin.details:
@@ -77,8 +82,5 @@ def get_configuration(scan: Scan, params: dict) -> PLUGIN_RESULTS:
     return PLUGIN_RESULTS(configuration, errors, True, summary)
 
 
-def allowlisted_configuration(item, allow_list):
-    for al_item in allow_list:
-        if dict_eq(al_item.value, item, WL_CONFIGURATION_KEYS):
-            return True
-    return False
+def allowlisted_configuration(item, allow_list: AllowList):
+    return allow_list.match(item)
@@ -1,16 +1,21 @@
+from typing import Iterable
+
 from artemisdb.artemisdb.consts import PluginType
-from artemisdb.artemisdb.models import Scan
+from artemisdb.artemisdb.models import PluginResult, Scan
 
 from json_report.results.results import PLUGIN_RESULTS, PluginErrors
 
 
-def get_inventory(scan: Scan) -> PLUGIN_RESULTS:
+def get_inventory(scan: Scan, plugin_results: Iterable[PluginResult] = None) -> PLUGIN_RESULTS:
     inventory = {}
     errors = PluginErrors()
     summary = {}
 
+    if plugin_results is None:
+        plugin_results = scan.pluginresult_set.filter(plugin_type=PluginType.INVENTORY.value)
+
     plugin = _empty = object()
-    for plugin in scan.pluginresult_set.filter(plugin_type=PluginType.INVENTORY.value):
+    for plugin in plugin_results:
         errors.update(plugin)
 
         if not plugin.details:
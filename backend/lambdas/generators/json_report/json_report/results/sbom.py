@@ -1,9 +1,11 @@
+from typing import Iterable
+
 from artemisdb.artemisdb.consts import PluginType
-from artemisdb.artemisdb.models import Scan
+from artemisdb.artemisdb.models import PluginResult, Scan
 from json_report.results.results import PLUGIN_RESULTS, PluginErrors
 
 
-def get_sbom(scan: Scan) -> PLUGIN_RESULTS:
+def get_sbom(scan: Scan, plugin_results: Iterable[PluginResult] = None) -> PLUGIN_RESULTS:
     """
     Unify the output of sbom plugins. We deliberately omit the `details` property in the database
     (since SBOM results are stored in s3), so this returns no scan results or summary. This will
@@ -18,8 +20,11 @@ def get_sbom(scan: Scan) -> PLUGIN_RESULTS:
 
     errors = PluginErrors()
 
+    if plugin_results is None:
+        plugin_results = scan.pluginresult_set.filter(plugin_type=PluginType.SBOM.value)
+
     plugin = object()
-    for plugin in scan.pluginresult_set.filter(plugin_type=PluginType.SBOM.value):
+    for plugin in plugin_results:
         errors.update(plugin)
 
     return PLUGIN_RESULTS(None, errors, True, None)
@@ -1,13 +1,14 @@
 from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
+from typing import Iterable
 
 from artemisdb.artemisdb.consts import PluginType
-from artemisdb.artemisdb.models import AllowListType, SecretType
+from artemisdb.artemisdb.models import AllowListType, PluginResult, SecretType
+from artemislib.allowlist import AllowList
 from django.db.models import Q
 
 from json_report.results.diff import diff_includes
 from json_report.results.results import PLUGIN_RESULTS, PluginErrors
-from json_report.util.util import dict_eq
 
 
 @dataclass
@@ -46,7 +47,7 @@ FindingDictType = dict[tuple[int, str], SecretFinding]
 FilenameDictType = dict[str, FindingDictType]
 
 
-def get_secrets(scan, params):
+def get_secrets(scan, params, plugin_results: Iterable[PluginResult] = None):
     # Unify the output of secrets plugins
 
     if "secret" not in params:
@@ -59,11 +60,12 @@ def get_secrets(scan, params):
     summary = 0
 
     # Pull the non-expired secrets AllowList once
-    allow_list = list(
+    allow_list = AllowList.for_type(
         scan.repo.allowlistitem_set.filter(
             Q(item_type=AllowListType.SECRET.value),
             Q(expires=None) | Q(expires__gt=datetime.now(timezone.utc)),
-        )
+        ),
+        AllowListType.SECRET.value,
     )
 
     diff_summary = None
@@ -73,8 +75,11 @@ def get_secrets(scan, params):
 
     filename_dict: FilenameDictType = {}
 
+    if plugin_results is None:
+        plugin_results = scan.pluginresult_set.filter(plugin_type=PluginType.SECRETS.value)
+
     plugin = _empty = object()
-    for plugin in scan.pluginresult_set.filter(plugin_type=PluginType.SECRETS.value):
+    for plugin in plugin_results:
         if plugin.errors:
             errors.update(plugin)
 
@@ -131,11 +136,8 @@ def get_secrets(scan, params):
     return PLUGIN_RESULTS(secrets, errors, success, summary)
 
 
-def allowlisted_secret(item, allow_list):
-    for al in allow_list:
-        if dict_eq(al.value, item, ["filename", "line", "commit"]):
-            return True
-    return False
+def allowlisted_secret(item, allow_list: AllowList):
+    return allow_list.match(item)
 
 
 def get_finding_dict_key(finding: SecretFinding) -> tuple[int, str]:
@@ -1,16 +1,17 @@
 from datetime import datetime, timezone
+from typing import Iterable
 
 from artemisdb.artemisdb.consts import PluginType
-from artemisdb.artemisdb.models import AllowListType, Scan
+from artemisdb.artemisdb.models import AllowListType, PluginResult, Scan
+from artemislib.allowlist import AllowList
 from django.db.models import Q
 
 from json_report.results.diff import diff_includes
 from json_report.results.results import PLUGIN_RESULTS, PluginErrors
-from json_report.util.const import SEVERITY, WL_STATIC_ANALYSIS_KEYS
-from json_report.util.util import dict_eq
+from json_report.util.const import SEVERITY
 
 
-def get_static_analysis(scan: Scan, params: dict) -> PLUGIN_RESULTS:
+def get_static_analysis(scan: Scan, params: dict, plugin_results: Iterable[PluginResult] = None) -> PLUGIN_RESULTS:
     """
     Unify the output of static analysis plugins
     NOTE: unit tests are located at backend/lambdas/generators/json_report/tests/test_generate_report.py
@@ -34,11 +35,12 @@ def get_static_analysis(scan: Scan, params: dict) -> PLUGIN_RESULTS:
     errors = PluginErrors()
 
     # Pull the non-expired static analysis items AllowList once
-    allow_list = list(
+    allow_list = AllowList.for_type(
         scan.repo.allowlistitem_set.filter(
             Q(item_type=AllowListType.STATIC_ANALYSIS.value),
             Q(expires=None) | Q(expires__gt=datetime.now(timezone.utc)),
-        )
+        ),
+        AllowListType.STATIC_ANALYSIS.value,
     )
 
     diff_summary = None
@@ -46,8 +48,11 @@ def get_static_analysis(scan: Scan, params: dict) -> PLUGIN_RESULTS:
         # If the scan was run with a diff set the diff_summary
         diff_summary = scan.diff_summary
 
+    if plugin_results is None:
+        plugin_results = scan.pluginresult_set.filter(plugin_type=PluginType.STATIC_ANALYSIS.value)
+
     plugin = _empty = object()
-    for plugin in scan.pluginresult_set.filter(plugin_type=PluginType.STATIC_ANALYSIS.value):
+    for plugin in plugin_results:
         errors.update(plugin)
 
         if not plugin.details:
@@ -93,8 +98,5 @@ def get_static_analysis(scan: Scan, params: dict) -> PLUGIN_RESULTS:
     return PLUGIN_RESULTS(static_analysis, errors, success, summary)
 
 
-def allowlisted_static_analysis(item, allow_list):
-    for al in allow_list:
-        if dict_eq(al.value, item, WL_STATIC_ANALYSIS_KEYS):
-            return True
-    return False
+def allowlisted_static_analysis(item, allow_list: AllowList):
+    return allow_list.match(item)
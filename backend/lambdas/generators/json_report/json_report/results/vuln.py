@@ -1,16 +1,17 @@
 from datetime import datetime, timezone
+from typing import Iterable
 
 from artemisdb.artemisdb.consts import PluginType
-from artemisdb.artemisdb.models import AllowListType, Scan
+from artemisdb.artemisdb.models import AllowListType, PluginResult, Scan
+from artemislib.allowlist import AllowList
 from django.db.models import Q
 
 from json_report.results.diff import diff_includes
 from json_report.results.results import PLUGIN_RESULTS, PluginErrors
 from json_report.util.const import SEVERITY, SEVERITY_DICT
-from json_report.util.util import dict_eq
 
 
-def get_vulns(scan: Scan, params: dict) -> PLUGIN_RESULTS:
+def get_vulns(scan: Scan, params: dict, plugin_results: Iterable[PluginResult] = None) -> PLUGIN_RESULTS:
     # Unify the output of vulnerability plugins
 
     if "severity" not in params:
@@ -23,11 +24,12 @@ def get_vulns(scan: Scan, params: dict) -> PLUGIN_RESULTS:
     errors = PluginErrors()
 
     # Pull the non-expired vulns AllowList once
-    allow_list = list(
+    allow_list = AllowList.for_type(
         scan.repo.allowlistitem_set.filter(
             Q(item_type=AllowListType.VULN.value),
             Q(expires=None) | Q(expires__gt=datetime.now(timezone.utc)),
-        )
+        ),
+        AllowListType.VULN.value,
     )
 
     # Pull the non-expired vulns_raw AllowList once
@@ -47,9 +49,12 @@ def get_vulns(scan: Scan, params: dict) -> PLUGIN_RESULTS:
         # If the scan was run with a diff set the diff_summary and the filtering hasn't been turned off
         diff_summary = scan.diff_summary
 
+    if plugin_results is None:
+        plugin_results = scan.pluginresult_set.filter(plugin_type=PluginType.VULN.value)
+
     plugin = _empty = object()
 
-    for plugin in scan.pluginresult_set.filter(plugin_type=PluginType.VULN.value):
+    for plugin in plugin_results:
         errors.update(plugin)
 
         for v in plugin.details:
@@ -94,27 +99,23 @@ def get_vulns(scan: Scan, params: dict) -> PLUGIN_RESULTS:
     return PLUGIN_RESULTS(vulns, errors, success, summary)
 
 
-def allowlisted_vuln(item, allow_list) -> bool:
-    keys = ["component", "id", "source"]
-    for al in allow_list:
-        if isinstance(item["source"], str):
-            # Source is a single string so do a straight comparison
-            if dict_eq(al.value, item, keys):
-                return True
-        elif isinstance(item["source"], list):
-            # Source is a list so do a comparison for each item in the list
-            masked = []
-            for source in item["source"]:
-                if dict_eq(al.value, {"component": item["component"], "id": item["id"], "source": source}, keys):
-                    masked.append(source)
-
-            # Remove all items from the source list that matched
-            for source in masked:
-                item["source"].remove(source)
-
-            # If no items remain this item should be hidden
-            if not item["source"]:
-                return True
+def allowlisted_vuln(item, allow_list: AllowList) -> bool:
+    if not allow_list:
+        return False
+
+    if isinstance(item["source"], str):
+        # Source is a single string so do a straight comparison
+        return allow_list.match(item)
+    elif isinstance(item["source"], list):
+        # Source is a list so do a comparison for each item in the list and remove all of the sources that matched
+        item["source"] = [
+            source
+            for source in item["source"]
+            if not allow_list.match({"component": item["component"], "id": item["id"], "source": source})
+        ]
+
+        # If no items remain this item should be hidden
+        return not item["source"]
     return False
 
 
@@ -0,0 +1,4 @@
+import os
+
+# Number of report categories to generate concurrently
+REPORT_WORKERS = int(os.environ.get("JSON_REPORT_WORKERS", 4))
@@ -1,5 +1,6 @@
 import unittest
 
+from artemislib.allowlist import AllowList
 from json_report.results.vuln import allowlisted_vuln
 
 
@@ -8,7 +9,7 @@ class MockAllowListItem:
         self.value = {"component": component, "id": ident, "source": source}
 
 
-ALLOW_LIST = [MockAllowListItem("component1", "id1", "file1")]
+ALLOW_LIST = AllowList.for_type([MockAllowListItem("component1", "id1", "file1")], "vulnerability")
 
 
 class TestAllowList(unittest.TestCase):
@@ -0,0 +1,157 @@
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+import boto3
+from moto import mock_aws
+
+from artemisdb.artemisdb.consts import ReportStatus
+from artemisdb.artemisdb.models import PluginResult
+from artemislib.aws import S3MultipartWriter
+from json_report import report
+from json_report.util.const import DEFAULT_SCAN_QUERY_PARAMS, FORMAT_FULL, JSON_REPORT_S3_KEY
+
+TEST_BUCKET = "test-bucket"
+TEST_REPORT_ID = "dd0d7b6a-3a73-4b5b-9a4d-6b4b2d3c5e0f"
+TEST_PARAMS = {**DEFAULT_SCAN_QUERY_PARAMS, "secret": ["aws"]}
+TEST_PLUGIN_RESULTS = [
+    PluginResult(
+        plugin_name="ESLint Static Scanner",
+        plugin_type="static_analysis",
+        details=[
+            {"filename": f"file{i}.js", "line": i, "message": "Parsing error", "severity": "critical", "type": ""}
+            for i in range(100)
+        ],
+        errors=["eslint error"],
+        alerts=[],
+        debug=[],
+    ),
+    PluginResult(
+        plugin_name="Trufflehog",
+        plugin_type="secrets",
+        details=[{"filename": "config.py", "line": 1, "commit": "abc123", "type": "aws", "validity": "unknown"}],
+        errors=[],
+        alerts=[],
+        debug=[],
+    ),
+    PluginResult(
+        plugin_name="Technology Discovery",
+        plugin_type="inventory",
+        details={"technology_discovery": {"Python": 100}},
+        errors=[],
+        alerts=["inventory alert"],
+        debug=[],
+    ),
+]
+
+
+def _mock_scan() -> MagicMock:
+    scan = MagicMock()
+    scan.to_dict.return_value = {"repo": "testorg/testrepo", "scan_id": "scan-id", "service": "github"}
+    scan.formatted_application_metadata.return_value = {}
+    scan.errors = []
+    scan.alerts = []
+    scan.debug = []
+    scan.diff_base = None
+    scan.diff_compare = None
+    scan.pluginresult_set.filter.side_effect = _filter
+    return scan
+
+
+def _filter(plugin_type__in: list) -> MagicMock:
+    qs = MagicMock()
+    qs.only.return_value.iterator.return_value = [
+        plugin_result for plugin_result in TEST_PLUGIN_RESULTS if plugin_result.plugin_type in plugin_type__in
+    ]
+    return qs
+
+
+class TestReport(unittest.TestCase):
+    def setUp(self) -> None:
+        self.scan = _mock_scan()
+        for patcher in [
+            patch.object(report, "Scan"),
+            patch.object(report, "Report"),
+            patch.object(report, "REPORT_WORKERS", 3),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        report.Scan.objects.select_related.return_value.get.return_value = self.scan
+
+    def test_get_report(self):
+        actual = report.get_report("scan-id", TEST_PARAMS)
+
+        # The plugin results are loaded once for all of the categories
+        self.scan.pluginresult_set.filter.assert_called_once()
+        self.assertEqual(len(actual["results"]["static_analysis"]), 100)
+        self.assertEqual(list(actual["results"]["secrets"]), ["config.py"])
+        self.assertEqual(actual["results"]["inventory"], {"technology_discovery": {"Python": 100}})
+        self.assertEqual(actual["results_summary"]["static_analysis"]["critical"], 100)
+        self.assertIsNone(actual["results_summary"]["vulnerabilities"])
+        self.assertEqual(actual["errors"], {"ESLint Static Scanner": ["eslint error"]})
+        self.assertEqual(actual["alerts"], {"Technology Discovery": ["inventory alert"]})
+        self.assertFalse(actual["success"])
+
+    def test_get_report_results(self):
+        actual = report.get_report("scan-id", {**TEST_PARAMS, "results": ["inventory"]})
+
+        self.scan.pluginresult_set.filter.assert_called_once_with(plugin_type__in=["inventory"])
+        self.assertEqual(actual["results"]["inventory"], {"technology_discovery": {"Python": 100}})
+        self.assertEqual(actual["results"]["static_analysis"], {})
+        self.assertIsNone(actual["results_summary"]["static_analysis"])
+        self.assertTrue(actual["success"])
+
+    @mock_aws
+    def test_stream_report(self):
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=TEST_BUCKET)
+        expected_key = JSON_REPORT_S3_KEY % TEST_REPORT_ID
+
+        with patch.object(report, "AWSConnect") as mock_aws_connect:
+            mock_writer = mock_aws_connect.return_value.open_s3_multipart_writer
+            mock_writer.side_effect = lambda key: S3MultipartWriter(
+                boto3.resource("s3", region_name="us-east-1").Object(TEST_BUCKET, key)
+            )
+            pointer = report.stream_report("scan-id", TEST_PARAMS, TEST_REPORT_ID)
+
+        mock_writer.assert_called_once_with(expected_key)
+        # The categories are loaded and written one at a time
+        self.assertEqual(self.scan.pluginresult_set.filter.call_count, len(report.CATEGORIES))
+        self.assertEqual(pointer["report_id"], TEST_REPORT_ID)
+        self.assertEqual(pointer["s3_key"], expected_key)
+
+        # The streamed report is the same as the report that is returned directly
+        body = s3.get_object(Bucket=TEST_BUCKET, Key=expected_key)["Body"].read()
+        self.assertEqual(pointer["size"], len(body))
+        self.assertEqual(json.loads(body), report.get_report("scan-id", {**TEST_PARAMS, "format": FORMAT_FULL}))
+
+        report.Report.objects.filter.assert_called_with(report_id=TEST_REPORT_ID)
+        update_kwargs = report.Report.objects.filter.return_value.update.call_args.kwargs
+        self.assertEqual(update_kwargs["status"], ReportStatus.COMPLETED.value)
+        self.assertEqual(update_kwargs["s3_key"], expected_key)
+
+    def test_stream_queued_report(self):
+        queued = report.Report.objects.get.return_value
+        queued.scan_id = "scan-id"
+        queued.filters = TEST_PARAMS
+        with patch.object(report, "stream_report") as mock_stream_report:
+            pointer = report.stream_queued_report(TEST_REPORT_ID)
+
+            # The report is generated with the filters saved when it was queued
+            mock_stream_report.assert_called_once_with("scan-id", TEST_PARAMS, TEST_REPORT_ID)
+            self.assertEqual(pointer, mock_stream_report.return_value)
+            report.Report.objects.filter.return_value.update.assert_called_once_with(
+                status=ReportStatus.PROCESSING.value
+            )
+
+            # A failed report is not raised so that the queue doesn't deliver it again
+            mock_stream_report.side_effect = RuntimeError
+            self.assertIsNone(report.stream_queued_report(TEST_REPORT_ID))
+
+    def test_stream_report_error(self):
+        with patch.object(report, "AWSConnect") as mock_aws:
+            mock_aws.return_value.open_s3_multipart_writer.side_effect = RuntimeError
+            with self.assertRaises(RuntimeError):
+                report.stream_report("scan-id", TEST_PARAMS, TEST_REPORT_ID)
+
+        report.Report.objects.filter.return_value.update.assert_called_once_with(status=ReportStatus.FAILED.value)
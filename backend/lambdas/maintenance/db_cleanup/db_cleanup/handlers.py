@@ -3,6 +3,8 @@ from db_cleanup.tasks.component import obsolete_components
 from db_cleanup.tasks.engine import old_engines, unterminated_engines
 from db_cleanup.tasks.repo import orphan_repos
 from db_cleanup.tasks.scan import old_scans, sbom_scans, secrets_scans, orphaned_s3_scan_data
+from db_cleanup.util.budget import TimeBudget
+from db_cleanup.util.env import MAX_RUN_TIME
 
 LOG = Logger("db_cleanup")
 
@@ -17,11 +19,19 @@ TASKS = [
     orphaned_s3_scan_data,
 ]
 
+# Time held back from the Lambda timeout for the batch that is in progress when a task's budget runs out
+RUN_TIME_MARGIN = 60
+
+
+def handler(_event=None, context=None):
+    run_time = MAX_RUN_TIME
+    if context is not None:
+        run_time = min(run_time, context.get_remaining_time_in_millis() / 1000 - RUN_TIME_MARGIN)
+    budget = TimeBudget(run_time)
 
-def handler(_event=None, _context=None):
     LOG.info("Running cleanup tasks")
-    for task in TASKS:
+    for i, task in enumerate(TASKS):
         try:
-            task(LOG)
+            task(LOG, budget.share(len(TASKS) - i))
         except Exception as e:
             LOG.error("Error running task '%s': %s", task.__name__, e)
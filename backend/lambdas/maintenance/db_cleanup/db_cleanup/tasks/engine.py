@@ -5,13 +5,12 @@ from artemisdb.artemisdb.models import Engine
 from artemislib.aws import AWSConnect
 from artemislib.datetime import format_timestamp, get_utc_datetime
 from artemislib.logging import Logger
-from db_cleanup.util.delete import sequential_delete
+from db_cleanup.util.budget import TimeBudget
+from db_cleanup.util.delete import batch_delete
 from db_cleanup.util.env import MAX_ENGINE_AGE
 
-LOG_FREQ = 100
 
-
-def unterminated_engines(log: Logger) -> None:
+def unterminated_engines(log: Logger, _budget: TimeBudget) -> None:
     log.info("Cleaning up unterminated engine records")
     aws = AWSConnect()
     instance_ids = aws.get_instance_ids()
@@ -28,8 +27,8 @@ def unterminated_engines(log: Logger) -> None:
     log.info("%s engine records updated", count)
 
 
-def old_engines(log: Logger) -> None:
+def old_engines(log: Logger, budget: TimeBudget) -> None:
     age = get_utc_datetime(offset_minutes=-MAX_ENGINE_AGE)
     log.info("Deleting engine records older than %s", format_timestamp(age))
     qs = Engine.objects.filter(shutdown_time__lt=age)
-    sequential_delete(qs, log, LOG_FREQ, "engine records")
+    batch_delete(qs, log, "engine records", budget)
@@ -1,11 +1,10 @@
 from artemisdb.artemisdb.models import Repo
 from artemislib.logging import Logger
-from db_cleanup.util.delete import sequential_delete
+from db_cleanup.util.budget import TimeBudget
+from db_cleanup.util.delete import batch_delete
 
-LOG_FREQ = 100
 
-
-def orphan_repos(log: Logger) -> None:
+def orphan_repos(log: Logger, budget: TimeBudget) -> None:
     log.info("Cleaning up repos that no longer have associated scans")
     qs = Repo.objects.filter(scan=None)
-    sequential_delete(qs, log, LOG_FREQ, "repos")
+    batch_delete(qs, log, "repos", budget)
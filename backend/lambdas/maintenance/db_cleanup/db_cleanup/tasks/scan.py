@@ -1,56 +1,99 @@
+import uuid
+
+from django.db.models import Exists, OuterRef
+
 from artemisdb.artemisdb.consts import ScanStatus
 from artemisdb.artemisdb.models import Scan
-from artemislib.aws import AWSConnect
+from artemislib.aws import S3_MAX_DELETE_KEYS, AWSConnect
 from artemislib.consts import SCANS_S3_KEY
 from artemislib.datetime import format_timestamp, get_utc_datetime
+from artemislib.db_cache import DBLookupCache
 from artemislib.env import SCAN_DATA_S3_BUCKET, SCAN_DATA_S3_ENDPOINT
 from artemislib.logging import Logger
-from db_cleanup.util.delete import sequential_delete
+from db_cleanup.util.budget import TimeBudget
+from db_cleanup.util.delete import batch_delete
 from db_cleanup.util.env import MAX_SCAN_AGE, MAX_SECRET_SCAN_AGE
 
-LOG_FREQ = 1000
+# Scans can have a very large number of dependency rows so they are deleted in smaller batches
+SCAN_BATCH_SIZE = 20
 
+# Cache key for the S3 key that the orphaned scan data cleanup has reached
+S3_MARKER_CACHE_KEY = "db_cleanup:orphaned_s3_scan_data:marker"
 
-def secrets_scans(log: Logger) -> None:
+
+def secrets_scans(log: Logger, budget: TimeBudget) -> None:
     age = get_utc_datetime(offset_minutes=-MAX_SECRET_SCAN_AGE)
     log.info("Cleaning up secrets scans older than %s", format_timestamp(age))
     qs = Scan.objects.filter(batch_priority=True, end_time__lt=age, plugins__contains="gitsecrets")
-    sequential_delete(qs, log, LOG_FREQ, "scans")
+    batch_delete(qs, log, "scans", budget, SCAN_BATCH_SIZE)
 
 
-def old_scans(log: Logger) -> None:
+def old_scans(log: Logger, budget: TimeBudget) -> None:
     age = get_utc_datetime(offset_minutes=-MAX_SCAN_AGE)
     log.info("Cleaning up scans older than %s", format_timestamp(age))
     qs = Scan.objects.filter(created__lt=age)
-    sequential_delete(qs, log, LOG_FREQ, "scans")
+    batch_delete(qs, log, "scans", budget, SCAN_BATCH_SIZE)
 
 
-def sbom_scans(log: Logger) -> None:
+def sbom_scans(log: Logger, budget: TimeBudget) -> None:
     log.info("Deleting obsolete SBOM scans")
-    qs = Scan.objects.filter(batch_priority=True, sbom=True, ref=None, status=ScanStatus.COMPLETED.value)
-    sequential_delete(qs, log, LOG_FREQ, "SBOM scans", _sbom_delete_check)
-
-
-def _sbom_delete_check(scan: Scan) -> bool:
     # The scan can be deleted if there are newer completed SBOM scans for this repo
-    return (
-        scan.repo.scan_set.filter(
-            batch_priority=True, sbom=True, status=ScanStatus.COMPLETED.value, created__gt=scan.created
-        ).count()
-        > 0
+    newer = Scan.objects.filter(
+        repo=OuterRef("repo"),
+        batch_priority=True,
+        sbom=True,
+        status=ScanStatus.COMPLETED.value,
+        created__gt=OuterRef("created"),
     )
+    qs = Scan.objects.filter(Exists(newer), batch_priority=True, sbom=True, ref=None, status=ScanStatus.COMPLETED.value)
+    batch_delete(qs, log, "SBOM scans", budget, SCAN_BATCH_SIZE)
 
 
-def orphaned_s3_scan_data(log: Logger) -> None:
+def orphaned_s3_scan_data(log: Logger, budget: TimeBudget) -> None:
+    # This also removes the scan data of the scans deleted by the tasks above, which are deleted directly in the
+    # database rather than through Scan.delete()
     log.info("Cleaning up orphaned scan data from S3")
     aws = AWSConnect()
-    files = aws.get_s3_file_list(prefix=SCANS_S3_KEY, s3_bucket=SCAN_DATA_S3_BUCKET, endpoint_url=SCAN_DATA_S3_ENDPOINT)
+    cache = DBLookupCache()
+
+    # Resume from where the last run ran out of time
+    marker = cache.lookup(S3_MARKER_CACHE_KEY) or None
+    files = aws.get_s3_file_list(
+        prefix=SCANS_S3_KEY, s3_bucket=SCAN_DATA_S3_BUCKET, endpoint_url=SCAN_DATA_S3_ENDPOINT, marker=marker
+    )
+
     count = 0
-    for f in files:
-        scan_id = f.key.split("/")[1]  # Extract the scan ID from the S3 key: scans/<SCAN_ID>/...
-        if not Scan.objects.filter(scan_id=scan_id).exists():
-            # Scan data is for a scan that no longer exists in the database
-            f.delete()
-            count += 1
-            log.debug("Deleted %s", f.key)
+    for page in files.page_size(S3_MAX_DELETE_KEYS).pages():
+        keys = [f.key for f in page]
+        if not keys:
+            continue
+
+        orphaned = _orphaned_keys(keys)
+        if orphaned:
+            count += aws.delete_s3_objects(orphaned, s3_bucket=SCAN_DATA_S3_BUCKET, endpoint_url=SCAN_DATA_S3_ENDPOINT)
+            log.debug("Deleted %s of %s files", len(orphaned), len(keys))
+
+        if budget.expired():
+            log.info("Time budget used up cleaning up orphaned scan data, resuming after %s in the next run", keys[-1])
+            cache.store(S3_MARKER_CACHE_KEY, keys[-1])
+            break
+    else:
+        # Reached the end of the scan data so start from the beginning in the next run
+        cache.store(S3_MARKER_CACHE_KEY, "")
+
     log.info("%s total files deleted", count)
+
+
+def _orphaned_keys(keys: list[str]) -> list[str]:
+    # Extract the scan ID from the S3 key: scans/<SCAN_ID>/...
+    scan_ids = {}
+    for key in keys:
+        try:
+            scan_ids[key] = uuid.UUID(key.split("/")[1])
+        except (IndexError, ValueError):
+            # Not scan data so leave it alone
+            continue
+
+    # Look up which of the scans in the page still exist in the database with a single query
+    existing = set(Scan.objects.filter(scan_id__in=set(scan_ids.values())).values_list("scan_id", flat=True))
+    return [key for key, scan_id in scan_ids.items() if scan_id not in existing]
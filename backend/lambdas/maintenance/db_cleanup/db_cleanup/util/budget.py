@@ -0,0 +1,22 @@
+from time import monotonic
+
+
+class TimeBudget:
+    """
+    Tracks how much of a Lambda run's time a cleanup task has left so that it can stop between batches and pick up
+    where it left off in the next run instead of being killed by the Lambda timeout mid-batch.
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.deadline = monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(self.deadline - monotonic(), 0)
+
+    def expired(self) -> bool:
+        return monotonic() >= self.deadline
+
+    def share(self, parts: int) -> "TimeBudget":
+        # Split what is left evenly so that a large backlog in one task doesn't starve the tasks after it. Time a task
+        # doesn't use is left over for the tasks that come after it.
+        return TimeBudget(self.remaining() / max(parts, 1))
@@ -1,51 +1,107 @@
-from datetime import datetime, timezone
+from functools import cache
+from time import monotonic
 
+from django.db import connection, models, transaction
 from django.db.models import QuerySet
+from django.db.models.deletion import get_candidate_relations_to_delete
 
 from artemislib.logging import Logger
+from db_cleanup.util.budget import TimeBudget
+from db_cleanup.util.env import BATCH_SIZE
 
-BATCH_SIZE = 100
 
+def batch_delete(qs: QuerySet, log: Logger, name: str, budget: TimeBudget, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Deletes the rows of the QuerySet, along with everything that cascades from them, in batches of primary keys.
 
-def sequential_delete(
-    qs: QuerySet, log: Logger, log_freq: int = 100, name: str | None = None, delete_check: callable = None
-) -> None:
-    total = 0
-    count = 0
-
-    start = 0
-    end = BATCH_SIZE
-    while True:
-        # Page through the full query using LIMIT so that we don't run into memory issues
-        batch = qs[start:end]
-        for item in batch:
-            # We are doing this in a loop rather than calling .delete() on the QuerySet
-            # because doing this directly on the QuerySet puts it in a transaction that
-            # has the potential to run longer than the max Lambda execution time. By
-            # deleting items individually we will delete what is possible within this
-            # Lambda execution and then pick it up in the next Lambda execution.
-            if delete_check is None or delete_check(item) is True:
-                start = datetime.now(timezone.utc)
-                d = item.delete()
-                log.debug("Deleted %s in %s (%s)", item, str(datetime.now(timezone.utc) - start), d)
-            else:
-                continue
+    Each batch is deleted with a fixed set of set-based statements in its own transaction so that no transaction runs
+    longer than the Lambda execution time and the deletes don't go through Django's collector one row at a time.
+    Deleted rows no longer match the QuerySet, so when the time budget runs out the next run resumes where this one
+    stopped.
+    :return: Number of rows of the QuerySet that were deleted
+    """
+    statements = delete_statements(qs.model)
+    pks = qs.order_by("pk").values_list("pk", flat=True)
 
-            count += 1
-            total += 1
+    total = 0
+    last = None
+    while not budget.expired():
+        # Select the next batch by keyset rather than offset so that each batch starts where the last one ended
+        batch = list((pks if last is None else pks.filter(pk__gt=last))[:batch_size])
+        if not batch:
+            break
 
-            if count % log_freq == 0:
-                log.info("Deleted %s %s", count, name)
-                count = 0
+        start = monotonic()
+        with transaction.atomic(), connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql, [batch])
+            count = cursor.rowcount
+        log.debug("Deleted %s %s in %.3fs", count, name, monotonic() - start)
 
-        if len(batch) < BATCH_SIZE:
-            # The page was less than the batch size so it was the last page
+        total += count
+        last = batch[-1]
+        if len(batch) < batch_size:
+            # The batch was less than the batch size so it was the last batch
             break
+    else:
+        log.info("Time budget used up deleting %s, the rest will be deleted in the next run", name)
 
-        start = end
-        end = end + BATCH_SIZE
+    log.info("%s total %s deleted", total, name)
+    return total
 
-    if count > 0:
-        log.info("Deleted %s %s", count, name)
 
-    log.info("%s total %s deleted", total, name)
+@cache
+def delete_statements(model: type[models.Model]) -> list[str]:
+    """
+    Builds the statements that delete a batch of the model's rows, given as a list of primary keys, along with all of
+    the rows that cascade from them. Dependent rows are deleted, and nullable references are cleared, before the rows
+    that they reference.
+    """
+    condition = f"{connection.ops.quote_name(model._meta.pk.column)} = ANY(%s)"
+    return _statements(model, condition, frozenset([model]))
+
+
+def _statements(model: type[models.Model], condition: str, path: frozenset) -> list[str]:
+    qn = connection.ops.quote_name
+    statements = []
+
+    # These are the same relations that Django's collector follows when deleting, including the relations from the
+    # through tables of many-to-many fields
+    relations = list(get_candidate_relations_to_delete(model._meta))
+
+    for rel in relations:
+        if rel.related_model is model and rel.field.remote_field.on_delete is models.CASCADE:
+            # Self-referencing rows (like the dependency tree) cascade to their descendants, so extend the rows being
+            # deleted to the whole subtree under them
+            table = qn(model._meta.db_table)
+            target = qn(rel.field.target_field.column)
+            condition = (
+                f"{target} IN (WITH RECURSIVE tree(id) AS ("
+                f"SELECT {target} FROM {table} WHERE {condition} "
+                f"UNION SELECT t.{target} FROM {table} t JOIN tree ON t.{qn(rel.field.column)} = tree.id"
+                f") SELECT id FROM tree)"
+            )
+
+    for rel in relations:
+        field = rel.field
+        on_delete = field.remote_field.on_delete
+        table = qn(rel.related_model._meta.db_table)
+        related = (
+            f"{qn(field.column)} IN "
+            f"(SELECT {qn(field.target_field.column)} FROM {qn(model._meta.db_table)} WHERE {condition})"
+        )
+
+        if on_delete is models.DO_NOTHING:
+            continue
+        elif on_delete is models.SET_NULL:
+            statements.append(f"UPDATE {table} SET {qn(field.column)} = NULL WHERE {related}")
+        elif on_delete is models.CASCADE:
+            if rel.related_model in path:
+                # Already being deleted, either as part of the subtree above or by an earlier statement
+                continue
+            statements.extend(_statements(rel.related_model, related, path | {rel.related_model}))
+        else:
+            raise ValueError(f"Unsupported on_delete for {rel.related_model.__name__}.{field.name}")
+
+    statements.append(f"DELETE FROM {qn(model._meta.db_table)} WHERE {condition}")
+    return statements
@@ -12,3 +12,10 @@ MAX_SECRET_SCAN_AGE = int(os.environ.get("MAX_SECRET_SCAN_AGE", 90 * DAY))
 # Max age for any scan
 # Defaulting to 180 days
 MAX_SCAN_AGE = int(os.environ.get("MAX_SCAN_AGE", 180 * DAY))
+
+# Max number of seconds a cleanup run spends on the tasks, which is capped to stay within the Lambda timeout
+# Defaulting to 14 minutes
+MAX_RUN_TIME = int(os.environ.get("MAX_RUN_TIME", 14 * 60))
+
+# Max number of rows selected for each batch delete
+BATCH_SIZE = int(os.environ.get("BATCH_SIZE", 100))
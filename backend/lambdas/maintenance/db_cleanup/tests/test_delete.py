@@ -0,0 +1,129 @@
+import unittest
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from artemisdb.artemisdb.consts import PluginType, Severity
+from artemisdb.artemisdb.models import (
+    Component,
+    Dependency,
+    PluginResult,
+    Repo,
+    RepoComponentScan,
+    RepoVulnerabilityScan,
+    Scan,
+    Vulnerability,
+)
+from db_cleanup.tasks.scan import _orphaned_keys
+from db_cleanup.util.budget import TimeBudget
+from db_cleanup.util.delete import batch_delete, delete_statements
+
+
+class TestDelete(unittest.TestCase):
+    def test_delete_statements(self):
+        statements = delete_statements(Scan)
+
+        # Everything that cascades from the scans is deleted before the scans themselves
+        self.assertTrue(statements[-1].startswith(f'DELETE FROM "{Scan._meta.db_table}"'))
+        for model in [PluginResult, Dependency, RepoComponentScan]:
+            with self.subTest(model=model.__name__):
+                self.assertEqual(
+                    len([sql for sql in statements if sql.startswith(f'DELETE FROM "{model._meta.db_table}"')]), 1
+                )
+
+        # The scans that resolved vulns are cleared instead of deleting the vulns
+        self.assertIn(
+            f'UPDATE "{RepoVulnerabilityScan._meta.db_table}" SET "resolved_by_id" = NULL',
+            "\n".join(statements),
+        )
+
+        # Each statement takes the batch of primary keys as its only parameter
+        for sql in statements:
+            self.assertEqual(sql.count("%s"), 1)
+
+    def test_time_budget(self):
+        budget = TimeBudget(60)
+        self.assertFalse(budget.expired())
+        self.assertLessEqual(budget.share(4).remaining(), 15)
+        self.assertTrue(TimeBudget(0).expired())
+
+
+@pytest.mark.integtest
+class TestDeleteDatabase(unittest.TestCase):
+    """
+    Test Class relies on the artemisdb docker container being up.
+    """
+
+    def setUp(self) -> None:
+        self.prefix = f"test-{uuid.uuid4().hex[:8]}"
+        self.repo = Repo.objects.create(service="testservice", repo=f"{self.prefix}/repo")
+        self.addCleanup(self.repo.delete)
+        self.component = Component.objects.create(name=self.prefix, version="1.0.0", label=self.prefix)
+        self.addCleanup(Component.objects.filter(name=self.prefix).delete)
+        self.vuln = Vulnerability.objects.create(vuln_id=uuid.uuid4(), severity=Severity.HIGH.value)
+        self.addCleanup(self.vuln.delete)
+        self.scans = [Scan.objects.create(repo=self.repo, scan_id=uuid.uuid4()) for _ in range(5)]
+        for scan in self.scans:
+            PluginResult.objects.create(
+                scan=scan,
+                plugin_name="test",
+                plugin_type=PluginType.VULN.value,
+                start_time=datetime.now(timezone.utc),
+                end_time=datetime.now(timezone.utc),
+                success=True,
+                details=[],
+                errors=[],
+                alerts=[],
+            )
+            parent = Dependency.objects.create(label="root", path="root", component=self.component, scan=scan)
+            child = Dependency.objects.create(
+                label="child", path="root.child", parent=parent, component=self.component, scan=scan
+            )
+            Dependency.objects.create(
+                label="grandchild", path="root.child.grandchild", parent=child, component=self.component, scan=scan
+            )
+        self.vuln_instance = RepoVulnerabilityScan.objects.create(
+            vuln_instance_id=uuid.uuid4(), repo=self.repo, vulnerability=self.vuln, resolved_by=self.scans[0]
+        )
+
+    def test_batch_delete(self):
+        qs = Scan.objects.filter(repo=self.repo)
+        deleted = batch_delete(qs, MagicMock(), "scans", TimeBudget(60), batch_size=2)
+
+        self.assertEqual(deleted, 5)
+        self.assertFalse(qs.exists())
+        self.assertFalse(Dependency.objects.filter(component=self.component).exists())
+        self.assertFalse(PluginResult.objects.filter(scan__in=self.scans).exists())
+
+        # The vuln instance is kept but is no longer resolved by the deleted scan
+        self.vuln_instance.refresh_from_db()
+        self.assertIsNone(self.vuln_instance.resolved_by)
+
+    def test_batch_delete_dependency_subtree(self):
+        # Deleting the component that the middle of each tree depends on deletes the rest of the subtree with it
+        child = Component.objects.create(name=self.prefix, version="2.0.0", label=f"{self.prefix}_child")
+        Dependency.objects.filter(component=self.component, label="child").update(component=child)
+
+        deleted = batch_delete(Component.objects.filter(pk=child.pk), MagicMock(), "components", TimeBudget(60))
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(
+            list(Dependency.objects.filter(scan__in=self.scans).values_list("label", flat=True)), ["root"] * 5
+        )
+
+    def test_batch_delete_budget(self):
+        qs = Scan.objects.filter(repo=self.repo)
+        self.assertEqual(batch_delete(qs, MagicMock(), "scans", TimeBudget(0)), 0)
+        self.assertEqual(qs.count(), 5)
+
+    def test_orphaned_keys(self):
+        orphan = uuid.uuid4()
+        keys = [
+            f"scans/{self.scans[0].scan_id}/sbom/artemis.json",
+            f"scans/{orphan}/sbom/artemis.json",
+            f"scans/{orphan}/other.json",
+            "scans/not-a-scan/file.json",
+        ]
+        self.assertEqual(_orphaned_keys(keys), keys[1:3])
@@ -2,8 +2,8 @@ import asyncio
 import re
 from typing import Tuple
 
-import requests
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Exists, Q
 from asgiref.sync import sync_to_async
 
 from artemisdb.artemisdb.consts import ComponentType
@@ -14,6 +14,9 @@ from license_retriever.retrievers.go import retrieve_go_licenses_batch
 from license_retriever.retrievers.npm import retrieve_npm_licenses_batch
 from license_retriever.retrievers.php import retrieve_php_licenses_batch
 from license_retriever.retrievers.pypi import retrieve_pypi_licenses_batch, PYPI_LICENSE_MAP
+from license_retriever.util.cache import recent_misses, store_misses
+from license_retriever.util.env import CHUNK_SIZE, MAX_CONCURRENT
+from license_retriever.util.spdx import get_spdx_licenses
 
 LOG = Logger("license_retriever")
 
@@ -33,43 +36,21 @@ def handler(_event=None, _context=None):
 
 async def async_handler():
     spdx_licenses = None
+    processed = 0
 
-    # Get all components that need license information - only supported types
-    # Use sync_to_async to properly handle Django ORM in async context
-    components_queryset = await sync_to_async(
-        lambda: Component.objects.filter(
-            Q(component_type__in=list(BATCH_RETRIEVERS.keys())) | Q(component_type__isnull=True), licenses__isnull=True
-        )
-    )()
+    # Page through the components that need license information, a chunk at a time, instead of loading all of them
+    last = 0
+    while components := await sync_to_async(get_components)(last):
+        last = components[-1].pk
+
+        if spdx_licenses is None:
+            spdx_licenses = await sync_to_async(get_spdx_licenses)()
 
-    components_count = await sync_to_async(components_queryset.count)()
-    components_list = await sync_to_async(list)(components_queryset)
-
-    if components_count > 0:
-        spdx_licenses = download_spdx_licenses()
-
-        # Group components by type for batch processing
-        components_by_type = {}
-        unknown_components = []
-
-        for component in components_list:
-            if component.component_type is None:
-                unknown_components.append(component)
-            elif component.component_type in BATCH_RETRIEVERS:
-                if component.component_type not in components_by_type:
-                    components_by_type[component.component_type] = []
-                components_by_type[component.component_type].append(component)
-            else:
-                LOG.warning("Component %s has unsupported type %s - skipping", component, component.component_type)
-
-        # Process each component type as a batch
-        for component_type, type_components in components_by_type.items():
-            LOG.info("Processing %d %s packages in batch", len(type_components), component_type)
-            await process_component_type_batch(component_type, type_components, spdx_licenses)
-
-        # Process unknown components (try all retrievers)
-        for component in unknown_components:
-            await process_unknown_component(component, spdx_licenses)
+        await process_components(components, spdx_licenses)
+        processed += len(components)
+
+    if processed > 0:
+        LOG.info("Processed %d components", processed)
     else:
         LOG.info("No components to process")
 
@@ -82,7 +63,51 @@ async def async_handler():
     LOG.info("%s components with unsupported types are missing licenses", not_supported)
 
 
-async def process_component_type_batch(component_type: str, components: list, spdx_licenses: dict):
+def get_components(last: int) -> list[Component]:
+    """
+    Get the next chunk of components that need license information - only supported types. Components that were
+    looked up recently without finding any licenses are skipped until the miss expires.
+    """
+    return list(
+        Component.objects.filter(
+            Q(component_type__in=list(BATCH_RETRIEVERS.keys())) | Q(component_type__isnull=True),
+            ~Exists(recent_misses()),
+            licenses__isnull=True,
+            pk__gt=last,
+        ).order_by("pk")[:CHUNK_SIZE]
+    )
+
+
+async def process_components(components: list, spdx_licenses: dict):
+    # Group components by type for batch processing
+    components_by_type = {}
+    unknown_components = []
+
+    for component in components:
+        if component.component_type is None:
+            unknown_components.append(component)
+        elif component.component_type in BATCH_RETRIEVERS:
+            if component.component_type not in components_by_type:
+                components_by_type[component.component_type] = []
+            components_by_type[component.component_type].append(component)
+        else:
+            LOG.warning("Component %s has unsupported type %s - skipping", component, component.component_type)
+
+    resolved = {}
+
+    # Process each component type as a batch
+    for component_type, type_components in components_by_type.items():
+        LOG.info("Processing %d %s packages in batch", len(type_components), component_type)
+        resolved.update(await process_component_type_batch(component_type, type_components, spdx_licenses))
+
+    # Process unknown components (try all retrievers)
+    for component in unknown_components:
+        resolved[component] = await process_unknown_component(component, spdx_licenses)
+
+    await sync_to_async(save_licenses)(resolved, unknown_components)
+
+
+async def process_component_type_batch(component_type: str, components: list, spdx_licenses: dict) -> dict:
     """Process all components of a given type using batch processing"""
 
     # Extract package info for batch processing
@@ -94,15 +119,17 @@ async def process_component_type_batch(component_type: str, components: list, sp
 
         # Process all packages of this type concurrently!
         LOG.info("Starting batch processing for %d %s packages", len(packages), component_type)
-        all_licenses = await batch_retriever(packages, max_concurrent=10)
+        all_licenses = await batch_retriever(packages, max_concurrent=MAX_CONCURRENT)
 
         # Map results back to components
+        resolved = {}
         for component in components:
             package_key = f"{component.name}@{component.version}"
             licenses = all_licenses.get(package_key, [])
 
             LOG.info("Processing %s package %s with licenses: %s", component_type, component, licenses)
-            await create_and_assign_licenses(component, licenses, spdx_licenses)
+            resolved[component] = get_license_objs(component, licenses, spdx_licenses)
+        return resolved
 
     except Exception as e:
         LOG.error("Error processing %s batch: %s", component_type, str(e))
@@ -110,25 +137,57 @@ async def process_component_type_batch(component_type: str, components: list, sp
         raise e
 
 
-async def create_and_assign_licenses(component, licenses: list, spdx_licenses: dict):
-    """Create license objects and assign them to a component"""
-    license_objs = []
+def get_license_objs(component, licenses: list, spdx_licenses: dict) -> list[License]:
+    """Build the (unsaved) license objects for a component"""
+    license_objs = {}
     for license in licenses:
         license_id, license_name = license_lookup(license, spdx_licenses)
         if license_id is not None:
             LOG.info("Found license: %s", license_id)
-            license_obj, _ = await sync_to_async(License.objects.get_or_create)(
-                license_id=license_id, defaults={"name": license_name}
-            )
-            license_objs.append(license_obj)
+            license_objs[license_id] = License(license_id=license_id, name=license_name)
 
-    if license_objs:
-        await sync_to_async(component.licenses.set)(license_objs)
-    else:
+    if not license_objs:
         LOG.info("No licenses found for %s", component)
+    return list(license_objs.values())
+
+
+def save_licenses(resolved: dict, identified: list) -> None:
+    """
+    Saves the licenses of a chunk of components with bulk statements instead of a get_or_create() for each license and
+    a set() for each component.
+    :param resolved: The license objects of each component
+    :param identified: Components whose type was identified
+    """
+    with transaction.atomic():
+        if identified:
+            Component.objects.bulk_update(identified, ["component_type"])
+
+        # Create the licenses that don't exist yet. Existing licenses are left as-is.
+        licenses = {obj.license_id: obj for license_objs in resolved.values() for obj in license_objs}
+        License.objects.bulk_create(licenses.values(), ignore_conflicts=True)
+        license_pks = dict(License.objects.filter(license_id__in=licenses).values_list("license_id", "pk"))
+
+        through = Component.licenses.through
+        through.objects.bulk_create(
+            [
+                through(component_id=component.pk, license_id=license_pks[obj.license_id])
+                for component, license_objs in resolved.items()
+                for obj in license_objs
+            ],
+            ignore_conflicts=True,
+        )
+
+        # Components of an unknown type are not looked up again so there is no need to record the misses
+        store_misses(
+            [
+                component
+                for component, license_objs in resolved.items()
+                if not license_objs and component.component_type in BATCH_RETRIEVERS
+            ]
+        )
 
 
-async def process_unknown_component(component, spdx_licenses: dict):
+async def process_unknown_component(component, spdx_licenses: dict) -> list[License]:
     """Process a component with unknown type by trying all batch retrievers"""
     LOG.info("Package type for %s is not known, attempting all batch retrievers", component)
 
@@ -146,10 +205,7 @@ async def process_unknown_component(component, spdx_licenses: dict):
                 # Got a match - record the component type and process licenses
                 LOG.info("%s is identified as a %s package", component, component_type)
                 component.component_type = component_type
-                await sync_to_async(component.save)()
-
-                await create_and_assign_licenses(component, licenses, spdx_licenses)
-                return
+                return get_license_objs(component, licenses, spdx_licenses)
 
         except Exception as e:
             LOG.error("Error trying %s batch retriever for %s: %s", component_type, component, str(e))
@@ -157,7 +213,7 @@ async def process_unknown_component(component, spdx_licenses: dict):
     # Package type was not identified by any batch retriever
     LOG.info("Package type was not identified for %s", component)
     component.component_type = ComponentType.UNKNOWN.value
-    await sync_to_async(component.save)()
+    return []
 
 
 def license_lookup(license, spdx_licenses) -> Tuple[str | None, str | None]:
@@ -171,21 +227,3 @@ def license_lookup(license, spdx_licenses) -> Tuple[str | None, str | None]:
     LOG.info("Unexpected license ID: %s", license)
     # Prevent the storing of bad data
     return None, None
-
-
-def download_spdx_licenses() -> dict:
-    # The Software Package Data Exchange (SPDX) standard is an open standard hosted by the Linux Foundation.
-    # The SPDX Licenses List is part of the standard and is a list of common licenses for the purpose of
-    # reliable identification of licenses in software projects. The machine-readable versions of the
-    # license list is stored in GitHub. https://spdx.org/licenses/
-    LOG.info("Downloading latest SPDX license data")
-    r = requests.get("https://raw.githubusercontent.com/spdx/license-list-data/main/json/licenses.json")
-    if r.status_code == 200:
-        licenses = {}
-        # Convert the licenses list into a dict for easier usage
-        for license in r.json()["licenses"]:
-            licenses[license["licenseId"].lower()] = license["name"]
-        return licenses
-
-    LOG.error("Unable to retrieve SPDX license data: [HTTP %s] %s", r.status_code, r.text)
-    return {}
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import OuterRef, QuerySet, Value
+from django.db.models.functions import Concat
+
+from artemisdb.artemisdb.models import CacheItem, Component
+from license_retriever.util.env import MISS_TTL
+
+# Cache key prefix for the (ecosystem, name, version) of components whose licenses could not be resolved
+MISS_KEY_PREFIX = "license_retriever:miss:"
+
+# Max length of a cache key. Components with longer keys are not cached and are retried on every run.
+MAX_KEY_LENGTH = CacheItem._meta.get_field("key").max_length
+
+
+def miss_key(component_type: str, name: str, version: str) -> str:
+    return f"{MISS_KEY_PREFIX}{component_type}:{name}@{version}"
+
+
+def recent_misses() -> QuerySet:
+    """
+    Subquery for the unexpired miss of the outer component, for excluding the components that were recently looked
+    up without success in the database instead of loading them
+    """
+    return CacheItem.objects.filter(
+        key=Concat(
+            Value(MISS_KEY_PREFIX),
+            OuterRef("component_type"),
+            Value(":"),
+            OuterRef("name"),
+            Value("@"),
+            OuterRef("version"),
+        ),
+        expires__gt=datetime.now(timezone.utc),
+    )
+
+
+def store_misses(components: list[Component]) -> None:
+    # Record the components so they aren't looked up again until the misses expire
+    expires = datetime.now(timezone.utc) + timedelta(days=MISS_TTL)
+    items = [
+        CacheItem(key=key, value="", expires=expires)
+        for key in {miss_key(c.component_type, c.name, c.version) for c in components}
+        if len(key) <= MAX_KEY_LENGTH
+    ]
+    CacheItem.objects.bulk_create(
+        items, update_conflicts=True, unique_fields=["key"], update_fields=["value", "expires"]
+    )
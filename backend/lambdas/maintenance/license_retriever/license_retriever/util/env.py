@@ -0,0 +1,13 @@
+import os
+
+# Number of components loaded and resolved at a time
+CHUNK_SIZE = int(os.environ.get("LICENSE_RETRIEVER_CHUNK_SIZE", 500))
+
+# Max number of concurrent registry requests per component type
+MAX_CONCURRENT = int(os.environ.get("LICENSE_RETRIEVER_MAX_CONCURRENT", 10))
+
+# Number of days to wait before retrying a component whose licenses could not be resolved
+MISS_TTL = int(os.environ.get("LICENSE_RETRIEVER_MISS_TTL", 7))
+
+# Local copy of the SPDX license list. This is kept in /tmp so it is reused while the Lambda is warm.
+SPDX_CACHE_PATH = os.environ.get("SPDX_CACHE_PATH", "/tmp/spdx_licenses.json")
@@ -0,0 +1,62 @@
+import json
+from typing import Optional
+
+import requests
+
+from artemislib.logging import Logger
+from license_retriever.util.env import SPDX_CACHE_PATH
+
+LOG = Logger(__name__)
+
+SPDX_LICENSES_URL = "https://raw.githubusercontent.com/spdx/license-list-data/main/json/licenses.json"
+
+
+def get_spdx_licenses() -> dict:
+    # The Software Package Data Exchange (SPDX) standard is an open standard hosted by the Linux Foundation.
+    # The SPDX Licenses List is part of the standard and is a list of common licenses for the purpose of
+    # reliable identification of licenses in software projects. The machine-readable versions of the
+    # license list is stored in GitHub. https://spdx.org/licenses/
+    #
+    # The list rarely changes so the local copy is revalidated with its ETag instead of downloading it every run.
+    cached = _read_cache()
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+
+    LOG.info("Retrieving latest SPDX license data")
+    try:
+        r = requests.get(SPDX_LICENSES_URL, headers=headers, timeout=30)
+    except requests.RequestException as e:
+        LOG.error("Unable to retrieve SPDX license data: %s", e)
+        return cached["licenses"] if cached else {}
+
+    if r.status_code == 304 and cached:
+        LOG.info("SPDX license data is unchanged")
+        return cached["licenses"]
+
+    if r.status_code == 200:
+        licenses = {}
+        # Convert the licenses list into a dict for easier usage
+        for license in r.json()["licenses"]:
+            licenses[license["licenseId"].lower()] = license["name"]
+        _write_cache(r.headers.get("ETag"), licenses)
+        return licenses
+
+    LOG.error("Unable to retrieve SPDX license data: [HTTP %s] %s", r.status_code, r.text)
+    return cached["licenses"] if cached else {}
+
+
+def _read_cache() -> Optional[dict]:
+    try:
+        with open(SPDX_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(etag: Optional[str], licenses: dict) -> None:
+    try:
+        with open(SPDX_CACHE_PATH, "w") as f:
+            json.dump({"etag": etag, "licenses": licenses}, f)
+    except OSError as e:
+        LOG.warning("Unable to cache SPDX license data: %s", e)
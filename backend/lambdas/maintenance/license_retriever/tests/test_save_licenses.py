@@ -0,0 +1,63 @@
+import unittest
+import uuid
+
+import pytest
+
+from artemisdb.artemisdb.consts import ComponentType
+from artemisdb.artemisdb.models import CacheItem, Component, License
+from license_retriever import handlers
+from license_retriever.util.cache import MISS_KEY_PREFIX
+
+
+@pytest.mark.integtest
+class TestHandlersDatabase(unittest.TestCase):
+    """
+    Test Class relies on the artemisdb docker container being up.
+    """
+
+    def setUp(self) -> None:
+        self.prefix = f"test-{uuid.uuid4().hex[:8]}"
+        self.components = [
+            Component.objects.create(
+                name=self.prefix, version=f"{i}.0.0", label=f"{self.prefix}_{i}", component_type=ComponentType.NPM.value
+            )
+            for i in range(3)
+        ]
+        self.addCleanup(Component.objects.filter(name=self.prefix).delete)
+        self.addCleanup(License.objects.filter(license_id__startswith=self.prefix).delete)
+        self.addCleanup(CacheItem.objects.filter(key__startswith=f"{MISS_KEY_PREFIX}npm:{self.prefix}@").delete)
+
+    def _get_components(self) -> list:
+        return [c for c in handlers.get_components(self.components[0].pk - 1) if c.name == self.prefix]
+
+    def test_save_licenses(self):
+        existing = License.objects.create(license_id=f"{self.prefix}-mit", name="MIT License")
+        mit = License(license_id=existing.license_id, name="Other Name")
+        gpl = License(license_id=f"{self.prefix}-gpl", name="GPL")
+
+        handlers.save_licenses({self.components[0]: [mit, gpl], self.components[1]: [gpl], self.components[2]: []}, [])
+
+        self.assertCountEqual(
+            self.components[0].licenses.values_list("license_id", flat=True), [mit.license_id, gpl.license_id]
+        )
+        self.assertCountEqual(self.components[1].licenses.values_list("license_id", flat=True), [gpl.license_id])
+
+        # Existing licenses are not modified
+        existing.refresh_from_db()
+        self.assertEqual(existing.name, "MIT License")
+
+        # The component with no licenses is skipped until the miss expires and the others have licenses now
+        self.assertEqual(self._get_components(), [])
+        CacheItem.objects.filter(key__startswith=f"{MISS_KEY_PREFIX}npm:{self.prefix}@").delete()
+        self.assertEqual(self._get_components(), [self.components[2]])
+
+    def test_save_licenses_identified(self):
+        self.components[0].component_type = ComponentType.UNKNOWN.value
+
+        handlers.save_licenses({self.components[0]: []}, [self.components[0]])
+
+        self.components[0].refresh_from_db()
+        self.assertEqual(self.components[0].component_type, ComponentType.UNKNOWN.value)
+        # Components of an unknown type are not retried so no miss is recorded for them
+        self.assertFalse(CacheItem.objects.filter(key__startswith=f"{MISS_KEY_PREFIX}unknown:{self.prefix}@").exists())
+        self.assertEqual(self._get_components(), self.components[1:])
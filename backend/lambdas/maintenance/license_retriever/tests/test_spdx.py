@@ -0,0 +1,71 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from license_retriever.util import spdx
+
+SPDX_RESPONSE = {"licenses": [{"licenseId": "MIT", "name": "MIT License"}]}
+EXPECTED = {"mit": "MIT License"}
+
+
+def _response(status_code: int, body: dict = None, etag: str = None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = body
+    response.headers = {"ETag": etag} if etag else {}
+    return response
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    path = tmp_path / "spdx_licenses.json"
+    with patch.object(spdx, "SPDX_CACHE_PATH", str(path)):
+        yield path
+
+
+def test_get_spdx_licenses_download(cache_path):
+    with patch("requests.get", return_value=_response(200, SPDX_RESPONSE, '"abc"')) as mock_get:
+        assert spdx.get_spdx_licenses() == EXPECTED
+
+    # Nothing is cached yet so the request is unconditional
+    assert mock_get.call_args.kwargs["headers"] == {}
+    assert json.loads(cache_path.read_text()) == {"etag": '"abc"', "licenses": EXPECTED}
+
+
+def test_get_spdx_licenses_not_modified(cache_path):
+    cache_path.write_text(json.dumps({"etag": '"abc"', "licenses": EXPECTED}))
+
+    with patch("requests.get", return_value=_response(304)) as mock_get:
+        assert spdx.get_spdx_licenses() == EXPECTED
+
+    assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"abc"'}
+
+
+def test_get_spdx_licenses_modified(cache_path):
+    cache_path.write_text(json.dumps({"etag": '"abc"', "licenses": {"gpl": "GPL"}}))
+
+    with patch("requests.get", return_value=_response(200, SPDX_RESPONSE, '"def"')):
+        assert spdx.get_spdx_licenses() == EXPECTED
+
+    assert json.loads(cache_path.read_text())["etag"] == '"def"'
+
+
+@pytest.mark.parametrize(
+    "side_effect",
+    [
+        pytest.param(requests.ConnectionError(), id="should use the cached list if the request fails"),
+        pytest.param([_response(500)], id="should use the cached list if the response is an error"),
+    ],
+)
+def test_get_spdx_licenses_error(cache_path, side_effect):
+    cache_path.write_text(json.dumps({"etag": '"abc"', "licenses": EXPECTED}))
+
+    with patch("requests.get", side_effect=side_effect):
+        assert spdx.get_spdx_licenses() == EXPECTED
+
+
+def test_get_spdx_licenses_error_no_cache(cache_path):
+    with patch("requests.get", return_value=_response(500)):
+        assert spdx.get_spdx_licenses() == {}
@@ -46,6 +46,7 @@ class ReportStatus(Enum):
 
 class ReportType(Enum):
     PDF = "pdf"
+    JSON = "json"
 
 
 class RiskClassification(Enum):
@@ -67,6 +68,9 @@ class Severity(Enum):
 
 DEFAULT_PAGE_SIZE = 20
 
+# Results are counted exactly up to this many objects when estimated counts are requested
+MAX_EXACT_COUNT = 1000
+
 MAX_REASON_LENGTH = 512
 
 NOT_RUNNING_STATUSES = [
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 03:40
+
+import artemisdb.artemisdb.consts
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("artemisdb", "0051_alter_apikey_expires_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="report",
+            name="report_type",
+            field=models.CharField(
+                choices=[
+                    (artemisdb.artemisdb.consts.ReportType["PDF"], "pdf"),
+                    (artemisdb.artemisdb.consts.ReportType["JSON"], "json"),
+                ],
+                max_length=64,
+            ),
+        ),
+    ]
@@ -1,6 +1,7 @@
 import importlib
 import uuid
 from datetime import datetime, timezone
+from typing import Optional
 from urllib.parse import quote_plus
 
 import simplejson
@@ -199,6 +200,10 @@ class Repo(models.Model):
         app_label = "artemisdb"
         unique_together = ["repo", "service"]
 
+    # Prefixes of the latest scan annotations that are used by to_dict(), if present
+    LATEST_SCAN = "latest_scan"
+    LATEST_QUALIFIED_SCAN = "latest_qualified_scan"
+
     def __str__(self):
         return f"{self.service}/{self.repo}"
 
@@ -208,29 +213,31 @@ class Repo(models.Model):
         ret = {"service": self.service, "repo": self.repo, "risk": self.risk}
 
         if include_scan:
-            scan = self.scan_set.order_by("-created").only("created", "scan_id").first()
-            if scan:
-                ret["scan"] = {"created": format_timestamp(scan.created), "scan_id": str(scan.scan_id)}
-            else:
-                ret["scan"] = None
+            ret["scan"] = self._latest_scan(self.LATEST_SCAN, self.scan_set.all())
 
         if include_qualified_scan:
-            qualified_scan = (
-                self.scan_set.filter(qualified=True).order_by("-created").only("created", "scan_id").first()
-            )
-            if qualified_scan:
-                ret["qualified_scan"] = {
-                    "created": format_timestamp(qualified_scan.created),
-                    "scan_id": str(qualified_scan.scan_id),
-                }
-            else:
-                ret["qualified_scan"] = None
+            ret["qualified_scan"] = self._latest_scan(self.LATEST_QUALIFIED_SCAN, self.scan_set.filter(qualified=True))
 
         if include_app_metadata:
             ret["application_metadata"] = self.formatted_application_metadata()
 
         return ret
 
+    def _latest_scan(self, prefix: str, scans: models.QuerySet) -> Optional[dict]:
+        if hasattr(self, f"{prefix}_id"):
+            # The latest scan was annotated when the repo was loaded
+            scan_id = getattr(self, f"{prefix}_id")
+            created = getattr(self, f"{prefix}_created")
+        else:
+            scan = scans.order_by("-created").only("created", "scan_id").first()
+            if scan is None:
+                return None
+            scan_id = scan.scan_id
+            created = scan.created
+        if scan_id is None:
+            return None
+        return {"created": format_timestamp(created), "scan_id": str(scan_id)}
+
     @classmethod
     def in_scope(cls, scopes: list[list[list[str]]]) -> models.QuerySet:
         # Performance shortcut
@@ -1,18 +1,30 @@
+import base64
+import binascii
 import importlib
+import json
+from datetime import date, datetime
 from enum import Enum
 from http import HTTPStatus
-from typing import Callable
+from typing import Callable, Optional
+from uuid import UUID
 
+from django.core.exceptions import FieldDoesNotExist
+from django.db import DatabaseError
+from django.db.models import Q
 from django.db.models.query import QuerySet
 
-from artemisdb.artemisdb.consts import DEFAULT_PAGE_SIZE
+from artemisdb.artemisdb.consts import DEFAULT_PAGE_SIZE, MAX_EXACT_COUNT
 from artemisdb.artemisdb.env import API_PATH, CUSTOM_FILTERING_MODULE
+from artemisdb.artemisdb.serializers import prepare_queryset
 from artemislib.datetime import from_iso_timestamp
 from artemislib.logging import Logger
 from artemisapi.const import REPO_SEARCH_CICD_TOOL_PARAM
 
 IGNORED_FIELDS = [REPO_SEARCH_CICD_TOOL_PARAM]
 
+# Query args that cursor_page sets itself in the next/previous links
+CURSOR_PAGING_ARGS = ["cursor", "limit", "offset", "count", "order_by"]
+
 try:
     # If the Artemis API library is present load the response method and validation exception
     from artemisapi.response import response
@@ -37,6 +49,17 @@ class FilterType(Enum):
     IS_IN = "in"
 
 
+class CountMode(Enum):
+    EXACT = "exact"  # Count all of the matching objects
+    ESTIMATE = "estimate"  # Count up to MAX_EXACT_COUNT objects and use the query planner's estimate beyond that
+    NONE = "none"  # Don't count the objects
+
+
+class CursorDirection(Enum):
+    NEXT = "n"
+    PREVIOUS = "p"
+
+
 LOG = Logger(__name__)
 
 CUSTOM_FILTERING = None
@@ -163,7 +186,15 @@ class FilterMap:
 
 class PageInfo:
     def __init__(
-        self, offset: int, limit: int, filters: list[Filter], order_by: list[str], query_str: str = None
+        self,
+        offset: int,
+        limit: int,
+        filters: list[Filter],
+        order_by: list[str],
+        query_str: str = None,
+        cursor: str = None,
+        count: CountMode = CountMode.EXACT,
+        order_by_param: str = None,
     ) -> None:
         self.offset = offset
         self.limit = limit
@@ -171,10 +202,15 @@ class PageInfo:
         self.order_by = order_by
         self.query_str = query_str
 
+        # Cursor paging. The cursor is None when using limit/offset paging and an empty string for the first page.
+        self.cursor = cursor
+        self.count = count
+        self.order_by_param = order_by_param  # The order_by query parameter, which is carried over to the links
+
     def __str__(self) -> str:
         return (
             f"PageInfo<offset={self.offset}, limit={self.limit}, "
-            f"filter_count={len(self.filters)}, order_by={self.order_by}"
+            f"filter_count={len(self.filters)}, order_by={self.order_by}, cursor={self.cursor is not None}"
         )
 
     def __repr__(self) -> str:
@@ -190,7 +226,11 @@ def page(
     extra_args: str = None,
     query_str: str = None,
     post_processor=None,
+    paging: PageInfo = None,
 ):
+    if paging is not None and paging.cursor is not None and isinstance(qs, QuerySet):
+        return cursor_page(qs, paging, api_resource, to_dict_kwargs, extra_args, post_processor)
+
     end = offset + limit
     count = 0
 
@@ -200,17 +240,13 @@ def page(
         # .count() is more efficient than len() since we're slicing the QuerySet. Some unit tests actually end up
         # passing in a list as the result of the mocked QuerySet and list.count() doesn't have the same method signature
         # as QuerySet.count() so in those cases use len().
-        count = qs.count() if isinstance(qs, QuerySet) else len(qs)
-        for obj in qs[offset:end]:
-            if to_dict_kwargs is None:
-                to_dict_kwargs = {}
-            item_dict = obj.to_dict(**to_dict_kwargs)
-
-            # Apply post-processing if a function was provided
-            if post_processor is not None:
-                item_dict = post_processor(obj, item_dict)
-
-            obj_list.append(item_dict)
+        if isinstance(qs, QuerySet):
+            count = _count(qs, paging.count if paging is not None else CountMode.EXACT)
+            # Load the relations and annotations used by to_dict() along with the page of objects
+            qs = prepare_queryset(qs, to_dict_kwargs)
+        else:
+            count = len(qs)
+        obj_list = _to_dicts(qs[offset:end], to_dict_kwargs, post_processor)
 
     # Build the paging links
     next_offset = offset + limit
@@ -237,6 +273,257 @@ def page(
     return response({"results": obj_list, "count": count, "next": next_page, "previous": prev_page})
 
 
+def cursor_page(
+    qs: QuerySet,
+    paging: PageInfo,
+    api_resource: str,
+    to_dict_kwargs: dict = None,
+    extra_args: str = None,
+    post_processor=None,
+):
+    """
+    Keyset paging of the QuerySet, which takes the same amount of time regardless of how deep the page is.
+
+    The QuerySet's ordering, with the primary key added as a tie-breaker, is the key. The next/previous cursors
+    encode the key of the last/first object on the page and the page is selected with a WHERE clause on the key
+    instead of an OFFSET.
+    """
+    ordering = _keyset_ordering(qs)
+    if ordering is None:
+        return response({"message": "Cursor paging is not supported with this ordering"}, HTTPStatus.BAD_REQUEST)
+
+    try:
+        direction, key = decode_cursor(paging.cursor, ordering)
+    except ValidationError as e:
+        return response({"message": e.message}, e.code)
+
+    count = _count(qs, paging.count)
+
+    page_ordering = ordering
+    if direction == CursorDirection.PREVIOUS:
+        # Page backwards by reversing the ordering and then put the page back in the original order
+        page_ordering = [_reverse_order(order) for order in ordering]
+    page_qs = qs.order_by(*page_ordering)
+    if key is not None:
+        page_qs = page_qs.filter(_keyset_filter(qs.model, page_ordering, key))
+    page_qs = prepare_queryset(page_qs, to_dict_kwargs)
+
+    # Get one more object than the page size to see if there are more objects beyond this page
+    objs = list(page_qs[: paging.limit + 1])
+    more = len(objs) > paging.limit
+    objs = objs[: paging.limit]
+    if direction == CursorDirection.PREVIOUS:
+        objs.reverse()
+
+    obj_list = _to_dicts(objs, to_dict_kwargs, post_processor)
+
+    if direction == CursorDirection.NEXT:
+        has_next = more
+        has_prev = key is not None
+    else:
+        has_next = True
+        has_prev = more
+
+    link = f"{API_PATH}{api_resource}?limit={paging.limit}"
+    args = []
+    if paging.order_by_param:
+        args.append(f"order_by={paging.order_by_param}")
+    if paging.count != CountMode.EXACT:
+        args.append(f"count={paging.count.value}")
+    query_str = _remove_args(paging.query_str, CURSOR_PAGING_ARGS)
+    if query_str:
+        args.append(query_str)
+    if extra_args is not None:
+        args.append(extra_args)
+    suffix = "".join(f"&{arg}" for arg in args)
+
+    next_page = None
+    prev_page = None
+    if has_next and objs:
+        next_cursor = encode_cursor(CursorDirection.NEXT, ordering, _key(objs[-1], ordering))
+        next_page = f"{link}&cursor={next_cursor}{suffix}"
+    if has_prev and objs:
+        prev_cursor = encode_cursor(CursorDirection.PREVIOUS, ordering, _key(objs[0], ordering))
+        prev_page = f"{link}&cursor={prev_cursor}{suffix}"
+
+    return response({"results": obj_list, "count": count, "next": next_page, "previous": prev_page})
+
+
+def encode_cursor(direction: CursorDirection, ordering: list[str], key: list) -> str:
+    """
+    Encodes the direction and the key of the boundary object into an opaque, URL-safe cursor
+    """
+    data = {"d": direction.value, "o": ",".join(ordering), "k": [_encode_key_value(value) for value in key]}
+    encoded = base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode("utf-8")).decode("utf-8")
+    return encoded.rstrip("=")
+
+
+def decode_cursor(cursor: str, ordering: list[str]) -> tuple[CursorDirection, Optional[list]]:
+    """
+    Decodes a cursor created by encode_cursor(). An empty cursor is the first page.
+    :return: Tuple of the direction and the key, which is None for the first page
+    """
+    if not cursor:
+        return CursorDirection.NEXT, None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(f"{cursor}{'=' * (-len(cursor) % 4)}".encode("utf-8")))
+        direction = CursorDirection(data["d"])
+        key = [_decode_key_value(value) for value in data["k"]]
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+        raise ValidationError("Invalid cursor")
+    if data.get("o") != ",".join(ordering) or len(key) != len(ordering):
+        # The ordering has changed since the cursor was created
+        raise ValidationError("Cursor does not match the ordering")
+    return direction, key
+
+
+def _to_dicts(objs, to_dict_kwargs: dict = None, post_processor=None) -> list:
+    obj_list = []
+    for obj in objs:
+        if to_dict_kwargs is None:
+            to_dict_kwargs = {}
+        item_dict = obj.to_dict(**to_dict_kwargs)
+
+        # Apply post-processing if a function was provided
+        if post_processor is not None:
+            item_dict = post_processor(obj, item_dict)
+
+        obj_list.append(item_dict)
+    return obj_list
+
+
+def _count(qs: QuerySet, count: CountMode) -> Optional[int]:
+    if count == CountMode.NONE:
+        return None
+    if count == CountMode.EXACT:
+        return qs.count()
+
+    # Counting a limited subquery stops once MAX_EXACT_COUNT objects are found so small results are still exact
+    capped = qs[: MAX_EXACT_COUNT + 1].count()
+    if capped <= MAX_EXACT_COUNT:
+        return capped
+    try:
+        plan = json.loads(qs.explain(format="json"))
+        return max(int(plan[0]["Plan"]["Plan Rows"]), capped)
+    except (DatabaseError, ValueError, KeyError, IndexError, TypeError) as e:
+        LOG.warning("Unable to estimate count: %s", e)
+        return capped
+
+
+def _keyset_ordering(qs: QuerySet) -> Optional[list[str]]:
+    """
+    Returns the field ordering of the QuerySet with the primary key added as a tie-breaker so that the key is unique.
+    Returns None if the ordering can't be used as a key, such as when it contains expressions.
+    """
+    ordering = list(qs.query.order_by or (qs.query.default_ordering and qs.model._meta.ordering) or [])
+    if not all(isinstance(order, str) and order.lstrip("-") and order != "?" for order in ordering):
+        return None
+    if not qs.query.standard_ordering:
+        ordering = [_reverse_order(order) for order in ordering]
+    fields = [order.lstrip("-") for order in ordering]
+    if "pk" not in fields and qs.model._meta.pk.name not in fields:
+        ordering.append("pk")
+    return ordering
+
+
+def _reverse_order(order: str) -> str:
+    return order[1:] if order.startswith("-") else f"-{order}"
+
+
+def _keyset_filter(model, ordering: list[str], key: list) -> Q:
+    """
+    Builds the filter for the objects that come after the key in the ordering:
+      (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+
+    NULLs are handled the same way as the Postgres default, which is that NULLs sort as if larger than any other
+    value. This way reversing the ordering to page backwards also reverses the position of the NULLs.
+    """
+    q = Q(pk__in=[])
+    equal = Q()
+    for order, value in zip(ordering, key):
+        field = order.lstrip("-")
+        descending = order.startswith("-")
+        nullable = _is_nullable(model, field)
+        if value is None:
+            after = Q(**{f"{field}__isnull": False}) if descending else Q(pk__in=[])
+            same = Q(**{f"{field}__isnull": True})
+        else:
+            after = Q(**{f"{field}__lt" if descending else f"{field}__gt": value})
+            if nullable and not descending:
+                after |= Q(**{f"{field}__isnull": True})
+            same = Q(**{field: value})
+        q |= equal & after
+        equal &= same
+
+    # Bound the leading field as well so that the database can use an index to start the scan at the key instead of
+    # filtering all of the objects that come before it
+    field = ordering[0].lstrip("-")
+    if key[0] is not None and not _is_nullable(model, field):
+        q &= Q(**{f"{field}__lte" if ordering[0].startswith("-") else f"{field}__gte": key[0]})
+    return q
+
+
+def _is_nullable(model, path: str) -> bool:
+    """
+    Whether the field at the lookup path can be NULL. Paths that can't be resolved to a concrete field, such as
+    annotations, are treated as nullable.
+    """
+    if path == "pk":
+        return False
+    for name in path.split("__"):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return True
+        if field.null or field.many_to_many or field.one_to_many or not field.concrete:
+            return True
+        model = field.related_model
+        if model is None:
+            break
+    return False
+
+
+def _key(obj, ordering: list[str]) -> list:
+    key = []
+    for order in ordering:
+        value = obj
+        for attr in order.lstrip("-").split("__"):
+            value = getattr(value, attr, None)
+            if value is None:
+                break
+        key.append(value)
+    return key
+
+
+def _encode_key_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, UUID):
+        return str(value)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _decode_key_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("Unknown key value type")
+    return value
+
+
+def _remove_args(query_str: Optional[str], names: list[str]) -> Optional[str]:
+    # The query string is rebuilt from all of the request's args, including the ones for the current page
+    if not query_str:
+        return query_str
+    return "&".join(arg for arg in query_str.split("&") if arg.split("=", 1)[0] not in names)
+
+
 def validate_paging_query(query: dict) -> tuple:
     try:
         offset = int(query.get("offset", 0))
@@ -253,6 +540,19 @@ def validate_paging_query(query: dict) -> tuple:
     return (offset, limit)
 
 
+def validate_cursor_query(query: dict) -> tuple:
+    cursor = query.get("cursor")
+    if cursor is not None and "offset" in query:
+        raise ValidationError("Offset and cursor cannot be used together")
+
+    try:
+        count = CountMode(query.get("count", CountMode.EXACT.value))
+    except ValueError:
+        raise ValidationError(f"Count must be one of: {', '.join(c.value for c in CountMode)}")
+
+    return (cursor, count)
+
+
 def parse_paging_event(
     event: dict,
     ordering_fields: list = None,
@@ -265,6 +565,7 @@ def parse_paging_event(
     ordering_aliases: dict = None,
     mv_validators: dict = None,
     api_id: str = None,
+    cursor_paging: bool = False,
 ) -> PageInfo:
     load_custom_filtering()
     if api_id in CUSTOM_FILTERING:
@@ -288,8 +589,15 @@ def parse_paging_event(
     # Calculate the paging
     offset, limit = validate_paging_query(query)
 
+    # Cursor paging is opt-in for each API
+    cursor = None
+    count = CountMode.EXACT
+    if cursor_paging:
+        cursor, count = validate_cursor_query(query)
+
     # Extract order_by from the args before checking the filters
     order_by = []
+    order_by_param = query.get("order_by")
     full_ordering_fields = (ordering_fields or []) + [f"-{f}" for f in ordering_fields or []]
     for order in list(filter(None, query.get("order_by", "").split(","))):
         if order not in full_ordering_fields:
@@ -360,6 +668,8 @@ def parse_paging_event(
 
     # Build up the complete list of all possible args
     supported_fields = ["offset", "limit"]
+    if cursor_paging:
+        supported_fields += ["cursor", "count"]
     supported_fields += exact_filters or []
     supported_fields += mv_filters or []
     supported_fields += [f"{f}__contains" for f in substring_filters or []] + [
@@ -387,7 +697,9 @@ def parse_paging_event(
                 query_str += "&"
             query_str += f"{arg}={v}"
 
-    return PageInfo(offset, limit, filters, order_by, query_str)
+    return PageInfo(
+        offset, limit, filters, order_by, query_str, cursor=cursor, count=count, order_by_param=order_by_param
+    )
 
 
 def apply_filters(
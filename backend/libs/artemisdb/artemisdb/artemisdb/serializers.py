@@ -0,0 +1,109 @@
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from django.db.models import OuterRef, Subquery
+from django.db.models.query import QuerySet
+
+from artemisdb.artemisdb.models import (
+    Component,
+    Group,
+    GroupMembership,
+    Repo,
+    RepoComponentScan,
+    RepoVulnerabilityScan,
+    Scan,
+    ScanBatch,
+    Vulnerability,
+)
+
+
+@dataclass(frozen=True)
+class Serializer:
+    """
+    The relations and annotations that a model's to_dict() uses so that a page of objects can be loaded in a fixed
+    number of queries instead of following the relations lazily for each object.
+    """
+
+    select_related: list[str] = field(default_factory=list)
+    prefetch_related: list[str] = field(default_factory=list)
+    annotations: dict = field(default_factory=dict)
+
+    def apply(self, qs: QuerySet) -> QuerySet:
+        if self.select_related:
+            qs = qs.select_related(*self.select_related)
+        if self.prefetch_related:
+            qs = qs.prefetch_related(*self.prefetch_related)
+        if self.annotations:
+            qs = qs.annotate(**self.annotations)
+        return qs
+
+
+def _latest_scan_annotations(prefix: str, scans: QuerySet) -> dict:
+    scans = scans.filter(repo=OuterRef("pk")).order_by("-created")
+    return {
+        f"{prefix}_id": Subquery(scans.values("scan_id")[:1]),
+        f"{prefix}_created": Subquery(scans.values("created")[:1]),
+    }
+
+
+def _repo(include_scan: bool = False, include_qualified_scan: bool = False, **_kwargs) -> Serializer:
+    # Repo.to_dict() uses these annotations instead of querying for the latest scans of each repo
+    annotations = {}
+    if include_scan:
+        annotations.update(_latest_scan_annotations(Repo.LATEST_SCAN, Scan.objects.all()))
+    if include_qualified_scan:
+        annotations.update(_latest_scan_annotations(Repo.LATEST_QUALIFIED_SCAN, Scan.objects.filter(qualified=True)))
+    return Serializer(annotations=annotations)
+
+
+def _repo_vulnerability_scan(include_resolved_by: bool = True, include_repo: bool = True, **_kwargs) -> Serializer:
+    select_related = ["vulnerability"]
+    if include_resolved_by:
+        select_related.append("resolved_by")
+    if include_repo:
+        select_related.append("repo")
+    return Serializer(
+        select_related=select_related,
+        prefetch_related=[
+            "vulnerability__components",
+            "vulnerability__plugins",
+            "vulnerabilityscanplugin_set__components",
+        ],
+    )
+
+
+# Map of models to the methods that return the Serializer for the to_dict() kwargs
+SERIALIZERS: dict[type, Callable[..., Serializer]] = {
+    Component: lambda **_kwargs: Serializer(prefetch_related=["licenses"]),
+    Group: lambda **_kwargs: Serializer(select_related=["parent", "created_by"]),
+    GroupMembership: lambda **_kwargs: Serializer(select_related=["user"]),
+    Repo: _repo,
+    RepoComponentScan: lambda **_kwargs: Serializer(
+        select_related=["component"], prefetch_related=["component__licenses"]
+    ),
+    RepoVulnerabilityScan: _repo_vulnerability_scan,
+    Scan: lambda **_kwargs: Serializer(select_related=["repo", "engine", "owner", "owner_group", "batch"]),
+    ScanBatch: lambda **_kwargs: Serializer(select_related=["created_by"]),
+    Vulnerability: lambda **_kwargs: Serializer(prefetch_related=["components", "plugins"]),
+}
+
+
+def get_serializer(model: type, to_dict_kwargs: dict = None) -> Optional[Serializer]:
+    """
+    Returns the Serializer for the model's to_dict() with the kwargs, if one is registered
+    """
+    serializer = SERIALIZERS.get(model)
+    if serializer is None:
+        return None
+    return serializer(**(to_dict_kwargs or {}))
+
+
+def prepare_queryset(qs: QuerySet, to_dict_kwargs: dict = None) -> QuerySet:
+    """
+    Applies the relations and annotations that the model's to_dict() uses to the QuerySet. This must be done before
+    the QuerySet is sliced.
+    """
+    serializer = get_serializer(qs.model, to_dict_kwargs)
+    if serializer is None:
+        return qs
+    return serializer.apply(qs)
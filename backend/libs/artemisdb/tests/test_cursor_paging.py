@@ -0,0 +1,155 @@
+import json
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from artemisapi.validators import ValidationError
+from artemisdb.artemisdb.models import Repo, Scan
+from artemisdb.artemisdb.paging import (
+    CURSOR_PAGING_ARGS,
+    CountMode,
+    CursorDirection,
+    _remove_args,
+    decode_cursor,
+    encode_cursor,
+    page,
+    parse_paging_event,
+)
+
+TEST_ORDERING = ["-created", "pk"]
+
+
+class TestCursorPaging(unittest.TestCase):
+    def test_parse_paging_event_cursor(self):
+        event = {"queryStringParameters": {"cursor": "", "count": "estimate", "order_by": "-created"}}
+
+        result = parse_paging_event(event, ordering_fields=["created"], cursor_paging=True)
+
+        self.assertEqual(result.cursor, "")
+        self.assertEqual(result.count, CountMode.ESTIMATE)
+        self.assertEqual(result.order_by_param, "-created")
+
+    def test_parse_paging_event_cursor_invalid(self):
+        test_cases = [
+            ({"cursor": "", "offset": "20"}, True),
+            ({"count": "foobar"}, True),
+            # Cursor paging is opt-in
+            ({"cursor": ""}, False),
+            ({"count": "none"}, False),
+        ]
+        for query, cursor_paging in test_cases:
+            with self.subTest(query=query):
+                with self.assertRaises(ValidationError):
+                    parse_paging_event({"queryStringParameters": query}, cursor_paging=cursor_paging)
+
+    def test_remove_args(self):
+        test_cases = [
+            ("cursor=abc&limit=10&repo=testorg/repo&count=none&order_by=-created", "repo=testorg/repo"),
+            ("status=completed&status=failed", "status=completed&status=failed"),
+            ("cursor=abc&limit=10", ""),
+            ("", ""),
+            (None, None),
+        ]
+        for query_str, expected in test_cases:
+            with self.subTest(query_str=query_str):
+                self.assertEqual(_remove_args(query_str, CURSOR_PAGING_ARGS), expected)
+
+    def test_cursor(self):
+        ordering = ["-created", "ref", "repo__repo", "pk"]
+        key = [datetime(2024, 1, 2, 3, 4, 5), None, "testorg/testrepo", 42]
+        cursor = encode_cursor(CursorDirection.PREVIOUS, ordering, key)
+
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor, ordering), (CursorDirection.PREVIOUS, key))
+        self.assertEqual(decode_cursor("", TEST_ORDERING), (CursorDirection.NEXT, None))
+
+    def test_cursor_invalid(self):
+        for cursor in ["foobar", encode_cursor(CursorDirection.NEXT, ["created", "pk"], [None, 1])]:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValidationError):
+                    decode_cursor(cursor, TEST_ORDERING)
+
+
+@pytest.mark.integtest
+class TestCursorPagingDatabase(unittest.TestCase):
+    """
+    Test Class relies on the artemisdb docker container being up.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.repo = Repo.objects.create(service="testservice", repo=f"testorg/test-{uuid.uuid4().hex[:8]}")
+        now = datetime.utcnow()
+        for i in range(25):
+            # Some of the scans share a timestamp so that the primary key tie-breaker is needed
+            scan = Scan.objects.create(
+                repo=cls.repo, scan_id=uuid.uuid4(), ref=None if i % 3 == 0 else f"branch{i % 4}"
+            )
+            Scan.objects.filter(pk=scan.pk).update(created=now - timedelta(minutes=i // 2))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.repo.delete()
+
+    def _page(self, qs, cursor: str = "", limit: int = 10, count: CountMode = CountMode.EXACT) -> dict:
+        query = {"cursor": cursor, "limit": str(limit), "count": count.value}
+        paging = parse_paging_event(
+            # API Gateway also includes the single value args in the multi-value args
+            {"queryStringParameters": query, "multiValueQueryStringParameters": {k: [v] for k, v in query.items()}},
+            cursor_paging=True,
+        )
+        resp = page(qs, paging.offset, paging.limit, "search/scans", paging=paging)
+        self.assertEqual(resp["statusCode"], HTTPStatus.OK)
+        return json.loads(resp["body"])
+
+    def _cursor(self, link: str) -> str:
+        args = parse_qs(urlparse(link).query, keep_blank_values=True)
+        self.assertEqual(len(args["cursor"]), 1)
+        self.assertEqual(len(args["limit"]), 1)
+        return args["cursor"][0]
+
+    def _walk(self, qs) -> None:
+        # The primary key is added as the tie-breaker
+        expected = [scan.scan_id for scan in qs.order_by(*qs.query.order_by, "pk")]
+        self.assertEqual(len(expected), 25)
+
+        # Page forwards through all of the scans
+        pages = []
+        body = self._page(qs)
+        self.assertIsNone(body["previous"])
+        self.assertEqual(body["count"], 25)
+        while True:
+            pages.append([scan["scan_id"] for scan in body["results"]])
+            if body["next"] is None:
+                break
+            body = self._page(qs, self._cursor(body["next"]))
+        self.assertEqual([len(p) for p in pages], [10, 10, 5])
+        self.assertEqual([scan_id for p in pages for scan_id in p], [str(scan_id) for scan_id in expected])
+
+        # Page backwards from the last page
+        for p in reversed(pages[:-1]):
+            body = self._page(qs, self._cursor(body["previous"]))
+            self.assertEqual([scan["scan_id"] for scan in body["results"]], p)
+        self.assertIsNone(body["previous"])
+
+    def test_cursor_paging(self):
+        self._walk(Scan.objects.filter(repo=self.repo).order_by("-created"))
+
+    def test_cursor_paging_nullable(self):
+        self._walk(Scan.objects.filter(repo=self.repo).order_by("ref", "-created"))
+        self._walk(Scan.objects.filter(repo=self.repo).order_by("-ref", "created"))
+
+    def test_cursor_paging_count(self):
+        qs = Scan.objects.filter(repo=self.repo).order_by("-created")
+
+        self.assertEqual(self._page(qs, count=CountMode.ESTIMATE)["count"], 25)
+        with CaptureQueriesContext(connection) as ctx:
+            body = self._page(qs, count=CountMode.NONE)
+        self.assertIsNone(body["count"])
+        self.assertFalse(any("COUNT(" in query["sql"] for query in ctx.captured_queries))
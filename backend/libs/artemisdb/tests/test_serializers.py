@@ -0,0 +1,105 @@
+import json
+import unittest
+import uuid
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from artemisdb.artemisdb.consts import PluginType, Severity
+from artemisdb.artemisdb.models import Component, License, Plugin, Repo, Scan, Vulnerability
+from artemisdb.artemisdb.paging import page
+from artemisdb.artemisdb.serializers import get_serializer, prepare_queryset
+
+NUM_OBJECTS = 12
+
+
+class TestSerializers(unittest.TestCase):
+    def test_get_serializer(self):
+        serializer = get_serializer(Repo, {"include_qualified_scan": True, "include_app_metadata": True})
+        self.assertEqual(
+            sorted(serializer.annotations),
+            [f"{Repo.LATEST_QUALIFIED_SCAN}_created", f"{Repo.LATEST_QUALIFIED_SCAN}_id"],
+        )
+
+        self.assertEqual(get_serializer(Repo).annotations, {})
+        self.assertEqual(get_serializer(Vulnerability).prefetch_related, ["components", "plugins"])
+        self.assertIsNone(get_serializer(License))
+
+
+@pytest.mark.integtest
+class TestSerializersDatabase(unittest.TestCase):
+    """
+    Test Class relies on the artemisdb docker container being up.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.prefix = f"test-{uuid.uuid4().hex[:8]}"
+        cls.plugin = Plugin.objects.create(name=cls.prefix, friendly_name=cls.prefix, type=PluginType.VULN.value)
+        cls.license = License.objects.create(license_id=cls.prefix, name=cls.prefix)
+        for i in range(NUM_OBJECTS):
+            repo = Repo.objects.create(service="testservice", repo=f"{cls.prefix}/repo{i}")
+            if i % 3 != 0:
+                # Leave some of the repos without scans or without qualified scans
+                Scan.objects.create(repo=repo, scan_id=uuid.uuid4(), qualified=True)
+                Scan.objects.create(repo=repo, scan_id=uuid.uuid4(), qualified=i % 2 == 0)
+
+            component = Component.objects.create(name=cls.prefix, version=str(i), label=f"{cls.prefix}_{i}")
+            component.licenses.add(cls.license)
+
+            vuln = Vulnerability.objects.create(vuln_id=uuid.uuid4(), severity=Severity.HIGH.value)
+            vuln.components.add(component)
+            vuln.plugins.add(cls.plugin)
+        cls.vuln_ids = list(Vulnerability.objects.filter(plugins=cls.plugin).values_list("vuln_id", flat=True))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        Vulnerability.objects.filter(vuln_id__in=cls.vuln_ids).delete()
+        Component.objects.filter(name=cls.prefix).delete()
+        Repo.objects.filter(repo__startswith=f"{cls.prefix}/").delete()
+        cls.license.delete()
+        cls.plugin.delete()
+
+    def _endpoints(self) -> list:
+        # The QuerySets and to_dict() kwargs that the paged API endpoints use, along with the number of queries it
+        # takes to load a page of them
+        return [
+            (
+                "search/scans",
+                Scan.objects.filter(repo__repo__startswith=f"{self.prefix}/").order_by("-created"),
+                {"history_format": True},
+                2,
+            ),
+            (
+                "search/repositories",
+                Repo.objects.filter(repo__startswith=f"{self.prefix}/").order_by("repo"),
+                {"include_scan": True, "include_qualified_scan": True, "include_app_metadata": True},
+                2,
+            ),
+            (
+                "search/vulnerabilities",
+                Vulnerability.objects.filter(vuln_id__in=self.vuln_ids).order_by("-added"),
+                None,
+                4,
+            ),
+            ("sbom/components", Component.objects.filter(name=self.prefix).order_by("version"), None, 3),
+        ]
+
+    def test_page_query_count(self):
+        for api_resource, qs, to_dict_kwargs, expected in self._endpoints():
+            with self.subTest(api_resource=api_resource):
+                # The number of queries does not depend on the size of the page
+                for limit in [1, NUM_OBJECTS]:
+                    with CaptureQueriesContext(connection) as ctx:
+                        resp = page(qs, 0, limit, api_resource, to_dict_kwargs=to_dict_kwargs)
+                    self.assertEqual(len(json.loads(resp["body"])["results"]), limit)
+                    self.assertEqual(len(ctx.captured_queries), expected)
+
+    def test_prepare_queryset(self):
+        for api_resource, qs, to_dict_kwargs, _ in self._endpoints():
+            with self.subTest(api_resource=api_resource):
+                # Serializing the prepared QuerySet matches following the relations lazily
+                expected = [obj.to_dict(**(to_dict_kwargs or {})) for obj in qs]
+                actual = [obj.to_dict(**(to_dict_kwargs or {})) for obj in prepare_queryset(qs, to_dict_kwargs)]
+                self.assertEqual(actual, expected)
@@ -0,0 +1,106 @@
+from collections import deque
+from typing import Iterable, Optional, Sequence
+
+# The allowlist item value fields that identify the findings an item applies to, by allowlist item type
+ALLOWLIST_KEYS = {
+    "configuration": ("id",),
+    "secret": ("filename", "line", "commit"),
+    "static_analysis": ("filename", "line", "type"),
+    "vulnerability": ("component", "id", "source"),
+}
+
+
+class AllowList:
+    """
+    Compiled form of a repo's allowlist items of a single type.
+
+    The items are hashed by the tuple of their key values so that checking a finding against the allowlist is a single
+    set lookup instead of a comparison against every item.
+    """
+
+    def __init__(self, items: Iterable, keys: Sequence[str]):
+        self.keys = tuple(keys)
+        self._index = set()
+        for item in items:
+            key = self._key(item.value)
+            if key is not None:
+                self._index.add(key)
+
+    @classmethod
+    def for_type(cls, items: Iterable, item_type: str) -> "AllowList":
+        return cls(items, ALLOWLIST_KEYS[item_type])
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def match(self, finding: dict) -> bool:
+        key = self._key(finding)
+        return key is not None and key in self._index
+
+    def _key(self, value: dict) -> Optional[tuple]:
+        key = tuple(value.get(k) for k in self.keys)
+        try:
+            hash(key)
+        except TypeError:
+            # A value that can't be hashed can't be compared by key, and allowlist values are always scalars
+            return None
+        return key
+
+
+class SubstringMatcher:
+    """
+    Aho-Corasick automaton over a set of strings.
+
+    Determines whether any of the strings occurs in a text in a single pass over the text, no matter how many strings
+    there are, instead of searching the text once for each string.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [False]
+        self._count = 0
+
+        for pattern in patterns:
+            self._count += 1
+            state = 0
+            for char in pattern:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(False)
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._out[state] = True
+
+        # Breadth-first so that the failure state of every state is complete before any of its children are visited
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] or self._out[self._fail[child]]
+                queue.append(child)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def search(self, text: str) -> bool:
+        if self._out[0]:
+            # An empty string is a substring of everything
+            return True
+
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                return True
+        return False
@@ -45,6 +45,65 @@ class LambdaError(Exception):
     pass
 
 
+# S3 requires all but the last part of a multipart upload to be at least 5 MiB
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+S3_DEFAULT_PART_SIZE = 8 * 1024 * 1024
+
+# S3 DeleteObjects accepts up to 1000 keys per request
+S3_MAX_DELETE_KEYS = 1000
+
+
+class S3MultipartWriter:
+    """
+    Writes a text object to S3 incrementally using a multipart upload so that the whole object never has to be held
+    in memory. The writer buffers up to part_size bytes before uploading each part.
+
+    The upload is completed when the writer is closed. If an exception is raised inside the context manager the upload
+    is aborted instead so that the incomplete parts are not left behind.
+    """
+
+    def __init__(self, obj: S3Object, part_size: int = S3_DEFAULT_PART_SIZE) -> None:
+        if part_size < S3_MIN_PART_SIZE:
+            raise ValueError(f"Part size must be at least {S3_MIN_PART_SIZE} bytes")
+        self._upload = obj.initiate_multipart_upload()
+        self._part_size = part_size
+        self._buffer = bytearray()
+        self._parts: list[dict] = []
+        self.size = 0
+
+    def __enter__(self) -> "S3MultipartWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, data: str) -> None:
+        encoded = data.encode("utf-8")
+        self._buffer += encoded
+        self.size += len(encoded)
+        while len(self._buffer) >= self._part_size:
+            self._upload_part(bytes(self._buffer[: self._part_size]))
+            del self._buffer[: self._part_size]
+
+    def close(self) -> None:
+        # A multipart upload needs at least one part, even if it is empty
+        if self._buffer or not self._parts:
+            self._upload_part(bytes(self._buffer))
+            self._buffer.clear()
+        self._upload.complete(MultipartUpload={"Parts": self._parts})
+
+    def abort(self) -> None:
+        self._upload.abort()
+
+    def _upload_part(self, body: bytes) -> None:
+        part_number = len(self._parts) + 1
+        resp = self._upload.Part(part_number).upload(Body=body)
+        self._parts.append({"ETag": resp["ETag"], "PartNumber": part_number})
+
+
 class AWSConnect:
     _instance = None
     _EC2: EC2ServiceResource
@@ -200,6 +259,21 @@ class AWSConnect:
         if obj:
             obj.put(Body=body)
 
+    def open_s3_multipart_writer(
+        self,
+        path: str,
+        s3_bucket: Optional[str] = S3_BUCKET,
+        endpoint_url: str = DEFAULT_S3_ENDPOINT,
+        part_size: int = S3_DEFAULT_PART_SIZE,
+    ) -> S3MultipartWriter:
+        """
+        Starts a multipart upload for writing a large text object to S3 incrementally.
+
+        Raises ValueError if the bucket is not specified.
+        Raises botocore.exceptions.ClientError if the upload cannot be started.
+        """
+        return S3MultipartWriter(self.get_s3_object(path, s3_bucket, endpoint_url), part_size=part_size)
+
     def delete_s3_files(
         self, prefix: str, s3_bucket: Optional[str] = S3_BUCKET, endpoint_url: str = DEFAULT_S3_ENDPOINT
     ) -> int:
@@ -219,11 +293,39 @@ class AWSConnect:
             count += len(item.get("Deleted", []))
         return count
 
+    def delete_s3_objects(
+        self, keys: list[str], s3_bucket: Optional[str] = S3_BUCKET, endpoint_url: str = DEFAULT_S3_ENDPOINT
+    ) -> int:
+        """
+        Delete S3 objects by key, up to 1000 objects per request.
+
+        Returns the number of objects which were deleted.
+        Raises ValueError if the bucket is not specified.
+        Raises botocore.exceptions.ClientError if a request fails.
+        """
+        if s3_bucket is None:
+            raise ValueError("Target bucket must be specified")
+        count = 0
+        bucket = self._S3[endpoint_url].Bucket(s3_bucket)
+        for i in range(0, len(keys), S3_MAX_DELETE_KEYS):
+            chunk = keys[i : i + S3_MAX_DELETE_KEYS]
+            # Quiet mode only returns the objects that could not be deleted
+            resp = bucket.delete_objects(Delete={"Objects": [{"Key": key} for key in chunk], "Quiet": True})
+            errors = resp.get("Errors", [])
+            for error in errors:
+                self.log.error("Unable to delete %s: %s", error.get("Key"), error.get("Message"))
+            count += len(chunk) - len(errors)
+        return count
+
     def get_s3_file_list(
-        self, prefix: str, s3_bucket: Optional[str] = S3_BUCKET, endpoint_url: str = DEFAULT_S3_ENDPOINT
+        self,
+        prefix: str,
+        s3_bucket: Optional[str] = S3_BUCKET,
+        endpoint_url: str = DEFAULT_S3_ENDPOINT,
+        marker: Optional[str] = None,
     ) -> BucketObjectsCollection:
         """
-        Lists all objects matching a prefix.
+        Lists all objects matching a prefix, optionally starting after the marker key.
 
         Returns an iterable object collection.
         Raises ValueError if the bucket is not specified.
@@ -232,4 +334,6 @@ class AWSConnect:
             raise ValueError("Target bucket must be specified")
         self.log.debug("[get_s3_file_list] prefix=%s, bucket=%s, endpoint=%s", prefix, s3_bucket, endpoint_url)
         bucket = self._S3[endpoint_url].Bucket(s3_bucket)
+        if marker:
+            return bucket.objects.filter(Prefix=prefix, Marker=marker)
         return bucket.objects.filter(Prefix=prefix)
@@ -1,6 +1,7 @@
 import os
 import sys
 import json
+import threading
 from logging import (
     Formatter,
     LogRecord,
@@ -73,15 +74,18 @@ class LogRecordFactory:
 
     LogRecord instances are created every time something is logged. They
     contain all the information for the event being logged. This custom
-    factory, adds the ability to add and remove fields from a LogRecord
+    factory, adds the ability to add and remove fields from a LogRecord.
+    Thread fields are only added to records logged by the thread that set
+    them and take precedence over the fields shared by all threads.
     """
 
     def __init__(self):
         self.extra_fields = {}
+        self._thread = threading.local()
 
     def __call__(self, *args, **kwargs) -> LogRecord:
         record = LogRecord(*args, **kwargs)
-        for key, value in self.extra_fields.items():
+        for key, value in {**self.extra_fields, **self.get_thread_fields()}.items():
             setattr(record, key, value)
         return record
 
@@ -98,6 +102,17 @@ class LogRecordFactory:
     def get_current_fields(self) -> dict[str, Any]:
         return self.extra_fields
 
+    def add_thread_fields(self, **kwargs):
+        self._thread.fields = {**self.get_thread_fields(), **kwargs}
+
+    def remove_thread_fields(self, *args):
+        fields = self.get_thread_fields()
+        for key in args:
+            fields.pop(key, None)
+
+    def get_thread_fields(self) -> dict[str, Any]:
+        return getattr(self._thread, "fields", {})
+
 
 class Logger:
     """
@@ -127,6 +142,16 @@ class Logger:
         record_factory = cls._get_record_factory()
         record_factory.remove_fields(*args)
 
+    @classmethod
+    def add_thread_fields(cls, **kwargs):
+        record_factory = cls._get_record_factory()
+        record_factory.add_thread_fields(**kwargs)
+
+    @classmethod
+    def remove_thread_fields(cls, *args):
+        record_factory = cls._get_record_factory()
+        record_factory.remove_thread_fields(*args)
+
     @classmethod
     def reset_fields(cls):
         record_factory = cls._get_record_factory()
@@ -0,0 +1,111 @@
+import time
+import unittest
+
+import pytest
+
+from artemislib.allowlist import ALLOWLIST_KEYS, AllowList, SubstringMatcher
+from artemislib.logging import Logger
+from artemislib.util import dict_eq
+
+LOG = Logger(__name__)
+
+
+class MockAllowListItem:
+    def __init__(self, **value) -> None:
+        self.value = value
+
+
+def _secret(n: int) -> dict:
+    return {"filename": f"dir/file{n}.py", "line": n, "commit": f"{n:040x}", "type": "aws"}
+
+
+class TestAllowList(unittest.TestCase):
+    def test_match(self):
+        allow_list = AllowList.for_type(
+            [MockAllowListItem(filename="foo.py", line=1, commit="abc"), MockAllowListItem(filename="bar.py", line=2)],
+            "secret",
+        )
+        self.assertEqual(len(allow_list), 2)
+
+        test_cases = [
+            ({"filename": "foo.py", "line": 1, "commit": "abc", "type": "aws"}, True),
+            ({"filename": "foo.py", "line": "1", "commit": "abc"}, False),  # Types must match
+            ({"filename": "foo.py", "line": 2, "commit": "abc"}, False),
+            ({"filename": "bar.py", "line": 2}, True),  # Missing keys match missing keys
+            ({"filename": ["foo.py"], "line": 1, "commit": "abc"}, False),  # Unhashable values never match
+        ]
+        for finding, expected in test_cases:
+            with self.subTest(finding=finding):
+                self.assertEqual(allow_list.match(finding), expected)
+
+    def test_match_keys(self):
+        allow_list = AllowList([MockAllowListItem(id="check-1", name="ignored")], ALLOWLIST_KEYS["configuration"])
+        self.assertTrue(allow_list.match({"id": "check-1", "name": "Check 1"}))
+        self.assertFalse(allow_list.match({"id": "check-2", "name": "ignored"}))
+
+    def test_empty(self):
+        allow_list = AllowList.for_type([], "vulnerability")
+        self.assertFalse(allow_list)
+        self.assertFalse(allow_list.match({"component": "foo", "id": "CVE-1", "source": "bar"}))
+
+
+class TestSubstringMatcher(unittest.TestCase):
+    def test_search(self):
+        matcher = SubstringMatcher(["foobar", "he", "she", "his", "hers", "abcd", "bc"])
+        self.assertEqual(len(matcher), 7)
+
+        test_cases = [
+            ("foobar", True),  # Exact match
+            ("foo", False),  # Pattern is superstring, no match
+            ("xxfoobarbaz", True),  # Pattern is substring
+            ("ushers", True),
+            ("abxcd", False),
+            ("abcx", True),  # Match found by following a failure link from "abc" to "bc"
+            ("fooba", False),
+            ("", False),
+        ]
+        for text, expected in test_cases:
+            with self.subTest(text=text):
+                self.assertEqual(matcher.search(text), expected)
+                # Same result as checking each pattern
+                self.assertEqual(any(p in text for p in ["foobar", "he", "she", "his", "hers", "abcd", "bc"]), expected)
+
+    def test_search_empty(self):
+        self.assertFalse(SubstringMatcher([]).search("foo"))
+        self.assertTrue(SubstringMatcher(["", "bar"]).search("foo"))
+
+    @pytest.mark.benchmark
+    def test_benchmark(self):
+        findings = 10000
+        items = 1000
+
+        # Secrets allowlist items and findings, half of the items match a finding
+        keys = ALLOWLIST_KEYS["secret"]
+        al_items = [MockAllowListItem(**{key: _secret(n)[key] for key in keys}) for n in range(0, items * 2, 2)]
+        secrets = [_secret(n) for n in range(findings)]
+
+        # Raw secrets allowlist strings and matches, half of the strings are in a match
+        raw_items = [f"AKIA{n:016d}" for n in range(0, items * 2, 2)]
+        matches = [f"aws_access_key_id = AKIA{n:016d}" for n in range(findings)]
+
+        # Each finding compared against every item, the way findings were matched before the allowlist index
+        start = time.monotonic()
+        linear = [any(dict_eq(al.value, secret, keys) for al in al_items) for secret in secrets]
+        linear += [any(al in match for al in raw_items) for match in matches]
+        linear_time = time.monotonic() - start
+
+        start = time.monotonic()
+        allow_list = AllowList(al_items, keys)
+        matcher = SubstringMatcher(raw_items)
+        compiled = [allow_list.match(secret) for secret in secrets] + [matcher.search(match) for match in matches]
+        compiled_time = time.monotonic() - start
+
+        LOG.info(
+            "Matched %d findings against %d allowlist items: linear %.3fs, compiled %.3fs",
+            findings,
+            items,
+            linear_time,
+            compiled_time,
+        )
+        self.assertEqual(compiled, linear)
+        self.assertEqual(sum(compiled), items * 2)
@@ -5,7 +5,7 @@ from moto import mock_aws
 from botocore.exceptions import ClientError
 import unittest
 
-from artemislib.aws import AWSConnect
+from artemislib.aws import S3_MIN_PART_SIZE, AWSConnect
 
 DEFAULT_REGION = "us-east-1"
 
@@ -146,6 +146,51 @@ class TestAWSConnect(unittest.TestCase):
         with self.assertRaises(ValueError):
             aws.write_s3_file("nonexistent", "foo bar", None)
 
+    def test_open_s3_multipart_writer(self):
+        s3 = boto3.client("s3", region_name=DEFAULT_REGION)
+        s3.create_bucket(Bucket="dest")
+        chunk = "x" * 1024 * 1024
+
+        aws = AWSConnect(region=DEFAULT_REGION)
+        with aws.open_s3_multipart_writer("foo/bar.json", "dest", part_size=S3_MIN_PART_SIZE) as writer:
+            for _ in range(11):
+                writer.write(chunk)
+
+        self.assertEqual(writer.size, 11 * len(chunk))
+        resp = s3.get_object(Bucket="dest", Key="foo/bar.json")
+        # The ETag of a multipart object ends with the number of parts
+        self.assertTrue(resp["ETag"].strip('"').endswith("-3"))
+        self.assertEqual(resp["Body"].read().decode("utf-8"), chunk * 11)
+
+    def test_open_s3_multipart_writer_empty(self):
+        s3 = boto3.client("s3", region_name=DEFAULT_REGION)
+        s3.create_bucket(Bucket="dest")
+
+        aws = AWSConnect(region=DEFAULT_REGION)
+        with aws.open_s3_multipart_writer("foo/bar.json", "dest"):
+            pass
+
+        resp = s3.get_object(Bucket="dest", Key="foo/bar.json")
+        self.assertEqual(resp["Body"].read(), b"")
+
+    def test_open_s3_multipart_writer_abort(self):
+        s3 = boto3.client("s3", region_name=DEFAULT_REGION)
+        s3.create_bucket(Bucket="dest")
+
+        aws = AWSConnect(region=DEFAULT_REGION)
+        with self.assertRaises(RuntimeError):
+            with aws.open_s3_multipart_writer("foo/bar.json", "dest") as writer:
+                writer.write("lorem ipsum")
+                raise RuntimeError()
+
+        self.assertNotIn("Contents", s3.list_objects_v2(Bucket="dest"))
+        self.assertNotIn("Uploads", s3.list_multipart_uploads(Bucket="dest"))
+
+    def test_open_s3_multipart_writer_part_size(self):
+        aws = AWSConnect(region=DEFAULT_REGION)
+        with self.assertRaises(ValueError):
+            aws.open_s3_multipart_writer("foo/bar.json", "dest", part_size=1024)
+
     def test_delete_s3_files(self):
         s3 = boto3.client("s3", region_name=DEFAULT_REGION)
         s3.create_bucket(Bucket="dest")
@@ -168,6 +213,24 @@ class TestAWSConnect(unittest.TestCase):
         with self.assertRaises(ValueError):
             aws.delete_s3_files("foo/", None)
 
+    def test_delete_s3_objects(self):
+        s3 = boto3.client("s3", region_name=DEFAULT_REGION)
+        s3.create_bucket(Bucket="dest")
+        keys = [f"foo/{i}.txt" for i in range(1001)]
+        for key in keys + ["bar.txt"]:
+            s3.put_object(Bucket="dest", Key=key, Body=b"foo")
+
+        aws = AWSConnect(region=DEFAULT_REGION)
+        count = aws.delete_s3_objects(keys, "dest")
+        self.assertEqual(count, 1001)
+        # Confirm that only the listed files were deleted.
+        self.assertEqual([x.key for x in aws.get_s3_file_list("", "dest")], ["bar.txt"])
+
+    def test_delete_s3_objects_missing_bucket(self):
+        aws = AWSConnect(region=DEFAULT_REGION)
+        with self.assertRaises(ValueError):
+            aws.delete_s3_objects(["foo"], None)
+
     def test_get_s3_file_list(self):
         s3 = boto3.client("s3", region_name=DEFAULT_REGION)
         s3.create_bucket(Bucket="list")
@@ -191,3 +254,13 @@ class TestAWSConnect(unittest.TestCase):
         aws = AWSConnect(region=DEFAULT_REGION)
         with self.assertRaises(ValueError):
             aws.get_s3_file_list("foo/", None)
+
+    def test_get_s3_file_list_marker(self):
+        s3 = boto3.client("s3", region_name=DEFAULT_REGION)
+        s3.create_bucket(Bucket="list")
+        for key in ["foo/a.txt", "foo/b.txt", "foo/c.txt"]:
+            s3.put_object(Bucket="list", Key=key, Body=b"foo")
+
+        aws = AWSConnect(region=DEFAULT_REGION)
+        actual = [x.key for x in aws.get_s3_file_list("foo/", "list", marker="foo/a.txt")]
+        self.assertEqual(actual, ["foo/b.txt", "foo/c.txt"])
@@ -1,6 +1,7 @@
 import json
 import pytest
 import logging
+import threading
 from artemislib.logging import Logger, JSONFormatter
 
 LOG_MESSAGE1 = {"level": "INFO", "message": "Scanning Repository", "repo": "Warnermedia/artemis", "scan_id": "1234"}
@@ -50,6 +51,29 @@ def test_add_and_remove_fields_engine(custom_caplog):
     assert log2 == LOG_MESSAGE2
 
 
+def test_thread_fields(custom_caplog):
+    logger = Logger("test_logger")
+    Logger.add_fields(scan_id="1234", plugin="shared")
+
+    def worker():
+        Logger.add_thread_fields(plugin="trivy")
+        logger.info("Running plugin")
+        Logger.remove_thread_fields("plugin")
+        logger.info("Plugin finished")
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    logger.info("Scanning Repository")
+
+    log_outputs = [json.loads(line) for line in custom_caplog.text.strip().split("\n")]
+    assert [(log["message"], log["plugin"]) for log in log_outputs] == [
+        ("Running plugin", "trivy"),
+        ("Plugin finished", "shared"),
+        ("Scanning Repository", "shared"),
+    ]
+
+
 def test_inject_lambda_context(custom_caplog):
     @Logger.inject_lambda_context
     def handler(event, context):
@@ -36,6 +36,8 @@ print("INTERNAL_EVENT_QUEUE=https://localstack:4566/000000000000/artemis-event-q
 
 print("REPORT_QUEUE=https://127.0.0.1:4566/000000000000/artemis-report-queue")
 print("INTERNAL_REPORT_QUEUE=https://localstack:4566/000000000000/artemis-report-queue")
+print("JSON_REPORT_QUEUE=https://127.0.0.1:4566/000000000000/artemis-json-report-queue")
+print("INTERNAL_JSON_REPORT_QUEUE=https://localstack:4566/000000000000/artemis-json-report-queue")
 
 print("ARTEMIS_SCHEDULED_SCANS_QUEUE=https://127.0.0.1:4566/000000000000/artemis-scheduled-scan-queue")
 print("INTERNAL_ARTEMIS_SCHEDULED_SCANS_QUEUE=https://localstack:4566/000000000000/artemis-scheduled-scan-queue")
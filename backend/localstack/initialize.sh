@@ -5,5 +5,6 @@ awslocal sqs create-queue --queue-name artemis-priority-task-queue
 awslocal sqs create-queue --queue-name artemis-callback-queue
 awslocal sqs create-queue --queue-name artemis-event-queue
 awslocal sqs create-queue --queue-name artemis-report-queue
+awslocal sqs create-queue --queue-name artemis-json-report-queue
 awslocal sqs create-queue --queue-name artemis-scheduled-scan-queue
 awslocal s3 mb s3://artemis-localstack
@@ -141,6 +141,7 @@ module "analyzer" {
   event_queue              = module.sqs_queues.event_queue
   secrets_queue            = module.sqs_queues.secrets_queue
   report_queue             = module.sqs_queues.report_queue
+  json_report_queue        = module.sqs_queues.json_report_queue
   audit_event_queue        = module.sqs_queues.audit_event_queue
   scheduled_scan_queue     = module.sqs_queues.scheduled_scan_queue
   metadata_events_queue    = module.sqs_queues.metadata_events_queue
@@ -116,4 +116,10 @@ resource "aws_lambda_permission" "event-dispatch" {
 resource "aws_lambda_event_source_mapping" "event-dispatch" {
   event_source_arn = var.event_queue.arn
   function_name    = aws_lambda_function.event-dispatch.arn
+
+  # Gather larger batches so events are forwarded with fewer SendMessageBatch calls and only retry the records that
+  # failed instead of the whole batch
+  batch_size                         = 100
+  maximum_batching_window_in_seconds = 1
+  function_response_types            = ["ReportBatchItemFailures"]
 }
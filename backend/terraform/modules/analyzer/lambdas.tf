@@ -168,6 +168,7 @@ resource "aws_lambda_function" "repo-handler" {
       JSON_REPORT_LAMBDA                = aws_lambda_function.json_report.arn
       SBOM_REPORT_LAMBDA                = aws_lambda_function.sbom_report.arn
       REPORT_QUEUE                      = var.report_queue.id
+      JSON_REPORT_QUEUE                 = var.json_report_queue.id
       ARTEMIS_FEATURE_AQUA_ENABLED      = var.aqua_enabled ? 1 : 0
       ARTEMIS_FEATURE_VERACODE_ENABLED  = var.veracode_enabled ? 1 : 0
       ARTEMIS_FEATURE_SNYK_ENABLED      = var.snyk_enabled ? 1 : 0
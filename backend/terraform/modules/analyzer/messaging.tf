@@ -7,7 +7,8 @@ locals {
     module.public_engine_cluster.priority_task_queue.arn,
     module.nat_engine_cluster.task_queue.arn,
     module.nat_engine_cluster.priority_task_queue.arn,
-    var.report_queue.arn
+    var.report_queue.arn,
+    var.json_report_queue.arn
   ]
 }
 
@@ -28,6 +29,7 @@ module "task-queue-receive" {
   actions = [
     "sqs:ReceiveMessage",
     "sqs:DeleteMessage",
+    "sqs:ChangeMessageVisibility",
   ]
   iam_role_names = [
     module.public_engine_cluster.engine-role.name,
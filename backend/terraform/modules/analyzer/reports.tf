@@ -11,7 +11,7 @@ resource "aws_lambda_function" "json_report" {
   runtime       = var.lambda_runtime
   architectures = [var.lambda_architecture]
   memory_size   = 1024
-  timeout       = 300
+  timeout       = 900
   role          = aws_iam_role.lambda-assume-role.arn
 
   logging_config {
@@ -31,6 +31,7 @@ resource "aws_lambda_function" "json_report" {
       DATADOG_ENABLED                   = var.datadog_enabled
       ANALYZER_DJANGO_SECRETS_ARN       = "arn:aws:secretsmanager:${var.aws_region}:${data.aws_caller_identity.current.account_id}:secret:${var.app}/django-secret-key"
       ANALYZER_DB_CREDS_ARN             = "arn:aws:secretsmanager:${var.aws_region}:${data.aws_caller_identity.current.account_id}:secret:${var.app}/db-user"
+      S3_BUCKET                         = var.s3_analyzer_files_id
       ARTEMIS_METADATA_FORMATTER_MODULE = var.metadata_formatter_module
       },
       var.datadog_enabled ? merge({
@@ -211,7 +212,8 @@ module "s3-reports-lambda-policy" {
   actions = [
     "s3:GetObject",
     "s3:PutObject",
-    "s3:DeleteObject"
+    "s3:DeleteObject",
+    "s3:AbortMultipartUpload"
   ]
   iam_role_names = [aws_iam_role.lambda-assume-role.name]
   name           = "${var.app}-lambda-s3-reports"
@@ -231,7 +233,8 @@ module "report-queue-send-recv" {
   iam_role_names = [aws_iam_role.lambda-assume-role.name]
   name           = "${var.app}-reports-queue-send-recv"
   resources = [
-    var.report_queue.arn
+    var.report_queue.arn,
+    var.json_report_queue.arn
   ]
 }
 
@@ -253,6 +256,20 @@ resource "aws_lambda_event_source_mapping" "report-queue" {
   batch_size       = 1
 }
 
+resource "aws_lambda_permission" "json-report-generation" {
+  statement_id  = "AllowExecutionFromSQS"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.json_report.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = var.json_report_queue.arn
+}
+
+resource "aws_lambda_event_source_mapping" "json-report-queue" {
+  event_source_arn = var.json_report_queue.arn
+  function_name    = aws_lambda_function.json_report.arn
+  batch_size       = 1
+}
+
 ###############################################################################
 # Report Cleanup
 ###############################################################################
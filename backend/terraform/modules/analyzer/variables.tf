@@ -253,6 +253,8 @@ variable "event_queue" {}
 
 variable "report_queue" {}
 
+variable "json_report_queue" {}
+
 variable "audit_event_queue" {}
 
 variable "scheduled_scan_queue" {}
@@ -14,3 +14,20 @@ resource "aws_sqs_queue" "report-queue" {
 output "report_queue" {
   value = aws_sqs_queue.report-queue
 }
+
+resource "aws_sqs_queue" "json-report-queue" {
+  name = "${var.app}-json-report-queue"
+
+  visibility_timeout_seconds = 900
+
+  tags = merge(
+    var.tags,
+    {
+      Name = "Artemis JSON Report Queue"
+    }
+  )
+}
+
+output "json_report_queue" {
+  value = aws_sqs_queue.json-report-queue
+}
@@ -3,7 +3,7 @@ import requests
 
 from aws_lambda_powertools import Logger
 
-from heimdall_utils.artemis import redundant_scan_exists
+from heimdall_utils.artemis import filter_redundant_scans
 from heimdall_utils.aws_utils import queue_service_and_org
 from heimdall_utils.env import DEFAULT_API_TIMEOUT, APPLICATION
 from heimdall_utils.utils import JSONUtils, ScanOptions, ServiceInfo, parse_timestamp
@@ -94,60 +94,48 @@ class ADORepoProcessor:
         """Get the repos+refs for this ADO project"""
         resp = self._query_api(query=f"{project}/_apis/git/repositories")
 
-        repos = []
+        candidates = []
         for repo in resp.get("value", []):
+            name = f"{project}/{repo['name']}"
             if self.scan_options.default_branch_only:
+                timestamp = None
                 if self.redundant_scan_query:
                     # Only make the additional queries to get the default branch commit and timestamp if it will
                     # actually be used. If there is no redundant scan query we can skip making these API calls.
                     commit_id = self._get_ref_commit_id(project, repo["name"], repo["defaultBranch"])
                     timestamp = self._get_commit_timestamp(project, repo["name"], commit_id)
-                    if redundant_scan_exists(
-                        api_key=self.artemis_api_key,
-                        service=self.service_info.service,
-                        org=self.service_info.org,
-                        repo=f"{project}/{repo['name']}",
-                        branch=None,
-                        timestamp=timestamp,
-                        query=self.redundant_scan_query,
-                    ):
-                        continue
-                repos.append(
-                    {
-                        "service": self.service_info.service,
-                        "repo": f"{project}/{repo['name']}",
-                        "org": self.service_info.org,
-                        "plugins": self.scan_options.plugins,
-                    }
-                )
+                task = {
+                    "service": self.service_info.service,
+                    "repo": name,
+                    "org": self.service_info.org,
+                    "plugins": self.scan_options.plugins,
+                }
+                candidates.append((task, (name, None, timestamp)))
             else:
                 refs = self._get_refs(project, repo["name"])
                 for ref, commit_id in refs:
+                    timestamp = None
                     if self.redundant_scan_query:
                         # Only make the additional query to get the default branch timestamp if it will actually be
                         # used. If there is no redundant scan query we can skip making this API call.
                         timestamp = self._get_commit_timestamp(project, repo["name"], commit_id)
-                        if redundant_scan_exists(
-                            api_key=self.artemis_api_key,
-                            service=self.service_info.service,
-                            org=self.service_info.org,
-                            repo=f"{project}/{repo['name']}",
-                            branch=ref,
-                            timestamp=timestamp,
-                            query=self.redundant_scan_query,
-                        ):
-                            continue
-                    repos.append(
-                        {
-                            "service": self.service_info.service,
-                            "repo": f"{project}/{repo['name']}",
-                            "org": self.service_info.org,
-                            "plugins": self.scan_options.plugins,
-                            "branch": ref,
-                        }
-                    )
-
-        return repos
+                    task = {
+                        "service": self.service_info.service,
+                        "repo": name,
+                        "org": self.service_info.org,
+                        "plugins": self.scan_options.plugins,
+                        "branch": ref,
+                    }
+                    candidates.append((task, (name, ref, timestamp)))
+
+        # Check for redundant scans of all of the project's repos at once
+        return filter_redundant_scans(
+            self.artemis_api_key,
+            self.service_info.service,
+            self.service_info.org,
+            candidates,
+            self.redundant_scan_query,
+        )
 
     def _get_refs(self, project: str, repo: str, page_size=REF_PAGE_SIZE) -> list:
         """Get all of the branches for this repo
@@ -8,7 +8,7 @@ from aws_lambda_powertools import Logger
 
 from heimdall_repos.objects.cloud_bitbucket_class import CloudBitbucket
 from heimdall_repos.objects.server_v1_bitbucket_class import ServerV1Bitbucket
-from heimdall_utils.artemis import redundant_scan_exists
+from heimdall_utils.artemis import filter_redundant_scans
 from heimdall_utils.aws_utils import GetProxySecret, queue_service_and_org, queue_branch_and_repo
 from heimdall_utils.env import APPLICATION
 from heimdall_utils.utils import JSONUtils, ScanOptions, ServiceInfo, parse_timestamp
@@ -104,7 +104,7 @@ class ProcessBitbucketRepos:
         """
         Handles processing for a single repository or all repositories in an organization
         """
-        repos = []
+        candidates = []
         for repo in nodes:
             name = repo.get("slug")
             # With an external org we only want to scan the private repos
@@ -114,13 +114,21 @@ class ProcessBitbucketRepos:
                 continue
 
             default_branch = self._get_default_branch(name, repo)
-            repos.extend(self._process_branches(name, default_branch))
-
-        return repos
+            candidates.extend(self._process_branches(name, default_branch))
+
+        # Check for redundant scans of all of the branches at once
+        return filter_redundant_scans(
+            self.artemis_api_key,
+            self.service_info.service,
+            self.service_info.org,
+            candidates,
+            self.redundant_scan_query,
+        )
 
     def _process_branches(self, repo_name: str, default_branch: str) -> list:
         """
-        Handles processing for all branches in a given repository
+        Handles processing for all branches in a given repository, returning each task along with the details needed
+        to check for a redundant scan
         """
         branch_tasks = []
         branch_names, timestamps = self._get_branch_names(repo_name)
@@ -136,26 +144,17 @@ class ProcessBitbucketRepos:
             if branch == default_branch:
                 search_branch = None
 
-            if not redundant_scan_exists(
-                api_key=self.artemis_api_key,
-                service=self.service_info.service,
-                org=self.service_info.org,
-                repo=repo_name,
-                branch=search_branch,
-                timestamp=timestamps[branch],
-                query=self.redundant_scan_query,
-            ):
-                task = {
-                    "service": self.service_info.service,
-                    "repo": repo_name,
-                    "org": self.service_info.org,
-                    "plugins": self.scan_options.plugins,
-                    "branch": branch,
-                }
-                if branch == default_branch:
-                    task.pop("branch")
-
-                branch_tasks.append(task)
+            task = {
+                "service": self.service_info.service,
+                "repo": repo_name,
+                "org": self.service_info.org,
+                "plugins": self.scan_options.plugins,
+                "branch": branch,
+            }
+            if branch == default_branch:
+                task.pop("branch")
+
+            branch_tasks.append((task, (repo_name, search_branch, timestamps[branch])))
         return branch_tasks
 
     def _get_branch_names(self, repo: str) -> Tuple[list, dict]:
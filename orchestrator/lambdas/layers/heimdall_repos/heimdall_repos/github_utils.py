@@ -12,7 +12,7 @@ from heimdall_repos.repo_layer_env import (
     GITHUB_TIMEOUT_FLAG,
     GITHUB_TIMEOUT_KEYWORDS,
 )
-from heimdall_utils.artemis import redundant_scan_exists
+from heimdall_utils.artemis import filter_redundant_scans
 from heimdall_utils.aws_utils import GetProxySecret, queue_service_and_org, queue_branch_and_repo
 from heimdall_utils.env import DEFAULT_API_TIMEOUT, APPLICATION
 from heimdall_utils.github.app import GithubApp
@@ -225,6 +225,7 @@ class ProcessGithubRepos:
         """
         log.info("Processing repos in org: %s", self.service_info.org)
         repos = []
+        candidates = []
         for repo in nodes:
             name = repo.get("name")
             log.debug("Processing branches in repo %s/%s", self.service_info.org, name, repo=name)
@@ -261,7 +262,18 @@ class ProcessGithubRepos:
             default_branch_name = default_branch_ref.get("name", "HEAD")
             branch_names, timestamps = self._get_branch_names(name, repo.get("refs"), default_branch_ref)
 
-            repos.extend(self._process_branches(name, default_branch_name, branch_names, timestamps))
+            candidates.extend(self._process_branches(name, default_branch_name, branch_names, timestamps))
+
+        # Check for redundant scans of all of the branches in the page at once
+        repos.extend(
+            filter_redundant_scans(
+                self.artemis_api_key,
+                self.service_info.service,
+                self.service_info.org,
+                candidates,
+                self.redundant_scan_query,
+            )
+        )
         return repos
 
     def _is_repo_valid(self, repo: dict):
@@ -288,7 +300,8 @@ class ProcessGithubRepos:
             timestamps (dict): A dictionary mapping branch names to the timestamp of the last commit on that branch
 
         Returns:
-            list: A list of Heimdall Tasks
+            list: A list of Heimdall Tasks, each paired with the (repo, branch, timestamp) used to check for a
+            redundant scan
         """
         tasks = []
         for branch in branches:
@@ -296,26 +309,17 @@ class ProcessGithubRepos:
             if branch == default_branch_name:
                 search_branch = None
 
-            if not redundant_scan_exists(
-                api_key=self.artemis_api_key,
-                service=self.service_info.service,
-                org=self.service_info.org,
-                repo=repo_name,
-                branch=search_branch,
-                timestamp=timestamps[branch],
-                query=self.redundant_scan_query,
-            ):
-                task = {
-                    "service": self.service_info.service,
-                    "repo": repo_name,
-                    "org": self.service_info.org,
-                    "plugins": self.scan_options.plugins,
-                    "branch": branch,
-                }
-                if branch == default_branch_name:
-                    task.pop("branch")
-
-                tasks.append(task)
+            task = {
+                "service": self.service_info.service,
+                "repo": repo_name,
+                "org": self.service_info.org,
+                "plugins": self.scan_options.plugins,
+                "branch": branch,
+            }
+            if branch == default_branch_name:
+                task.pop("branch")
+
+            tasks.append((task, (repo_name, search_branch, timestamps[branch])))
         return tasks
 
     def _get_branch_names(self, repo: str, refs: dict, default_branch_ref) -> Tuple[list, dict]:
@@ -10,7 +10,7 @@ import requests
 from aws_lambda_powertools import Logger
 
 from heimdall_repos.repo_layer_env import GITLAB_REPO_QUERY
-from heimdall_utils.artemis import redundant_scan_exists
+from heimdall_utils.artemis import filter_redundant_scans
 from heimdall_utils.aws_utils import GetProxySecret, queue_service_and_org
 from heimdall_utils.env import DEFAULT_API_TIMEOUT, APPLICATION
 from heimdall_utils.utils import JSONUtils, ServiceInfo, ScanOptions, parse_timestamp
@@ -138,7 +138,7 @@ class ProcessGitlabRepos:
         :param nodes: list of repositories
         :return: list of repos or an empty list
         """
-        repos = []
+        candidates = []
         # the repo name includes any org subgroups. To prevent subgroup duplicates, we post the base org only
         base_org = self.service_info.org.split("/")[0]
         for repo in nodes:
@@ -151,60 +151,46 @@ class ProcessGitlabRepos:
             if not repo["repository"]:
                 repo["repository"] = {"rootRef": "HEAD"}
             if self.scan_options.default_branch_only:
+                timestamp = None
                 if self.redundant_scan_query:
                     # Only make the additional query to get the rootRef timestamp if it will actually be used.
                     # If there is no redundant scan query we can skip making this API call.
                     refs, timestamps = self._get_branch_names(repo["id"], repo["repository"]["rootRef"])
 
-                    timestamp = None
                     if refs and timestamps:
                         timestamp = timestamps[refs[0]]
                     else:
                         log.warning(
                             "Unable to retrieve timestamp for %s/%s/%s", self.service_info.service, base_org, name
                         )
-
-                    if redundant_scan_exists(
-                        api_key=self.artemis_api_key,
-                        service=self.service_info.service,
-                        org=self.service_info.org,
-                        repo=name,
-                        branch=None,
-                        timestamp=timestamp,
-                        query=self.redundant_scan_query,
-                    ):
-                        continue
-                repos.append(
-                    {
+                task = {
+                    "service": self.service_info.service,
+                    "repo": name,
+                    "org": base_org,
+                    "plugins": self.scan_options.plugins,
+                }
+                candidates.append((task, (name, None, timestamp)))
+            else:
+                log.info("getting branches for repo: %s", name)
+                refs, timestamps = self._get_branch_names(repo["id"])
+                for ref in refs:
+                    task = {
                         "service": self.service_info.service,
                         "repo": name,
                         "org": base_org,
+                        "branch": ref,
                         "plugins": self.scan_options.plugins,
                     }
-                )
-            else:
-                log.info("getting branches for repo: %s", name)
-                refs, timestamps = self._get_branch_names(repo["id"])
-                for ref in refs:
-                    if not redundant_scan_exists(
-                        api_key=self.artemis_api_key,
-                        service=self.service_info.service,
-                        org=self.service_info.org,
-                        repo=name,
-                        branch=ref,
-                        timestamp=timestamps[ref],
-                        query=self.redundant_scan_query,
-                    ):
-                        repos.append(
-                            {
-                                "service": self.service_info.service,
-                                "repo": name,
-                                "org": base_org,
-                                "branch": ref,
-                                "plugins": self.scan_options.plugins,
-                            }
-                        )
-        return repos
+                    candidates.append((task, (name, ref, timestamps[ref])))
+
+        # Check for redundant scans of all of the branches in the page at once
+        return filter_redundant_scans(
+            self.artemis_api_key,
+            self.service_info.service,
+            self.service_info.org,
+            candidates,
+            self.redundant_scan_query,
+        )
 
     def _get_branch_names(self, project_id: str, ref: str = None) -> Tuple[list, dict]:
         """
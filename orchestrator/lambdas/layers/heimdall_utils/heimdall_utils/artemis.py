@@ -1,6 +1,6 @@
 # pylint: disable=no-member
-from copy import deepcopy
 from http import HTTPStatus
+from typing import Optional
 
 import requests
 from aws_lambda_powertools import Logger
@@ -12,57 +12,85 @@ metric = get_metrics()
 
 LOG = Logger(service=APPLICATION, name=__name__, child=True)
 
+# Maximum number of scans the Artemis API can check in one request
+MAX_REDUNDANT_SCAN_CHECKS = 1000
 
-def redundant_scan_exists(
+
+def redundant_scans_exist(
     api_key: str,
     service: str,
     org: str,
-    repo: str,
-    branch: str,
-    timestamp: str,
+    checks: list[tuple[str, Optional[str], Optional[str]]],
     query: dict,
     raise_for_status: bool = False,  # Useful during testing
-) -> bool:
+) -> list[bool]:
     """
-    Determine if an Artemis scan for the service/org/repo+branch matching
-    the provided query has been created since the provided timestamp
+    Determine, for each (repo, branch, timestamp) in the checks, if an Artemis scan for the service/org/repo+branch
+    matching the provided query has been created since the timestamp. A branch of None is the default branch.
     """
-    if not query:
+    if not query or not checks:
         # No query provided bypasses the check altogether
-        return False
+        return [False] * len(checks)
+
+    results = []
+    for i in range(0, len(checks), MAX_REDUNDANT_SCAN_CHECKS):
+        batch = checks[i : i + MAX_REDUNDANT_SCAN_CHECKS]
+        LOG.debug("Checking for scans of %d branches in %s/%s", len(batch), service, org)
+        exists = _search_scans_exist(api_key, service, org, batch, query, raise_for_status)
+
+        for (repo, branch, timestamp), scan_exists in zip(batch, exists):
+            if scan_exists:
+                LOG.debug("Scan of %s/%s/%s:%s since %s exists", service, org, repo, branch, timestamp)
+                metric.add_metric(
+                    "skipped_tasks.count",
+                    1,
+                    version_control_service=service,
+                    organization_name=org,
+                    repository_name=repo,
+                )
+        results.extend(exists)
+    return results
+
+
+def filter_redundant_scans(
+    api_key: str, service: str, org: str, candidates: list[tuple[dict, tuple]], query: dict
+) -> list[dict]:
+    """
+    Filters a list of (task, (repo, branch, timestamp)) candidates down to the tasks that do not have a redundant scan
+    """
+    exists = redundant_scans_exist(api_key, service, org, [check for _, check in candidates], query)
+    return [task for (task, _), scan_exists in zip(candidates, exists) if not scan_exists]
 
-    LOG.debug("Checking for scan of %s/%s/%s:%s since %s", service, org, repo, branch, timestamp)
 
-    # Build the Artemis scan search parameters
-    params = deepcopy(query)  # Start with the provided query
-    params["limit"] = 1  # We only need to pull back a single scan to determine if any exist
-    params["service"] = service.lower()  # Add the service to the query
-    params["repo"] = f"{org}/{repo}".lower()  # Add the org/repo to the query
-    if branch is None:
-        params["branch__isnull"] = True  # Add null branch to the query
-    else:
-        params["branch"] = branch  # Add the branch to the query
-    params["created__gt"] = timestamp  # Add the timestamp to the query
+def _search_scans_exist(
+    api_key: str, service: str, org: str, checks: list, query: dict, raise_for_status: bool
+) -> list[bool]:
+    body = {
+        "query": {k: str(v) for k, v in query.items()},
+        "scans": [
+            {
+                "service": service.lower(),
+                "repo": f"{org}/{repo}".lower(),
+                "branch": branch,
+                "created__gt": timestamp,
+            }
+            for repo, branch, timestamp in checks
+        ],
+    }
 
-    r = requests.get(
+    r = requests.post(
         f"{ARTEMIS_API}/search/scans",
         headers={"x-api-key": api_key, "Content-Type": "application/json"},
-        params=params,
+        json=body,
         timeout=DEFAULT_API_TIMEOUT,
     )
     if raise_for_status:
         r.raise_for_status()
     if r.status_code == HTTPStatus.OK:
-        # Return a boolean matching whether any scans were returned
-        if r.json().get("count", 0) > 0:
-            LOG.debug("Scan of %s/%s/%s:%s exists", service, org, repo, branch)
-            metric.add_metric(
-                "skipped_tasks.count", 1, version_control_service=service, organization_name=org, repository_name=repo
-            )
-            return True
-        else:
-            LOG.debug("Scan of %s/%s/%s:%s does not exist", service, org, repo, branch)
-            return False
+        results = r.json().get("results", [])
+        if len(results) == len(checks):
+            return [bool(result) for result in results]
 
-    # Something else happened so default to assuming a redundant scan doesn't exist
-    return False
+    # Something else happened so default to assuming redundant scans don't exist
+    LOG.warning("Unable to check for existing scans in %s/%s (status %d)", service, org, r.status_code)
+    return [False] * len(checks)
@@ -1,6 +1,6 @@
 # pylint: disable=no-name-in-module, no-member
 import json
-from typing import Any
+from typing import Any, Optional
 
 import boto3
 import requests
@@ -172,11 +172,14 @@ def get_analyzer_api_key(api_key_loc) -> str or None:
     return None
 
 
-def send_analyzer_request(url: str, api_key: str, request_json: dict) -> Response:
+def send_analyzer_request(
+    url: str, api_key: str, request_json: dict, session: Optional[requests.Session] = None
+) -> Response:
     """
     Connects to Analyzer API to send repo scan request.
+    If a session is provided its connection pool is reused between requests.
     """
-    return requests.post(
+    return (session or requests).post(
         url=url,
         headers={"x-api-key": api_key, "Content-Type": "application/json"},
         json=request_json,
@@ -3,8 +3,11 @@ import json
 import os
 import warnings
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any, Optional
+
+import requests
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
 
@@ -33,6 +36,13 @@ REPO_DLQ = os.environ.get("REPO_DEAD_LETTER_QUEUE")
 SCAN_DEPTH = int(os.environ.get("SCAN_DEPTH", 1))
 SCAN_TABLE_NAME = os.environ.get("SCAN_TABLE") or ""
 
+# HEIMDALL_REPO_SCAN_BATCH_SIZE -- Maximum number of repos to pull off the queue per invocation
+# HEIMDALL_SUBMIT_CHUNK_SIZE -- Maximum number of repos to submit to the Artemis API in a single request
+# HEIMDALL_SUBMIT_CONCURRENCY -- Maximum number of requests to the Artemis API to have in flight at a time
+BATCH_SIZE = max(int(os.environ.get("HEIMDALL_REPO_SCAN_BATCH_SIZE") or 20), 1)
+SUBMIT_CHUNK_SIZE = max(int(os.environ.get("HEIMDALL_SUBMIT_CHUNK_SIZE") or 20), 1)
+SUBMIT_CONCURRENCY = max(int(os.environ.get("HEIMDALL_SUBMIT_CONCURRENCY") or 4), 1)
+
 log = Logger(service=APPLICATION, name="repo_scan")
 json_utils = JSONUtils(log)
 metrics = get_metrics()
@@ -40,7 +50,9 @@ metrics = get_metrics()
 
 @metrics.log_metrics()
 @log.inject_lambda_context
-def run(event: dict[str, Any] = None, context: LambdaContext = None, size: int = 20) -> Optional[list[dict[str, Any]]]:
+def run(
+    event: dict[str, Any] = None, context: LambdaContext = None, size: int = BATCH_SIZE
+) -> Optional[list[dict[str, Any]]]:
     # Get the size of the REPO_QUEUE
     message_num = get_queue_size(REPO_QUEUE)
     if message_num == 0:
@@ -49,7 +61,7 @@ def run(event: dict[str, Any] = None, context: LambdaContext = None, size: int =
 
     api_key = get_analyzer_api_key(API_KEY_LOC)
 
-    # Pull no more than 20 repos off the queue
+    # Pull no more than the batch size of repos off the queue
     repos = []
 
     while len(repos) < size:
@@ -87,38 +99,81 @@ def process_messages(messages: list) -> namedtuple:
 def submit_repos(repos: list, analyzer_url: str, api_key: str) -> list:
     """
     Takes the repo list, converts them into a json readable by Analyzer,
-    and sends each request to Analyzer.
+    and sends the requests for each service to Analyzer concurrently.
     """
     all_success = []
     all_scan_items = []
 
     requests_by_service = construct_repo_requests(repos)
-    for service, request_items in requests_by_service["reqs"].items():
-        log.append_keys(version_control_service=service)
-        log.info("Submitting %d repos for %s", len(request_items), service)
-
-        url = f"{analyzer_url}/{service}"
-        response = send_analyzer_request(url, api_key, request_items)
-
-        repo_dict = {}
-        response_dict = json_utils.get_json_from_response(response.text)
-        success = is_status_successful(response.status_code)
-        if not success:
-            error_response = handle_error_response(response.status_code, response.text)
-            log.error(error_response)
-        if success or response.status_code == 207:
-            repo_dict = get_repo_scan_items(service, response.text)
-            all_scan_items.extend(repo_dict["scan_items"])
-        if response.status_code == 504 or response.status_code == 401:
-            log.error(f"Error submitting repos. API Error Code: {response.status_code}")
-            requeue_failed_repos(service, requests_by_service["req_lookup"][service], request_items)
-        if "failed" in response_dict:
-            requeue_failed_repos(service, requests_by_service["req_lookup"][service], response_dict["failed"])
-        all_success.append({"service": service, "repos": repo_dict.get("repos"), "success": success})
+    chunks = [
+        (service, request_items[i : i + SUBMIT_CHUNK_SIZE])
+        for service, request_items in requests_by_service["reqs"].items()
+        for i in range(0, len(request_items), SUBMIT_CHUNK_SIZE)
+    ]
+
+    with requests.Session() as session:
+        # Size the connection pool so that concurrent requests don't have to open new connections
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=SUBMIT_CONCURRENCY)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        with ThreadPoolExecutor(max_workers=SUBMIT_CONCURRENCY) as executor:
+            responses = executor.map(
+                lambda chunk: submit_chunk(session, analyzer_url, api_key, *chunk),
+                chunks,
+            )
+            # The responses are handled in the order the chunks were submitted, as each one completes
+            for (service, request_items), response in zip(chunks, responses):
+                log.append_keys(version_control_service=service)
+                result, scan_items = handle_response(
+                    service, request_items, requests_by_service["req_lookup"][service], response
+                )
+                all_success.append(result)
+                all_scan_items.extend(scan_items)
     batch_update_db(SCAN_TABLE_NAME, all_scan_items)
     return all_success
 
 
+def submit_chunk(session: requests.Session, analyzer_url: str, api_key: str, service: str, request_items: list):
+    """
+    Sends a chunk of repos for a service to Analyzer.
+    Returns None if the request could not be made.
+    """
+    log.info("Submitting %d repos for %s", len(request_items), service)
+    try:
+        return send_analyzer_request(f"{analyzer_url}/{service}", api_key, request_items, session=session)
+    except requests.RequestException as e:
+        log.error("Error submitting repos for %s: %s", service, e)
+        return None
+
+
+def handle_response(service: str, request_items: list, repo_lookup: dict[str, Any], response) -> tuple[dict, list]:
+    """
+    Processes the Analyzer response to a chunk of repos, requeuing the repos that failed.
+    Returns the submission result and the scan items to store.
+    """
+    if response is None:
+        requeue_failed_repos(service, repo_lookup, request_items)
+        return {"service": service, "repos": None, "success": False}, []
+
+    repo_dict = {}
+    scan_items = []
+    response_dict = json_utils.get_json_from_response(response.text)
+    success = is_status_successful(response.status_code)
+    if not success:
+        error_response = handle_error_response(response.status_code, response.text)
+        log.error(error_response)
+    if success or response.status_code == 207:
+        repo_dict = get_repo_scan_items(service, response.text)
+        scan_items = repo_dict["scan_items"]
+    if response.status_code == 504 or response.status_code == 401:
+        log.error(f"Error submitting repos. API Error Code: {response.status_code}")
+        requeue_failed_repos(service, repo_lookup, request_items)
+    if "failed" in response_dict:
+        requeue_failed_repos(service, repo_lookup, response_dict["failed"])
+    return {"service": service, "repos": repo_dict.get("repos"), "success": success}, scan_items
+
+
 def requeue_failed_repos(service: str, repo_lookup: dict[str, Any], failed_repos: list):
     """
     Send failed repos to the repo-dead-letter SQS queue
@@ -1,28 +1,67 @@
 # pylint: disable=no-name-in-module, no-member
 import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Any
 import boto3
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.utilities.typing import LambdaContext
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 from heimdall_utils.env import APPLICATION
 
 REGION = os.environ.get("REGION", "us-east-1")
 REPO_SCAN_LAMBDA = os.environ.get("HEIMDALL_REPO_SCAN_LAMBDA")
 INVOKE_COUNT = int(os.environ.get("HEIMDALL_INVOKE_COUNT", "10"))
+# Maximum number of repo_scan invocations this lambda has in flight at a time. The budget across all of the
+# repo_scan_loop invocations is enforced by the reserved concurrency of the repo_scan lambda.
+MAX_IN_FLIGHT = max(int(os.environ.get("HEIMDALL_MAX_IN_FLIGHT") or 1), 1)
+# The repo_scan lambda can run for up to 15 minutes so wait that long for the synchronous invocation to return
+INVOKE_READ_TIMEOUT = 900
 
 log = Logger(service=APPLICATION, name="repo_scan_loop")
 
 
 @log.inject_lambda_context
 def handler(event: dict[str, Any] = None, context: LambdaContext = None) -> None:
-    aws_lambda = boto3.client("lambda", region_name=REGION)
+    aws_lambda = boto3.client(
+        "lambda",
+        region_name=REGION,
+        config=Config(read_timeout=INVOKE_READ_TIMEOUT, max_pool_connections=MAX_IN_FLIGHT),
+    )
 
-    # Invoke the repo_scan lambda the configured number of times
-    for i in range(INVOKE_COUNT):
-        log.info("Invoking %s (%s of %s)", REPO_SCAN_LAMBDA, i + 1, INVOKE_COUNT)
+    # Invoke the repo_scan lambda the configured number of times, keeping up to MAX_IN_FLIGHT invocations running.
+    # No new invocations are started once the queue is empty or the repo_scan lambda is at its concurrency limit.
+    launched = 0
+    more = True
+    in_flight = set()
+    with ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT) as executor:
+        while in_flight or (more and launched < INVOKE_COUNT):
+            while more and launched < INVOKE_COUNT and len(in_flight) < MAX_IN_FLIGHT:
+                launched += 1
+                in_flight.add(executor.submit(invoke, aws_lambda, launched))
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                if not future.result():
+                    more = False
+
+
+def invoke(aws_lambda, n: int) -> bool:
+    """
+    Invokes the repo_scan lambda
+    :return: Whether the repo_scan lambda should be invoked again
+    """
+    log.info("Invoking %s (%s of %s)", REPO_SCAN_LAMBDA, n, INVOKE_COUNT)
+    try:
         resp = aws_lambda.invoke(FunctionName=REPO_SCAN_LAMBDA, InvocationType="RequestResponse", Payload="{}")
-        if resp["StatusCode"] == 200 and "FunctionError" not in resp:
-            log.info("Invocation succeeded")
-        else:
-            log.error("Lambda function %s failed: %s", REPO_SCAN_LAMBDA, resp.get("FunctionError", "Unknown error"))
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") == "TooManyRequestsException":
+            log.warning("Lambda function %s is at its concurrency limit", REPO_SCAN_LAMBDA)
+            return False
+        raise
+    if resp["StatusCode"] == 200 and "FunctionError" not in resp:
+        log.info("Invocation succeeded")
+        # The repo_scan lambda returns null when there was nothing on the queue
+        return resp["Payload"].read().strip() != b"null"
+    log.error("Lambda function %s failed: %s", REPO_SCAN_LAMBDA, resp.get("FunctionError", "Unknown error"))
+    return True
@@ -0,0 +1,74 @@
+import unittest
+from http import HTTPStatus
+from unittest.mock import MagicMock, patch
+
+from heimdall_utils import artemis
+
+TEST_KEY = "test_key"
+TEST_SERVICE = "GitHub"
+TEST_ORG = "wm-test"
+TEST_QUERY = {"plugin__icontains": "trufflehog"}
+TEST_TIMESTAMP = "2024-01-01T00:00:00Z"
+
+
+def _response(results: list, status_code=HTTPStatus.OK) -> MagicMock:
+    resp = MagicMock(status_code=status_code)
+    resp.json.return_value = {"results": results}
+    return resp
+
+
+class TestArtemis(unittest.TestCase):
+    @patch.object(artemis.requests, "post")
+    def test_redundant_scans_exist(self, mock_post):
+        mock_post.return_value = _response([True, False])
+
+        checks = [("repo1", None, TEST_TIMESTAMP), ("repo2", "dev", TEST_TIMESTAMP)]
+        result = artemis.redundant_scans_exist(TEST_KEY, TEST_SERVICE, TEST_ORG, checks, TEST_QUERY)
+
+        self.assertEqual(result, [True, False])
+        mock_post.assert_called_once()
+        self.assertEqual(
+            mock_post.call_args.kwargs["json"],
+            {
+                "query": TEST_QUERY,
+                "scans": [
+                    {"service": "github", "repo": "wm-test/repo1", "branch": None, "created__gt": TEST_TIMESTAMP},
+                    {"service": "github", "repo": "wm-test/repo2", "branch": "dev", "created__gt": TEST_TIMESTAMP},
+                ],
+            },
+        )
+
+    @patch.object(artemis.requests, "post")
+    def test_redundant_scans_exist_batches(self, mock_post):
+        mock_post.side_effect = lambda *args, **kwargs: _response([True] * len(kwargs["json"]["scans"]))
+
+        checks = [(f"repo{i}", None, TEST_TIMESTAMP) for i in range(artemis.MAX_REDUNDANT_SCAN_CHECKS + 1)]
+        result = artemis.redundant_scans_exist(TEST_KEY, TEST_SERVICE, TEST_ORG, checks, TEST_QUERY)
+
+        self.assertEqual(result, [True] * len(checks))
+        self.assertEqual(mock_post.call_count, 2)
+
+    @patch.object(artemis.requests, "post")
+    def test_redundant_scans_exist_no_query(self, mock_post):
+        result = artemis.redundant_scans_exist(TEST_KEY, TEST_SERVICE, TEST_ORG, [("repo1", None, None)], None)
+
+        self.assertEqual(result, [False])
+        mock_post.assert_not_called()
+
+    @patch.object(artemis.requests, "post")
+    def test_redundant_scans_exist_error(self, mock_post):
+        mock_post.return_value = _response([], HTTPStatus.INTERNAL_SERVER_ERROR)
+
+        checks = [("repo1", None, TEST_TIMESTAMP), ("repo2", "dev", TEST_TIMESTAMP)]
+        result = artemis.redundant_scans_exist(TEST_KEY, TEST_SERVICE, TEST_ORG, checks, TEST_QUERY)
+
+        self.assertEqual(result, [False, False])
+
+    @patch.object(artemis.requests, "post")
+    def test_filter_redundant_scans(self, mock_post):
+        mock_post.return_value = _response([True, False])
+
+        candidates = [({"repo": "repo1"}, ("repo1", None, TEST_TIMESTAMP)), ({"repo": "repo2"}, ("repo2", None, None))]
+        result = artemis.filter_redundant_scans(TEST_KEY, TEST_SERVICE, TEST_ORG, candidates, TEST_QUERY)
+
+        self.assertEqual(result, [{"repo": "repo2"}])
@@ -5,6 +5,8 @@ import unittest
 from collections import namedtuple
 from unittest.mock import patch
 
+import requests
+
 from repo_scan import repo_scan
 
 TEST_BATCH_ID = "4886eea8-ebca-4bcf-bf22-063ca255067c"
@@ -243,6 +245,55 @@ class TestRepoScan(unittest.TestCase):
 
         self.assertEqual(expected_result, result)
 
+    @patch.object(repo_scan, "SUBMIT_CHUNK_SIZE", 1)
+    @patch.object(repo_scan, "batch_update_db")
+    @patch.object(repo_scan, "send_analyzer_request")
+    def test_submit_repos_chunks(self, mock_request_fun, mock_db_fun):
+        responses = {
+            "eslint-config": RESPONSE_TUPLE(200, json.dumps(ANALYZER_RESPONSE_TEXT_GITHUB_ESLINT)),
+            "graphite": RESPONSE_TUPLE(200, json.dumps({"queued": [], "failed": []})),
+            "portal_web": RESPONSE_TUPLE(200, json.dumps(ANALYZER_RESPONSE_TEXT_BITBUCKET)),
+        }
+        mock_request_fun.side_effect = lambda url, api_key, request_items, session: responses[request_items[0]["repo"]]
+
+        result = repo_scan.submit_repos(POLLED_REPOS, "url", "api_key")
+
+        # Each chunk is submitted separately over the same session and the results are kept in order
+        self.assertEqual(mock_request_fun.call_count, 3)
+        self.assertEqual(len({call.kwargs["session"] for call in mock_request_fun.call_args_list}), 1)
+        self.assertEqual(
+            result,
+            [
+                ANALYZER_QUEUED_RESULT_GITHUB_ESLINT[0],
+                {"repos": {}, "service": "github", "success": True},
+                ANALYZER_QUEUED_RESULT_BITBUCKET[0],
+            ],
+        )
+        mock_db_fun.assert_called_once()
+        self.assertEqual(len(mock_db_fun.call_args.args[1]), 2)
+
+    @patch.object(repo_scan, "send_sqs_message")
+    @patch.object(repo_scan, "batch_update_db")
+    @patch.object(repo_scan, "send_analyzer_request")
+    def test_submit_repos_request_error(self, mock_request_fun, mock_db_fun, mock_sqs_fun):
+        def send(url, api_key, request_items, session):
+            if url.endswith("/github"):
+                raise requests.ConnectionError()
+            return RESPONSE_TUPLE(200, json.dumps(ANALYZER_RESPONSE_TEXT_BITBUCKET))
+
+        mock_request_fun.side_effect = send
+        mock_sqs_fun.return_value = True
+
+        result = repo_scan.submit_repos(POLLED_REPOS, "url", "api_key")
+
+        self.assertEqual(
+            result,
+            [{"repos": None, "service": "github", "success": False}, ANALYZER_QUEUED_RESULT_BITBUCKET[0]],
+        )
+        # The repos that could not be submitted are requeued
+        mock_sqs_fun.assert_called_once()
+        self.assertEqual(len(mock_sqs_fun.call_args.args[1]), 2)
+
     def test_construct_repo_requests_one_service(self):
         self.maxDiff = None
         expected_result = {"reqs": GITHUB_CONSTRUCTED_REQUEST, "req_lookup": self.github_lookup_req}
@@ -0,0 +1,69 @@
+import io
+import threading
+import time
+import unittest
+from dataclasses import dataclass
+from unittest.mock import MagicMock, patch
+
+from botocore.exceptions import ClientError
+
+from repo_scan_loop import main
+
+
+def _response(payload: bytes = b'{"results": []}') -> dict:
+    return {"StatusCode": 200, "Payload": io.BytesIO(payload)}
+
+
+@dataclass
+class MockLambdaContext:
+    function_name: str = "test"
+    memory_limit_in_mb: int = 128
+    invoked_function_arn: str = "arn:aws:lambda:eu-west-1:809313241:function:test"
+    aws_request_id: str = "52fdfc07-2182-154f-163f-5f0f9a621d72"
+
+
+class TestRepoScanLoop(unittest.TestCase):
+    def _run(self, invoke) -> MagicMock:
+        client = MagicMock()
+        client.invoke.side_effect = invoke
+        with patch.object(main.boto3, "client", return_value=client):
+            main.handler(event={}, context=MockLambdaContext)
+        return client
+
+    @patch.object(main, "MAX_IN_FLIGHT", 3)
+    @patch.object(main, "INVOKE_COUNT", 10)
+    def test_handler_in_flight(self):
+        lock = threading.Lock()
+        state = {"running": 0, "max": 0}
+
+        def invoke(**kwargs):
+            with lock:
+                state["running"] += 1
+                state["max"] = max(state["max"], state["running"])
+            time.sleep(0.05)
+            with lock:
+                state["running"] -= 1
+            return _response()
+
+        client = self._run(invoke)
+
+        self.assertEqual(client.invoke.call_count, 10)
+        self.assertEqual(state["max"], 3)
+
+    @patch.object(main, "MAX_IN_FLIGHT", 1)
+    @patch.object(main, "INVOKE_COUNT", 10)
+    def test_handler_queue_empty(self):
+        payloads = iter([b'[{"service": "github"}]', b"null"])
+
+        client = self._run(lambda **kwargs: _response(next(payloads)))
+
+        self.assertEqual(client.invoke.call_count, 2)
+
+    @patch.object(main, "MAX_IN_FLIGHT", 1)
+    @patch.object(main, "INVOKE_COUNT", 10)
+    def test_handler_throttled(self):
+        error = ClientError({"Error": {"Code": "TooManyRequestsException"}}, "Invoke")
+
+        client = self._run(MagicMock(side_effect=[_response(), error]))
+
+        self.assertEqual(client.invoke.call_count, 2)
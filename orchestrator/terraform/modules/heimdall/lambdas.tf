@@ -137,16 +137,20 @@ resource "aws_lambda_function" "repo-scan" {
   memory_size   = 256
   role          = aws_iam_role.vpc-lambda-assume-role.arn
   layers        = var.lambda_layers
+
+  reserved_concurrent_executions = var.repo_scan_reserved_concurrency
+
   environment {
     variables = merge({
-      APPLICATION            = var.app
-      REGION                 = var.aws_region
-      ARTEMIS_API            = var.artemis_api
-      ARTEMIS_API_KEY        = aws_secretsmanager_secret.artemis-api-key.name
-      REPO_QUEUE             = aws_sqs_queue.repo-queue.id
-      SCAN_TABLE             = aws_dynamodb_table.repo-scan-id.name
-      REPO_DEAD_LETTER_QUEUE = aws_sqs_queue.repo-deadletter-queue.id
-      DATADOG_ENABLED        = var.datadog_enabled
+      APPLICATION                 = var.app
+      REGION                      = var.aws_region
+      ARTEMIS_API                 = var.artemis_api
+      ARTEMIS_API_KEY             = aws_secretsmanager_secret.artemis-api-key.name
+      REPO_QUEUE                  = aws_sqs_queue.repo-queue.id
+      SCAN_TABLE                  = aws_dynamodb_table.repo-scan-id.name
+      REPO_DEAD_LETTER_QUEUE      = aws_sqs_queue.repo-deadletter-queue.id
+      HEIMDALL_SUBMIT_CONCURRENCY = var.repo_scan_submit_concurrency
+      DATADOG_ENABLED             = var.datadog_enabled
       },
       var.datadog_enabled ? merge({
         DD_LAMBDA_HANDLER = "handlers.handler"
@@ -196,6 +200,7 @@ resource "aws_lambda_function" "repo-scan-loop" {
       REGION                    = var.aws_region
       HEIMDALL_REPO_SCAN_LAMBDA = aws_lambda_function.repo-scan.function_name
       HEIMDALL_INVOKE_COUNT     = 10
+      HEIMDALL_MAX_IN_FLIGHT    = var.repo_scan_loop_max_in_flight
       DATADOG_ENABLED           = var.datadog_enabled
       },
       var.datadog_enabled ? merge({
@@ -152,6 +152,21 @@ variable "repo_scan_loop_lambda_timeout" {
   default     = 900
 }
 
+variable "repo_scan_loop_max_in_flight" {
+  description = "Maximum number of repo_scan Lambda invocations each repo_scan_loop Lambda runs concurrently"
+  default     = 4
+}
+
+variable "repo_scan_reserved_concurrency" {
+  description = "Reserved concurrency of the repo_scan Lambda, which limits the total number of invocations in flight (-1 for no limit)"
+  default     = -1
+}
+
+variable "repo_scan_submit_concurrency" {
+  description = "Maximum number of concurrent requests the repo_scan Lambda makes to the Artemis API"
+  default     = 4
+}
+
 variable "lambda_runtime" {
   default = "python3.12"
 }